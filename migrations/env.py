@@ -18,6 +18,8 @@ if config.config_file_name is not None:
 from recruitx_app.models.job import Job
 from recruitx_app.models.candidate import Candidate
 from recruitx_app.models.score import Score
+from recruitx_app.models.scoring_job import ScoringJob
+from recruitx_app.models.document_cache import ExtractedDocument, AnalysisCacheEntry
 from recruitx_app.core.database import Base
 
 # add your model's MetaData object here
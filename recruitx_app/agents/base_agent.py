@@ -0,0 +1,147 @@
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from recruitx_app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Safety settings shared by every agent
+DEFAULT_SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+
+def function_call_args(function_call: Any) -> Optional[Dict[str, Any]]:
+    """
+    Returns the arguments of a Gemini function call as a plain dict.
+
+    The SDK exposes `args` as a proto Struct (MapComposite); JSON strings and dicts
+    are accepted as well.
+
+    Args:
+        function_call: The `function_call` of a response part
+
+    Returns:
+        The arguments, or None if there are none
+    """
+    args = function_call.args
+    if isinstance(args, str):
+        return json.loads(args)
+    if isinstance(args, dict):
+        return args
+    return type(function_call).to_dict(function_call).get("args")
+
+class GeminiModelRegistry:
+    """
+    Process-wide cache of GenerativeModel instances.
+
+    Models are keyed by (model name, generation config, safety settings, tools) and
+    reused across requests. A cached model is never bound to an API key: the key pool
+    binds each call to a per-key client (see retry_utils.call_gemini_with_backoff),
+    so sharing one instance between concurrent requests is safe.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str, str, str], genai.GenerativeModel] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(value: Any) -> str:
+        return json.dumps(value, sort_keys=True, default=repr)
+
+    def get_model(
+        self,
+        model_name: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        safety_settings: Optional[List[Dict[str, str]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> genai.GenerativeModel:
+        """
+        Returns the cached model for this configuration, creating it on first use.
+
+        Args:
+            model_name: The Gemini model name
+            generation_config: Generation parameters as a dict
+            safety_settings: Safety settings list
+            tools: Tools bound at construction time (most agents pass tools per call)
+
+        Returns:
+            A shared GenerativeModel instance.
+        """
+        key = (
+            model_name,
+            self._freeze(generation_config),
+            self._freeze(safety_settings),
+            self._freeze(tools)
+        )
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model_kwargs = {
+                    "safety_settings": safety_settings,
+                    "generation_config": generation_config
+                }
+                if tools is not None:
+                    model_kwargs["tools"] = tools
+                model = genai.GenerativeModel(model_name, **model_kwargs)
+                self._models[key] = model
+                logger.info(f"Created Gemini model {model_name} ({len(self._models)} cached configurations).")
+            return model
+
+    def clear(self) -> None:
+        """Drops all cached models."""
+        with self._lock:
+            self._models.clear()
+
+
+class BaseAgent:
+    """
+    Base class for the Gemini-backed agents.
+
+    Holds the model name, safety settings and generation config, and hands out models
+    from the shared registry. Subclasses override `generation_config` (and pass a
+    different model name if needed) instead of building their own models.
+    """
+
+    generation_config: Dict[str, Any] = {
+        "temperature": 0.2,
+        "top_p": 0.95,
+        "top_k": 40,
+    }
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.GEMINI_PRO_MODEL
+        self.safety_settings = [dict(setting) for setting in DEFAULT_SAFETY_SETTINGS]
+
+    def _get_gemini_model(self, purpose: str = "general", generation_config: Optional[Dict[str, Any]] = None):
+        """
+        Get the Gemini model for this agent from the shared registry.
+
+        Args:
+            purpose: What the model is used for (only used in logs)
+            generation_config: Overrides the agent's default generation config
+
+        Returns:
+            A GenerativeModel instance. Construction is retried once before the error is raised.
+        """
+        config = generation_config or self.generation_config
+        try:
+            return gemini_model_registry.get_model(self.model_name, config, self.safety_settings)
+        except Exception as e:
+            logger.error(f"Error initializing Gemini model for {type(self).__name__} ({purpose}): {e}")
+            try:
+                return gemini_model_registry.get_model(self.model_name, config, self.safety_settings)
+            except Exception as e2:
+                logger.error(f"Second error initializing Gemini model: {e2}")
+                raise e2
+
+
+# Instantiate the registry for easy import
+gemini_model_registry = GeminiModelRegistry()
@@ -1,74 +1,24 @@
-import google.generativeai as genai
 import json
 import logging
 from typing import Dict, Any, Optional, List, Union
 import asyncio # Added for sleep
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff # Import the retry helper
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class CodeExecutionAgent:
+class CodeExecutionAgent(BaseAgent):
     """
     An agent that leverages Gemini 2.5 Pro's code execution capabilities 
     to dynamically generate and execute code for advanced analysis tasks.
     """
     
     def __init__(self):
-        self.model_name = settings.GEMINI_PRO_MODEL
-        genai.configure(api_key=settings.get_next_api_key())
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-    
-    def _get_gemini_model(self):
-        """Get the Gemini model, rotating API keys if necessary."""
-        try:
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config={
-                    "temperature": 0.2,  # Slightly higher for creative code solutions
-                    "top_p": 0.95,
-                    "top_k": 40,
-                }
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Error initializing Gemini model: {e}")
-            genai.configure(api_key=settings.get_next_api_key())
-            logger.info("Rotated to next API key")
-            try:
-                return genai.GenerativeModel(
-                    self.model_name,
-                    safety_settings=self.safety_settings,
-                    generation_config={
-                        "temperature": 0.2,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                    }
-                )
-            except Exception as e2:
-                logger.error(f"Second error initializing Gemini model: {e2}")
-                raise e2
+        super().__init__(settings.GEMINI_PRO_MODEL)
     
     async def generate_and_execute_skill_matcher(
         self, 
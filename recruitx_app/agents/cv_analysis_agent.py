@@ -1,9 +1,9 @@
-import google.generativeai as genai
 import json
 import logging
 from typing import Dict, Any, List, Optional
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent, function_call_args as get_function_call_args
 from recruitx_app.schemas.candidate import CandidateAnalysis # Import the schema
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff # Import retry helper
 from recruitx_app.services.vector_db_service import vector_db_service # Import the vector db service
@@ -161,47 +161,21 @@ Use the retrieved context to:
 - Do **not** invent or assume information not present in the text. Your response MUST be a call to the `analyze_cv` function.
 """
 
-class CVAnalysisAgent:
+class CVAnalysisAgent(BaseAgent):
     """
     Agent responsible for analyzing candidate CVs using Gemini function calling.
     """
 
+    # Low temp for structured output consistency; response_mime_type is NOT set for function calling
+    generation_config = {
+        "temperature": 0.1,
+        "top_p": 0.95,
+        "top_k": 40,
+    }
+
     def __init__(self):
         """Initialize the CV Analysis Agent."""
-        self.model_name = settings.GEMINI_PRO_MODEL
-        # Safety settings can be defined once
-        self.safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
-        ]
-        # Initial configuration, will be re-configured in _get_gemini_model
-        genai.configure(api_key=settings.get_next_api_key())
-
-    def _get_gemini_model(self, purpose="cv_analysis"):
-        """Get the Gemini model, managing API key rotation."""
-        current_key = settings.get_next_api_key() # Force rotation/get next key
-        logger.info(f"Using API Key ending in: ...{current_key[-4:]} for CV Analysis ({purpose})")
-        genai.configure(api_key=current_key)
-
-        try:
-            # Define generation config for consistency
-            generation_config = genai.GenerationConfig(
-                temperature=0.1, # Low temp for structured output consistency
-                top_p=0.95,
-                top_k=40
-            )
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config=generation_config
-                # response_mime_type is NOT set for function calling
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Fatal error initializing Gemini model for CV Analysis: {e}")
-            raise e # Re-raise after logging
+        super().__init__(settings.GEMINI_PRO_MODEL)
             
     async def get_relevant_context(self, cv_text: str, max_chunks: int = 5) -> str:
         """
@@ -325,7 +299,7 @@ class CVAnalysisAgent:
                     if hasattr(part, 'function_call') and part.function_call:
                         function_call = part.function_call
                         if function_call.name == "analyze_cv":
-                            function_call_args = json.loads(function_call.args)
+                            function_call_args = get_function_call_args(function_call)
                             logger.info(f"Successfully received function call: analyze_cv")
                             break
 
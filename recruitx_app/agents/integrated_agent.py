@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import json
 import logging
 from typing import Dict, Any, Optional, List, Union, Callable
@@ -6,6 +5,7 @@ import asyncio # Added for sleep
 import time # Added for sleep
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent
 from recruitx_app.agents.jd_analysis_agent import JDAnalysisAgent
 from recruitx_app.agents.code_execution_agent import CodeExecutionAgent
 from recruitx_app.agents.tool_use_agent import ToolUseAgent
@@ -19,7 +19,7 @@ logger = logging.getLogger(__name__)
 # Define longer delay time
 INTER_STEP_DELAY = 15 # seconds
 
-class IntegratedAgent:
+class IntegratedAgent(BaseAgent):
     """
     An integrated agent that combines all Gemini 2.5 Pro capabilities:
     - Function calling
@@ -33,67 +33,13 @@ class IntegratedAgent:
     """
     
     def __init__(self):
-        self.model_name = settings.GEMINI_PRO_MODEL
-        genai.configure(api_key=settings.get_next_api_key())
+        super().__init__(settings.GEMINI_PRO_MODEL)
         
         # Initialize specialized agents
         self.jd_analysis_agent = JDAnalysisAgent()
         self.code_execution_agent = CodeExecutionAgent()
         self.tool_use_agent = ToolUseAgent()
         self.multimodal_agent = MultimodalAgent()
-        
-        # Configure the main Gemini model
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-    
-    def _get_gemini_model(self):
-        """Get the Gemini model, rotating API keys if necessary."""
-        try:
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config={
-                    "temperature": 0.2,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    # "enable_thinking": True, # Temporarily remove thinking capability
-                }
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Error initializing Gemini model: {e}")
-            genai.configure(api_key=settings.get_next_api_key())
-            logger.info("Rotated to next API key")
-            try:
-                return genai.GenerativeModel(
-                    self.model_name,
-                    safety_settings=self.safety_settings,
-                    generation_config={
-                        "temperature": 0.2,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        # "enable_thinking": True,
-                    }
-                )
-            except Exception as e2:
-                logger.error(f"Second error initializing Gemini model: {e2}")
-                raise e2
     
     async def comprehensive_job_candidate_analysis(
         self, 
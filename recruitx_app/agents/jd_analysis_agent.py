@@ -1,10 +1,10 @@
-import google.generativeai as genai
 import json
 from typing import Dict, Any, Optional, List, Union
 import logging
 import asyncio # Added for sleep
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent, function_call_args as get_function_call_args
 from recruitx_app.schemas.job import JobAnalysis, JobRequirementFacet
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff # Import the retry helper
 from recruitx_app.services.vector_db_service import vector_db_service # Import the vector db service
@@ -236,57 +236,17 @@ Use the `extract_job_requirements` function call schema provided to structure yo
 
 # --- End NEW --- 
 
-class JDAnalysisAgent:
+class JDAnalysisAgent(BaseAgent):
+    # Low temperature for consistent structured output; function calling does not use response_mime_type
+    generation_config = {
+        "temperature": 0.1,
+        "top_p": 0.95,
+        "top_k": 40,
+    }
+
     def __init__(self):
         # Use the Gemini model from settings
-        self.model_name = settings.GEMINI_PRO_MODEL  
-        # Initialize the counter for API key rotation
-        self._api_key_index = 0
-        # Configure Gemini API with the first API key for now
-        genai.configure(api_key=settings.get_next_api_key())
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-
-    def _get_gemini_model(self, purpose="general_analysis"): # Updated default purpose
-        """Get the Gemini model, rotating API keys if necessary."""
-        # Ensure API key is configured before creating the model
-        current_key = settings.get_next_api_key() # Force rotation/get next key
-        logger.info(f"Using API Key ending in: ...{current_key[-4:]} for JD Analysis ({purpose})") # Added purpose to log
-        genai.configure(api_key=current_key)
-        
-        try:
-            # Adjust generation config based on purpose if needed in the future
-            # For now, using a consistent config, but function calling won't use response_mime_type
-            generation_config={ 
-                "temperature": 0.1,
-                "top_p": 0.95,
-                "top_k": 40,
-            }
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config=generation_config 
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Fatal error initializing Gemini model: {e}")
-            raise e # Re-raise after logging
+        super().__init__(settings.GEMINI_PRO_MODEL)
     
     async def get_relevant_context(self, job_description: str, max_chunks: int = 5) -> str:
         """
@@ -388,7 +348,7 @@ class JDAnalysisAgent:
                         function_call = part.function_call
                         # Confirm it's the expected function
                         if function_call.name == "analyze_job_description":
-                            function_call_args = json.loads(function_call.args)
+                            function_call_args = get_function_call_args(function_call)
                             logger.info(f"Successfully received function call: analyze_job_description")
                             break
 
@@ -396,6 +356,9 @@ class JDAnalysisAgent:
                 logger.error(f"Failed to get function call arguments from response.")
                 return None
 
+            # Add the job_id, which isn't part of the function call args
+            function_call_args["job_id"] = job_id
+
             # Convert to JobAnalysis object:
             job_analysis = JobAnalysis.model_validate(function_call_args)
             logger.info(f"Successfully analyzed job ID: {job_id}, identified {len(job_analysis.required_skills)} required skills.")
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import json
 import base64
 import logging
@@ -6,71 +5,21 @@ from typing import Dict, Any, Optional, List, Union
 import asyncio # Added for sleep
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff # Import the retry helper
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class MultimodalAgent:
+class MultimodalAgent(BaseAgent):
     """
     A demonstration agent for leveraging Gemini 2.5 Pro's multimodal capabilities.
     This can be used for CV analysis with images, charts, and other visual elements.
     """
     
     def __init__(self):
-        self.model_name = settings.GEMINI_PRO_VISION_MODEL
-        self._api_key_index = 0
-        genai.configure(api_key=settings.get_next_api_key())
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-    
-    def _get_gemini_model(self):
-        """Get the Gemini multimodal model, rotating API keys if necessary."""
-        try:
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config={
-                    "temperature": 0.2,  # Slightly higher for creative analysis
-                    "top_p": 0.95,
-                    "top_k": 40,
-                }
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Error initializing Gemini model: {e}")
-            genai.configure(api_key=settings.get_next_api_key())
-            logger.info("Rotated to next API key")
-            try:
-                return genai.GenerativeModel(
-                    self.model_name,
-                    safety_settings=self.safety_settings,
-                    generation_config={
-                        "temperature": 0.2,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                    }
-                )
-            except Exception as e2:
-                logger.error(f"Second error initializing Gemini model: {e2}")
-                raise e2
+        super().__init__(settings.GEMINI_PRO_VISION_MODEL)
     
     async def analyze_document_with_images(
         self, 
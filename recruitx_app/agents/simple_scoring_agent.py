@@ -1,16 +1,15 @@
-import google.generativeai as genai
 import json
 import logging
 from typing import Dict, Any, Optional, List
 import asyncio
-import numpy as np
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff
 # Import the vector DB service
 from recruitx_app.services.vector_db_service import vector_db_service
 # Import text utilities for cosine similarity
-from recruitx_app.utils.text_utils import cosine_similarity
+from recruitx_app.utils.text_utils import cosine_similarity_matrix
 # Import JobRequirementFacet for type hints
 from recruitx_app.schemas.job import JobRequirementFacet
 
@@ -97,61 +96,22 @@ Return your response ONLY as a valid JSON object in the following format, with n
 }}
 """
 
-class OrchestrationAgent: # Renamed from SimpleScoringAgent
+class OrchestrationAgent(BaseAgent): # Renamed from SimpleScoringAgent
     """
     An agent that orchestrates scoring using the Agentic RAG approach.
-    Uses API key rotation for reliability.
+    Calls are spread over the API key pool by call_gemini_with_backoff.
     """
-    
+
+    # Configure for JSON output, low temp for structured output
+    generation_config = {
+        "temperature": 0.1,
+        "top_p": 0.95,
+        "top_k": 40,
+        "response_mime_type": "application/json",
+    }
+
     def __init__(self):
-        self.model_name = settings.GEMINI_PRO_MODEL
-        # Key rotation is handled by settings.get_next_api_key()
-        # Initial configuration happens once here, but _get_gemini_model can reconfigure if needed
-        genai.configure(api_key=settings.get_next_api_key())
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
-    
-    def _get_gemini_model(self, purpose="general"): # Added purpose for potential future config tweaks
-        """Get the Gemini model, explicitly rotating API keys via settings for every call."""
-        # --- Force rotation on every call --- 
-        api_key = settings.get_next_api_key() # Get the strictly next key
-        logger.info(f"Rotating to API Key ending in: ...{api_key[-4:]} for {purpose}")
-        # -------------------------------------
-        
-        genai.configure(api_key=api_key) # Configure with the new key
-        try:
-            # Configure for JSON output
-            generation_config = genai.GenerationConfig(
-                temperature=0.1, # Low temp for structured output
-                top_p=0.95,
-                top_k=40,
-                response_mime_type="application/json", 
-            )
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config=generation_config
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Fatal error initializing Gemini model even after forced key rotation: {e}")
-            raise e # Re-raise the exception if configuration fails
+        super().__init__(settings.GEMINI_PRO_MODEL)
     
     async def extract_skills(self, job_description: str, candidate_resume: str) -> Dict[str, Any]:
         """
@@ -217,7 +177,9 @@ class OrchestrationAgent: # Renamed from SimpleScoringAgent
         job_facets: List[JobRequirementFacet], 
         retrieved_evidence: Dict[int, Dict], 
         candidate_id: int,
-        external_data: Optional[Dict[str, Any]] = None
+        external_data: Optional[Dict[str, Any]] = None,
+        jd_embedding: Optional[List[float]] = None,
+        cv_embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         Generates the final score and explanation based on structured job facets, 
@@ -230,6 +192,10 @@ class OrchestrationAgent: # Renamed from SimpleScoringAgent
             retrieved_evidence: Dictionary mapping facet indices to retrieval results
             candidate_id: ID of the candidate (for logging)
             external_data: Optional dictionary containing external market data
+            jd_embedding: Optional precomputed embedding of the job description, so only the
+                resume is embedded when the same JD is scored against many candidates
+            cv_embedding: Optional precomputed embedding of the resume; when both embeddings
+                are given no embedding call is made here
             
         Returns:
             Dictionary with overall_score, explanation, and optional metadata
@@ -243,26 +209,29 @@ class OrchestrationAgent: # Renamed from SimpleScoringAgent
             logger.debug(f"Formatted {len(job_facets)} facets with evidence and external data")
             
             # --- Semantic Similarity Calculation Step ---
-            logger.info(f"Generating embeddings for JD and CV to calculate semantic similarity")
-            jd_cv_embeddings = await vector_db_service.generate_embeddings(
-                texts=[job_description, candidate_resume]
-            )
+            if jd_embedding is not None and cv_embedding is not None:
+                jd_cv_embeddings = [jd_embedding, cv_embedding]
+            elif jd_embedding is not None:
+                logger.info(f"Generating CV embedding to calculate semantic similarity (JD embedding provided)")
+                cv_embeddings = await vector_db_service.generate_embeddings(
+                    texts=[candidate_resume]
+                )
+                jd_cv_embeddings = [jd_embedding, cv_embeddings[0]] if cv_embeddings else None
+            else:
+                logger.info(f"Generating embeddings for JD and CV to calculate semantic similarity")
+                jd_cv_embeddings = await vector_db_service.generate_embeddings(
+                    texts=[job_description, candidate_resume]
+                )
             
             if jd_cv_embeddings and len(jd_cv_embeddings) >= 2:
                 jd_embedding = jd_cv_embeddings[0]
                 cv_embedding = jd_cv_embeddings[1]
                 
-                similarity = cosine_similarity(jd_embedding, cv_embedding)
-                # Ensure similarity is a float before formatting
-                if isinstance(similarity, (list, np.ndarray)) and len(similarity) > 0 and isinstance(similarity[0], (list, np.ndarray)) and len(similarity[0]) > 0:
-                    # Extract the float value (assuming nested list/array like [[score]])
-                    semantic_similarity_score = float(similarity[0][0])
-                elif isinstance(similarity, (float, int)):
-                    semantic_similarity_score = float(similarity)
-                else:
-                    # Handle unexpected format or None
-                    logger.warning(f"Failed to calculate or extract valid cosine similarity (received: {similarity}), using default value 0.0")
-                    semantic_similarity_score = 0.0 # Reset to default if extraction failed
+                try:
+                    semantic_similarity_score = float(cosine_similarity_matrix([jd_embedding], [cv_embedding])[0, 0])
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Failed to calculate cosine similarity ({e}), using default value 0.0")
+                    semantic_similarity_score = 0.0
 
                 logger.info(f"Calculated semantic similarity: {semantic_similarity_score:.4f}") # Log the final value
             else:
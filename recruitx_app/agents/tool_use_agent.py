@@ -1,43 +1,24 @@
-import google.generativeai as genai
 import json
 import logging
 from typing import Dict, Any, Optional, List, Union, Callable
 import asyncio # Added for sleep
 
 from recruitx_app.core.config import settings
+from recruitx_app.agents.base_agent import BaseAgent, function_call_args
 from recruitx_app.utils.retry_utils import call_gemini_with_backoff # Import the retry helper
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class ToolUseAgent:
+class ToolUseAgent(BaseAgent):
     """
     An agent that leverages Gemini 2.5 Pro's native tool use capabilities
     to interact with databases, external APIs, and custom functions.
     """
     
     def __init__(self):
-        self.model_name = settings.GEMINI_PRO_MODEL
-        genai.configure(api_key=settings.get_next_api_key())
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_NONE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_NONE"
-            }
-        ]
+        super().__init__(settings.GEMINI_PRO_MODEL)
         
         # Register available tools
         self.available_tools = {
@@ -136,37 +117,6 @@ class ToolUseAgent:
             }
         ]
     
-    def _get_gemini_model(self):
-        """Get the Gemini model, rotating API keys if necessary."""
-        try:
-            model = genai.GenerativeModel(
-                self.model_name,
-                safety_settings=self.safety_settings,
-                generation_config={
-                    "temperature": 0.2,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                }
-            )
-            return model
-        except Exception as e:
-            logger.error(f"Error initializing Gemini model: {e}")
-            genai.configure(api_key=settings.get_next_api_key())
-            logger.info("Rotated to next API key")
-            try:
-                return genai.GenerativeModel(
-                    self.model_name,
-                    safety_settings=self.safety_settings,
-                    generation_config={
-                        "temperature": 0.2,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                    }
-                )
-            except Exception as e2:
-                logger.error(f"Second error initializing Gemini model: {e2}")
-                raise e2
-    
     # Tool implementation methods - These would connect to real databases and APIs in production
     
     def _fetch_job_requirements(self, args):
@@ -346,7 +296,7 @@ class ToolUseAgent:
                                 function_call = part.function_call
                                 tool_name = function_call.name
                                 try:
-                                    args = json.loads(function_call.args)
+                                    args = function_call_args(function_call) or {}
                                 except Exception as e:
                                     # Handle the case where args is not a valid JSON string
                                     if isinstance(function_call.args, str):
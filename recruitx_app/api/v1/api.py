@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from recruitx_app.api.v1.endpoints import jobs, scores, candidates
+from recruitx_app.api.v1.endpoints import jobs, scores, candidates, system
 
 api_router = APIRouter()
 
@@ -8,6 +8,7 @@ api_router = APIRouter()
 api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 api_router.include_router(scores.router, prefix="/scores", tags=["scores"])
 api_router.include_router(candidates.router, prefix="/candidates", tags=["candidates"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
 
 # Add more endpoint routers here as they are created
 # api_router.include_router(candidates.router, prefix="/candidates", tags=["candidates"]) 
\ No newline at end of file
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from typing import List, Optional, Dict, Any
 
 from recruitx_app.core.database import get_db
 from recruitx_app.services.candidate_service import CandidateService
-from recruitx_app.schemas.candidate import Candidate, CandidateCreate, CandidateAnalysis
-from recruitx_app.utils.file_parser import extract_text_from_file
+from recruitx_app.core.config import settings
+from recruitx_app.schemas.candidate import Candidate, CandidateCreate, CandidateAnalysis, BulkIngestionBatch
+from recruitx_app.services.bulk_ingestion_service import bulk_ingestion_service
+from recruitx_app.services.document_cache_service import document_cache_service
+from recruitx_app.utils.file_parser import FileTooLargeError, read_upload_file
 
 router = APIRouter()
 candidate_service = CandidateService()
@@ -22,11 +25,17 @@ async def upload_candidate_cv(
     Upload a candidate CV file (PDF, DOCX, or TXT) and create a new candidate record.
     Analysis is not triggered automatically by this endpoint.
     """
-    # Read the file content
-    file_content = await file.read()
+    # Read the file content, enforcing the upload size limit
+    try:
+        file_content = await read_upload_file(file)
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     
-    # Extract text from the file
-    resume_raw = extract_text_from_file(file_content, file.filename)
+    # Extract text from the file, reusing the text of an identical earlier upload
+    resume_raw, content_hash, _ = await document_cache_service.extract_text(db, file_content, file.filename)
     
     if not resume_raw:
         raise HTTPException(
@@ -44,7 +53,7 @@ async def upload_candidate_cv(
     
     # Create the candidate record using the service
     try:
-        created_candidate = candidate_service.create_candidate(db=db, candidate_data=candidate_data)
+        created_candidate = candidate_service.create_candidate(db=db, candidate_data=candidate_data, content_hash=content_hash)
         return created_candidate
     except Exception as e:
         # Catch potential database errors or other issues
@@ -53,6 +62,59 @@ async def upload_candidate_cv(
             detail=f"Failed to create candidate: {str(e)}"
         )
 
+@router.post("/bulk-upload", response_model=BulkIngestionBatch, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_candidate_cvs(
+    files: List[UploadFile] = File(...),
+    analyze: bool = Form(True),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload many CV files (or zip archives of CVs) and ingest them in the background.
+    Each CV is parsed, stored as a candidate named after its file and, unless `analyze`
+    is false, analyzed and indexed. Poll GET /candidates/bulk-upload/{batch_id} for progress.
+    """
+    uploads = []
+    for upload in files:
+        is_archive = (upload.filename or "").lower().endswith(".zip")
+        try:
+            content = await read_upload_file(
+                upload,
+                max_bytes=settings.BULK_INGEST_MAX_ARCHIVE_BYTES if is_archive else None
+            )
+        except FileTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"{upload.filename}: {e}"
+            )
+        uploads.append((upload.filename or "upload", content))
+
+    try:
+        # The batch outlives the request, so its stages open their own sessions on the request's database
+        batch = bulk_ingestion_service.start_batch(
+            uploads,
+            analyze=analyze,
+            session_factory=sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return batch.to_dict()
+
+@router.get("/bulk-upload/{batch_id}", response_model=BulkIngestionBatch)
+def get_bulk_upload_progress(batch_id: str):
+    """
+    Get the per-file progress of a bulk CV ingestion batch.
+    """
+    batch = bulk_ingestion_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Bulk ingestion batch {batch_id} not found"
+        )
+    return batch.to_dict()
+
 @router.get("/", response_model=List[Candidate])
 def get_candidates(
     skip: int = 0, 
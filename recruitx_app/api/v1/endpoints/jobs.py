@@ -5,7 +5,8 @@ from typing import List, Optional
 from recruitx_app.core.database import get_db
 from recruitx_app.services.job_service import JobService
 from recruitx_app.schemas.job import Job, JobCreate, JobAnalysis
-from recruitx_app.utils.file_parser import extract_text_from_file
+from recruitx_app.services.document_cache_service import document_cache_service
+from recruitx_app.utils.file_parser import FileTooLargeError, read_upload_file
 
 router = APIRouter()
 job_service = JobService()
@@ -59,11 +60,17 @@ async def upload_job_description(
     """
     Upload a job description file (PDF, DOCX, or TXT) and create a new job.
     """
-    # Read the file content
-    file_content = await file.read()
+    # Read the file content, enforcing the upload size limit
+    try:
+        file_content = await read_upload_file(file)
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     
-    # Extract text from the file
-    description_raw = extract_text_from_file(file_content, file.filename)
+    # Extract text from the file, reusing the text of an identical earlier upload
+    description_raw, _, _ = await document_cache_service.extract_text(db, file_content, file.filename)
     
     if not description_raw:
         raise HTTPException(
@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from typing import List, Dict, Any, Optional
 import logging
 import asyncio # Import asyncio
-from uuid import UUID
-from pydantic import BaseModel, ConfigDict  # Added ConfigDict
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field  # Added ConfigDict
 
 from recruitx_app.core.database import get_db 
 from recruitx_app.services.scoring_service import ScoringService # Import service
+from recruitx_app.services.bulk_scoring_service import bulk_scoring_service
+from recruitx_app.services.shortlist_service import shortlist_service
 from recruitx_app.models.score import Score
+from recruitx_app.models.job import Job
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.services.scoring_queue_service import scoring_queue_service
 from recruitx_app.schemas.score import ScoreCreate
 
 router = APIRouter()
@@ -24,7 +29,22 @@ class ScoreCreate(BaseModel):
 
 class BatchScoreCreate(BaseModel):
     job_id: int
-    candidate_ids: List[int]
+    candidate_ids: List[int] = []
+    # When set, only the best candidates of a vectorized shortlist (of candidate_ids,
+    # or of the whole pool if none are given) are passed on to LLM scoring
+    shortlist_top_k: Optional[int] = Field(None, ge=1, le=10000)
+
+class ShortlistEntry(BaseModel):
+    candidate_id: int
+    score: float
+    embedding_similarity: float
+    skill_overlap: float
+    matched_skills: List[str]
+
+class ShortlistResponse(BaseModel):
+    job_id: int
+    pool_size: int
+    candidates: List[ShortlistEntry]
 
 # Restore original ScoreResponse
 class ScoreResponse(BaseModel):
@@ -41,18 +61,36 @@ class ScoreResponse(BaseModel):
 # Define a response model for generate_score to avoid leaking internal details
 class ScoreGenerationResponse(BaseModel):
     """Response model for the score generation endpoint."""
-    job_id: UUID
-    candidate_id: UUID
+    job_id: int
+    candidate_id: int
     message: str
-    score_id: UUID | None = None  # Score ID might not be available immediately if async
+    scoring_job_id: int
+    status: str
+    score_id: Optional[int] = None  # Set once the background scoring job has completed
 
     model_config = ConfigDict(from_attributes=True)  # Replaced Config class
 
 # Pydantic model for the request body of the generate endpoint
 class GenerateScoreRequest(BaseModel):
     """Request body for initiating score generation."""
-    job_id: UUID
-    candidate_id: UUID
+    job_id: int
+    candidate_id: int
+
+class ScoringJobResponse(BaseModel):
+    """Status of a queued scoring job."""
+    id: int
+    job_id: int
+    candidate_id: int
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    score_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 # Revert create_score endpoint to synchronous operation
 @router.post("/", response_model=ScoreResponse)
@@ -119,6 +157,25 @@ def get_scores_for_job(
     )
     return scores
 
+@router.get("/job/{job_id}/shortlist", response_model=ShortlistResponse)
+async def get_shortlist_for_job(
+    job_id: int,
+    top_k: Optional[int] = Query(None, ge=1, le=10000, description="Number of candidates to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Rank the whole candidate pool for a job without any LLM calls.
+    Candidates are ordered by summary-embedding similarity and required-skill overlap;
+    the top of this list is what is worth sending to POST /scores/batch.
+    """
+    shortlist = await shortlist_service.shortlist(db, job_id=job_id, top_k=top_k)
+    if shortlist is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found or missing description."
+        )
+    return shortlist
+
 @router.get("/candidate/{candidate_id}", response_model=List[ScoreResponse])
 def get_scores_for_candidate(
     candidate_id: int,
@@ -130,95 +187,118 @@ def get_scores_for_candidate(
     scores = scoring_service.get_scores_for_candidate(db, candidate_id=candidate_id)
     return scores
 
-# Revert batch endpoint to use asyncio.gather for concurrency
+# Batch endpoint: JD-side work is done once and candidates are scored with bounded concurrency
 @router.post("/batch", response_model=Dict[str, Any])
 async def batch_create_scores(
     batch_data: BatchScoreCreate,
     db: Session = Depends(get_db)
 ):
     """
-    Generate scores for a job against multiple candidates concurrently.
-    WARNING: Still makes individual API calls per candidate, could hit rate limits.
+    Generate scores for a job against multiple candidates.
+    The job is decomposed, embedded and enriched with market data once; only the
+    candidate-specific retrieval and synthesis run per candidate.
+    With shortlist_top_k, candidates are first ranked by the vectorized shortlist and
+    only the best ones are scored.
     """
-    results = {}
-    successful_count = 0
-    tasks = []
+    candidate_ids = batch_data.candidate_ids
+    if batch_data.shortlist_top_k:
+        shortlist = await shortlist_service.shortlist(
+            db,
+            job_id=batch_data.job_id,
+            top_k=batch_data.shortlist_top_k,
+            candidate_ids=candidate_ids or None
+        )
+        if shortlist is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job with ID {batch_data.job_id} not found or missing description."
+            )
+        candidate_ids = [entry["candidate_id"] for entry in shortlist["candidates"]]
+    elif not candidate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide candidate_ids, shortlist_top_k, or both."
+        )
 
-    # Create tasks for each candidate scoring operation
-    for candidate_id in batch_data.candidate_ids:
-        tasks.append(scoring_service.generate_score(
-            db=db, 
-            job_id=batch_data.job_id, 
-            candidate_id=candidate_id
-        ))
-        
-    # Run scoring tasks concurrently
-    logger.info(f"Starting concurrent batch scoring for job {batch_data.job_id} and {len(tasks)} candidates.")
-    score_results = await asyncio.gather(*tasks, return_exceptions=True)
-    logger.info(f"Finished concurrent batch scoring for job {batch_data.job_id}.")
-
-    # Process results
-    for i, result in enumerate(score_results):
-        candidate_id = batch_data.candidate_ids[i]
-        if isinstance(result, Exception):
-            logger.error(f"Error processing candidate {candidate_id} in batch for job {batch_data.job_id}: {result}")
-            results[str(candidate_id)] = {"status": "error", "message": str(result)}
-        elif result: # Check if score object is not None
-            results[str(candidate_id)] = {
-                "score_id": result.id,
-                "overall_score": result.overall_score,
-                "status": "success"
-            }
-            successful_count += 1
-        else:
-             # Handle case where generate_score returned None (e.g., job/candidate not found initially)
-             logger.warning(f"Score generation returned None for candidate {candidate_id} in batch for job {batch_data.job_id} (Job/Candidate not found?).")
-             results[str(candidate_id)] = {"status": "error", "message": "Score generation returned None (Job/Candidate not found?)"}
+    logger.info(f"Starting bulk scoring for job {batch_data.job_id} and {len(candidate_ids)} candidates.")
+    # Candidates are scored concurrently, so each task needs its own session on the request's database
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    try:
+        score_results = await bulk_scoring_service.score_candidates(
+            job_id=batch_data.job_id,
+            candidate_ids=candidate_ids,
+            session_factory=session_factory
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to prepare scoring for Job {batch_data.job_id}: {str(e)}"
+        )
+    if score_results is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {batch_data.job_id} not found or missing description."
+        )
+
+    results = {str(candidate_id): result for candidate_id, result in score_results.items()}
+    successful_count = sum(1 for result in score_results.values() if result["status"] == "success")
 
     return {
         "job_id": batch_data.job_id,
         "results": results,
-        "total_processed": len(batch_data.candidate_ids),
+        "total_processed": len(score_results),
         "successful": successful_count
     } 
 
 @router.post("/generate", response_model=ScoreGenerationResponse, status_code=202)
-async def generate_score(
+def generate_score(
     *,
     db: Session = Depends(get_db),
-    request_body: GenerateScoreRequest,
-    scoring_service: ScoringService = Depends(ScoringService),
+    request_body: GenerateScoreRequest
 ):
     """
     Initiates the scoring process for a given job and candidate.
-    This endpoint is asynchronous and will return immediately.
-    The actual scoring happens in the background.
+    The request is queued and returns immediately; poll GET /scores/jobs/{scoring_job_id}
+    for the status and the resulting score ID.
     """
+    job = db.query(Job).filter(Job.id == request_body.job_id).first()
+    candidate = db.query(Candidate).filter(Candidate.id == request_body.candidate_id).first()
+    if not job or not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job or Candidate not found."
+        )
+
     try:
-        # TODO: Implement background task processing (e.g., using Celery or FastAPI's BackgroundTasks)
-        # For now, call synchronously for demonstration
-        score = await scoring_service.generate_score(
-            db=db,
+        scoring_job = scoring_queue_service.enqueue(
+            db,
             job_id=request_body.job_id,
             candidate_id=request_body.candidate_id
         )
-        if score:
-            return ScoreGenerationResponse(
-                job_id=request_body.job_id,
-                candidate_id=request_body.candidate_id,
-                message="Score generation initiated successfully.",
-                score_id=score.id  # Return score_id if available
-            )
-        else:
-             # Handle cases where score generation might fail synchronously (e.g., invalid IDs)
-             # Although the main processing is async, initial checks might fail.
-            return ScoreGenerationResponse(
-                 job_id=request_body.job_id,
-                 candidate_id=request_body.candidate_id,
-                 message="Score generation failed (e.g., invalid IDs or initial error)."
-            )
-
     except Exception as e:
-        # Log the exception details
-        print(f"Error initiating score generation: {e}") # Basic logging
-        raise HTTPException(status_code=500, detail=f"Failed to initiate score generation: {e}") 
\ No newline at end of file
+        logger.error(f"Error queueing score generation: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to initiate score generation: {e}")
+
+    return ScoreGenerationResponse(
+        job_id=scoring_job.job_id,
+        candidate_id=scoring_job.candidate_id,
+        message="Score generation queued.",
+        scoring_job_id=scoring_job.id,
+        status=scoring_job.status
+    )
+
+@router.get("/jobs/{scoring_job_id}", response_model=ScoringJobResponse)
+def get_scoring_job(
+    scoring_job_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the status of a queued scoring job.
+    """
+    scoring_job = scoring_queue_service.get_scoring_job(db, scoring_job_id)
+    if not scoring_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scoring job with ID {scoring_job_id} not found"
+        )
+    return scoring_job
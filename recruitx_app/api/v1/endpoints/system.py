@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+import logging
+
+from recruitx_app.services.external_tool_service import external_tool_service
+
+router = APIRouter()
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+def get_cache_stats():
+    """
+    Get hit/miss/eviction counters and sizes of the application caches.
+    """
+    return {
+        "external_api": external_tool_service.get_cache_stats()
+    }
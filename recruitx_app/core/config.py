@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Load .env file in the parent directory (project root)
@@ -23,13 +23,86 @@ class Settings(BaseSettings):
     GEMINI_PRO_VISION_MODEL: str = "models/gemini-2.0-flash-lite"  # Using the same model for vision as it supports multimodal inputs
     GEMINI_EMBEDDING_MODEL: str
 
+    # Per-key Gemini quotas used by the API key pool scheduler
+    GEMINI_RPM_PER_KEY: int = 30  # Requests per minute allowed on one key
+    GEMINI_TPM_PER_KEY: int = 1000000  # Prompt tokens per minute allowed on one key
+    GEMINI_KEY_COOLDOWN_SECONDS: float = 60.0  # How long a key is avoided after a 429
+
+    # Embedding backend for indexing and queries
+    EMBEDDING_PROVIDER: str = "gemini"  # "gemini", "local" (sentence-transformers) or "hashing" (no model, works offline)
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"  # Hugging Face model name or local directory
+    LOCAL_EMBEDDING_DEVICE: str = "cpu"
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32  # Texts per inference call; texts are grouped by length
+    LOCAL_EMBEDDING_WORKERS: int = 2  # Concurrent local inference batches
+    HASHING_EMBEDDING_DIMENSION: int = 768
+    VECTOR_COLLECTION_NAME: str = "recruitx_documents"  # Use a new name to re-index with another embedding backend
+    VECTOR_STORE_PATH: Optional[str] = None  # ChromaDB directory; defaults to .vector_store in the project root
+
+    # Embedding cache - SQLite file shared by all workers ("" disables the disk tier)
+    EMBEDDING_CACHE_PATH: Optional[str] = None  # Defaults to embedding_cache.sqlite3 inside the vector store directory
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 20000  # Number of vectors kept in the in-process LRU
+
+    # Bulk scoring - number of candidates scored concurrently for one job
+    BULK_SCORING_CONCURRENCY: int = 4
+
+    # Thread pools for blocking SDK calls, keeping them off the event loop
+    LLM_EXECUTOR_WORKERS: int = 16  # Concurrent Gemini generate/embed calls
+    CHROMA_EXECUTOR_WORKERS: int = 4  # Concurrent ChromaDB queries/writes
+    PARSE_EXECUTOR_WORKERS: int = 4  # Concurrent document parsing/OCR jobs
+    CACHE_EXECUTOR_WORKERS: int = 4  # Concurrent SQLite cache reads/writes (embedding and API response caches)
+    OCR_PROCESS_WORKERS: int = 0  # OCR worker processes (0 = one per CPU)
+
+    # LLM transport - record/replay/synthetic stand-in for Gemini, for offline and load testing
+    LLM_TRANSPORT: str = "live"  # "live", "record" (live + cassette), "replay" (cassette only) or "synthetic"
+    LLM_CASSETTE_PATH: Optional[str] = None  # Defaults to .llm_cassettes/cassette.jsonl in the project root
+    LLM_REPLAY_MISS_SYNTHETIC: bool = False  # Replay: synthesize responses for unrecorded requests instead of failing
+    LLM_SIMULATED_LATENCY_MS: int = 0  # Replay/synthetic: latency added to every call
+    LLM_SIMULATED_EMBEDDING_LATENCY_MS: Optional[int] = None  # Replay/synthetic: latency of embedding calls (None = LLM_SIMULATED_LATENCY_MS)
+    LLM_SIMULATED_LATENCY_JITTER_MS: int = 0  # Replay/synthetic: random extra latency, uniform in [0, jitter]
+    LLM_SIMULATED_RATE_LIMIT_RATE: float = 0.0  # Replay/synthetic: fraction of calls failing with a 429
+    LLM_SIMULATION_SEED: Optional[int] = None  # Seed for latency and 429 injection (None = nondeterministic)
+
+    # OCR rendering - DPI adapts to the page size to bound the image size
+    OCR_MAX_DPI: int = 300
+    OCR_MIN_DPI: int = 150
+    OCR_MAX_PIXELS: int = 9000000  # About 300 DPI on a Letter page
+
+    # File uploads
+    MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024  # Larger uploads are rejected with 413
+    UPLOAD_FORM_OVERHEAD_BYTES: int = 64 * 1024  # Allowance for form fields and multipart headers on top of the file
+
+    # Bulk CV ingestion - staged parse/store/analyze/index pipeline behind POST /candidates/bulk-upload
+    BULK_INGEST_MAX_FILES: int = 10000  # CVs accepted in one batch, after expanding zip archives
+    BULK_INGEST_MAX_ARCHIVE_BYTES: int = 500 * 1024 * 1024  # Size limit of one uploaded zip archive
+    BULK_INGEST_MAX_REQUEST_BYTES: int = 2 * 1024 * 1024 * 1024  # Size limit of a whole bulk-upload request
+    BULK_INGEST_ANALYSIS_WORKERS: int = 8  # Concurrent CV analyses (the API key pool paces the calls)
+    BULK_INGEST_DB_BATCH_SIZE: int = 100  # Candidates inserted per transaction
+    BULK_INGEST_INDEX_BATCH_SIZE: int = 50  # Candidates whose chunks are sent to ChromaDB in one add
+    BULK_INGEST_QUEUE_SIZE: int = 64  # Files buffered between two stages
+    BULK_INGEST_KEEP_BATCHES: int = 50  # Finished batches kept for progress queries
+
+    # Candidate shortlisting - vectorized first-stage ranking before LLM scoring
+    SHORTLIST_EMBEDDING_WEIGHT: float = 0.7  # Weight of the summary-embedding cosine similarity
+    SHORTLIST_SKILL_WEIGHT: float = 0.3  # Weight of the share of required skills the candidate lists
+    SHORTLIST_DEFAULT_TOP_K: int = 50
+    SHORTLIST_INDEX_TTL_SECONDS: float = 300.0  # How long the in-memory candidate matrix is reused
+    SHORTLIST_PAGE_SIZE: int = 5000  # Chunk embeddings read from ChromaDB per call when building it
+
+    # Scoring queue - background workers draining POST /scores/generate requests
+    SCORING_QUEUE_WORKERS: int = 2
+    SCORING_QUEUE_MAX_ATTEMPTS: int = 3
+    SCORING_QUEUE_RETRY_DELAY_SECONDS: float = 5.0  # Doubled after every failed attempt
+    SCORING_QUEUE_LEASE_SECONDS: float = 1800.0  # A RUNNING job older than this is assumed abandoned and re-queued on start
+
+    # External market data (salary, market insights, skill trends)
+    EXTERNAL_DATA_TIMEOUT_SECONDS: float = 5.0  # Budget for each source; slower sources are left out
+    EXTERNAL_DATA_CACHE_TTL_SECONDS: float = 3600.0  # How long a job's combined result is reused
+    EXTERNAL_DATA_CACHE_SIZE: int = 1024
+
     # Project Specific Settings
     PROJECT_NAME: str = "RecruitX"
     API_V1_STR: str = "/api/v1"
 
-    # Simple round-robin logic for API keys
-    _api_key_index: int = 0
-
     @property
     def gemini_api_keys(self) -> List[str]:
         return [
@@ -46,9 +119,9 @@ class Settings(BaseSettings):
         ]
 
     def get_next_api_key(self) -> str:
-        key = self.gemini_api_keys[self._api_key_index]
-        self._api_key_index = (self._api_key_index + 1) % len(self.gemini_api_keys)
-        return key
+        """Returns the key with the most rate-limit headroom according to the API key pool."""
+        from recruitx_app.utils.api_key_pool import api_key_pool
+        return api_key_pool.best_key()
 
 # Instantiate the settings
 settings = Settings()
@@ -1,14 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 
 from recruitx_app.core.config import settings
 from recruitx_app.api.v1.api import api_router
+from recruitx_app.services.scoring_queue_service import scoring_queue_service
+from recruitx_app.services.bulk_ingestion_service import bulk_ingestion_service
+from recruitx_app.services.external_tool_service import external_tool_service
+from recruitx_app.utils.concurrency import shutdown_executors
+from recruitx_app.utils.upload_limits import UploadSizeLimitMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts background services on startup and stops them on shutdown."""
+    await external_tool_service.start()
+    await scoring_queue_service.start()
+    yield
+    await bulk_ingestion_service.stop()
+    await scoring_queue_service.stop()
+    await external_tool_service.close()
+    shutdown_executors()
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -20,6 +39,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads before Starlette spools them to disk
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -10,6 +10,7 @@ class Candidate(Base):
     email = Column(String(255), nullable=True)
     phone = Column(String(50), nullable=True)
     resume_raw = Column(Text, nullable=False)  # Raw text from the CV
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of the uploaded CV file, if uploaded
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
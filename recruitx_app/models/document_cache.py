@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from recruitx_app.core.database import Base
+
+class ExtractedDocument(Base):
+    """Text extracted from an uploaded file, keyed by the sha256 of the file bytes."""
+    __tablename__ = "extracted_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    filename = Column(String(255), nullable=True)  # Name of the first upload with this content
+    size_bytes = Column(Integer, nullable=False)
+    extracted_text = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)  # Duplicate uploads served from the cache
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ExtractedDocument {self.content_hash[:12]}: {self.filename}>"
+
+class AnalysisCacheEntry(Base):
+    """An LLM analysis of a document text, keyed by the sha256 of the text and the model that produced it."""
+    __tablename__ = "analysis_cache"
+    __table_args__ = (UniqueConstraint("text_hash", "analysis_type", "model_name", name="uq_analysis_cache_key"),)
+
+    # Analysis types
+    TYPE_CV = "cv"
+
+    id = Column(Integer, primary_key=True, index=True)
+    text_hash = Column(String(64), nullable=False, index=True)
+    analysis_type = Column(String(50), nullable=False)
+    model_name = Column(String(255), nullable=False)
+    analysis = Column(JSON, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<AnalysisCacheEntry {self.analysis_type} {self.text_hash[:12]}>"
@@ -16,5 +16,10 @@ class Job(Base):
     # Store the structured data extracted by the JD Analysis Agent
     analysis = Column(JSON, nullable=True)  # Will store extracted skills, requirements, etc.
 
+    # Cached JD decomposition facets, keyed by a sha256 of description_raw so they are
+    # only recomputed when the JD text changes
+    requirement_facets = Column(JSON, nullable=True)
+    requirement_facets_hash = Column(String(64), nullable=True)
+
     def __repr__(self):
         return f"<Job {self.id}: {self.title} at {self.company}>" 
\ No newline at end of file
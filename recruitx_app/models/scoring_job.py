@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from recruitx_app.core.database import Base
+
+class ScoringJob(Base):
+    """A queued request to score one candidate against one job, processed by the scoring queue workers."""
+    __tablename__ = "scoring_jobs"
+
+    # Lifecycle states
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+
+    status = Column(String(20), nullable=False, default=STATUS_PENDING, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(Text, nullable=True)  # Last failure message, if any
+
+    # Set once the score has been generated
+    score_id = Column(Integer, ForeignKey("scores.id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ScoringJob {self.id}: Job {self.job_id} - Candidate {self.candidate_id} ({self.status})>"
@@ -62,4 +62,23 @@ class Education(BaseModel):
 class Project(BaseModel):
     name: str
     description: Optional[str] = None
-    technologies: Optional[List[str]] = None 
\ No newline at end of file
+    technologies: Optional[List[str]] = None 
+# Schemas for bulk CV ingestion progress
+
+class BulkIngestionFile(BaseModel):
+    index: int
+    filename: str
+    status: str  # QUEUED, PARSED, STORED, ANALYZED, COMPLETED or FAILED
+    candidate_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkIngestionBatch(BaseModel):
+    batch_id: str
+    analyze: bool
+    total_files: int
+    finished_files: int
+    counts: Dict[str, int]  # Number of files in each status
+    is_finished: bool
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    files: List[BulkIngestionFile] = []
@@ -1,24 +1,44 @@
+import asyncio
+import copy
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
+from recruitx_app.core.config import settings
 from recruitx_app.schemas.job import JobRequirementFacet
 from recruitx_app.services.vector_db_service import vector_db_service
 from recruitx_app.services.external_tool_service import external_tool_service
-from recruitx_app.utils.text_utils import cosine_similarity
+from recruitx_app.utils.text_utils import cosine_similarity_matrix, indices_above_threshold
+from recruitx_app.utils.cache_utils import TTLCache
 
 logger = logging.getLogger(__name__)
 
+
+def candidate_chunks_filter(candidate_id: int) -> Dict[str, Any]:
+    """ChromaDB filter for one candidate's chunks; a filter on several keys needs an explicit $and."""
+    return {"$and": [{"doc_type": "candidate"}, {"candidate_id": candidate_id}]}
+
+
 class AgenticRAGService:
     """
     Service responsible for implementing Agentic RAG principles,
     starting with dynamic retrieval based on decomposed job facets.
     """
 
+    def __init__(self):
+        # Job-level external market data, keyed by (title, location, experience, sorted skills)
+        self._external_data_cache = TTLCache(
+            maxsize=settings.EXTERNAL_DATA_CACHE_SIZE,
+            ttl_seconds=settings.EXTERNAL_DATA_CACHE_TTL_SECONDS
+        )
+        self._external_data_in_flight: Dict[Tuple, asyncio.Future] = {}
+
     async def retrieve_evidence_for_facets(
         self,
         candidate_id: int,
         facets: List[JobRequirementFacet],
-        n_results_per_facet: int = 3
+        n_results_per_facet: int = 3,
+        batch_queries: bool = False,
+        query_embeddings: Optional[Dict[str, List[float]]] = None
     ) -> Dict[int, Dict[str, Any]]: # Return Dict mapping facet index to results
         """
         Retrieves relevant text chunks from a candidate's documents for each job requirement facet.
@@ -27,6 +47,10 @@ class AgenticRAGService:
             candidate_id: The ID of the candidate whose documents to search.
             facets: A list of JobRequirementFacet objects from the decomposed JD.
             n_results_per_facet: The number of document chunks to retrieve for each facet.
+            batch_queries: If True, all facet queries are sent to ChromaDB as a single
+                multi-query instead of one query per facet. The result shape is the same.
+            query_embeddings: Optional precomputed facet query embeddings (see embed_facet_queries),
+                e.g. shared across all candidates scored against the same job.
 
         Returns:
             A dictionary where keys are the *indices* of the input facets and values are
@@ -37,16 +61,27 @@ class AgenticRAGService:
         evidence: Dict[int, Optional[Dict[str, Any]]] = {}
 
         # Define the base 'where' filter for candidate documents
-        where_filter = {
-            "doc_type": "candidate",
-            "candidate_id": candidate_id
-        }
+        where_filter = candidate_chunks_filter(candidate_id)
+
+        # --- 1. Formulate Queries ---
+        # Simple strategy for now: Combine detail and context.
+        # Future: Could use more sophisticated query generation based on facet_type.
+        query_texts = [self._facet_query_text(facet) for facet in facets]
+
+        # Embed every non-empty query in one (cached) call. The vectors are used to query
+        # the store and are attached to the results so validation can reuse them.
+        if query_embeddings is None:
+            query_embeddings = await self._embed_query_texts([text for text in query_texts if text])
+
+        if batch_queries:
+            evidence = await self._retrieve_batched(
+                query_texts, query_embeddings, n_results_per_facet, where_filter
+            )
+            logger.info(f"Finished batched evidence retrieval for Candidate ID: {candidate_id}. Found evidence for {sum(1 for r in evidence.values() if r is not None)} facets.")
+            return evidence
 
         for i, facet in enumerate(facets):
-            # --- 1. Formulate Query --- 
-            # Simple strategy for now: Combine detail and context.
-            # Future: Could use more sophisticated query generation based on facet_type.
-            query_text = f"{facet.detail} {facet.context or ''}".strip()
+            query_text = query_texts[i]
             logger.debug(f"Facet {i} ({facet.facet_type}: '{facet.detail}') - Query: '{query_text[:100]}...'" )
 
             if not query_text:
@@ -54,18 +89,31 @@ class AgenticRAGService:
                 evidence[i] = None
                 continue
 
-            # --- 2. Query Vector Store --- 
+            query_embedding = query_embeddings.get(query_text) if query_embeddings else None
+
+            # --- 2. Query Vector Store ---
             try:
-                facet_results = await vector_db_service.query_collection(
-                    query_texts=[query_text],
-                    n_results=n_results_per_facet,
-                    where=where_filter,
-                    # include=['metadatas', 'documents', 'distances'] # Already included by default in service
-                )
-                
+                if query_embedding is not None:
+                    facet_results = await vector_db_service.query_collection(
+                        query_texts=[query_text],
+                        query_embeddings=[query_embedding],
+                        n_results=n_results_per_facet,
+                        where=where_filter,
+                        include_embeddings=True
+                    )
+                else:
+                    facet_results = await vector_db_service.query_collection(
+                        query_texts=[query_text],
+                        n_results=n_results_per_facet,
+                        where=where_filter,
+                        include_embeddings=True
+                    )
+
                 if facet_results and facet_results.get('ids') and facet_results['ids'][0]:
                     num_found = len(facet_results['ids'][0])
                     logger.debug(f"Facet {i} query found {num_found} results.")
+                    if query_embedding is not None:
+                        facet_results['query_embeddings'] = [query_embedding]
                     evidence[i] = facet_results
                 else:
                     logger.debug(f"Facet {i} query found no results.")
@@ -85,8 +133,9 @@ class AgenticRAGService:
         relevance_threshold: float = 0.5 # Configurable threshold
     ) -> Dict[int, Optional[Dict[str, Any]]]:
         """
-        Validates the relevance of retrieved evidence chunks against the original facet detail
-        using embedding similarity.
+        Validates the relevance of retrieved evidence chunks against the facet query
+        using embedding similarity. Query and chunk embeddings carried in the results
+        (see retrieve_evidence_for_facets) are reused; only missing ones are generated.
 
         Args:
             facets: The original list of JobRequirementFacet objects.
@@ -100,93 +149,239 @@ class AgenticRAGService:
         logger.info(f"Starting evidence relevance validation for {len(facets)} facets.")
         validated_evidence: Dict[int, Optional[Dict[str, Any]]] = {}
 
-        # Prepare lists for batch embedding generation
-        facet_details_to_embed = []
+        # Facets whose evidence should be checked, with the reference (query) embedding and
+        # chunk embeddings taken from the query results where ChromaDB returned them.
+        facet_indices_map = [] # Original facet index for each entry below
+        facet_embeddings: List[Optional[List[float]]] = []
+        chunk_embeddings_per_facet: List[Optional[List[List[float]]]] = []
+
+        # Texts that still need embedding when stored vectors are not available
+        facet_texts_to_embed = []
+        facet_text_targets = [] # Position in facet_embeddings for each facet text
         evidence_chunks_to_embed = []
-        facet_indices_map = [] # To map results back to original facet index
-        chunk_indices_map = [] # To map results back to chunk index within a facet
+        chunk_text_targets = [] # Position in chunk_embeddings_per_facet for each chunk group
 
-        # Collect all text that needs embedding
         for i, facet in enumerate(facets):
             if i in retrieved_evidence and retrieved_evidence[i] is not None:
                 evidence_data = retrieved_evidence[i]
                 if evidence_data.get('documents') and evidence_data['documents'][0]:
-                    facet_details_to_embed.append(facet.detail)
+                    position = len(facet_indices_map)
                     facet_indices_map.append(i)
-                    
                     chunks = evidence_data['documents'][0]
-                    current_chunk_indices = []
-                    for j, chunk in enumerate(chunks):
-                        evidence_chunks_to_embed.append(chunk)
-                        current_chunk_indices.append(j)
-                    chunk_indices_map.append(current_chunk_indices)
+
+                    query_embedding = self._first_result_list(evidence_data.get('query_embeddings'))
+                    facet_embeddings.append(query_embedding)
+                    if query_embedding is None:
+                        facet_texts_to_embed.append(self._facet_query_text(facet))
+                        facet_text_targets.append(position)
+
+                    stored_embeddings = self._first_result_list(evidence_data.get('embeddings'))
+                    if stored_embeddings is not None and len(stored_embeddings) == len(chunks):
+                        chunk_embeddings_per_facet.append(list(stored_embeddings))
+                    else:
+                        chunk_embeddings_per_facet.append(None)
+                        evidence_chunks_to_embed.extend(chunks)
+                        chunk_text_targets.append((position, len(chunks)))
                 else:
                      validated_evidence[i] = None # No evidence to validate
             else:
                 validated_evidence[i] = None # No evidence retrieved initially
                 
-        if not facet_details_to_embed: # No evidence found for any facet
+        if not facet_indices_map: # No evidence found for any facet
             logger.info("No evidence found to validate.")
             return validated_evidence
 
-        # Perform batch embedding generation
-        logger.info(f"Generating embeddings for {len(facet_details_to_embed)} facet details and {len(evidence_chunks_to_embed)} evidence chunks.")
-        try:
-            all_texts_to_embed = facet_details_to_embed + evidence_chunks_to_embed
-            all_embeddings = await vector_db_service.generate_embeddings(all_texts_to_embed)
-            
-            if not all_embeddings or len(all_embeddings) != len(all_texts_to_embed):
-                logger.error("Failed to generate embeddings for validation. Skipping relevance check.")
-                # Return the original evidence if embedding fails
-                return retrieved_evidence 
+        # Only embed what the query results did not already carry
+        all_texts_to_embed = facet_texts_to_embed + evidence_chunks_to_embed
+        if all_texts_to_embed:
+            logger.info(f"Generating embeddings for {len(facet_texts_to_embed)} facet queries and {len(evidence_chunks_to_embed)} evidence chunks without stored vectors.")
+            try:
+                all_embeddings = await vector_db_service.generate_embeddings(all_texts_to_embed)
+
+                if not all_embeddings or len(all_embeddings) != len(all_texts_to_embed):
+                    logger.error("Failed to generate embeddings for validation. Skipping relevance check.")
+                    # Return the original evidence if embedding fails
+                    return retrieved_evidence
+
+            except Exception as e:
+                logger.error(f"Error during embedding generation for validation: {e}. Skipping relevance check.", exc_info=True)
+                return retrieved_evidence
 
             # Split embeddings back
-            num_facets = len(facet_details_to_embed)
-            facet_embeddings = all_embeddings[:num_facets]
-            evidence_embeddings = all_embeddings[num_facets:]
-            
-        except Exception as e:
-            logger.error(f"Error during embedding generation for validation: {e}. Skipping relevance check.", exc_info=True)
+            num_facet_texts = len(facet_texts_to_embed)
+            for position, embedding in zip(facet_text_targets, all_embeddings[:num_facet_texts]):
+                facet_embeddings[position] = embedding
+            offset = num_facet_texts
+            for position, count in chunk_text_targets:
+                chunk_embeddings_per_facet[position] = all_embeddings[offset:offset + count]
+                offset += count
+        else:
+            logger.info(f"Reusing stored embeddings to validate evidence for {len(facet_indices_map)} facets.")
+
+        # Validate relevance using cosine similarity: every facet against every chunk in one
+        # matrix product, of which each facet keeps the block of its own chunks
+        chunk_offsets = [0]
+        for facet_chunk_embeddings in chunk_embeddings_per_facet:
+            chunk_offsets.append(chunk_offsets[-1] + len(facet_chunk_embeddings))
+        try:
+            similarities = cosine_similarity_matrix(
+                facet_embeddings,
+                [embedding for facet_chunk_embeddings in chunk_embeddings_per_facet for embedding in facet_chunk_embeddings]
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error computing evidence similarities: {e}. Skipping relevance check.")
             return retrieved_evidence
 
-        # Validate relevance using cosine similarity
-        current_evidence_embedding_index = 0
-        for idx, (facet_index, facet_embedding) in enumerate(zip(facet_indices_map, facet_embeddings)):
+        for position, facet_index in enumerate(facet_indices_map):
             original_evidence_data = retrieved_evidence[facet_index]
             if original_evidence_data is None: continue # Should not happen based on logic above, but safety check
 
-            relevant_indices = []
             original_chunk_count = len(original_evidence_data['documents'][0])
-            
-            # Get the embeddings for the chunks of this specific facet
-            facet_chunk_embeddings = evidence_embeddings[current_evidence_embedding_index : current_evidence_embedding_index + original_chunk_count]
-            
-            for chunk_idx, chunk_embedding in enumerate(facet_chunk_embeddings):
-                similarity = cosine_similarity(facet_embedding, chunk_embedding)
-                if similarity is not None and similarity >= relevance_threshold:
-                    relevant_indices.append(chunk_idx)
-                # else: logger.debug(f"Chunk {chunk_idx} for facet {facet_index} is irrelevant (Similarity: {similarity:.4f})")
+            relevant_indices = indices_above_threshold(
+                similarities[position, chunk_offsets[position]:chunk_offsets[position + 1]],
+                relevance_threshold
+            )
             
             # Filter the original evidence data based on relevant indices
             if relevant_indices:
-                filtered_data = {
-                    'ids': [[original_evidence_data['ids'][0][k] for k in relevant_indices]],
-                    'documents': [[original_evidence_data['documents'][0][k] for k in relevant_indices]],
-                    'metadatas': [[original_evidence_data['metadatas'][0][k] for k in relevant_indices]],
-                    'distances': [[original_evidence_data['distances'][0][k] for k in relevant_indices]]
-                    # Add other included fields if necessary
-                }
-                validated_evidence[facet_index] = filtered_data
+                validated_evidence[facet_index] = self._filter_results(original_evidence_data, relevant_indices)
                 logger.debug(f"Facet {facet_index}: Kept {len(relevant_indices)} of {original_chunk_count} evidence chunks after relevance check.")
             else:
                  validated_evidence[facet_index] = None # No relevant chunks found
                  logger.debug(f"Facet {facet_index}: No relevant evidence chunks found after check.")
-            
-            current_evidence_embedding_index += original_chunk_count # Move to the next set of chunk embeddings
 
         logger.info(f"Finished evidence relevance validation. Kept evidence for {sum(1 for r in validated_evidence.values() if r is not None)} facets.")
         return validated_evidence
 
+    async def _retrieve_batched(
+        self,
+        query_texts: List[str],
+        query_embeddings: Optional[Dict[str, List[float]]],
+        n_results_per_facet: int,
+        where_filter: Dict[str, Any]
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Runs every non-empty facet query as one ChromaDB multi-query and splits the
+        response back into per-facet result dictionaries.
+        """
+        evidence: Dict[int, Optional[Dict[str, Any]]] = {i: None for i in range(len(query_texts))}
+        facet_indices = [i for i, text in enumerate(query_texts) if text]
+        for i in range(len(query_texts)):
+            if i not in facet_indices:
+                logger.warning(f"Skipping empty query for facet index {i}")
+        if not facet_indices:
+            return evidence
+
+        batch_texts = [query_texts[i] for i in facet_indices]
+        batch_embeddings = None
+        if query_embeddings and all(text in query_embeddings for text in batch_texts):
+            batch_embeddings = [query_embeddings[text] for text in batch_texts]
+
+        try:
+            if batch_embeddings is not None:
+                results = await vector_db_service.query_collection(
+                    query_texts=batch_texts,
+                    query_embeddings=batch_embeddings,
+                    n_results=n_results_per_facet,
+                    where=where_filter,
+                    include_embeddings=True
+                )
+            else:
+                results = await vector_db_service.query_collection(
+                    query_texts=batch_texts,
+                    n_results=n_results_per_facet,
+                    where=where_filter,
+                    include_embeddings=True
+                )
+        except Exception as e:
+            logger.error(f"Error running batched vector store query for {len(batch_texts)} facets: {e}", exc_info=True)
+            return evidence
+
+        if not results or not results.get('ids') or len(results['ids']) != len(batch_texts):
+            logger.warning(f"Batched query for {len(batch_texts)} facets returned no usable results.")
+            return evidence
+
+        for position, facet_index in enumerate(facet_indices):
+            facet_results = {
+                key: ([value[position]] if isinstance(value, list) and len(value) == len(batch_texts) else value)
+                for key, value in results.items()
+            }
+            if facet_results['ids'][0]:
+                logger.debug(f"Facet {facet_index} query found {len(facet_results['ids'][0])} results.")
+                if batch_embeddings is not None:
+                    facet_results['query_embeddings'] = [batch_embeddings[position]]
+                evidence[facet_index] = facet_results
+            else:
+                logger.debug(f"Facet {facet_index} query found no results.")
+        return evidence
+
+    @staticmethod
+    def _facet_query_text(facet: JobRequirementFacet) -> str:
+        """Builds the retrieval query for a facet; also the reference text for relevance checks."""
+        return f"{facet.detail} {facet.context or ''}".strip()
+
+    async def embed_facet_queries(self, facets: List[JobRequirementFacet]) -> Optional[Dict[str, List[float]]]:
+        """
+        Embeds the retrieval queries of a job's facets once so they can be reused for every
+        candidate scored against the job.
+
+        Returns:
+            A mapping of facet query text to embedding, or None if embedding failed.
+        """
+        return await self._embed_query_texts([text for text in map(self._facet_query_text, facets) if text])
+
+    async def _embed_query_texts(self, query_texts: List[str]) -> Optional[Dict[str, List[float]]]:
+        """
+        Embeds facet queries in a single call through the cached embedding path.
+
+        Returns:
+            A mapping of query text to embedding, or None if embedding failed (callers then
+            fall back to letting ChromaDB embed the query text).
+        """
+        unique_texts = list(dict.fromkeys(query_texts))
+        if not unique_texts:
+            return None
+        try:
+            embeddings = await vector_db_service.generate_embeddings(unique_texts)
+        except Exception as e:
+            logger.warning(f"Could not embed facet queries, falling back to text queries: {e}")
+            return None
+        if not embeddings or len(embeddings) != len(unique_texts):
+            logger.warning("Could not embed facet queries, falling back to text queries.")
+            return None
+        return dict(zip(unique_texts, embeddings))
+
+    @staticmethod
+    def _first_result_list(value: Any) -> Optional[Any]:
+        """Returns the first per-query entry of a ChromaDB result field (e.g. 'embeddings'), or None."""
+        if value is None or len(value) == 0 or value[0] is None:
+            return None
+        return value[0]
+
+    @staticmethod
+    def _relevant_chunk_indices(
+        facet_embedding: List[float],
+        chunk_embeddings: List[List[float]],
+        relevance_threshold: float
+    ) -> List[int]:
+        """Returns the indices of chunks whose similarity to the facet meets the threshold."""
+        try:
+            similarities = cosine_similarity_matrix([facet_embedding], chunk_embeddings)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cannot compare facet and chunk embeddings: {e}")
+            return []
+        return indices_above_threshold(similarities[0], relevance_threshold)
+
+    @staticmethod
+    def _filter_results(results: Dict[str, Any], indices: List[int]) -> Dict[str, Any]:
+        """Keeps only the given chunk indices of a single-query ChromaDB result."""
+        return {
+            'ids': [[results['ids'][0][k] for k in indices]],
+            'documents': [[results['documents'][0][k] for k in indices]],
+            'metadatas': [[results['metadatas'][0][k] for k in indices]],
+            'distances': [[results['distances'][0][k] for k in indices]]
+        }
+
     async def iterative_retrieve_and_validate(
         self,
         candidate_id: int,
@@ -194,7 +389,9 @@ class AgenticRAGService:
         max_attempts_per_facet: int = 2,
         min_evidence_chunks: int = 1,
         n_results_per_facet: int = 3,
-        relevance_threshold: float = 0.5
+        relevance_threshold: float = 0.5,
+        batch_queries: bool = True,
+        query_embeddings: Optional[Dict[str, List[float]]] = None
     ) -> Dict[int, Optional[Dict[str, Any]]]:
         """
         Implements the iterative refinement loop for evidence retrieval and validation.
@@ -207,6 +404,8 @@ class AgenticRAGService:
             min_evidence_chunks: Minimum number of evidence chunks needed to consider a facet covered.
             n_results_per_facet: Number of chunks to retrieve per query.
             relevance_threshold: Threshold for the relevance validation.
+            batch_queries: Whether the initial retrieval runs all facets as one multi-query.
+            query_embeddings: Optional precomputed facet query embeddings (see embed_facet_queries).
             
         Returns:
             A dictionary with evidence for each facet, including any results from refinement attempts.
@@ -217,7 +416,9 @@ class AgenticRAGService:
         evidence_results = await self.retrieve_evidence_for_facets(
             candidate_id=candidate_id,
             facets=facets,
-            n_results_per_facet=n_results_per_facet
+            n_results_per_facet=n_results_per_facet,
+            batch_queries=batch_queries,
+            query_embeddings=query_embeddings
         )
         
         validated_results = await self.validate_evidence_relevance(
@@ -254,46 +455,44 @@ class AgenticRAGService:
                     logger.info(f"Attempt {current_attempt} for facet {i}: Using refined query: '{refined_query[:100]}...'")
                     
                     # Query using the refined query
-                    where_filter = {
-                        "doc_type": "candidate",
-                        "candidate_id": candidate_id
-                    }
+                    where_filter = candidate_chunks_filter(candidate_id)
                     
                     try:
                         refined_results = await vector_db_service.query_collection(
                             query_texts=[refined_query],
                             n_results=n_results_per_facet,
-                            where=where_filter
+                            where=where_filter,
+                            include_embeddings=True
                         )
                         
                         # Validate the new results
                         if refined_results and refined_results.get('documents') and refined_results['documents'][0]:
-                            # Embedding comparison between facet and each chunk for relevance check
-                            facet_embedding = await vector_db_service.generate_embeddings([facet.detail])
-                            if not facet_embedding:
-                                logger.warning(f"Failed to generate embedding for facet {i}. Skipping relevance check.")
-                                continue
-                                
-                            chunk_embeddings = await vector_db_service.generate_embeddings(refined_results['documents'][0])
+                            # Compare each chunk against the facet's original query embedding, reusing
+                            # the vector from the initial retrieval when it is available
+                            facet_embedding = self._first_result_list((evidence_results.get(i) or {}).get('query_embeddings'))
+                            if facet_embedding is None and query_embeddings:
+                                facet_embedding = query_embeddings.get(self._facet_query_text(facet))
+                            if facet_embedding is None:
+                                generated = await vector_db_service.generate_embeddings([self._facet_query_text(facet)])
+                                if not generated:
+                                    logger.warning(f"Failed to generate embedding for facet {i}. Skipping relevance check.")
+                                    continue
+                                facet_embedding = generated[0]
+
+                            # ChromaDB returns the stored chunk embeddings, so only embed as a fallback
+                            chunk_embeddings = self._first_result_list(refined_results.get('embeddings'))
+                            if chunk_embeddings is None or len(chunk_embeddings) != len(refined_results['documents'][0]):
+                                chunk_embeddings = await vector_db_service.generate_embeddings(refined_results['documents'][0])
                             if not chunk_embeddings:
                                 logger.warning(f"Failed to generate embeddings for refined results of facet {i}. Skipping relevance check.")
                                 continue
                             
                             # Identify relevant chunks (using same threshold as validate_evidence_relevance)
-                            relevant_indices = []
-                            for j, chunk_embedding in enumerate(chunk_embeddings):
-                                similarity = cosine_similarity(facet_embedding[0], chunk_embedding)
-                                if similarity is not None and similarity >= relevance_threshold:
-                                    relevant_indices.append(j)
+                            relevant_indices = self._relevant_chunk_indices(facet_embedding, chunk_embeddings, relevance_threshold)
                             
                             # If we found relevant chunks, add them to final results
                             if relevant_indices:
-                                filtered_data = {
-                                    'ids': [[refined_results['ids'][0][k] for k in relevant_indices]],
-                                    'documents': [[refined_results['documents'][0][k] for k in relevant_indices]],
-                                    'metadatas': [[refined_results['metadatas'][0][k] for k in relevant_indices]],
-                                    'distances': [[refined_results['distances'][0][k] for k in relevant_indices]]
-                                }
+                                filtered_data = self._filter_results(refined_results, relevant_indices)
                                 
                                 # Merge with existing results if any
                                 if i in final_results and final_results[i] is not None:
@@ -418,6 +617,13 @@ class AgenticRAGService:
         """
         Tool integration function that gathers external market and salary data
         to enrich job-candidate matching with market insights.
+
+        The salary, market and skill-trend lookups run concurrently, each within
+        settings.EXTERNAL_DATA_TIMEOUT_SECONDS; a slow or failing source is left out and
+        the others are still returned. Complete results are cached per job profile
+        (title, location, experience and the skills sent to the sources) for
+        EXTERNAL_DATA_CACHE_TTL_SECONDS,
+        and concurrent requests for the same profile share one set of lookups.
         
         Args:
             job_title: The job title being evaluated
@@ -428,7 +634,48 @@ class AgenticRAGService:
         Returns:
             Dictionary containing enriched data from external sources
         """
-        logger.info(f"Gathering external market data for job '{job_title}' with {len(skills)} skills")
+        top_skills = skills[:10] if skills else None  # Limit to top 10 skills
+        # Only request skill trends if we have skills and they're not too many
+        trend_skills = skills if skills and len(skills) <= 15 else None
+        cache_key = (
+            job_title.strip().lower(),
+            (location or "").strip().lower(),
+            experience_years,
+            tuple(top_skills or ()),
+            tuple(trend_skills or ())
+        )
+        cached = self._external_data_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached external market data for job '{job_title}'")
+            return copy.deepcopy(cached)
+
+        in_flight = self._external_data_in_flight.get(cache_key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._fetch_external_data(
+                job_title, location, top_skills, trend_skills, experience_years
+            ))
+            self._external_data_in_flight[cache_key] = in_flight
+            try:
+                external_data, complete = await asyncio.shield(in_flight)
+            finally:
+                self._external_data_in_flight.pop(cache_key, None)
+            if complete:
+                self._external_data_cache.set(cache_key, copy.deepcopy(external_data))
+        else:
+            logger.debug(f"Joining in-flight external data lookup for job '{job_title}'")
+            external_data, _ = await asyncio.shield(in_flight)
+        return copy.deepcopy(external_data)
+
+    async def _fetch_external_data(
+        self,
+        job_title: str,
+        location: Optional[str],
+        top_skills: Optional[List[str]],
+        trend_skills: Optional[List[str]],
+        experience_years: Optional[int]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Runs the external lookups concurrently. Returns (external data, whether every source succeeded)."""
+        logger.info(f"Gathering external market data for job '{job_title}' with {len(top_skills or [])} top skills")
         
         # Initialize the results dictionary
         external_data = {
@@ -437,62 +684,55 @@ class AgenticRAGService:
             "skill_trends": None,
             "error": None
         }
-        
-        try:
-            # Get salary benchmark data (async call)
-            salary_response = await external_tool_service.get_salary_benchmark(
+
+        lookups = {
+            "salary_benchmark": external_tool_service.get_salary_benchmark(
                 job_title=job_title,
                 location=location,
                 experience_years=experience_years,
-                skills=skills[:10] if skills else None  # Limit to top 10 skills
-            )
-            
-            if salary_response["success"]:
-                external_data["salary_benchmark"] = salary_response["data"]
-                logger.debug(f"Retrieved salary data for {job_title}: {salary_response['data']['salary_data']['median']} USD median")
-            else:
-                logger.warning(f"Failed to retrieve salary data: {salary_response['error']}")
-            
-            # Get job market insights (async call)
-            market_response = await external_tool_service.get_job_market_insights(
+                skills=top_skills
+            ),
+            "market_insights": external_tool_service.get_job_market_insights(
                 job_title=job_title,
-                skills=skills[:10] if skills else None,  # Limit to top 10 skills
+                skills=top_skills,
                 location=location,
                 time_period="6months"  # Default to 6 months of data
             )
-            
-            if market_response["success"]:
-                external_data["market_insights"] = market_response["data"]
-                logger.debug(f"Retrieved market insights for {job_title}: Growth rate {market_response['data']['market_data']['demand_growth_rate']}")
+        }
+        if trend_skills:
+            lookups["skill_trends"] = external_tool_service.get_skill_demand_trends(
+                skills=trend_skills,
+                location=location,
+                time_period="6months"  # Default to 6 months of data
+            )
+
+        timeout = settings.EXTERNAL_DATA_TIMEOUT_SECONDS
+        responses = await asyncio.gather(
+            *(asyncio.wait_for(lookup, timeout=timeout) for lookup in lookups.values()),
+            return_exceptions=True
+        )
+
+        complete = True
+        for source, response in zip(lookups.keys(), responses):
+            if isinstance(response, asyncio.TimeoutError):
+                logger.warning(f"External data source '{source}' timed out after {timeout}s; continuing without it.")
+                complete = False
+            elif isinstance(response, Exception):
+                logger.error(f"Error retrieving external data source '{source}': {response}", exc_info=response)
+                complete = False
+            elif response.get("success"):
+                external_data[source] = response["data"]
+                logger.debug(f"Retrieved {source} for {job_title}")
             else:
-                logger.warning(f"Failed to retrieve market insights: {market_response['error']}")
-            
-            # Get skill-specific demand trends (async call)
-            # Only request if we have skills and they're not too many
-            if skills and len(skills) <= 15:
-                skill_response = await external_tool_service.get_skill_demand_trends(
-                    skills=skills,
-                    location=location,
-                    time_period="6months"  # Default to 6 months of data
-                )
-                
-                if skill_response["success"]:
-                    external_data["skill_trends"] = skill_response["data"]
-                    logger.debug(f"Retrieved skill trends for {len(skills)} skills")
-                else:
-                    logger.warning(f"Failed to retrieve skill trends: {skill_response['error']}")
-            
-            # Basic error handling
-            if not any([external_data["salary_benchmark"], external_data["market_insights"], external_data["skill_trends"]]):
-                external_data["error"] = "Failed to retrieve any external data"
-                logger.error("All external data retrieval attempts failed")
-                
-        except Exception as e:
-            error_msg = f"Error gathering external market data: {str(e)}"
-            external_data["error"] = error_msg
-            logger.error(error_msg, exc_info=True)
+                logger.warning(f"Failed to retrieve {source}: {response.get('error')}")
+                complete = False
+
+        # Basic error handling
+        if not any([external_data["salary_benchmark"], external_data["market_insights"], external_data["skill_trends"]]):
+            external_data["error"] = "Failed to retrieve any external data"
+            logger.error("All external data retrieval attempts failed")
         
-        return external_data
+        return external_data, complete
     
     async def enrich_evidence_with_external_data(
         self,
@@ -514,6 +754,31 @@ class AgenticRAGService:
         Returns:
             Dictionary containing enriched evidence and external data
         """
+        external_data = await self.fetch_job_external_data(
+            facets=facets,
+            job_title=job_title,
+            location=location
+        )
+        return self.map_external_data_to_facets(facets, validated_evidence, external_data)
+
+    async def fetch_job_external_data(
+        self,
+        facets: List[JobRequirementFacet],
+        job_title: str,
+        location: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Gathers the external market data for a job. The result depends only on the job,
+        so it can be fetched once and mapped onto many candidates' evidence.
+        
+        Args:
+            facets: List of job requirement facets
+            job_title: Job title to use for external data lookup
+            location: Optional job location
+            
+        Returns:
+            The dictionary returned by get_external_data_for_job_market_fit
+        """
         # Extract skills from all facets of type "skill"
         skills = []
         experience_years = None
@@ -538,13 +803,30 @@ class AgenticRAGService:
         logger.info(f"Getting external data for {job_title} with {len(skills)} skills and {experience_years if experience_years else 'unknown'} years experience")
         
         # Get external data from our service
-        external_data = await self.get_external_data_for_job_market_fit(
+        return await self.get_external_data_for_job_market_fit(
             job_title=job_title,
             location=location,
             skills=skills,
             experience_years=experience_years
         )
+
+    def map_external_data_to_facets(
+        self,
+        facets: List[JobRequirementFacet],
+        validated_evidence: Dict[int, Optional[Dict[str, Any]]],
+        external_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Maps job-level external data onto the facets of one candidate that have evidence.
         
+        Args:
+            facets: List of job requirement facets
+            validated_evidence: The validated evidence for each facet
+            external_data: Output of fetch_job_external_data
+            
+        Returns:
+            Dictionary containing enriched evidence and external data
+        """
         # Map external data to relevant facets
         facet_external_data = {}
         
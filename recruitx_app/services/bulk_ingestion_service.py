@@ -0,0 +1,463 @@
+import asyncio
+import io
+import logging
+import os
+import uuid
+import zipfile
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import SessionLocal
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.services.candidate_service import CandidateService
+from recruitx_app.services.document_cache_service import document_cache_service
+from recruitx_app.services.shortlist_service import shortlist_service
+from recruitx_app.services.vector_db_service import vector_db_service
+from recruitx_app.utils.concurrency import run_in_parse_executor
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input of a stage
+_DONE = object()
+
+
+def candidate_name_from_filename(filename: str) -> str:
+    """Derives a display name from a CV file name, e.g. "jane_doe-cv.pdf" -> "Jane Doe Cv"."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    name = " ".join(stem.replace("_", " ").replace("-", " ").replace(".", " ").split())
+    return name.title() or "Unknown Candidate"
+
+
+class IngestionFile:
+    """Progress of one CV in a bulk ingestion batch."""
+
+    # Lifecycle states, in pipeline order
+    STATUS_QUEUED = "QUEUED"
+    STATUS_PARSED = "PARSED"
+    STATUS_STORED = "STORED"
+    STATUS_ANALYZED = "ANALYZED"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    def __init__(self, index: int, filename: str):
+        self.index = index
+        self.filename = filename
+        self.status = self.STATUS_QUEUED
+        self.candidate_id: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def fail(self, error: str) -> None:
+        self.status = self.STATUS_FAILED
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "filename": self.filename,
+            "status": self.status,
+            "candidate_id": self.candidate_id,
+            "error": self.error
+        }
+
+
+class IngestionBatch:
+    """A set of CVs ingested together, with per-file progress."""
+
+    def __init__(self, files: List[IngestionFile], analyze: bool):
+        self.batch_id = uuid.uuid4().hex
+        self.files = files
+        self.analyze = analyze
+        self.created_at = datetime.now(timezone.utc)
+        self.completed_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.completed_at is not None
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of files in each status."""
+        counts: Dict[str, int] = {}
+        for ingestion_file in self.files:
+            counts[ingestion_file.status] = counts.get(ingestion_file.status, 0) + 1
+        return counts
+
+    def to_dict(self, include_files: bool = True) -> Dict[str, Any]:
+        finished = sum(1 for ingestion_file in self.files if ingestion_file.is_finished)
+        result = {
+            "batch_id": self.batch_id,
+            "analyze": self.analyze,
+            "total_files": len(self.files),
+            "finished_files": finished,
+            "counts": self.counts(),
+            "is_finished": self.is_finished,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at
+        }
+        if include_files:
+            result["files"] = [ingestion_file.to_dict() for ingestion_file in self.files]
+        return result
+
+
+# A CV waiting to be parsed: its progress record and a loader returning its bytes
+_Source = Tuple[IngestionFile, Callable[[], bytes]]
+
+
+class BulkIngestionService:
+    """
+    Ingests batches of CVs through a staged pipeline.
+
+    Each stage is fed by a bounded asyncio queue, so a slow stage applies backpressure
+    instead of letting parsed text pile up in memory:
+
+    1. parse   - text extraction on the parse executor (OCR pages go to the OCR process
+                 pool), deduplicated through the document cache
+    2. store   - candidates inserted with one bulk_save_objects per batch of files
+    3. analyze - CV analyses run concurrently; the API key pool paces the LLM calls
+    4. index   - analyses saved and the chunks of many candidates added to ChromaDB
+                 in a single call
+
+    Progress is kept in memory per batch; the most recent finished batches stay
+    queryable. A file that fails in one stage is reported and does not affect the others.
+    Sessions come from `session_factory`, which a caller can override per batch (e.g.
+    to use the database of the request's session).
+    """
+
+    def __init__(
+        self,
+        candidate_service: Optional[CandidateService] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        parse_workers: Optional[int] = None,
+        analysis_workers: Optional[int] = None,
+        db_batch_size: Optional[int] = None,
+        index_batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.candidate_service = candidate_service or CandidateService()
+        self.session_factory = session_factory
+        self.parse_workers = parse_workers or settings.PARSE_EXECUTOR_WORKERS
+        self.analysis_workers = analysis_workers or settings.BULK_INGEST_ANALYSIS_WORKERS
+        self.db_batch_size = db_batch_size or settings.BULK_INGEST_DB_BATCH_SIZE
+        self.index_batch_size = index_batch_size or settings.BULK_INGEST_INDEX_BATCH_SIZE
+        self.queue_size = queue_size or settings.BULK_INGEST_QUEUE_SIZE
+        self._batches: "OrderedDict[str, IngestionBatch]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start_batch(
+        self,
+        uploads: List[Tuple[str, bytes]],
+        analyze: bool = True,
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> IngestionBatch:
+        """
+        Registers a batch and starts ingesting it in the background.
+
+        Args:
+            uploads: (filename, content) pairs; zip archives are expanded into their files
+            analyze: Whether to analyze and index the CVs after storing them
+            session_factory: Opens the sessions used for this batch (defaults to the
+                service's session_factory)
+
+        Returns:
+            The batch, whose progress can be polled with get_batch.
+        """
+        sources = self._expand_uploads(uploads)
+        batch = IngestionBatch([ingestion_file for ingestion_file, _ in sources], analyze)
+        self._batches[batch.batch_id] = batch
+        self._forget_old_batches()
+
+        task = asyncio.create_task(self.run_batch(batch, sources, session_factory), name=f"ingest-{batch.batch_id}")
+        self._tasks[batch.batch_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(batch.batch_id, None))
+        logger.info(f"Started bulk ingestion batch {batch.batch_id} with {len(batch.files)} files.")
+        return batch
+
+    def get_batch(self, batch_id: str) -> Optional[IngestionBatch]:
+        """Get a batch by ID."""
+        return self._batches.get(batch_id)
+
+    async def stop(self) -> None:
+        """Cancels the running batches; their unfinished files are marked as failed."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget_old_batches(self) -> None:
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.is_finished]
+        for batch_id in finished[:max(0, len(finished) - settings.BULK_INGEST_KEEP_BATCHES)]:
+            del self._batches[batch_id]
+
+    def _expand_uploads(self, uploads: List[Tuple[str, bytes]]) -> List[_Source]:
+        """
+        Turns the uploads into per-CV sources. Zip members are only decompressed when the
+        parse stage reaches them; unreadable archives and oversized members become failed files.
+        """
+        sources: List[_Source] = []
+
+        def add(filename: str, loader: Callable[[], bytes], error: Optional[str] = None) -> None:
+            ingestion_file = IngestionFile(len(sources), filename)
+            if error:
+                ingestion_file.fail(error)
+            sources.append((ingestion_file, loader))
+
+        for filename, content in uploads:
+            if not filename.lower().endswith(".zip"):
+                add(filename, lambda content=content: content)
+                continue
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+                members = archive.infolist()
+            except zipfile.BadZipFile as e:
+                add(filename, bytes, f"Invalid zip archive: {e}")
+                continue
+            for member in members:
+                member_name = os.path.basename(member.filename)
+                # Skip directories and the resource forks added by macOS
+                if member.is_dir() or not member_name or member_name.startswith(".") or "__MACOSX" in member.filename:
+                    continue
+                display_name = f"{filename}/{member.filename}"
+                if member.file_size > settings.MAX_UPLOAD_BYTES:
+                    add(display_name, bytes, f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES} bytes")
+                else:
+                    add(display_name, lambda archive=archive, member=member: archive.read(member))
+
+        if len(sources) > settings.BULK_INGEST_MAX_FILES:
+            raise ValueError(f"A batch may contain at most {settings.BULK_INGEST_MAX_FILES} files, got {len(sources)}.")
+        return sources
+
+    async def run_batch(
+        self,
+        batch: IngestionBatch,
+        sources: List[_Source],
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> IngestionBatch:
+        """Runs every file of a batch through the pipeline and returns the finished batch."""
+        session_factory = session_factory or self.session_factory
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        store_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        analyze_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        index_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def feed():
+            for ingestion_file, loader in sources:
+                if not ingestion_file.is_finished:
+                    await parse_queue.put((ingestion_file, loader))
+            for _ in range(self.parse_workers):
+                await parse_queue.put(_DONE)
+
+        async def parse_stage():
+            await asyncio.gather(*(self._parse_worker(session_factory, parse_queue, store_queue) for _ in range(self.parse_workers)))
+            await store_queue.put(_DONE)
+
+        async def store_stage():
+            await self._store_worker(session_factory, store_queue, analyze_queue if batch.analyze else None)
+            for _ in range(self.analysis_workers):
+                await analyze_queue.put(_DONE)
+
+        async def analyze_stage():
+            await asyncio.gather(*(self._analyze_worker(session_factory, analyze_queue, index_queue) for _ in range(self.analysis_workers)))
+            await index_queue.put(_DONE)
+
+        try:
+            await asyncio.gather(feed(), parse_stage(), store_stage(), analyze_stage(), self._index_worker(session_factory, index_queue))
+        finally:
+            for ingestion_file in batch.files:
+                if not ingestion_file.is_finished:
+                    ingestion_file.fail("Ingestion was interrupted")
+            batch.completed_at = datetime.now(timezone.utc)
+            # Have the shortlist index rebuilt with the new candidates instead of after its TTL
+            shortlist_service.invalidate()
+            counts = batch.counts()
+            logger.info(f"Finished bulk ingestion batch {batch.batch_id}: "
+                        f"{counts.get(IngestionFile.STATUS_COMPLETED, 0)}/{len(batch.files)} files completed.")
+        return batch
+
+    @staticmethod
+    async def _next_items(queue: asyncio.Queue, max_items: int) -> Tuple[List[Any], bool]:
+        """
+        Waits for one item, then takes whatever else is already queued, up to max_items.
+
+        Returns:
+            A tuple of (items, whether the end of the input was reached).
+        """
+        items = []
+        item = await queue.get()
+        while item is not _DONE:
+            items.append(item)
+            if len(items) >= max_items or queue.empty():
+                return items, False
+            item = queue.get_nowait()
+        return items, True
+
+    async def _parse_worker(
+        self,
+        session_factory: Callable[[], Session],
+        parse_queue: asyncio.Queue,
+        store_queue: asyncio.Queue
+    ) -> None:
+        db = session_factory()
+        try:
+            while True:
+                item = await parse_queue.get()
+                if item is _DONE:
+                    return
+                ingestion_file, loader = item
+                try:
+                    content = await run_in_parse_executor(loader)
+                    text, content_hash, _ = await document_cache_service.extract_text(db, content, ingestion_file.filename)
+                except Exception as e:
+                    logger.error(f"Failed to parse {ingestion_file.filename}: {e}", exc_info=True)
+                    ingestion_file.fail(f"Failed to parse file: {e}")
+                    continue
+                if not text:
+                    ingestion_file.fail("Could not extract text from the file")
+                    continue
+                ingestion_file.status = IngestionFile.STATUS_PARSED
+                await store_queue.put((ingestion_file, text, content_hash))
+        finally:
+            db.close()
+
+    async def _store_worker(
+        self,
+        session_factory: Callable[[], Session],
+        store_queue: asyncio.Queue,
+        analyze_queue: Optional[asyncio.Queue]
+    ) -> None:
+        done = False
+        while not done:
+            items, done = await self._next_items(store_queue, self.db_batch_size)
+            if not items:
+                continue
+            stored = self._save_candidates(session_factory, items)
+            for ingestion_file, text in stored:
+                if analyze_queue is None:
+                    ingestion_file.status = IngestionFile.STATUS_COMPLETED
+                else:
+                    await analyze_queue.put((ingestion_file, text))
+
+    def _save_candidates(
+        self,
+        session_factory: Callable[[], Session],
+        items: List[Tuple[IngestionFile, str, str]]
+    ) -> List[Tuple[IngestionFile, str]]:
+        """Inserts the candidates of parsed files in one transaction. Returns the stored (file, text) pairs."""
+        db = session_factory()
+        try:
+            candidates = [
+                Candidate(
+                    name=candidate_name_from_filename(ingestion_file.filename),
+                    resume_raw=text,
+                    content_hash=content_hash
+                )
+                for ingestion_file, text, content_hash in items
+            ]
+            # return_defaults fetches the generated primary keys
+            db.bulk_save_objects(candidates, return_defaults=True)
+            db.commit()
+            stored = []
+            for (ingestion_file, text, _), candidate in zip(items, candidates):
+                ingestion_file.candidate_id = candidate.id
+                ingestion_file.status = IngestionFile.STATUS_STORED
+                stored.append((ingestion_file, text))
+            logger.info(f"Stored {len(candidates)} bulk-ingested candidates in one transaction.")
+            return stored
+        except Exception as e:
+            logger.error(f"Failed to store {len(items)} bulk-ingested candidates: {e}", exc_info=True)
+            db.rollback()
+            for ingestion_file, _, _ in items:
+                ingestion_file.fail(f"Failed to store candidate: {e}")
+            return []
+        finally:
+            db.close()
+
+    async def _analyze_worker(
+        self,
+        session_factory: Callable[[], Session],
+        analyze_queue: asyncio.Queue,
+        index_queue: asyncio.Queue
+    ) -> None:
+        db = session_factory()
+        try:
+            while True:
+                item = await analyze_queue.get()
+                if item is _DONE:
+                    return
+                ingestion_file, text = item
+                try:
+                    analysis = await self.candidate_service.get_or_run_analysis(db, ingestion_file.candidate_id, text)
+                except Exception as e:
+                    logger.error(f"Exception analyzing bulk-ingested candidate {ingestion_file.candidate_id}: {e}", exc_info=True)
+                    analysis = None
+                if not analysis:
+                    ingestion_file.fail("CV analysis failed")
+                    continue
+                ingestion_file.status = IngestionFile.STATUS_ANALYZED
+                await index_queue.put((ingestion_file, text, analysis.model_dump(mode='json')))
+        finally:
+            db.close()
+
+    async def _index_worker(self, session_factory: Callable[[], Session], index_queue: asyncio.Queue) -> None:
+        done = False
+        while not done:
+            items, done = await self._next_items(index_queue, self.index_batch_size)
+            if items:
+                await self._save_and_index(session_factory, items)
+
+    async def _save_and_index(
+        self,
+        session_factory: Callable[[], Session],
+        items: List[Tuple[IngestionFile, str, Dict[str, Any]]]
+    ) -> None:
+        """Saves the analyses of several candidates in one transaction and indexes all their chunks in one call."""
+        db = session_factory()
+        try:
+            db.bulk_update_mappings(Candidate, [
+                {"id": ingestion_file.candidate_id, "analysis": analysis}
+                for ingestion_file, _, analysis in items
+            ])
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save {len(items)} bulk analyses: {e}", exc_info=True)
+            db.rollback()
+            for ingestion_file, _, _ in items:
+                ingestion_file.fail(f"Failed to save analysis: {e}")
+            return
+        finally:
+            db.close()
+
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        ids: List[str] = []
+        for ingestion_file, text, _ in items:
+            chunks, chunk_metadatas, chunk_ids = self.candidate_service.build_index_chunks(ingestion_file.candidate_id, text)
+            documents.extend(chunks)
+            metadatas.extend(chunk_metadatas)
+            ids.extend(chunk_ids)
+
+        success = True
+        if documents:
+            try:
+                success = await vector_db_service.add_document_chunks(documents=documents, metadatas=metadatas, ids=ids)
+            except Exception as e:
+                logger.error(f"Exception indexing {len(items)} bulk-ingested candidates: {e}", exc_info=True)
+                success = False
+
+        for ingestion_file, _, _ in items:
+            if success:
+                ingestion_file.status = IngestionFile.STATUS_COMPLETED
+            else:
+                ingestion_file.fail("Analysis saved, but indexing the CV failed")
+        if success:
+            logger.info(f"Indexed {len(documents)} chunks of {len(items)} bulk-ingested candidates in one call.")
+
+
+# Instantiate the service for easy import
+bulk_ingestion_service = BulkIngestionService()
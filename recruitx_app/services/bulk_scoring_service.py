@@ -0,0 +1,274 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import SessionLocal
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.job import Job
+from recruitx_app.models.score import Score
+from recruitx_app.schemas.job import JobRequirementFacet
+from recruitx_app.services.agentic_rag_service import agentic_rag_service
+from recruitx_app.services.scoring_service import ScoringService
+from recruitx_app.services.vector_db_service import vector_db_service
+
+logger = logging.getLogger(__name__)
+
+
+class JobScoringContext(BaseModel):
+    """Job-side artifacts computed once and shared by every candidate scored against the job."""
+    job_id: int
+    job_title: str
+    job_location: Optional[str] = None
+    description_raw: str
+    facets: Optional[List[JobRequirementFacet]] = None
+    query_embeddings: Optional[Dict[str, List[float]]] = None
+    jd_embedding: Optional[List[float]] = None
+    external_data: Optional[Dict[str, Any]] = None
+
+
+class BulkScoringService:
+    """
+    Scores one job against many candidates.
+
+    The JD-side work (facet decomposition, facet query embeddings, the JD embedding
+    and external market data) is done once per job. Only candidate-specific evidence
+    retrieval and score synthesis fan out, bounded by a semaphore. Each candidate task
+    loads its data through its own DB session and all scores are written in one commit.
+    Sessions come from `session_factory`, which a caller can override per batch (e.g.
+    to use the database of the request's session).
+    """
+
+    def __init__(
+        self,
+        scoring_service: Optional[ScoringService] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.scoring_service = scoring_service or ScoringService()
+        self.session_factory = session_factory
+
+    async def prepare_job_context(self, job: Job) -> JobScoringContext:
+        """
+        Computes the job-level scoring artifacts.
+
+        Facets come from ScoringService.get_job_facets (and are set on the job so the
+        caller's commit persists them). If decomposition fails the context has no facets
+        and every candidate receives a decomposition-failure score.
+        """
+        context = JobScoringContext(
+            job_id=job.id,
+            job_title=job.title or "Unknown Position",
+            job_location=job.location or None,
+            description_raw=job.description_raw
+        )
+
+        context.facets = await self.scoring_service.get_job_facets(job)
+        if not context.facets:
+            logger.error(f"JD decomposition failed for Job {job.id}. Candidates will receive failure scores.")
+            return context
+
+        query_embeddings, jd_embeddings, external_data = await asyncio.gather(
+            agentic_rag_service.embed_facet_queries(context.facets),
+            vector_db_service.generate_embeddings([job.description_raw]),
+            agentic_rag_service.fetch_job_external_data(
+                facets=context.facets,
+                job_title=context.job_title,
+                location=context.job_location
+            ),
+            return_exceptions=True
+        )
+
+        if isinstance(query_embeddings, Exception):
+            logger.warning(f"Could not precompute facet query embeddings for Job {job.id}: {query_embeddings}")
+        else:
+            context.query_embeddings = query_embeddings
+
+        if isinstance(jd_embeddings, Exception) or not jd_embeddings:
+            logger.warning(f"Could not precompute JD embedding for Job {job.id}; it will be embedded per candidate.")
+        else:
+            context.jd_embedding = jd_embeddings[0]
+
+        if isinstance(external_data, Exception):
+            logger.warning(f"Could not fetch external market data for Job {job.id}: {external_data}")
+        else:
+            context.external_data = external_data
+
+        logger.info(f"Prepared scoring context for Job {job.id}: {len(context.facets)} facets, "
+                    f"query embeddings {'ready' if context.query_embeddings else 'missing'}, "
+                    f"JD embedding {'ready' if context.jd_embedding else 'missing'}.")
+        return context
+
+    async def score_candidates(
+        self,
+        job_id: int,
+        candidate_ids: List[int],
+        max_concurrency: Optional[int] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """
+        Scores a job against a list of candidates.
+
+        Args:
+            job_id: The ID of the job
+            candidate_ids: The IDs of the candidates to score (duplicates are scored once)
+            max_concurrency: Maximum number of candidates scored at the same time
+                (defaults to settings.BULK_SCORING_CONCURRENCY)
+            session_factory: Opens the sessions used for this batch (defaults to the
+                service's session_factory)
+
+        Returns:
+            A dictionary mapping each candidate ID to its result, either
+            {"status": "success", "score_id": ..., "overall_score": ...} or
+            {"status": "error", "message": ...}, or None if the job was not found.
+
+        Raises:
+            Exception: If preparing the job context or saving its facets fails
+        """
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        session_factory = session_factory or self.session_factory
+
+        db = session_factory()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job or not job.description_raw:
+                logger.warning(f"Cannot run bulk scoring: Job {job_id} not found or missing raw text.")
+                return None
+            context = await self.prepare_job_context(job)
+            # Persist newly decomposed facets on the job
+            db.commit()
+        except Exception as e:
+            # Not a missing job: let the caller report a server error
+            logger.error(f"Failed to prepare bulk scoring for Job {job_id}: {e}", exc_info=True)
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        semaphore = asyncio.Semaphore(max_concurrency or settings.BULK_SCORING_CONCURRENCY)
+        logger.info(f"Starting bulk scoring for Job {job_id} across {len(candidate_ids)} candidates.")
+        outcomes = await asyncio.gather(
+            *(self._score_candidate(context, candidate_id, semaphore, session_factory) for candidate_id in candidate_ids)
+        )
+
+        results: Dict[int, Dict[str, Any]] = {}
+        pending: List[Tuple[int, Score]] = []
+        for candidate_id, (score, error) in zip(candidate_ids, outcomes):
+            if score is not None:
+                pending.append((candidate_id, score))
+            else:
+                results[candidate_id] = {"status": "error", "message": error}
+
+        results.update(self._save_scores(job_id, pending, session_factory))
+        logger.info(f"Finished bulk scoring for Job {job_id}: "
+                    f"{sum(1 for r in results.values() if r['status'] == 'success')}/{len(candidate_ids)} succeeded.")
+        return {candidate_id: results[candidate_id] for candidate_id in candidate_ids}
+
+    async def _score_candidate(
+        self,
+        context: JobScoringContext,
+        candidate_id: int,
+        semaphore: asyncio.Semaphore,
+        session_factory: Callable[[], Session]
+    ) -> Tuple[Optional[Score], Optional[str]]:
+        """Scores a single candidate against a prepared job context. Returns (score, error)."""
+        async with semaphore:
+            db = session_factory()
+            try:
+                candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+                resume_raw = candidate.resume_raw if candidate else None
+            except Exception as e:
+                logger.error(f"Failed to load Candidate {candidate_id} for bulk scoring: {e}", exc_info=True)
+                return None, f"Failed to load candidate: {e}"
+            finally:
+                db.close()
+
+            if not resume_raw:
+                logger.warning(f"Skipping Candidate {candidate_id}: not found or missing raw text.")
+                return None, "Candidate not found or missing raw text"
+
+            if not context.facets:
+                return self.scoring_service._build_decomposition_failure_score(context.job_id, candidate_id), None
+
+            try:
+                validated_evidence = await agentic_rag_service.iterative_retrieve_and_validate(
+                    candidate_id=candidate_id,
+                    facets=context.facets,
+                    max_attempts_per_facet=2,
+                    min_evidence_chunks=1,
+                    n_results_per_facet=3,
+                    relevance_threshold=0.5,
+                    query_embeddings=context.query_embeddings
+                )
+
+                if context.external_data is not None:
+                    enriched_data = agentic_rag_service.map_external_data_to_facets(
+                        context.facets, validated_evidence, context.external_data
+                    )
+                else:
+                    enriched_data = {"external_data": {"error": "External data unavailable"}, "facet_external_data": {}}
+                external_data_success, facets_enriched = self.scoring_service._summarize_external_data(enriched_data)
+
+                score_synthesis_result = await self.scoring_service.orchestration_agent.synthesize_score(
+                    job_description=context.description_raw,
+                    candidate_resume=resume_raw,
+                    job_facets=context.facets,
+                    retrieved_evidence=validated_evidence,
+                    candidate_id=candidate_id,
+                    external_data=enriched_data if external_data_success else None,
+                    jd_embedding=context.jd_embedding
+                )
+
+                return self.scoring_service._build_score_record(
+                    job_id=context.job_id,
+                    candidate_id=candidate_id,
+                    job_facets=context.facets,
+                    validated_evidence=validated_evidence,
+                    score_synthesis_result=score_synthesis_result,
+                    external_data_success=external_data_success,
+                    facets_enriched=facets_enriched
+                ), None
+            except Exception as e:
+                logger.error(f"Exception during bulk scoring of Candidate {candidate_id} for Job {context.job_id}: {e}", exc_info=True)
+                return None, str(e)
+
+    def _save_scores(
+        self,
+        job_id: int,
+        pending: List[Tuple[int, Score]],
+        session_factory: Callable[[], Session]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Writes all scores in a single transaction and returns per-candidate results."""
+        if not pending:
+            return {}
+
+        db = session_factory()
+        try:
+            db.add_all([score for _, score in pending])
+            db.flush() # Assigns primary keys before the commit expires the objects
+            results = {
+                candidate_id: {
+                    "score_id": score.id,
+                    "overall_score": score.overall_score,
+                    "status": "success"
+                }
+                for candidate_id, score in pending
+            }
+            db.commit()
+            logger.info(f"Saved {len(pending)} scores for Job {job_id} in one transaction.")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to save {len(pending)} bulk scores for Job {job_id}: {e}", exc_info=True)
+            db.rollback()
+            return {
+                candidate_id: {"status": "error", "message": f"Failed to save score: {e}"}
+                for candidate_id, _ in pending
+            }
+        finally:
+            db.close()
+
+
+# Instantiate the service for easy import
+bulk_scoring_service = BulkScoringService()
@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
 from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.document_cache import AnalysisCacheEntry
 from recruitx_app.agents.cv_analysis_agent import CVAnalysisAgent
-from recruitx_app.services.vector_db_service import vector_db_service
-from recruitx_app.utils.text_utils import split_text
+from recruitx_app.services.vector_db_service import content_chunk_ids, vector_db_service
+from recruitx_app.services.document_cache_service import document_cache_service
+from recruitx_app.services.shortlist_service import shortlist_service
+from recruitx_app.utils.text_utils import iter_text_spans
 from recruitx_app.schemas.candidate import CandidateAnalysis
 
 logger = logging.getLogger(__name__)
@@ -27,23 +30,87 @@ class CandidateService:
         """Get a specific candidate by ID."""
         return db.query(Candidate).filter(Candidate.id == candidate_id).first()
     
-    def create_candidate(self, db: Session, candidate_data: Dict[str, Any]) -> Candidate:
+    def create_candidate(self, db: Session, candidate_data: Dict[str, Any], content_hash: Optional[str] = None) -> Candidate:
         """
         Create a new candidate.
         
         Args:
             db: Database session
-            candidate_data: Dictionary containing candidate information
+            candidate_data: Dictionary (or CandidateCreate) containing candidate information
+            content_hash: sha256 of the uploaded CV file, if the candidate came from an upload
             
         Returns:
             The created candidate
         """
+        if hasattr(candidate_data, "model_dump"):
+            candidate_data = candidate_data.model_dump(exclude_unset=True)
         db_candidate = Candidate(**candidate_data)
+        if content_hash:
+            db_candidate.content_hash = content_hash
         db.add(db_candidate)
         db.commit()
         db.refresh(db_candidate)
+        # Have the shortlist index rebuilt with the new candidate instead of after its TTL
+        shortlist_service.invalidate()
         return db_candidate
     
+    async def get_or_run_analysis(self, db: Session, candidate_id: int, resume_raw: str) -> Optional[CandidateAnalysis]:
+        """
+        Returns the analysis of a CV, reusing the cached analysis of an identical CV if there is one.
+
+        Args:
+            db: Database session
+            candidate_id: The ID of the candidate the CV belongs to
+            resume_raw: The CV text
+
+        Returns:
+            The CandidateAnalysis, or None if the agent failed.
+        """
+        cached_analysis = document_cache_service.get_analysis(
+            db, resume_raw, AnalysisCacheEntry.TYPE_CV, self.cv_agent.model_name
+        )
+        if cached_analysis is not None:
+            logger.info(f"Reusing cached analysis of an identical CV for candidate ID: {candidate_id}")
+            return CandidateAnalysis(**{**cached_analysis, "candidate_id": candidate_id})
+
+        logger.info(f"Starting CV analysis for candidate ID: {candidate_id}")
+        # Agent returns CandidateAnalysis object or None
+        analysis_result = await self.cv_agent.analyze_cv(
+            cv_text=resume_raw,
+            candidate_id=candidate_id
+        )
+        if not analysis_result:
+            logger.error(f"CV analysis failed for candidate ID: {candidate_id}. Agent returned None.")
+            return None
+
+        document_cache_service.store_analysis(
+            db, resume_raw, AnalysisCacheEntry.TYPE_CV, self.cv_agent.model_name,
+            analysis_result.model_dump(mode='json')
+        )
+        return analysis_result
+
+    def build_index_chunks(self, candidate_id: int, resume_raw: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Splits a CV into the chunks indexed for RAG.
+
+        Returns:
+            A tuple of (chunk texts, chunk metadatas, chunk IDs).
+        """
+        doc_id = f"cand_{candidate_id}"
+        chunks = []
+        metadatas = []
+        for i, (start, end, chunk) in enumerate(iter_text_spans(resume_raw)):
+            chunks.append(chunk)
+            metadatas.append({
+                "doc_id": doc_id,
+                "doc_type": "candidate",
+                "candidate_id": candidate_id,
+                "chunk_index": i,
+                "start_offset": start,  # Position of the chunk in resume_raw
+                "end_offset": end
+            })
+        return chunks, metadatas, content_chunk_ids(doc_id, chunks)
+
     async def analyze_cv(self, db: Session, candidate_id: int) -> Optional[CandidateAnalysis]:
         """
         Analyze a candidate's CV using the agent, update the database, and index the content.
@@ -54,16 +121,9 @@ class CandidateService:
             logger.warning(f"Candidate {candidate_id} not found or has no resume text for analysis.")
             return None
             
-        # Step 1: Analyze the CV using the agent (now expects candidate_id)
-        logger.info(f"Starting CV analysis for candidate ID: {candidate_id}")
-        # Agent now returns CandidateAnalysis object or None
-        analysis_result: Optional[CandidateAnalysis] = await self.cv_agent.analyze_cv(
-            cv_text=candidate.resume_raw, 
-            candidate_id=candidate_id
-        )
-        
+        # Step 1: Reuse the analysis of an identical CV, or analyze it with the agent
+        analysis_result = await self.get_or_run_analysis(db, candidate_id, candidate.resume_raw)
         if not analysis_result:
-            logger.error(f"CV analysis failed for candidate ID: {candidate_id}. Agent returned None.")
             # Optionally update candidate status in DB to reflect analysis failure?
             return None
 
@@ -73,6 +133,7 @@ class CandidateService:
             candidate.analysis = analysis_dict 
             db.commit()
             db.refresh(candidate)
+            shortlist_service.invalidate()  # The candidate's skills changed
             logger.info(f"Successfully updated candidate {candidate_id} with analysis results.")
         except Exception as e:
             db.rollback()
@@ -80,34 +141,21 @@ class CandidateService:
             # If saving fails, should we still index? Let's return None to indicate overall failure.
             return None
             
-        # Step 3: Chunk and index the raw resume text for RAG (no change needed here)
+        # Step 3: Chunk the raw resume text and sync the changed chunks into the RAG index
         try:
             logger.info(f"Starting chunking and indexing for candidate ID: {candidate_id}")
-            chunks = split_text(candidate.resume_raw)
+            chunks, metadatas, _ = self.build_index_chunks(candidate_id, candidate.resume_raw)
             
             if not chunks:
-                logger.warning(f"No text chunks generated by split_text for candidate ID: {candidate_id}")
+                logger.warning(f"No text chunks generated for candidate ID: {candidate_id}")
                 # Even if indexing fails, the analysis was successful, so return the result.
                 return analysis_result 
-                
-            metadatas = []
-            ids = []
-            for i, chunk in enumerate(chunks):
-                doc_id = f"cand_{candidate_id}"
-                chunk_id = f"{doc_id}_chunk_{i}"
-                metadatas.append({
-                    "doc_id": doc_id,
-                    "doc_type": "candidate",
-                    "candidate_id": candidate_id,
-                    "chunk_index": i
-                })
-                ids.append(chunk_id)
             
             logger.info(f"Attempting to index {len(chunks)} chunks for candidate ID: {candidate_id}")
-            success = await vector_db_service.add_document_chunks(
+            success = await vector_db_service.sync_document_chunks(
+                doc_id=f"cand_{candidate_id}",
                 documents=chunks,
-                metadatas=metadatas,
-                ids=ids
+                metadatas=metadatas
             )
             
             if success:
@@ -119,6 +167,8 @@ class CandidateService:
         except Exception as e:
              logger.error(f"Error during chunking/indexing for candidate {candidate_id}: {e}", exc_info=True)
              # Log error but still return the successful analysis result.
-            
+
+        # The candidate's chunk embeddings changed as well
+        shortlist_service.invalidate()
         # Return the validated CandidateAnalysis object if everything up to DB save succeeded.
         return analysis_result
\ No newline at end of file
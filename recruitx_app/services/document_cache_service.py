@@ -0,0 +1,140 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from recruitx_app.models.document_cache import AnalysisCacheEntry, ExtractedDocument
+from recruitx_app.utils.cache_utils import compute_content_hash
+from recruitx_app.utils.file_parser import extract_text_from_file_async
+
+logger = logging.getLogger(__name__)
+
+
+def compute_file_hash(file_content: bytes) -> str:
+    """Returns the hex sha256 digest of an uploaded file."""
+    return hashlib.sha256(file_content).hexdigest()
+
+
+class DocumentCacheService:
+    """
+    Content-addressed caches that let re-submitted documents skip repeated work.
+
+    - Uploaded files are fingerprinted by the sha256 of their bytes; the extracted
+      text is stored once and reused for every later upload of the same file.
+    - LLM analyses are keyed by the sha256 of the analysed text plus the analysis
+      type and model, so a duplicate CV is not sent to the LLM again.
+
+    Chunk embeddings need no entry here: the vector DB service already caches them
+    by the hash of the chunk text (see utils.embedding_cache).
+    """
+
+    async def extract_text(self, db: Session, file_content: bytes, filename: str) -> Tuple[Optional[str], str, bool]:
+        """
+        Returns the text of an uploaded file, parsing it only the first time its content is seen.
+
+        Args:
+            db: Database session
+            file_content: The binary content of the file
+            filename: The name of the file (with extension)
+
+        Returns:
+            A tuple of (extracted text or None, content hash, whether the text came from the cache).
+        """
+        content_hash = compute_file_hash(file_content)
+        cached = db.query(ExtractedDocument).filter(ExtractedDocument.content_hash == content_hash).first()
+        if cached is not None:
+            try:
+                cached.hit_count = (cached.hit_count or 0) + 1
+                cached.last_used_at = datetime.now(timezone.utc)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not update usage of cached document {content_hash[:12]}: {e}")
+            logger.info(f"Duplicate upload of '{filename}' ({content_hash[:12]}); reusing extracted text.")
+            return cached.extracted_text, content_hash, True
+
+        text = await extract_text_from_file_async(file_content, filename)
+        if text:
+            try:
+                db.add(ExtractedDocument(
+                    content_hash=content_hash,
+                    filename=filename,
+                    size_bytes=len(file_content),
+                    extracted_text=text,
+                    hit_count=0
+                ))
+                db.commit()
+            except IntegrityError:
+                # A concurrent upload of the same file stored it first
+                db.rollback()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to cache extracted text for {content_hash[:12]}: {e}", exc_info=True)
+        return text, content_hash, False
+
+    def get_analysis(self, db: Session, text: str, analysis_type: str, model_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a cached analysis of this exact text by this model, or None.
+
+        Args:
+            db: Database session
+            text: The analysed document text
+            analysis_type: Kind of analysis (e.g. AnalysisCacheEntry.TYPE_CV)
+            model_name: The model that produced the analysis
+        """
+        entry = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.text_hash == compute_content_hash(text),
+            AnalysisCacheEntry.analysis_type == analysis_type,
+            AnalysisCacheEntry.model_name == model_name
+        ).first()
+        if entry is None:
+            return None
+        try:
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not update usage of cached {analysis_type} analysis: {e}")
+        return dict(entry.analysis)
+
+    def store_analysis(self, db: Session, text: str, analysis_type: str, model_name: str, analysis: Dict[str, Any]) -> None:
+        """
+        Stores an analysis of a text. Failures are logged and otherwise ignored.
+
+        Args:
+            db: Database session
+            text: The analysed document text
+            analysis_type: Kind of analysis (e.g. AnalysisCacheEntry.TYPE_CV)
+            model_name: The model that produced the analysis
+            analysis: The analysis as a JSON-serialisable dict
+        """
+        text_hash = compute_content_hash(text)
+        try:
+            exists = db.query(AnalysisCacheEntry.id).filter(
+                AnalysisCacheEntry.text_hash == text_hash,
+                AnalysisCacheEntry.analysis_type == analysis_type,
+                AnalysisCacheEntry.model_name == model_name
+            ).first()
+            if exists:
+                return
+            db.add(AnalysisCacheEntry(
+                text_hash=text_hash,
+                analysis_type=analysis_type,
+                model_name=model_name,
+                analysis=analysis,
+                hit_count=0
+            ))
+            db.commit()
+        except IntegrityError:
+            # Cached by a concurrent analysis of the same text
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to cache {analysis_type} analysis: {e}", exc_info=True)
+
+
+# Instantiate the service for easy import
+document_cache_service = DocumentCacheService()
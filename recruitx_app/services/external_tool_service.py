@@ -2,13 +2,20 @@ import aiohttp
 import logging
 import json
 import asyncio
-from typing import Dict, Any, Optional, List, Union, TypedDict
+import copy
+from typing import Dict, Any, Optional, List, Union, TypedDict, Tuple
 from functools import lru_cache
 import os
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from recruitx_app.utils.tiered_cache import SQLiteCacheStore, TieredCache
 
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CACHE_PATH = os.path.join(PROJECT_ROOT, ".cache", "external_api_cache.sqlite3")
+
 class APIResponse(TypedDict):
     """Type definition for API responses"""
     success: bool
@@ -37,13 +44,86 @@ class ExternalToolService:
         
         # Cache configuration
         self.cache_ttl = int(os.getenv("EXTERNAL_API_CACHE_TTL", "86400"))  # Default: 24 hours
+        self.cache_stale_ttl = int(os.getenv("EXTERNAL_API_CACHE_STALE_TTL", "3600"))  # Served stale while refreshing
+        self.cache_max_entries = int(os.getenv("EXTERNAL_API_CACHE_MAX_ENTRIES", "2048"))
+        self.cache_max_bytes = int(os.getenv("EXTERNAL_API_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        # SQLite file shared by all workers ("" disables the shared tier, ":memory:" keeps it per process)
+        self.cache_path = os.getenv("EXTERNAL_API_CACHE_PATH", DEFAULT_CACHE_PATH)
         
         # Default timeout for API requests in seconds
         self.request_timeout = int(os.getenv("EXTERNAL_API_TIMEOUT", "10"))
         
-        # Initialize in-memory cache
-        self._cache = {}
-        self._cache_timestamps = {}
+        # Connection pooling for the shared HTTP session
+        self.limit_per_host = int(os.getenv("EXTERNAL_API_LIMIT_PER_HOST", "10"))  # Open connections per host
+        self.max_concurrent_per_host = int(os.getenv("EXTERNAL_API_MAX_CONCURRENT_PER_HOST", "8"))  # In-flight requests per host
+        self.dns_cache_ttl = int(os.getenv("EXTERNAL_API_DNS_CACHE_TTL", "300"))
+        self.keepalive_timeout = float(os.getenv("EXTERNAL_API_KEEPALIVE_TIMEOUT", "30"))
+        
+        # Bounded memory tier backed by the shared SQLite tier
+        self._cache = TieredCache(
+            namespace="external_api",
+            ttl_seconds=self.cache_ttl,
+            stale_ttl_seconds=self.cache_stale_ttl,
+            max_entries=self.cache_max_entries,
+            max_bytes=self.cache_max_bytes,
+            shared_store=SQLiteCacheStore(self.cache_path) if self.cache_path else None
+        )
+        
+        # Long-lived session (opened by start(), or lazily on first request) and its loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Identical GET requests currently in flight, shared by all callers (singleflight)
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    async def start(self) -> None:
+        """Opens the shared HTTP session. Called from the application lifespan on startup."""
+        self._get_session()
+        logger.info("External tool service HTTP session started.")
+    
+    async def close(self) -> None:
+        """Closes the shared HTTP session. Called from the application lifespan on shutdown."""
+        await self._cache.wait_for_refreshes()
+        session = self._session
+        self._session = None
+        self._session_loop = None
+        self._host_semaphores = {}
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("External tool service HTTP session closed.")
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared session, creating it if needed.
+        
+        A session is tied to the event loop it was created on, so a new one is made
+        when called from a different loop (e.g. tests that each run their own loop).
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._session_loop = loop
+            self._host_semaphores = {}
+            self._in_flight = {}
+        return self._session
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Returns the semaphore bounding concurrent requests to the host of `url`."""
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
     
     async def _make_api_request(
         self, 
@@ -59,6 +139,11 @@ class ExternalToolService:
         """
         Makes an HTTP request to an external API with error handling and caching.
         
+        Requests go through the shared session. Identical GET requests that are already
+        in flight are not sent again; callers wait for the same response instead.
+        Successful GET responses are cached; once expired they are still served for
+        a while as the cache refreshes them in the background.
+        
         Args:
             url: The URL to request
             method: HTTP method (GET, POST, etc.)
@@ -72,20 +157,6 @@ class ExternalToolService:
         Returns:
             APIResponse with success flag, data or error message
         """
-        # Check cache if applicable
-        if use_cache and method.upper() == "GET":
-            if not cache_key and params:
-                # Create a cache key from the URL and params
-                param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-                cache_key = f"{url}?{param_str}"
-            elif not cache_key:
-                cache_key = url
-                
-            cached_response = self._get_from_cache(cache_key)
-            if cached_response:
-                logger.debug(f"Cache hit for {cache_key}")
-                return cached_response
-        
         # Prepare headers
         if headers is None:
             headers = {}
@@ -98,15 +169,75 @@ class ExternalToolService:
         if data and method.upper() in ["POST", "PUT"] and "Content-Type" not in headers:
             headers["Content-Type"] = "application/json"
         
+        if method.upper() != "GET":
+            return await self._send_request(url, method, headers, params, data)
+        
+        if not use_cache:
+            return await self._get_with_singleflight(url, headers, params)
+        
+        if not cache_key and params:
+            # Create a cache key from the URL and params
+            param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+            cache_key = f"{url}?{param_str}"
+        elif not cache_key:
+            cache_key = url
+        
+        return await self._cache.get_or_fetch(
+            cache_key,
+            lambda: self._get_with_singleflight(url, headers, params),
+            cacheable=lambda result: result["success"]
+        )
+    
+    async def _get_with_singleflight(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]]
+    ) -> APIResponse:
+        """Sends a GET request, joining an identical request already in flight."""
+        flight_key = (url, self._flight_fingerprint(params, headers))
+        in_flight = self._in_flight.get(flight_key)
+        if in_flight is not None:
+            logger.debug(f"Joining in-flight request to {url}")
+            return copy.deepcopy(await asyncio.shield(in_flight))
+        
+        in_flight = asyncio.ensure_future(self._send_request(url, "GET", headers, params, None))
+        self._in_flight[flight_key] = in_flight
+        try:
+            return await asyncio.shield(in_flight)
+        finally:
+            if self._in_flight.get(flight_key) is in_flight:
+                del self._in_flight[flight_key]
+    
+    @staticmethod
+    def _flight_fingerprint(params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> str:
+        """Identifies a GET request's parameters and headers for singleflight merging."""
+        return json.dumps({"params": params or {}, "headers": headers}, sort_keys=True, default=str)
+    
+    async def _send_request(
+        self,
+        url: str,
+        method: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]]
+    ) -> APIResponse:
+        """
+        Sends one request over the shared session, bounded by the per-host semaphore.
+        
+        Returns:
+            APIResponse with success flag, data or error message
+        """
         try:
-            async with aiohttp.ClientSession() as session:
+            session = self._get_session()
+            async with self._get_host_semaphore(url):
                 async with session.request(
                     method=method,
                     url=url,
                     headers=headers,
                     params=params,
                     json=data if data and method.upper() in ["POST", "PUT"] else None,
-                    timeout=self.request_timeout
+                    timeout=aiohttp.ClientTimeout(total=self.request_timeout)
                 ) as response:
                     response_text = await response.text()
                     
@@ -121,17 +252,11 @@ class ExternalToolService:
                         }
                     
                     if response.status >= 200 and response.status < 300:
-                        result = {
+                        return {
                             "success": True,
                             "data": response_data,
                             "error": None
                         }
-                        
-                        # Cache successful GET responses if requested
-                        if use_cache and method.upper() == "GET" and cache_key:
-                            self._store_in_cache(cache_key, result)
-                            
-                        return result
                     else:
                         error_msg = response_data.get("error", {}).get("message", "Unknown error")
                         logger.warning(f"API request to {url} failed with status {response.status}: {error_msg}")
@@ -163,26 +288,18 @@ class ExternalToolService:
                 "error": f"Unexpected error: {str(e)}"
             }
     
-    def _get_from_cache(self, key: str) -> Optional[APIResponse]:
-        """Retrieves a value from the cache if it exists and is not expired"""
-        if key in self._cache and key in self._cache_timestamps:
-            timestamp = self._cache_timestamps[key]
-            now = datetime.now()
-            
-            # Check if the cached value is still valid
-            if now - timestamp < timedelta(seconds=self.cache_ttl):
-                return self._cache[key]
-            else:
-                # Clear expired cache entries
-                del self._cache[key]
-                del self._cache_timestamps[key]
-                
-        return None
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters of the response cache."""
+        return self._cache.stats()
     
-    def _store_in_cache(self, key: str, value: APIResponse) -> None:
-        """Stores a value in the cache with the current timestamp"""
-        self._cache[key] = value
-        self._cache_timestamps[key] = datetime.now()
+    async def _cached_simulation(self, kind: str, simulate, *args) -> Dict[str, Any]:
+        """Returns a cached result of one of the _simulate_* fallbacks, computing it on a miss."""
+        cache_key = f"simulated:{kind}:{json.dumps(args, default=str)}"
+        
+        async def run():
+            return simulate(*args)
+        
+        return await self._cache.get_or_fetch(cache_key, run)
     
     async def get_salary_benchmark(
         self, 
@@ -228,7 +345,9 @@ class ExternalToolService:
         else:
             logger.info(f"Using simulated salary data for job title: {job_title} (no API key or using example domain)")
             # Fall back to simulation if no API key or using the example domain
-            simulated_response = self._simulate_salary_data(job_title, location, experience_years, skills)
+            simulated_response = await self._cached_simulation(
+                "salary", self._simulate_salary_data, job_title, location, experience_years, skills
+            )
             return {
                 "success": True,
                 "data": simulated_response,
@@ -277,7 +396,9 @@ class ExternalToolService:
         else:
             logger.info(f"Using simulated market data for job title: {job_title} (no API key or using example domain)")
             # Fall back to simulation if no API key or using the example domain
-            simulated_response = self._simulate_market_data(job_title, skills, location, time_period)
+            simulated_response = await self._cached_simulation(
+                "market", self._simulate_market_data, job_title, skills, location, time_period
+            )
             return {
                 "success": True,
                 "data": simulated_response,
@@ -328,7 +449,9 @@ class ExternalToolService:
         else:
             logger.info(f"Using simulated skill trend data for skills: {', '.join(skills[:3])}... (no API key or using example domain)")
             # Fall back to simulation if no API key or using the example domain
-            simulated_response = self._simulate_skill_trends(skills, location, time_period)
+            simulated_response = await self._cached_simulation(
+                "skill_trends", self._simulate_skill_trends, skills, location, time_period
+            )
             return {
                 "success": True,
                 "data": simulated_response,
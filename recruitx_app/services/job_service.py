@@ -9,7 +9,7 @@ from recruitx_app.agents.jd_analysis_agent import JDAnalysisAgent
 # Import the vector DB service
 from recruitx_app.services.vector_db_service import vector_db_service
 # Import the text splitter utility
-from recruitx_app.utils.text_utils import split_text
+from recruitx_app.utils.text_utils import iter_text_spans
 
 logger = logging.getLogger(__name__) # Setup logger
 
@@ -69,35 +69,36 @@ class JobService:
         try:
             logger.info(f"Starting chunking and indexing for job ID: {job_id}")
             
-            # Use the refined split_text function
+            # Use the refined splitter, keeping each chunk's position in the description
             # Using default chunk_size=1000, chunk_overlap=100 for now
             # These could be made configurable if needed
-            chunks = split_text(job.description_raw)
+            spans = list(iter_text_spans(job.description_raw))
             
-            if not chunks:
-                logger.warning(f"No text chunks generated by split_text for job ID: {job_id}")
+            if not spans:
+                logger.warning(f"No text chunks generated for job ID: {job_id}")
                 return analysis_dict # Return analysis even if indexing fails
 
+            doc_id = f"job_{job_id}"
+            chunks = []
             metadatas = []
-            ids = []
-            for i, chunk in enumerate(chunks):
-                doc_id = f"job_{job_id}"
-                chunk_id = f"{doc_id}_chunk_{i}"
+            for i, (start, end, chunk) in enumerate(spans):
+                chunks.append(chunk)
                 metadatas.append({
                     "doc_id": doc_id,
                     "doc_type": "job",
                     "job_id": job_id,
-                    "chunk_index": i
+                    "chunk_index": i,
+                    "start_offset": start,  # Position of the chunk in description_raw
+                    "end_offset": end
                     # Add other relevant metadata? e.g., job title? Maybe later.
                 })
-                ids.append(chunk_id)
             
-            # Add chunks to vector store
+            # Sync the chunks into the vector store; only changed chunks are embedded
             logger.info(f"Attempting to index {len(chunks)} chunks for job ID: {job_id}")
-            success = await vector_db_service.add_document_chunks(
+            success = await vector_db_service.sync_document_chunks(
+                doc_id=doc_id,
                 documents=chunks,
-                metadatas=metadatas,
-                ids=ids
+                metadatas=metadatas
             )
             
             if success:
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import SessionLocal
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.job import Job
+from recruitx_app.models.scoring_job import ScoringJob
+from recruitx_app.services.scoring_service import ScoringService
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringQueueService:
+    """
+    In-process queue that runs score generation in the background.
+
+    Requests are persisted as ScoringJob rows and their IDs are pushed onto an
+    asyncio queue drained by a fixed number of worker tasks. Failed attempts are
+    re-queued with exponential backoff until `max_attempts` is reached; a missing
+    job or candidate fails immediately.
+
+    Several processes (e.g. uvicorn workers) can share the table: a worker claims a
+    job with a conditional UPDATE, so only one process runs each attempt. On start,
+    PENDING rows are queued again, and so are RUNNING rows whose lease
+    (`lease_seconds` since started_at) has expired, i.e. whose process died.
+    """
+
+    def __init__(
+        self,
+        scoring_service: Optional[ScoringService] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        num_workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.scoring_service = scoring_service or ScoringService()
+        self.session_factory = session_factory
+        self.num_workers = num_workers or settings.SCORING_QUEUE_WORKERS
+        self.max_attempts = max_attempts or settings.SCORING_QUEUE_MAX_ATTEMPTS
+        self.retry_delay = settings.SCORING_QUEUE_RETRY_DELAY_SECONDS if retry_delay is None else retry_delay
+        self.lease_seconds = settings.SCORING_QUEUE_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._retry_tasks: set = set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Starts the worker tasks and re-queues unfinished jobs from the database."""
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"scoring-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        recovered = self._recover_unfinished_jobs()
+        logger.info(f"Scoring queue started with {self.num_workers} workers ({recovered} unfinished jobs re-queued).")
+
+    async def stop(self) -> None:
+        """Cancels the workers. Unfinished jobs stay in the database and are recovered on the next start."""
+        for task in [*self._workers, *self._retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retry_tasks, return_exceptions=True)
+        self._workers = []
+        self._retry_tasks = set()
+        self._queue = None
+        self._loop = None
+        logger.info("Scoring queue stopped.")
+
+    async def join(self) -> None:
+        """Waits until every queued job (including scheduled retries) has been processed."""
+        while self._queue is not None:
+            await self._queue.join()
+            if not self._retry_tasks:
+                return
+            await asyncio.gather(*self._retry_tasks, return_exceptions=True)
+
+    def enqueue(self, db: Session, job_id: int, candidate_id: int) -> ScoringJob:
+        """
+        Persists a new scoring job and hands it to the workers.
+
+        Safe to call from sync endpoints running on the threadpool: the job ID is then
+        handed to the queue's event loop with call_soon_threadsafe.
+
+        Args:
+            db: The database session
+            job_id: The ID of the job
+            candidate_id: The ID of the candidate
+
+        Returns:
+            The created ScoringJob (status PENDING).
+        """
+        scoring_job = ScoringJob(
+            job_id=job_id,
+            candidate_id=candidate_id,
+            status=ScoringJob.STATUS_PENDING,
+            attempts=0,
+            max_attempts=self.max_attempts
+        )
+        db.add(scoring_job)
+        db.commit()
+        db.refresh(scoring_job)
+
+        if self._put(scoring_job.id):
+            logger.info(f"Queued scoring job {scoring_job.id} for Job {job_id}, Candidate {candidate_id}.")
+        else:
+            logger.warning(f"Scoring queue is not running; scoring job {scoring_job.id} will be picked up on start.")
+        return scoring_job
+
+    def _put(self, scoring_job_id: int) -> bool:
+        """
+        Queues a job ID. asyncio.Queue is not thread-safe, so calls from other threads
+        are scheduled on the queue's loop. Returns False if the queue has stopped.
+        """
+        queue, loop = self._queue, self._loop
+        if queue is None or loop is None:
+            return False
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            queue.put_nowait(scoring_job_id)
+            return True
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, scoring_job_id)
+        except RuntimeError:
+            # The loop closed in the meantime
+            return False
+        return True
+
+    def get_scoring_job(self, db: Session, scoring_job_id: int) -> Optional[ScoringJob]:
+        """Get a scoring job by ID."""
+        return db.query(ScoringJob).filter(ScoringJob.id == scoring_job_id).first()
+
+    def _recover_unfinished_jobs(self) -> int:
+        db = self.session_factory()
+        try:
+            lease_cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+            # A RUNNING row past its lease was interrupted by a shutdown or crash; younger
+            # ones may be in progress in another process and are left alone
+            db.query(ScoringJob).filter(
+                ScoringJob.status == ScoringJob.STATUS_RUNNING,
+                (ScoringJob.started_at == None) | (ScoringJob.started_at < lease_cutoff)  # noqa: E711
+            ).update({ScoringJob.status: ScoringJob.STATUS_PENDING}, synchronize_session=False)
+            db.commit()
+
+            pending_ids = [
+                scoring_job_id for (scoring_job_id,) in db.query(ScoringJob.id).filter(
+                    ScoringJob.status == ScoringJob.STATUS_PENDING
+                ).order_by(ScoringJob.id)
+            ]
+            for scoring_job_id in pending_ids:
+                self._queue.put_nowait(scoring_job_id)
+            return len(pending_ids)
+        except Exception as e:
+            logger.error(f"Failed to recover unfinished scoring jobs: {e}", exc_info=True)
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def _claim(self, db: Session, scoring_job_id: int) -> bool:
+        """Atomically moves a job from PENDING to RUNNING; False if another worker got it first."""
+        claimed = db.query(ScoringJob).filter(
+            ScoringJob.id == scoring_job_id,
+            ScoringJob.status == ScoringJob.STATUS_PENDING
+        ).update({
+            ScoringJob.status: ScoringJob.STATUS_RUNNING,
+            ScoringJob.attempts: ScoringJob.attempts + 1,
+            ScoringJob.started_at: datetime.now(timezone.utc)
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    @staticmethod
+    def _permanent_error(db: Session, scoring_job: ScoringJob) -> Optional[str]:
+        """Returns why a job can never succeed (missing job or candidate), or None."""
+        job = db.query(Job).filter(Job.id == scoring_job.job_id).first()
+        if not job or not job.description_raw:
+            return f"Job {scoring_job.job_id} not found or missing description."
+        candidate = db.query(Candidate).filter(Candidate.id == scoring_job.candidate_id).first()
+        if not candidate or not candidate.resume_raw:
+            return f"Candidate {scoring_job.candidate_id} not found or missing resume text."
+        return None
+
+    async def _worker(self, worker_index: int) -> None:
+        while True:
+            scoring_job_id = await self._queue.get()
+            try:
+                await self._process(scoring_job_id)
+            except Exception as e:
+                logger.error(f"Scoring worker {worker_index} crashed on job {scoring_job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, scoring_job_id: int) -> None:
+        """Runs one attempt of a scoring job and records the outcome."""
+        db = self.session_factory()
+        try:
+            if not self._claim(db, scoring_job_id):
+                return
+            scoring_job = self.get_scoring_job(db, scoring_job_id)
+
+            permanent_error = self._permanent_error(db, scoring_job)
+            if permanent_error:
+                scoring_job.status = ScoringJob.STATUS_FAILED
+                scoring_job.error = permanent_error
+                scoring_job.completed_at = datetime.now(timezone.utc)
+                db.commit()
+                logger.error(f"Scoring job {scoring_job_id} failed permanently: {permanent_error}")
+                return
+
+            error = None
+            score = None
+            try:
+                score = await self.scoring_service.generate_score(
+                    db=db,
+                    job_id=scoring_job.job_id,
+                    candidate_id=scoring_job.candidate_id
+                )
+                if not score:
+                    error = "Score generation returned no result."
+            except Exception as e:
+                logger.error(f"Scoring job {scoring_job_id} attempt {scoring_job.attempts} raised: {e}", exc_info=True)
+                db.rollback()
+                error = str(e)
+
+            if score:
+                scoring_job.status = ScoringJob.STATUS_COMPLETED
+                scoring_job.score_id = score.id
+                scoring_job.error = None
+                scoring_job.completed_at = datetime.now(timezone.utc)
+                logger.info(f"Scoring job {scoring_job_id} completed with score {score.id}.")
+            elif scoring_job.attempts < scoring_job.max_attempts:
+                scoring_job.status = ScoringJob.STATUS_PENDING
+                scoring_job.error = error
+                delay = self.retry_delay * (2 ** (scoring_job.attempts - 1))
+                logger.warning(f"Scoring job {scoring_job_id} failed attempt {scoring_job.attempts}/{scoring_job.max_attempts}; retrying in {delay:.1f}s. Error: {error}")
+                self._schedule_retry(scoring_job_id, delay)
+            else:
+                scoring_job.status = ScoringJob.STATUS_FAILED
+                scoring_job.error = error
+                scoring_job.completed_at = datetime.now(timezone.utc)
+                logger.error(f"Scoring job {scoring_job_id} failed after {scoring_job.attempts} attempts: {error}")
+            db.commit()
+        finally:
+            db.close()
+
+    def _schedule_retry(self, scoring_job_id: int, delay: float) -> None:
+        async def requeue():
+            await asyncio.sleep(delay)
+            if self._queue is not None:
+                self._queue.put_nowait(scoring_job_id)
+
+        task = asyncio.create_task(requeue())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+
+# Instantiate the service for easy import
+scoring_queue_service = ScoringQueueService()
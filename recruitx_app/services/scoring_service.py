@@ -1,7 +1,6 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 import logging
-import asyncio
 from sqlalchemy import desc, asc # Import asc/desc
 
 from recruitx_app.models.job import Job
@@ -11,14 +10,21 @@ from recruitx_app.models.score import Score
 from recruitx_app.agents.simple_scoring_agent import OrchestrationAgent 
 from recruitx_app.agents.jd_analysis_agent import JDAnalysisAgent # Import JD agent
 from recruitx_app.services.agentic_rag_service import agentic_rag_service # Import Agentic RAG service
+from recruitx_app.services.vector_db_service import vector_db_service
+from recruitx_app.schemas.job import JobRequirementFacet
+from recruitx_app.utils.cache_utils import LRUCache, compute_content_hash
+from recruitx_app.utils.pipeline import StagePipeline
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Number of decomposed JDs kept in the in-process facet cache
+FACET_CACHE_SIZE = 512
+
 class ScoringService:
     """
     Service for generating match scores using Agentic RAG principles.
-    Steps:
+    Steps (independent steps run concurrently, see generate_score):
     1. Decompose JD into requirement facets (LLM).
     2. Dynamically retrieve evidence for each facet from candidate docs (RAG).
     3. Calculate overall semantic similarity (Embeddings).
@@ -29,6 +35,53 @@ class ScoringService:
         # Use the orchestration agent for synthesis and JD agent for decomposition
         self.orchestration_agent = OrchestrationAgent()
         self.jd_analysis_agent = JDAnalysisAgent() # Add JD agent instance
+        # In-process LRU of decomposed facets, keyed by (job_id, sha256 of description_raw)
+        self._facet_cache = LRUCache(maxsize=FACET_CACHE_SIZE)
+
+    async def get_job_facets(self, job: Job) -> Optional[List[JobRequirementFacet]]:
+        """
+        Returns the decomposed requirement facets for a job, reusing cached results.
+
+        Lookup order is the in-process LRU, then the facets persisted on the Job row,
+        and only then a decomposition LLM call. Both caches are keyed by a hash of
+        `description_raw`, so facets are recomputed only when the JD text changes.
+        Newly decomposed facets are set on the job and persisted with the caller's
+        next commit.
+
+        Args:
+            job: The Job whose description should be decomposed
+
+        Returns:
+            A list of JobRequirementFacet objects or None if decomposition fails.
+        """
+        description_hash = compute_content_hash(job.description_raw)
+        cache_key = (job.id, description_hash)
+
+        cached_facets = self._facet_cache.get(cache_key)
+        if cached_facets is not None:
+            logger.info(f"Using cached requirement facets for Job {job.id} (in-process cache).")
+            return cached_facets
+
+        if job.requirement_facets_hash == description_hash and job.requirement_facets:
+            try:
+                stored_facets = [JobRequirementFacet(**facet) for facet in job.requirement_facets]
+                self._facet_cache.set(cache_key, stored_facets)
+                logger.info(f"Using stored requirement facets for Job {job.id}.")
+                return stored_facets
+            except Exception as e:
+                logger.warning(f"Stored requirement facets for Job {job.id} are invalid, decomposing again: {e}")
+
+        job_facets = await self.jd_analysis_agent.decompose_job_description(
+            job_id=job.id,
+            job_description=job.description_raw
+        )
+        if not job_facets:
+            return None
+
+        self._facet_cache.set(cache_key, job_facets)
+        job.requirement_facets = [f.model_dump() for f in job_facets]
+        job.requirement_facets_hash = description_hash
+        return job_facets
     
     async def generate_score( 
         self, 
@@ -37,10 +90,16 @@ class ScoringService:
         candidate_id: int
     ) -> Optional[Score]:
         """
-        Generates a match score using an enhanced three-step orchestration flow:
-        1. Skill extraction (LLM)
-        2. Semantic similarity (embeddings)
-        3. Score synthesis (LLM with similarity input)
+        Generates a match score with the Agentic RAG pipeline.
+
+        The steps run as a dependency graph, so independent work overlaps:
+        - facets: JD decomposition (LLM, cached per JD)
+        - similarity_embeddings: JD/CV embeddings, which need nothing else
+        - evidence: retrieval and validation per facet (needs facets)
+        - external_data: market data for the job (needs facets only)
+        - enrichment: maps external data onto the evidenced facets
+        - synthesis: final score (LLM), once everything above is done
+        Per-stage timings are stored in `Score.details["timings"]`.
         
         Args:
             db: The database session
@@ -59,161 +118,232 @@ class ScoringService:
             
         logger.info(f"Starting Agentic RAG scoring process for Job {job_id}, Candidate {candidate_id}.")
         try:
-            db_score: Optional[Score] = None # Define db_score variable here
-
-            # --- Step 1: Decompose JD into Facets --- 
-            logger.info(f"Step 1: Decomposing JD {job_id} into requirement facets.")
-            job_facets = await self.jd_analysis_agent.decompose_job_description(
-                job_id=job_id, 
-                job_description=job.description_raw
-            )
+            pipeline = self._build_scoring_pipeline(job, candidate)
+            results, timings = await pipeline.run()
+            job_facets = results["facets"]
 
             if not job_facets:
                 logger.error(f"JD decomposition failed for Job {job_id}. Cannot proceed with scoring.")
                 # Create a score record indicating the failure
-                db_score = Score(
-                    job_id=job_id,
-                    candidate_id=candidate_id,
-                    overall_score=0.0, 
-                    explanation="Failed during job description decomposition.",
-                    details={"error": "JD decomposition failed"}
-                )
-                # Skip to saving the error score
+                db_score = self._build_decomposition_failure_score(job_id, candidate_id, timings=timings)
             else:
-                logger.info(f"Step 1 successful. Decomposed JD {job_id} into {len(job_facets)} facets.")
-                
-                # --- Step 2: Iterative Retrieval & Validation --- 
-                logger.info(f"Step 2: Retrieving and validating evidence for {len(job_facets)} facets from Candidate {candidate_id} with refinement.")
-                # Use the Agentic RAG service's new iterative method
-                validated_evidence_results = await agentic_rag_service.iterative_retrieve_and_validate(
-                    candidate_id=candidate_id,
-                    facets=job_facets,
-                    max_attempts_per_facet=2,  # Try up to 2 times for required facets with insufficient evidence
-                    min_evidence_chunks=1,     # At least 1 relevant chunk per facet
-                    n_results_per_facet=3,     # Retrieve 3 chunks per query
-                    relevance_threshold=0.5    # Keep chunks with similarity >= 0.5
-                )
-                
-                # Calculate metrics for logging
-                total_facets = len(job_facets)
-                required_facets = sum(1 for f in job_facets if f.is_required)
-                facets_with_evidence = sum(1 for v in validated_evidence_results.values() if v is not None)
-                required_facets_with_evidence = sum(1 for i, f in enumerate(job_facets) 
-                                                 if f.is_required and validated_evidence_results.get(i) is not None)
-                
-                logger.info(f"Step 2 successful. Evidence found for {facets_with_evidence}/{total_facets} facets " +
-                           f"({required_facets_with_evidence}/{required_facets} required facets).")
-
-                # --- Step 3: Tool Integration - Enrich with External Data ---
-                logger.info(f"Step 3: Enriching evidence with external market data for Job {job_id}.")
-                
-                # Get job title and location from the job object
-                job_title = job.title if hasattr(job, 'title') and job.title else "Unknown Position"
-                job_location = job.location if hasattr(job, 'location') and job.location else None
-                
-                # Call the AgenticRAG service to integrate external tool data
-                enriched_data = await agentic_rag_service.enrich_evidence_with_external_data(
-                    facets=job_facets,
-                    validated_evidence=validated_evidence_results,
-                    job_title=job_title,
-                    location=job_location
-                )
-                
-                external_data_success = False
-                if enriched_data and "external_data" in enriched_data:
-                    if enriched_data["external_data"].get("error") is None:
-                        # Log successful data points retrieved
-                        data_points = []
-                        if enriched_data["external_data"].get("salary_benchmark"):
-                            data_points.append("salary benchmarks")
-                        if enriched_data["external_data"].get("market_insights"):
-                            data_points.append("market demand insights")
-                        if enriched_data["external_data"].get("skill_trends"):
-                            data_points.append("skill trends")
-                            
-                        if data_points:
-                            logger.info(f"Step 3 successful. Retrieved external data: {', '.join(data_points)}")
-                            external_data_success = True
-                        else:
-                            logger.warning("Step 3 partial success. No specific data points retrieved.")
-                    else:
-                        logger.warning(f"Step 3 failed: {enriched_data['external_data'].get('error')}")
-                else:
-                    logger.warning("Step 3 failed: Invalid response from external data enrichment")
-
-                # Count facets enriched with external data
-                facets_enriched = 0
-                if "facet_external_data" in enriched_data:
-                    facets_enriched = len(enriched_data["facet_external_data"])
-                
-                if external_data_success:
-                    logger.info(f"Enhanced {facets_enriched} facets with external market data")
-                
-                # --- Step 4 & 5: Calculate Similarity and Synthesize Score --- 
-                logger.info(f"Steps 4+5: Synthesizing final score for Job {job_id}, Candidate {candidate_id}.")
-                # Add a small delay between API calls
-                await asyncio.sleep(1) 
-                
-                # Update to include the external data enrichment
-                score_synthesis_result = await self.orchestration_agent.synthesize_score(
-                     job_description=job.description_raw,
-                     candidate_resume=candidate.resume_raw,
-                     job_facets=job_facets,
-                     retrieved_evidence=validated_evidence_results,
-                     candidate_id=candidate_id,
-                     external_data=enriched_data if external_data_success else None
-                )
-
-                overall_score = 0.0 # Default score
-                explanation = "Score synthesis failed."
-                details = score_synthesis_result # Store synthesis result by default
-                
-                if "error" in score_synthesis_result:
-                     logger.error(f"Score synthesis failed: {score_synthesis_result.get('error', 'Unknown error')}")
-                     explanation = f"Failed during score synthesis: {score_synthesis_result.get('error', 'Unknown error')}"
-                     details = { 
-                         "synthesis_error": score_synthesis_result,
-                         "job_facets": [f.model_dump() for f in job_facets], # Include facets in error details
-                         "retrieved_evidence_summary": {k: (v is not None) for k, v in validated_evidence_results.items()}, # Summarize evidence retrieval status
-                         "external_data_status": "success" if external_data_success else "failed"
-                     }
-                else:
-                     overall_score = score_synthesis_result.get("overall_score", 0.0)
-                     explanation = score_synthesis_result.get("explanation", "No explanation provided.")
-                     # Include facets, evidence summary, and external data status in success details
-                     details = { 
-                         "synthesis_result": score_synthesis_result,
-                         "job_facets": [f.model_dump() for f in job_facets], 
-                         "retrieved_evidence_summary": {k: (v is not None) for k, v in validated_evidence_results.items()},
-                         "external_data_status": "success" if external_data_success else "failed",
-                         "facets_enriched": facets_enriched
-                     }
-                     logger.info(f"Steps 4+5 successful. Final Score: {overall_score}")
-
-                # Create the score record 
-                db_score = Score(
+                db_score = self._build_score_record(
                     job_id=job_id,
                     candidate_id=candidate_id,
-                    overall_score=overall_score, 
-                    explanation=explanation,
-                    details=details # Store comprehensive details
+                    job_facets=job_facets,
+                    validated_evidence=results["evidence"],
+                    score_synthesis_result=results["synthesis"],
+                    external_data_success=results["enrichment"]["external_data_success"],
+                    facets_enriched=results["enrichment"]["facets_enriched"],
+                    timings=timings
                 )
+            logger.info(f"Scoring pipeline for Job {job_id}, Candidate {candidate_id} finished in {timings['total']:.2f}s: {timings}")
 
-            # --- Save Score Record (if created) --- 
-            if db_score:
-                db.add(db_score)
-                db.commit()
-                db.refresh(db_score)
-                logger.info(f"Saved score {db_score.id} for Job {job_id}, Candidate {candidate_id}. Final Score: {db_score.overall_score}")
-                return db_score
-            else:
-                 logger.error(f"Failed to create a score object for Job {job_id}, Candidate {candidate_id}.")
-                 return None
+            # --- Save Score Record --- 
+            db.add(db_score)
+            db.commit()
+            db.refresh(db_score)
+            logger.info(f"Saved score {db_score.id} for Job {job_id}, Candidate {candidate_id}. Final Score: {db_score.overall_score}")
+            return db_score
 
         except Exception as e:
             logger.error(f"Exception during orchestrated score generation for Job {job_id}, Candidate {candidate_id}: {e}", exc_info=True)
             db.rollback()
             return None # Return None on failure
+
+    def _build_scoring_pipeline(self, job: Job, candidate: Candidate) -> StagePipeline:
+        """Builds the stage graph used by generate_score for one job/candidate pair."""
+        job_id = job.id
+        candidate_id = candidate.id
+        job_description = job.description_raw
+        candidate_resume = candidate.resume_raw
+        job_title = job.title if hasattr(job, 'title') and job.title else "Unknown Position"
+        job_location = job.location if hasattr(job, 'location') and job.location else None
+
+        async def facets():
+            logger.info(f"Decomposing JD {job_id} into requirement facets.")
+            job_facets = await self.get_job_facets(job)
+            if job_facets:
+                logger.info(f"Decomposed JD {job_id} into {len(job_facets)} facets.")
+            return job_facets
+
+        async def similarity_embeddings():
+            embeddings = await vector_db_service.generate_embeddings([job_description, candidate_resume])
+            return embeddings if embeddings and len(embeddings) >= 2 else None
+
+        async def evidence(facets):
+            if not facets:
+                return None
+            logger.info(f"Retrieving and validating evidence for {len(facets)} facets from Candidate {candidate_id} with refinement.")
+            validated_evidence_results = await agentic_rag_service.iterative_retrieve_and_validate(
+                candidate_id=candidate_id,
+                facets=facets,
+                max_attempts_per_facet=2,  # Try up to 2 times for required facets with insufficient evidence
+                min_evidence_chunks=1,     # At least 1 relevant chunk per facet
+                n_results_per_facet=3,     # Retrieve 3 chunks per query
+                relevance_threshold=0.5    # Keep chunks with similarity >= 0.5
+            )
+            required_facets = sum(1 for f in facets if f.is_required)
+            facets_with_evidence = sum(1 for v in validated_evidence_results.values() if v is not None)
+            required_facets_with_evidence = sum(1 for i, f in enumerate(facets)
+                                             if f.is_required and validated_evidence_results.get(i) is not None)
+            logger.info(f"Evidence found for {facets_with_evidence}/{len(facets)} facets " +
+                        f"({required_facets_with_evidence}/{required_facets} required facets).")
+            return validated_evidence_results
+
+        async def external_data(facets):
+            if not facets:
+                return None
+            logger.info(f"Fetching external market data for Job {job_id}.")
+            return await agentic_rag_service.fetch_job_external_data(
+                facets=facets,
+                job_title=job_title,
+                location=job_location
+            )
+
+        async def enrichment(facets, evidence, external_data):
+            if not facets:
+                return None
+            if external_data is None:
+                enriched_data = {"external_data": {"error": "External data unavailable"}, "facet_external_data": {}}
+            else:
+                enriched_data = agentic_rag_service.map_external_data_to_facets(facets, evidence, external_data)
+            external_data_success, facets_enriched = self._summarize_external_data(enriched_data)
+            return {
+                "enriched_data": enriched_data,
+                "external_data_success": external_data_success,
+                "facets_enriched": facets_enriched
+            }
+
+        async def synthesis(facets, evidence, enrichment, similarity_embeddings):
+            if not facets:
+                return None
+            logger.info(f"Synthesizing final score for Job {job_id}, Candidate {candidate_id}.")
+            # No fixed delay before the call: the API key pool only waits when no key has headroom
+            return await self.orchestration_agent.synthesize_score(
+                job_description=job_description,
+                candidate_resume=candidate_resume,
+                job_facets=facets,
+                retrieved_evidence=evidence,
+                candidate_id=candidate_id,
+                external_data=enrichment["enriched_data"] if enrichment["external_data_success"] else None,
+                jd_embedding=similarity_embeddings[0] if similarity_embeddings else None,
+                cv_embedding=similarity_embeddings[1] if similarity_embeddings else None
+            )
+
+        pipeline = StagePipeline()
+        pipeline.add_stage("facets", facets)
+        pipeline.add_stage("similarity_embeddings", similarity_embeddings, optional=True)
+        pipeline.add_stage("evidence", evidence, depends_on=["facets"])
+        pipeline.add_stage("external_data", external_data, depends_on=["facets"], optional=True)
+        pipeline.add_stage("enrichment", enrichment, depends_on=["facets", "evidence", "external_data"])
+        pipeline.add_stage("synthesis", synthesis, depends_on=["facets", "evidence", "enrichment", "similarity_embeddings"])
+        return pipeline
+
+    def _summarize_external_data(self, enriched_data: Dict[str, Any]) -> Tuple[bool, int]:
+        """
+        Logs the outcome of external data enrichment.
+
+        Returns:
+            A tuple of (whether usable external data was retrieved, number of facets enriched).
+        """
+        external_data_success = False
+        if enriched_data and "external_data" in enriched_data:
+            if enriched_data["external_data"].get("error") is None:
+                # Log successful data points retrieved
+                data_points = []
+                if enriched_data["external_data"].get("salary_benchmark"):
+                    data_points.append("salary benchmarks")
+                if enriched_data["external_data"].get("market_insights"):
+                    data_points.append("market demand insights")
+                if enriched_data["external_data"].get("skill_trends"):
+                    data_points.append("skill trends")
+                    
+                if data_points:
+                    logger.info(f"Step 3 successful. Retrieved external data: {', '.join(data_points)}")
+                    external_data_success = True
+                else:
+                    logger.warning("Step 3 partial success. No specific data points retrieved.")
+            else:
+                logger.warning(f"Step 3 failed: {enriched_data['external_data'].get('error')}")
+        else:
+            logger.warning("Step 3 failed: Invalid response from external data enrichment")
+
+        # Count facets enriched with external data
+        facets_enriched = 0
+        if "facet_external_data" in enriched_data:
+            facets_enriched = len(enriched_data["facet_external_data"])
+        
+        if external_data_success:
+            logger.info(f"Enhanced {facets_enriched} facets with external market data")
+        return external_data_success, facets_enriched
+
+    def _build_score_record(
+        self,
+        job_id: int,
+        candidate_id: int,
+        job_facets: List[JobRequirementFacet],
+        validated_evidence: Dict[int, Any],
+        score_synthesis_result: Dict[str, Any],
+        external_data_success: bool,
+        facets_enriched: int,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Score:
+        """Builds the (unsaved) Score row from a synthesis result, including failure details and optional stage timings."""
+        overall_score = 0.0 # Default score
+        explanation = "Score synthesis failed."
+        details = score_synthesis_result # Store synthesis result by default
+        
+        if "error" in score_synthesis_result:
+             logger.error(f"Score synthesis failed: {score_synthesis_result.get('error', 'Unknown error')}")
+             explanation = f"Failed during score synthesis: {score_synthesis_result.get('error', 'Unknown error')}"
+             details = { 
+                 "synthesis_error": score_synthesis_result,
+                 "job_facets": [f.model_dump() for f in job_facets], # Include facets in error details
+                 "retrieved_evidence_summary": {k: (v is not None) for k, v in validated_evidence.items()}, # Summarize evidence retrieval status
+                 "external_data_status": "success" if external_data_success else "failed"
+             }
+        else:
+             overall_score = score_synthesis_result.get("overall_score", 0.0)
+             explanation = score_synthesis_result.get("explanation", "No explanation provided.")
+             # Include facets, evidence summary, and external data status in success details
+             details = { 
+                 "synthesis_result": score_synthesis_result,
+                 "job_facets": [f.model_dump() for f in job_facets], 
+                 "retrieved_evidence_summary": {k: (v is not None) for k, v in validated_evidence.items()},
+                 "external_data_status": "success" if external_data_success else "failed",
+                 "facets_enriched": facets_enriched
+             }
+             logger.info(f"Steps 4+5 successful. Final Score: {overall_score}")
+
+        if timings is not None:
+            details = {**details, "timings": timings}
+
+        return Score(
+            job_id=job_id,
+            candidate_id=candidate_id,
+            overall_score=overall_score, 
+            explanation=explanation,
+            details=details # Store comprehensive details
+        )
+
+    def _build_decomposition_failure_score(
+        self,
+        job_id: int,
+        candidate_id: int,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Score:
+        """Builds the (unsaved) Score row recorded when the JD could not be decomposed."""
+        details = {"error": "JD decomposition failed"}
+        if timings is not None:
+            details["timings"] = timings
+        return Score(
+            job_id=job_id,
+            candidate_id=candidate_id,
+            overall_score=0.0, 
+            explanation="Failed during job description decomposition.",
+            details=details
+        )
             
     def get_score(self, db: Session, score_id: int) -> Optional[Score]:
         """Get a score by ID."""
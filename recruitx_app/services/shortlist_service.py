@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session, sessionmaker
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import SessionLocal
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.job import Job
+from recruitx_app.services.vector_db_service import vector_db_service
+from recruitx_app.utils.text_utils import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_skill(skill: Any) -> str:
+    """Normalizes a skill name for matching ("  Machine  Learning" -> "machine learning")."""
+    return " ".join(str(skill).lower().split())
+
+
+def _skills_of(analysis: Optional[Dict[str, Any]], key: str) -> List[str]:
+    skills = (analysis or {}).get(key) or []
+    if not isinstance(skills, list):
+        return []
+    return list(dict.fromkeys(normalize_skill(skill) for skill in skills if skill))
+
+
+class CandidatePoolIndex:
+    """
+    The whole candidate pool as arrays, ready for vectorized ranking.
+
+    - `embeddings` holds one unit-length summary embedding per candidate (the mean of
+      the candidate's stored chunk embeddings); rows of candidates that were never
+      indexed are zero.
+    - Skills are stored in CSR form: the skill IDs of row i are
+      `skill_ids[skill_offsets[i]:skill_offsets[i + 1]]`, with names in `skill_names`.
+    """
+
+    def __init__(
+        self,
+        candidate_ids: np.ndarray,
+        embeddings: np.ndarray,
+        skill_ids: np.ndarray,
+        skill_offsets: np.ndarray,
+        skill_vocabulary: Dict[str, int],
+        built_at: float,
+        generation: int = 0
+    ):
+        self.candidate_ids = candidate_ids
+        self.embeddings = embeddings
+        self.skill_ids = skill_ids
+        self.skill_offsets = skill_offsets
+        self.skill_vocabulary = skill_vocabulary
+        self.skill_names = [name for name, _ in sorted(skill_vocabulary.items(), key=lambda item: item[1])]
+        self.built_at = built_at
+        # ShortlistService.invalidate() count when the build started
+        self.generation = generation
+        self.row_by_candidate = {int(candidate_id): row for row, candidate_id in enumerate(candidate_ids)}
+        # Row of every skill entry, for counting matches per candidate with bincount
+        self.skill_rows = np.repeat(np.arange(len(candidate_ids), dtype=np.int32), np.diff(skill_offsets))
+
+    @property
+    def size(self) -> int:
+        return len(self.candidate_ids)
+
+    def skill_overlap(self, required_skill_ids: np.ndarray) -> np.ndarray:
+        """Returns, for every candidate, how many of the given skill IDs they list."""
+        if len(required_skill_ids) == 0 or len(self.skill_ids) == 0:
+            return np.zeros(self.size, dtype=np.float32)
+        matches = np.isin(self.skill_ids, required_skill_ids)
+        return np.bincount(self.skill_rows[matches], minlength=self.size).astype(np.float32)
+
+    def matched_skills(self, row: int, required_skill_ids: np.ndarray) -> List[str]:
+        """Returns the names of the given skills that one candidate lists."""
+        row_skill_ids = self.skill_ids[self.skill_offsets[row]:self.skill_offsets[row + 1]]
+        return [self.skill_names[skill_id] for skill_id in row_skill_ids[np.isin(row_skill_ids, required_skill_ids)]]
+
+
+class ShortlistService:
+    """
+    First-stage candidate ranking for a job, cheap enough to run over the whole pool.
+
+    Every candidate gets a score in [0, 1] from two signals that are already stored:
+    the cosine similarity between the candidate's and the job's summary embeddings
+    (means of their indexed chunk embeddings) and the share of the job's required
+    skills found in the candidate's analysed skills. Only the top-K candidates are
+    meant to go on to the LLM scoring pipeline.
+
+    The candidate matrix is built from the database and ChromaDB on first use. Once it
+    is older than SHORTLIST_INDEX_TTL_SECONDS, or invalidate() was called because the
+    pool changed, it is rebuilt in the background while the current one keeps being
+    served, so uploads never put a full rebuild on a request's critical path.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        clock: Callable[[], float] = time.time
+    ):
+        self.session_factory = session_factory
+        self._clock = clock
+        self._index: Optional[CandidatePoolIndex] = None
+        self._generation = 0
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def invalidate(self) -> None:
+        """Marks the candidate matrix as outdated; the next shortlist triggers a background rebuild."""
+        self._generation += 1
+
+    def _is_outdated(self, index: CandidatePoolIndex) -> bool:
+        # An invalidate() during a build leaves that build outdated as well
+        return (index.generation != self._generation
+                or self._clock() - index.built_at >= settings.SHORTLIST_INDEX_TTL_SECONDS)
+
+    async def get_index(self, session_factory: Optional[Callable[[], Session]] = None) -> CandidatePoolIndex:
+        """
+        Returns the candidate matrix, building it on first use.
+
+        An outdated matrix is returned as is while a rebuild runs in the background.
+
+        Args:
+            session_factory: Opens the session the candidates are read with (defaults to
+                the service's session_factory)
+        """
+        session_factory = session_factory or self.session_factory
+        index = self._index
+        if index is None:
+            async with self._build_lock:
+                if self._index is None:
+                    self._index = await self._build_index(session_factory)
+                return self._index
+        if self._is_outdated(index):
+            self._refresh_in_background(session_factory)
+        return index
+
+    def _refresh_in_background(self, session_factory: Callable[[], Session]) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def refresh():
+            try:
+                async with self._build_lock:
+                    if self._index is None or self._is_outdated(self._index):
+                        self._index = await self._build_index(session_factory)
+            except Exception as e:
+                logger.error(f"Background rebuild of the shortlist index failed: {e}", exc_info=True)
+
+        self._refresh_task = asyncio.ensure_future(refresh())
+
+    async def wait_for_refresh(self) -> None:
+        """Waits for the background rebuild that is currently running, if any."""
+        if self._refresh_task is not None:
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+
+    @staticmethod
+    def _load_candidate_skills(session_factory: Callable[[], Session]):
+        """Reads every candidate's ID and skills (blocking). Returns (candidate_ids, skill_ids, skill_offsets, vocabulary)."""
+        candidate_ids: List[int] = []
+        skill_ids: List[int] = []
+        skill_offsets = [0]
+        vocabulary: Dict[str, int] = {}
+
+        db = session_factory()
+        try:
+            rows = db.query(Candidate.id, Candidate.analysis).order_by(Candidate.id).yield_per(1000)
+            for candidate_id, analysis in rows:
+                candidate_ids.append(candidate_id)
+                for skill in _skills_of(analysis, "skills"):
+                    skill_ids.append(vocabulary.setdefault(skill, len(vocabulary)))
+                skill_offsets.append(len(skill_ids))
+        finally:
+            db.close()
+        return candidate_ids, skill_ids, skill_offsets, vocabulary
+
+    async def _build_index(self, session_factory: Callable[[], Session]) -> CandidatePoolIndex:
+        start = time.perf_counter()
+        generation = self._generation
+        # The scan covers the whole pool, so it runs off the event loop
+        candidate_ids, skill_ids, skill_offsets, vocabulary = await asyncio.to_thread(
+            self._load_candidate_skills, session_factory
+        )
+
+        ids = np.asarray(candidate_ids, dtype=np.int64)
+        row_by_candidate = {candidate_id: row for row, candidate_id in enumerate(candidate_ids)}
+        embeddings = await self._load_summary_embeddings(row_by_candidate)
+
+        index = CandidatePoolIndex(
+            candidate_ids=ids,
+            embeddings=embeddings,
+            skill_ids=np.asarray(skill_ids, dtype=np.int32),
+            skill_offsets=np.asarray(skill_offsets, dtype=np.int64),
+            skill_vocabulary=vocabulary,
+            built_at=self._clock(),
+            generation=generation
+        )
+        logger.info(f"Built shortlist index of {index.size} candidates ({embeddings.shape[1]}-dim embeddings, "
+                    f"{len(vocabulary)} distinct skills) in {time.perf_counter() - start:.2f}s.")
+        return index
+
+    async def _load_summary_embeddings(self, row_by_candidate: Dict[int, int]) -> np.ndarray:
+        """
+        Averages the stored chunk embeddings of every candidate, reading ChromaDB page by page.
+
+        Returns:
+            A (number of candidates, dimension) float32 matrix of unit-length rows.
+        """
+        sums: Optional[np.ndarray] = None
+        offset = 0
+        page_size = settings.SHORTLIST_PAGE_SIZE
+        while True:
+            page = await vector_db_service.get_embeddings(
+                where={"doc_type": "candidate"}, limit=page_size, offset=offset
+            )
+            if not page or not page.get("ids"):
+                break
+            page_embeddings = page.get("embeddings")
+            if page_embeddings is None or len(page_embeddings) == 0:
+                break
+            vectors = np.asarray(page_embeddings, dtype=np.float32)
+            rows = np.asarray([
+                row_by_candidate.get(int((metadata or {}).get("candidate_id", -1)), -1)
+                for metadata in page["metadatas"]
+            ])
+            if sums is None:
+                sums = np.zeros((len(row_by_candidate), vectors.shape[1]), dtype=np.float32)
+            known = rows >= 0
+            np.add.at(sums, rows[known], vectors[known])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        if sums is None:
+            return np.zeros((len(row_by_candidate), 0), dtype=np.float32)
+        return normalize_rows(sums)
+
+    async def _job_embedding(self, job: Job, dimension: int) -> Optional[np.ndarray]:
+        """Returns the job's unit-length summary embedding, embedding the JD only if it was never indexed."""
+        if dimension == 0:
+            return None
+        page = await vector_db_service.get_embeddings(where={"doc_id": f"job_{job.id}"})
+        page_embeddings = page.get("embeddings") if page else None
+        if page_embeddings is not None and len(page_embeddings) > 0:
+            vector = np.asarray(page_embeddings, dtype=np.float32).mean(axis=0)
+        else:
+            embeddings = await vector_db_service.generate_embeddings([job.description_raw])
+            if not embeddings:
+                return None
+            vector = np.asarray(embeddings[0], dtype=np.float32)
+        if vector.shape != (dimension,):
+            logger.warning(f"Embedding of Job {job.id} has shape {vector.shape}, expected ({dimension},); ignoring it.")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    async def shortlist(
+        self,
+        db: Session,
+        job_id: int,
+        top_k: Optional[int] = None,
+        candidate_ids: Optional[Sequence[int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ranks candidates for a job and returns the best ones.
+
+        Args:
+            db: Database session
+            job_id: The ID of the job
+            top_k: Number of candidates to return (defaults to settings.SHORTLIST_DEFAULT_TOP_K)
+            candidate_ids: Restricts the ranking to these candidates (defaults to the whole pool)
+
+        Returns:
+            {"job_id", "pool_size", "candidates": [{"candidate_id", "score", "embedding_similarity",
+            "skill_overlap", "matched_skills"}, ...]} best first, or None if the job was not found.
+        """
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job or not job.description_raw:
+            logger.warning(f"Cannot shortlist: Job {job_id} not found or missing raw text.")
+            return None
+        top_k = top_k or settings.SHORTLIST_DEFAULT_TOP_K
+
+        # Build from the caller's database, like the job lookup above
+        index = await self.get_index(sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()))
+        required_skills = _skills_of(job.analysis, "required_skills")
+        required_skill_ids = np.asarray(
+            [index.skill_vocabulary[skill] for skill in required_skills if skill in index.skill_vocabulary],
+            dtype=np.int32
+        )
+        job_vector = await self._job_embedding(job, index.embeddings.shape[1])
+
+        similarity = np.zeros(index.size, dtype=np.float32)
+        if job_vector is not None:
+            similarity = np.clip(index.embeddings @ job_vector, 0.0, 1.0)
+        skill_share = np.zeros(index.size, dtype=np.float32)
+        if required_skills:
+            skill_share = index.skill_overlap(required_skill_ids) / len(required_skills)
+
+        # A signal the job cannot provide gives its weight to the other one
+        embedding_weight = settings.SHORTLIST_EMBEDDING_WEIGHT if job_vector is not None else 0.0
+        skill_weight = settings.SHORTLIST_SKILL_WEIGHT if required_skills else 0.0
+        total_weight = embedding_weight + skill_weight
+        if total_weight == 0:
+            scores = np.zeros(index.size, dtype=np.float32)
+        else:
+            scores = (embedding_weight * similarity + skill_weight * skill_share) / total_weight
+
+        rows = np.arange(index.size)
+        unknown_ids: List[int] = []
+        if candidate_ids is not None:
+            requested = sorted(set(candidate_ids))
+            rows = np.asarray([index.row_by_candidate[c] for c in requested if c in index.row_by_candidate], dtype=np.int64)
+            # Requested candidates the cached index has not seen yet are ranked with no signal rather than dropped
+            unknown_ids = [c for c in requested if c not in index.row_by_candidate]
+
+        if len(rows) > top_k:
+            best = rows[np.argpartition(-scores[rows], top_k - 1)[:top_k]]
+        else:
+            best = rows
+
+        ranked = [
+            (float(scores[row]), {
+                "candidate_id": int(index.candidate_ids[row]),
+                "score": round(float(scores[row]), 4),
+                "embedding_similarity": round(float(similarity[row]), 4),
+                "skill_overlap": round(float(skill_share[row]), 4),
+                "matched_skills": index.matched_skills(row, required_skill_ids)
+            })
+            for row in best
+        ]
+        ranked.extend(
+            (0.0, {"candidate_id": candidate_id, "score": 0.0, "embedding_similarity": 0.0,
+                   "skill_overlap": 0.0, "matched_skills": []})
+            for candidate_id in unknown_ids
+        )
+        # Highest score first; ties go to the lower candidate ID
+        ranked.sort(key=lambda item: (-item[0], item[1]["candidate_id"]))
+
+        return {
+            "job_id": job_id,
+            "pool_size": int(len(rows)) + len(unknown_ids),
+            "candidates": [entry for _, entry in ranked[:top_k]]
+        }
+
+
+# Instantiate the service for easy import
+shortlist_service = ShortlistService()
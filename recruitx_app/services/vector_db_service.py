@@ -1,18 +1,44 @@
+import asyncio
 import chromadb
 import logging
 import os
 from typing import Optional, List, Dict, Any
+from chromadb.api.types import EmbeddingFunction
 
-# Import ChromaDB utility and our settings
-import chromadb.utils.embedding_functions as embedding_functions
+# Import our settings and the key-pooled embedding function
 from recruitx_app.core.config import settings 
+from recruitx_app.utils.api_key_pool import PooledEmbeddingFunction
+from recruitx_app.utils.cache_utils import compute_content_hash
+from recruitx_app.utils.embedding_cache import EmbeddingCache
+from recruitx_app.utils.embedding_providers import (
+    HashingEmbeddingFunction, LocalEmbeddingFunction, embedding_model_id, length_sorted_batches
+)
+from recruitx_app.utils.concurrency import run_in_cache_executor, run_in_chroma_executor, run_in_embedding_executor, run_in_llm_executor
 
 logger = logging.getLogger(__name__)
 
 # Determine the path for persistent storage
 # Place it within the project root, maybe in a .vector_store directory
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-PERSIST_DIRECTORY = os.path.join(PROJECT_ROOT, ".vector_store")
+PERSIST_DIRECTORY = settings.VECTOR_STORE_PATH or os.path.join(PROJECT_ROOT, ".vector_store")
+EMBEDDING_CACHE_PATH = os.path.join(PERSIST_DIRECTORY, "embedding_cache.sqlite3")
+
+
+def content_chunk_ids(doc_id: str, chunks: List[str]) -> List[str]:
+    """
+    Derives chunk IDs from the chunk contents, e.g. "job_3_9f86d081884c7d65".
+
+    An unchanged chunk keeps its ID wherever it moves in the document. A chunk
+    that repeats within the same document gets a numeric suffix.
+    """
+    ids = []
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        chunk_id = f"{doc_id}_{compute_content_hash(chunk)[:16]}"
+        occurrence = seen.get(chunk_id, 0)
+        seen[chunk_id] = occurrence + 1
+        ids.append(chunk_id if occurrence == 0 else f"{chunk_id}_{occurrence}")
+    return ids
 
 class VectorDBService:
     """
@@ -22,15 +48,17 @@ class VectorDBService:
     _instance = None
     _client: Optional[chromadb.PersistentClient] = None
     _collection: Optional[chromadb.Collection] = None
-    _embedding_function: Optional[embedding_functions.GoogleGenerativeAiEmbeddingFunction] = None
+    _embedding_function: Optional[EmbeddingFunction] = None
+    _embedding_cache: Optional[EmbeddingCache] = None
 
-    COLLECTION_NAME = "recruitx_documents"
+    COLLECTION_NAME = settings.VECTOR_COLLECTION_NAME
 
     def __new__(cls):
         # Singleton pattern to ensure only one client instance
         if cls._instance is None:
             cls._instance = super(VectorDBService, cls).__new__(cls)
             cls._instance._initialize_client()
+            cls._instance._initialize_embedding_cache()
             cls._instance._get_embedding_function() # Initialize embedding function on creation
         return cls._instance
 
@@ -49,22 +77,111 @@ class VectorDBService:
                 logger.error(f"Failed to initialize ChromaDB client: {e}", exc_info=True)
                 self._client = None # Ensure client is None if init fails
 
+    def _initialize_embedding_cache(self):
+        """Initializes the content-addressed embedding cache (in-memory LRU + SQLite store)."""
+        if self._embedding_cache is None:
+            cache_path = settings.EMBEDDING_CACHE_PATH
+            if cache_path is None:
+                cache_path = EMBEDDING_CACHE_PATH
+            self._embedding_cache = EmbeddingCache(
+                db_path=cache_path or None,
+                memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE
+            )
+
     def _get_embedding_function(self):
-        """Initializes and returns the Google Generative AI embedding function."""
+        """Initializes and returns the embedding function of the configured EMBEDDING_PROVIDER."""
         if self._embedding_function is None:
+            provider = settings.EMBEDDING_PROVIDER
             try:
-                logger.info(f"Initializing Google Generative AI embedding function with model: {settings.GEMINI_EMBEDDING_MODEL}")
-                # Using API key rotation for safety, although Chroma might cache the function instance
-                self._embedding_function = embedding_functions.GoogleGenerativeAiEmbeddingFunction(
-                    api_key=settings.get_next_api_key(), 
-                    model_name=settings.GEMINI_EMBEDDING_MODEL
-                )
-                logger.info("Google Generative AI embedding function initialized.")
+                if provider == "gemini":
+                    logger.info(f"Initializing Google Generative AI embedding function with model: {settings.GEMINI_EMBEDDING_MODEL}")
+                    # Each embedding batch is routed to the API key with the most headroom
+                    self._embedding_function = PooledEmbeddingFunction(
+                        model_name=settings.GEMINI_EMBEDDING_MODEL
+                    )
+                elif provider == "local":
+                    logger.info(f"Initializing local embedding function with model: {settings.LOCAL_EMBEDDING_MODEL}")
+                    self._embedding_function = LocalEmbeddingFunction(
+                        model_name=settings.LOCAL_EMBEDDING_MODEL,
+                        device=settings.LOCAL_EMBEDDING_DEVICE,
+                        batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE
+                    )
+                elif provider == "hashing":
+                    logger.info(f"Initializing hashing embedding function with {settings.HASHING_EMBEDDING_DIMENSION} dimensions")
+                    self._embedding_function = HashingEmbeddingFunction(
+                        dimension=settings.HASHING_EMBEDDING_DIMENSION
+                    )
+                else:
+                    raise ValueError(f"Unknown EMBEDDING_PROVIDER '{provider}'")
+                logger.info(f"Embedding function for provider '{provider}' initialized.")
             except Exception as e:
-                logger.error(f"Failed to initialize Google Generative AI embedding function: {e}", exc_info=True)
+                logger.error(f"Failed to initialize embedding function for provider '{provider}': {e}", exc_info=True)
                 self._embedding_function = None
         return self._embedding_function
 
+    @staticmethod
+    def _collection_embedding_function(collection: chromadb.Collection) -> Optional[EmbeddingFunction]:
+        """Returns the embedding function a collection was opened with."""
+        # ChromaDB 0.4.x keeps it in a private attribute; newer releases expose `embedding_function`
+        return getattr(collection, "embedding_function", getattr(collection, "_embedding_function", None))
+
+    @staticmethod
+    def _collection_embedding_metadata() -> Dict[str, Any]:
+        """The embedding provider and model that vectors in the collection must come from."""
+        return {
+            "embedding_provider": settings.EMBEDDING_PROVIDER,
+            "embedding_model": embedding_model_id(settings.EMBEDDING_PROVIDER)
+        }
+
+    @staticmethod
+    def _modifiable_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # ChromaDB rejects modify() calls that carry the (immutable) HNSW settings
+        return {key: value for key, value in (metadata or {}).items() if not key.startswith("hnsw:")}
+
+    def _check_collection_embeddings(self, collection: chromadb.Collection) -> bool:
+        """
+        Makes sure the collection only ever holds vectors of the configured embedding model.
+
+        The provider and model are recorded in the collection metadata when it is first
+        used. Collections from before that hold Gemini vectors, so they are only adopted
+        by another provider while still empty.
+
+        Returns:
+            False if the collection holds vectors of another embedding model.
+        """
+        expected = self._collection_embedding_metadata()
+        metadata = collection.metadata or {}
+        stored_model = metadata.get("embedding_model")
+        if stored_model is None:
+            if settings.EMBEDDING_PROVIDER != "gemini" and collection.count() > 0:
+                logger.error(f"Collection '{self.COLLECTION_NAME}' holds Gemini embeddings but EMBEDDING_PROVIDER is "
+                             f"'{settings.EMBEDDING_PROVIDER}'. Set VECTOR_COLLECTION_NAME to a new collection and re-index.")
+                return False
+            collection.modify(metadata={**self._modifiable_metadata(metadata), **expected})
+            logger.info(f"Recorded embedding model '{expected['embedding_model']}' on collection '{self.COLLECTION_NAME}'.")
+            return True
+        if stored_model != expected["embedding_model"]:
+            logger.error(f"Collection '{self.COLLECTION_NAME}' holds embeddings of '{stored_model}' but the configured model is "
+                         f"'{expected['embedding_model']}'. Set VECTOR_COLLECTION_NAME to a new collection and re-index.")
+            return False
+        return True
+
+    async def _check_embedding_dimension(self, collection: chromadb.Collection, dimension: int) -> bool:
+        """Records the vector dimension on the collection's first add, and rejects vectors of another dimension."""
+        metadata = collection.metadata or {}
+        stored_dimension = metadata.get("embedding_dimension")
+        if stored_dimension is None:
+            await run_in_chroma_executor(
+                collection.modify,
+                metadata={**self._modifiable_metadata(metadata), "embedding_dimension": dimension}
+            )
+            return True
+        if stored_dimension != dimension:
+            logger.error(f"Cannot add {dimension}-dimensional embeddings to collection '{self.COLLECTION_NAME}', "
+                         f"which holds {stored_dimension}-dimensional ones.")
+            return False
+        return True
+
     def get_collection(self) -> Optional[chromadb.Collection]:
         """
         Gets or creates the default ChromaDB collection with the embedding function.
@@ -84,11 +201,13 @@ class VectorDBService:
         if self._collection is None:
             try:
                 logger.info(f"Getting or creating ChromaDB collection: {self.COLLECTION_NAME}")
-                self._collection = self._client.get_or_create_collection(
+                collection = self._client.get_or_create_collection(
                     name=self.COLLECTION_NAME,
                     embedding_function=embedding_func # Assign the embedding function
                 )
-                logger.info(f"Collection '{self.COLLECTION_NAME}' ready.")
+                if self._check_collection_embeddings(collection):
+                    self._collection = collection
+                    logger.info(f"Collection '{self.COLLECTION_NAME}' ready.")
             except Exception as e:
                 logger.error(f"Failed to get or create collection '{self.COLLECTION_NAME}': {e}", exc_info=True)
                 self._collection = None
@@ -97,76 +216,250 @@ class VectorDBService:
 
     # --- NEW Method: Generate Embeddings --- 
     async def generate_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
-        """Generates embeddings for a list of texts using the configured function."""
+        """
+        Generates embeddings for a list of texts using the configured function.
+        Embeddings are served from the content-addressed cache where possible; only
+        cache misses are embedded (see _embed_texts).
+        """
         embedding_func = self._get_embedding_function()
         if not embedding_func:
             logger.error("Cannot generate embeddings, embedding function not available.")
             return None
             
         try:
-            # The embedding function itself is usually callable like this
-            embeddings = embedding_func(texts)
+            model_name = embedding_model_id(settings.EMBEDDING_PROVIDER)
+            # The cache's SQLite tier is read and written off the event loop
+            embeddings = await run_in_cache_executor(self._embedding_cache.get_many, model_name, texts)
+            # De-duplicate misses so repeated texts are only embedded once
+            missing_texts = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+
+            if missing_texts:
+                new_embeddings = await self._embed_texts(embedding_func, missing_texts)
+                if not new_embeddings or len(new_embeddings) != len(missing_texts):
+                    logger.error(f"Embedding function returned {len(new_embeddings) if new_embeddings else 0} embeddings for {len(missing_texts)} texts.")
+                    return None
+                await run_in_cache_executor(self._embedding_cache.set_many, model_name, missing_texts, new_embeddings)
+                embeddings_by_text = dict(zip(missing_texts, new_embeddings))
+                embeddings = [embedding if embedding is not None else embeddings_by_text[text] for text, embedding in zip(texts, embeddings)]
+
             if embeddings:
-                 logger.info(f"Successfully generated {len(embeddings)} embeddings.")
+                 logger.info(f"Successfully generated {len(embeddings)} embeddings ({len(missing_texts)} cache misses).")
             return embeddings
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    async def _embed_texts(embedding_func: EmbeddingFunction, texts: List[str]) -> List[List[float]]:
+        """
+        Runs the embedding function off the event loop.
+
+        Gemini gets the whole list in one batched API call on the LLM executor. Local
+        models get batches of similar-length texts, run concurrently on the embedding
+        executor.
+        """
+        if settings.EMBEDDING_PROVIDER == "gemini":
+            return await run_in_llm_executor(embedding_func, texts)
+
+        batches = length_sorted_batches(texts, settings.LOCAL_EMBEDDING_BATCH_SIZE)
+        results = await asyncio.gather(*(
+            run_in_embedding_executor(embedding_func, [texts[i] for i in batch]) for batch in batches
+        ))
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for batch, batch_embeddings in zip(batches, results):
+            for i, embedding in zip(batch, batch_embeddings):
+                embeddings[i] = embedding
+        return embeddings
+
     # --- Add document and query methods --- 
 
     async def add_document_chunks(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> bool:
         """
         Adds document chunks (text, metadata, ids) to the collection.
-        Embeddings are generated automatically by the configured embedding function.
+        Embeddings are generated through the embedding cache and passed to ChromaDB explicitly.
         """
         collection = self.get_collection()
         if not collection:
             logger.error("Cannot add documents, collection not available.")
             return False
             
-        if collection.embedding_function is None:
+        if self._collection_embedding_function(collection) is None:
              logger.error("Cannot add documents, embedding function is not configured for the collection.")
              return False
 
         try:
-            # ChromaDB's add method handles embedding generation via the collection's function
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+            # Embed through the cache so chunks seen before (and later validation lookups) skip the API.
+            # If that fails, fall back to letting ChromaDB embed via the collection's function.
+            embeddings = await self.generate_embeddings(documents)
+            if embeddings:
+                if not await self._check_embedding_dimension(collection, len(embeddings[0])):
+                    return False
+                await run_in_chroma_executor(
+                    collection.add,
+                    documents=documents,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+            else:
+                await run_in_chroma_executor(
+                    collection.add,
+                    documents=documents,
+                    metadatas=metadatas,
+                    ids=ids
+                )
             logger.info(f"Successfully added/updated {len(ids)} chunks to collection '{self.COLLECTION_NAME}'.")
             return True
         except Exception as e:
             logger.error(f"Failed to add documents to collection: {e}", exc_info=True)
             return False
 
-    async def query_collection(self, query_texts: List[str], n_results: int = 5, where: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    async def sync_document_chunks(self, doc_id: str, documents: List[str], metadatas: List[Dict[str, Any]]) -> bool:
+        """
+        Makes the stored chunks of one document (by its "doc_id" metadata) match `documents`.
+
+        Chunk IDs come from content_chunk_ids, so the chunks stored for the document are
+        diffed by ID: only new chunks are embedded and added, kept chunks whose metadata
+        changed (e.g. their position) are updated in place, and chunks no longer in the
+        document are deleted. New chunks are added before the orphans are removed.
+
+        Returns:
+            True if the stored chunks now match the document.
+        """
+        collection = self.get_collection()
+        if not collection:
+            logger.error("Cannot sync document chunks, collection not available.")
+            return False
+
+        ids = content_chunk_ids(doc_id, documents)
+        try:
+            existing = await run_in_chroma_executor(
+                collection.get,
+                where={"doc_id": doc_id},
+                include=["metadatas"]
+            )
+            existing_metadatas = dict(zip(existing["ids"], existing.get("metadatas") or [None] * len(existing["ids"])))
+
+            new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing_metadatas]
+            changed_positions = [
+                i for i, chunk_id in enumerate(ids)
+                if chunk_id in existing_metadatas and existing_metadatas[chunk_id] != metadatas[i]
+            ]
+            current_ids = set(ids)
+            orphaned_ids = [chunk_id for chunk_id in existing_metadatas if chunk_id not in current_ids]
+
+            if new_positions:
+                added = await self.add_document_chunks(
+                    documents=[documents[i] for i in new_positions],
+                    metadatas=[metadatas[i] for i in new_positions],
+                    ids=[ids[i] for i in new_positions]
+                )
+                if not added:
+                    return False
+            if changed_positions:
+                await run_in_chroma_executor(
+                    collection.update,
+                    ids=[ids[i] for i in changed_positions],
+                    metadatas=[metadatas[i] for i in changed_positions]
+                )
+            if orphaned_ids:
+                await run_in_chroma_executor(collection.delete, ids=orphaned_ids)
+
+            logger.info(f"Synced chunks of '{doc_id}': {len(new_positions)} added, {len(changed_positions)} updated, "
+                        f"{len(orphaned_ids)} deleted, {len(ids) - len(new_positions)} unchanged.")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to sync chunks of '{doc_id}': {e}", exc_info=True)
+            return False
+
+    async def get_embeddings(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reads stored chunks with their embeddings and metadata, without querying or embedding.
+
+        Args:
+            where: Optional metadata filter (e.g. {"doc_type": "candidate"})
+            limit: Maximum number of chunks to return (for paging)
+            offset: Number of matching chunks to skip (for paging)
+
+        Returns:
+            The ChromaDB get result ('ids', 'embeddings', 'metadatas'), or None on failure.
+        """
+        collection = self.get_collection()
+        if not collection:
+            logger.error("Cannot read embeddings, collection not available.")
+            return None
+
+        try:
+            return await run_in_chroma_executor(
+                collection.get,
+                where=where,
+                limit=limit,
+                offset=offset,
+                include=["embeddings", "metadatas"]
+            )
+        except Exception as e:
+            logger.error(f"Failed to read embeddings from collection: {e}", exc_info=True)
+            return None
+
+    async def query_collection(
+        self,
+        query_texts: Optional[List[str]] = None,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Queries the collection for relevant document chunks using the configured embedding function.
+
+        Pass `query_embeddings` to query with precomputed (e.g. cached) vectors instead of
+        letting ChromaDB embed `query_texts`. With `include_embeddings=True` the stored chunk
+        embeddings are returned under 'embeddings', so callers can compare them without
+        re-embedding the chunk texts.
         """
         collection = self.get_collection()
         if not collection:
             logger.error("Cannot query collection, collection not available.")
             return None
 
-        if collection.embedding_function is None:
+        if self._collection_embedding_function(collection) is None:
              logger.error("Cannot query collection, embedding function is not configured.")
              return None
-            
+
+        include = ['metadatas', 'documents', 'distances'] # Include useful info
+        if include_embeddings:
+            include.append('embeddings')
+
         try:
-            # ChromaDB's query method handles embedding the query_texts automatically
-            results = collection.query(
-                query_texts=query_texts,
-                n_results=n_results,
-                where=where, # Optional filter
-                include=['metadatas', 'documents', 'distances'] # Include useful info
-            )
+            if query_embeddings is not None:
+                results = await run_in_chroma_executor(
+                    collection.query,
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where, # Optional filter
+                    include=include
+                )
+            else:
+                # ChromaDB's query method handles embedding the query_texts automatically
+                results = await run_in_chroma_executor(
+                    collection.query,
+                    query_texts=query_texts,
+                    n_results=n_results,
+                    where=where, # Optional filter
+                    include=include
+                )
             # Log query results concisely
-            num_results = len(results.get('ids', [[]])[0]) if results and results.get('ids') else 0
+            num_results = sum(len(ids) for ids in results['ids']) if results and results.get('ids') else 0
             query_preview = query_texts[0][:70] + "..." if query_texts else "N/A"
-            logger.info(f"Query '{query_preview}' returned {num_results} results.")
+            if query_texts and len(query_texts) > 1:
+                logger.info(f"Batched query of {len(query_texts)} texts (first: '{query_preview}') returned {num_results} results.")
+            else:
+                logger.info(f"Query '{query_preview}' returned {num_results} results.")
             return results
         except Exception as e:
             logger.error(f"Failed to query collection: {e}", exc_info=True)
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from google.api_core.exceptions import ResourceExhausted
+
+from recruitx_app.core.config import settings
+from recruitx_app.utils.llm_transport import llm_transport
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate used to charge the TPM bucket before a call
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MEDIA_PART = 258  # Gemini bills an image/blob part at a flat token count
+
+
+def mask_key(key: str) -> str:
+    """Returns a log-safe representation of an API key."""
+    return f"...{key[-4:]}" if key else "<empty>"
+
+
+def estimate_tokens(contents: Any) -> int:
+    """
+    Estimates the number of prompt tokens in a Gemini request payload.
+
+    Strings are estimated by length, lists/tuples are summed and dicts are searched
+    for their text/parts. Anything else (images, blobs) is charged a flat amount.
+    """
+    if contents is None:
+        return 0
+    if isinstance(contents, str):
+        return len(contents) // CHARS_PER_TOKEN + 1
+    if isinstance(contents, (list, tuple)):
+        return sum(estimate_tokens(item) for item in contents)
+    if isinstance(contents, dict):
+        if "text" in contents:
+            return estimate_tokens(contents["text"])
+        if "parts" in contents:
+            return estimate_tokens(contents["parts"])
+    return TOKENS_PER_MEDIA_PART
+
+
+class _KeyState:
+    """Token buckets and bookkeeping for a single API key."""
+
+    def __init__(self, rpm_limit: float, tpm_limit: float, now: float):
+        self.request_tokens = float(rpm_limit)
+        self.prompt_tokens = float(tpm_limit)
+        self.last_refill = now
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.rate_limited_count = 0
+
+
+class ApiKeyPool:
+    """
+    Schedules Gemini calls across a pool of API keys.
+
+    Each key has two continuously refilled token buckets, one for requests per minute
+    and one for prompt tokens per minute. A key that receives a 429 is put in cooldown.
+    `acquire` hands out the key with the most remaining headroom (ties go to the key
+    with fewest calls in flight) and only waits when every key is exhausted or cooling
+    down. Callers bind their request to the key with `get_client`, so concurrent calls
+    never depend on the process-global `genai.configure`.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        rpm_limit: Optional[float] = None,
+        tpm_limit: Optional[float] = None,
+        cooldown_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.keys: List[str] = list(dict.fromkeys(key for key in keys if key))
+        self.rpm_limit = float(rpm_limit or settings.GEMINI_RPM_PER_KEY)
+        self.tpm_limit = float(tpm_limit or settings.GEMINI_TPM_PER_KEY)
+        self.cooldown_seconds = settings.GEMINI_KEY_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        now = clock()
+        self._states: Dict[str, _KeyState] = {key: _KeyState(self.rpm_limit, self.tpm_limit, now) for key in self.keys}
+        self._clients: Dict[str, glm.GenerativeServiceClient] = {}
+
+    def _refill(self, state: _KeyState, now: float) -> None:
+        elapsed = max(0.0, now - state.last_refill)
+        state.request_tokens = min(self.rpm_limit, state.request_tokens + elapsed * self.rpm_limit / 60.0)
+        state.prompt_tokens = min(self.tpm_limit, state.prompt_tokens + elapsed * self.tpm_limit / 60.0)
+        state.last_refill = now
+
+    def _headroom(self, state: _KeyState) -> float:
+        return max(0.0, min(state.request_tokens / self.rpm_limit, state.prompt_tokens / self.tpm_limit))
+
+    def _seconds_until_available(self, state: _KeyState, tokens_needed: float, now: float) -> float:
+        wait = max(0.0, state.cooldown_until - now)
+        if state.request_tokens < 1:
+            wait = max(wait, (1 - state.request_tokens) * 60.0 / self.rpm_limit)
+        if state.prompt_tokens < tokens_needed:
+            wait = max(wait, (tokens_needed - state.prompt_tokens) * 60.0 / self.tpm_limit)
+        return wait
+
+    def _try_acquire(self, estimated_tokens: int) -> Tuple[Optional[str], float]:
+        """Reserves capacity on the best available key. Returns (key, 0) or (None, seconds to wait)."""
+        if not self.keys:
+            raise RuntimeError("No Gemini API keys configured.")
+        # A request larger than a full bucket can still run once the bucket is full
+        tokens_needed = min(float(estimated_tokens), self.tpm_limit)
+
+        with self._lock:
+            now = self._clock()
+            best_key = None
+            best_rank = None
+            for key in self.keys:
+                state = self._states[key]
+                self._refill(state, now)
+                if now < state.cooldown_until or state.request_tokens < 1 or state.prompt_tokens < tokens_needed:
+                    continue
+                rank = (self._headroom(state), -state.in_flight)
+                if best_rank is None or rank > best_rank:
+                    best_key, best_rank = key, rank
+
+            if best_key is None:
+                wait = min(self._seconds_until_available(self._states[key], tokens_needed, now) for key in self.keys)
+                return None, max(wait, 0.01)
+
+            state = self._states[best_key]
+            state.request_tokens -= 1
+            state.prompt_tokens -= tokens_needed
+            state.in_flight += 1
+            return best_key, 0.0
+
+    async def acquire(self, estimated_tokens: int = 0) -> str:
+        """
+        Reserves one request (and the estimated prompt tokens) on the key with the most headroom.
+
+        Args:
+            estimated_tokens: Estimated prompt tokens of the request
+
+        Returns:
+            The API key to use. Must be handed back with `release`.
+        """
+        while True:
+            key, wait = self._try_acquire(estimated_tokens)
+            if key is not None:
+                return key
+            logger.debug(f"All API keys exhausted or cooling down; waiting {wait:.2f}s.")
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, estimated_tokens: int = 0) -> str:
+        """Same as `acquire`, for code running on a worker thread."""
+        while True:
+            key, wait = self._try_acquire(estimated_tokens)
+            if key is not None:
+                return key
+            time.sleep(wait)
+
+    def release(self, key: str, estimated_tokens: int = 0, actual_tokens: Optional[int] = None) -> None:
+        """
+        Marks a call as finished.
+
+        Args:
+            key: The key returned by `acquire`
+            estimated_tokens: The estimate the key was charged with
+            actual_tokens: The real token usage, if the response reported it; the
+                TPM bucket is corrected by the difference
+        """
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            state.in_flight = max(0, state.in_flight - 1)
+            if actual_tokens is not None:
+                state.prompt_tokens = min(self.tpm_limit, state.prompt_tokens - (actual_tokens - estimated_tokens))
+
+    def report_rate_limited(self, key: str, retry_after: Optional[float] = None) -> None:
+        """Puts a key in cooldown after the API rejected it with a 429."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            now = self._clock()
+            state.cooldown_until = max(state.cooldown_until, now + (retry_after if retry_after is not None else self.cooldown_seconds))
+            state.request_tokens = min(state.request_tokens, 0.0)
+            state.rate_limited_count += 1
+        logger.warning(f"API key {mask_key(key)} rate limited; cooling down for {state.cooldown_until - now:.0f}s.")
+
+    def best_key(self) -> str:
+        """Returns the key with the most headroom without reserving capacity on it."""
+        if not self.keys:
+            raise RuntimeError("No Gemini API keys configured.")
+        with self._lock:
+            now = self._clock()
+            for state in self._states.values():
+                self._refill(state, now)
+            return max(
+                self.keys,
+                key=lambda k: (now >= self._states[k].cooldown_until, self._headroom(self._states[k]), -self._states[k].in_flight)
+            )
+
+    def get_client(self, key: str) -> glm.GenerativeServiceClient:
+        """Returns a Gemini client bound to `key`, created once per key and reused."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = glm.GenerativeServiceClient(client_options={"api_key": key})
+                self._clients[key] = client
+            return client
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Returns the current per-key state (keys masked) for monitoring."""
+        with self._lock:
+            now = self._clock()
+            result = []
+            for key in self.keys:
+                state = self._states[key]
+                self._refill(state, now)
+                result.append({
+                    "key": mask_key(key),
+                    "headroom": round(self._headroom(state), 3),
+                    "requests_available": round(state.request_tokens, 2),
+                    "tokens_available": round(state.prompt_tokens),
+                    "in_flight": state.in_flight,
+                    "cooling_down": now < state.cooldown_until,
+                    "rate_limited_count": state.rate_limited_count
+                })
+            return result
+
+
+class PooledEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Chroma embedding function that routes each batch through the API key pool.
+
+    Produces the same embeddings as Chroma's GoogleGenerativeAiEmbeddingFunction
+    (same task type and title) but sends a whole batch in one request with a
+    client bound to the scheduled key, moving to another key on a 429.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        task_type: str = "RETRIEVAL_DOCUMENT",
+        pool: Optional[ApiKeyPool] = None
+    ):
+        if not model_name:
+            raise ValueError("Please provide the model name.")
+        self._model_name = model_name
+        self._task_type = task_type
+        self._task_title = "Embedding of single string" if task_type == "RETRIEVAL_DOCUMENT" else None
+        self._pool = pool
+
+    @property
+    def pool(self) -> ApiKeyPool:
+        return self._pool or api_key_pool
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+        pool = self.pool
+        estimated = estimate_tokens(texts)
+        attempts = max(1, len(pool.keys))
+        for attempt in range(1, attempts + 1):
+            key = pool.acquire_blocking(estimated)
+            try:
+                result = llm_transport.embed_content(
+                    model=self._model_name,
+                    content=texts,
+                    task_type=self._task_type,
+                    title=self._task_title,
+                    client=pool.get_client(key)
+                )
+                return result["embedding"]
+            except ResourceExhausted:
+                pool.report_rate_limited(key)
+                if attempt >= attempts:
+                    raise
+            finally:
+                pool.release(key, estimated)
+        return []
+
+
+# Instantiate the pool for easy import
+api_key_pool = ApiKeyPool(settings.gemini_api_keys)
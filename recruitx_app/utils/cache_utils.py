@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def compute_content_hash(text: str) -> str:
+    """Returns the hex sha256 digest of a text, used as a content-addressed cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache.
+
+    Entries are evicted least-recently-used first once `maxsize` is exceeded.
+    Reads and writes are guarded by a lock so the cache can be shared between
+    the event loop and worker threads.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Returns the cached value for key (marking it as recently used) or default."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entry if the cache is full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Removes and returns the value for key, or default if absent."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """
+    LRU cache whose entries also expire `ttl_seconds` after they were stored.
+
+    Expired entries are dropped lazily when they are read.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize=maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().get(key, self._MISSING)
+        if entry is self._MISSING:
+            return default
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            super().pop(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Stores a value that expires after ttl_seconds (defaults to the cache TTL)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        super().set(key, (self._clock() + ttl, value))
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().pop(key, self._MISSING)
+        return default if entry is self._MISSING else entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
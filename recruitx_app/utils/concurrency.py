@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from recruitx_app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Blocking SDK calls run on dedicated, bounded thread pools instead of the event loop.
+# LLM and embedding API calls share one pool; ChromaDB work (queries, writes and the
+# embeddings it computes itself) gets its own so slow model calls cannot starve it.
+# Document parsing (PDF/DOCX extraction and OCR) runs on a third pool, and the
+# CPU-bound OCR of individual pages is spread over a process pool. Local embedding
+# models (EMBEDDING_PROVIDER other than "gemini") run their inference on a fourth pool.
+# Reads and writes of the SQLite-backed caches (embeddings, external API responses)
+# get a small pool of their own, so a cache lookup never queues behind a model call.
+_llm_executor: Optional[ThreadPoolExecutor] = None
+_chroma_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_embedding_executor: Optional[ThreadPoolExecutor] = None
+_cache_executor: Optional[ThreadPoolExecutor] = None
+_ocr_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Returns the shared executor for blocking Gemini SDK calls, creating it on first use."""
+    global _llm_executor
+    with _executor_lock:
+        if _llm_executor is None:
+            _llm_executor = ThreadPoolExecutor(
+                max_workers=settings.LLM_EXECUTOR_WORKERS,
+                thread_name_prefix="llm"
+            )
+        return _llm_executor
+
+
+def get_chroma_executor() -> ThreadPoolExecutor:
+    """Returns the shared executor for blocking ChromaDB calls, creating it on first use."""
+    global _chroma_executor
+    with _executor_lock:
+        if _chroma_executor is None:
+            _chroma_executor = ThreadPoolExecutor(
+                max_workers=settings.CHROMA_EXECUTOR_WORKERS,
+                thread_name_prefix="chroma"
+            )
+        return _chroma_executor
+
+
+def get_parse_executor() -> ThreadPoolExecutor:
+    """Returns the shared executor for document parsing, creating it on first use."""
+    global _parse_executor
+    with _executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ThreadPoolExecutor(
+                max_workers=settings.PARSE_EXECUTOR_WORKERS,
+                thread_name_prefix="parse"
+            )
+        return _parse_executor
+
+
+def get_embedding_executor() -> ThreadPoolExecutor:
+    """Returns the shared executor for local embedding inference, creating it on first use."""
+    global _embedding_executor
+    with _executor_lock:
+        if _embedding_executor is None:
+            _embedding_executor = ThreadPoolExecutor(
+                max_workers=settings.LOCAL_EMBEDDING_WORKERS,
+                thread_name_prefix="embedding"
+            )
+        return _embedding_executor
+
+
+def get_cache_executor() -> ThreadPoolExecutor:
+    """Returns the shared executor for SQLite cache I/O, creating it on first use."""
+    global _cache_executor
+    with _executor_lock:
+        if _cache_executor is None:
+            _cache_executor = ThreadPoolExecutor(
+                max_workers=settings.CACHE_EXECUTOR_WORKERS,
+                thread_name_prefix="cache"
+            )
+        return _cache_executor
+
+
+def ocr_worker_count() -> int:
+    """Returns the number of OCR worker processes."""
+    return settings.OCR_PROCESS_WORKERS or os.cpu_count() or 1
+
+
+def get_ocr_executor() -> ProcessPoolExecutor:
+    """Returns the shared process pool for OCR, sized to the CPU count unless configured."""
+    global _ocr_executor
+    with _executor_lock:
+        if _ocr_executor is None:
+            # Spawned workers avoid forking a process that is running threads
+            _ocr_executor = ProcessPoolExecutor(
+                max_workers=ocr_worker_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _ocr_executor
+
+
+async def run_in_llm_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking LLM/embedding SDK call on the LLM executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_llm_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_chroma_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking ChromaDB call on the Chroma executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_chroma_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_parse_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs blocking document parsing on the parse executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_embedding_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs local embedding inference on the embedding executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_embedding_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_cache_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs blocking SQLite cache I/O on the cache executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cache_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shuts down all executors (they are recreated lazily if used again)."""
+    global _llm_executor, _chroma_executor, _parse_executor, _embedding_executor, _cache_executor, _ocr_executor
+    with _executor_lock:
+        executors = [
+            e for e in (_llm_executor, _chroma_executor, _parse_executor, _embedding_executor, _cache_executor, _ocr_executor)
+            if e is not None
+        ]
+        _llm_executor = None
+        _chroma_executor = None
+        _parse_executor = None
+        _embedding_executor = None
+        _cache_executor = None
+        _ocr_executor = None
+    for executor in executors:
+        executor.shutdown(wait=wait)
+    if executors:
+        logger.info(f"Shut down {len(executors)} blocking-call executors.")
@@ -0,0 +1,134 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from recruitx_app.utils.cache_utils import LRUCache, compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement, so lookups are chunked
+_SQLITE_LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (model name, sha256 of text).
+
+    Lookups go to an in-memory LRU first and then to a SQLite table holding the
+    vectors as float32 blobs, so embeddings survive restarts and are shared by
+    every worker process pointed at the same file. Pass ":memory:" as the path
+    for a process-local store, or None to disable the disk tier entirely.
+    """
+
+    def __init__(self, db_path: Optional[str], memory_size: int = 20000):
+        self.db_path = db_path
+        self._memory = LRUCache(maxsize=memory_size)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if db_path:
+            self._connect()
+
+    def _connect(self):
+        """Opens the SQLite store and creates the embeddings table if needed."""
+        try:
+            if self.db_path != ":memory:":
+                parent_dir = os.path.dirname(self.db_path)
+                if parent_dir and not os.path.exists(parent_dir):
+                    os.makedirs(parent_dir)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            if self.db_path != ":memory:":
+                # WAL lets several uvicorn workers read while one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model_name TEXT NOT NULL, "
+                "text_hash TEXT NOT NULL, "
+                "dimension INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, "
+                "PRIMARY KEY (model_name, text_hash))"
+            )
+            conn.commit()
+            self._conn = conn
+            logger.info(f"Embedding cache store ready at: {self.db_path}")
+        except Exception as e:
+            logger.error(f"Failed to open embedding cache store at {self.db_path}: {e}", exc_info=True)
+            self._conn = None
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up cached embeddings for a list of texts.
+
+        Returns:
+            A list aligned with `texts` holding the cached embedding or None for each miss.
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: dict = {}
+
+        for i, text in enumerate(texts):
+            text_hash = compute_content_hash(text)
+            vector = self._memory.get((model_name, text_hash))
+            if vector is not None:
+                results[i] = vector.tolist()
+            else:
+                missing.setdefault(text_hash, []).append(i)
+
+        if not missing or self._conn is None:
+            return results
+
+        hashes = list(missing.keys())
+        try:
+            with self._lock:
+                rows = []
+                for start in range(0, len(hashes), _SQLITE_LOOKUP_BATCH):
+                    batch = hashes[start:start + _SQLITE_LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(self._conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model_name = ? AND text_hash IN ({placeholders})",
+                        [model_name, *batch]
+                    ).fetchall())
+        except Exception as e:
+            logger.error(f"Embedding cache lookup failed: {e}", exc_info=True)
+            return results
+
+        for text_hash, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            self._memory.set((model_name, text_hash), vector)
+            for i in missing[text_hash]:
+                results[i] = vector.tolist()
+
+        return results
+
+    def set_many(self, model_name: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """Stores embeddings for the given texts in both cache tiers."""
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            text_hash = compute_content_hash(text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._memory.set((model_name, text_hash), vector)
+            rows.append((model_name, text_hash, int(vector.shape[0]), vector.tobytes()))
+
+        if not rows or self._conn is None:
+            return
+
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model_name, text_hash, dimension, vector) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} embeddings to cache: {e}", exc_info=True)
+
+    def clear(self) -> None:
+        """Removes every cached embedding from both tiers."""
+        self._memory.clear()
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
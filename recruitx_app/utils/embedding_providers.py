@@ -0,0 +1,112 @@
+import logging
+import threading
+from typing import List, Sequence
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from recruitx_app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PROVIDERS = ("gemini", "local", "hashing")
+
+
+def embedding_model_id(provider: str) -> str:
+    """
+    Identifies the model that produces a provider's vectors, e.g. "local/all-MiniLM-L6-v2".
+
+    Used as the embedding cache key and recorded in the collection metadata, so vectors
+    from different models are never mixed. Gemini keeps the bare model name, which is
+    what the embedding cache was keyed by before providers were configurable. With the
+    replay or synthetic LLM transport, Gemini vectors may be fake (feature hashing), so
+    the mode is prefixed ("synthetic/models/embedding-001") to keep them away from real ones.
+    """
+    if provider == "gemini":
+        if settings.LLM_TRANSPORT in ("replay", "synthetic"):
+            return f"{settings.LLM_TRANSPORT}/{settings.GEMINI_EMBEDDING_MODEL}"
+        return settings.GEMINI_EMBEDDING_MODEL
+    if provider == "local":
+        return f"local/{settings.LOCAL_EMBEDDING_MODEL}"
+    if provider == "hashing":
+        return f"hashing/{settings.HASHING_EMBEDDING_DIMENSION}"
+    raise ValueError(f"Unknown embedding provider '{provider}'; expected one of {', '.join(EMBEDDING_PROVIDERS)}")
+
+
+def length_sorted_batches(texts: Sequence[str], batch_size: int) -> List[List[int]]:
+    """
+    Groups text positions into batches of similar length, longest first.
+
+    Transformer inference pads every text of a batch to its longest member, so
+    batching texts of similar length wastes far less compute on padding.
+    """
+    batch_size = max(1, batch_size)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+class LocalEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Chroma embedding function running a sentence-transformers model on the local CPU (or GPU).
+
+    The model is loaded on first use, from the Hugging Face cache or a local directory
+    (LOCAL_EMBEDDING_MODEL may be a path, for machines without internet access).
+    Vectors are L2-normalized.
+    """
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 32):
+        if not model_name:
+            raise ValueError("Please provide the model name.")
+        self._model_name = model_name
+        self._device = device
+        self._batch_size = batch_size
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading local embedding model '{self._model_name}' on {self._device}.")
+                    self._model = SentenceTransformer(self._model_name, device=self._device)
+        return self._model
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+        vectors = self._get_model().encode(
+            texts,
+            batch_size=self._batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32).tolist()
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Chroma embedding function based on feature hashing of word unigrams and bigrams.
+
+    Needs no model and no network, and is stateless: a text always maps to the same
+    vector, whatever else has been indexed. Similarity is lexical rather than
+    semantic, which is enough for offline environments and tests.
+    """
+
+    def __init__(self, dimension: int = 768):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.dimension = dimension
+        self._vectorizer = HashingVectorizer(
+            n_features=dimension,
+            ngram_range=(1, 2),
+            alternate_sign=True,
+            norm="l2"
+        )
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+        return self._vectorizer.transform(texts).toarray().astype(np.float32).tolist()
@@ -1,9 +1,9 @@
 import os
 import io
 import re
+import math
 import logging
-from typing import Optional, List, Dict, Any
-import tempfile
+from typing import Optional, List, Dict, Any, Tuple, TypedDict
 import csv
 import html2text
 
@@ -22,9 +22,34 @@ try:
 except ImportError:
     OCR_AVAILABLE = False
 
+from recruitx_app.core.config import settings
+from recruitx_app.utils.concurrency import get_ocr_executor, ocr_worker_count, run_in_parse_executor
+
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Size of the chunks read from an upload while enforcing the size cap
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
+
+# A page with at least this many characters in its text layer is not OCRed
+MIN_TEXT_LAYER_CHARS = 20
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an uploaded file exceeds the configured size limit."""
+
+class PdfPageText(TypedDict):
+    """Text extracted from one PDF page"""
+    page_number: int
+    text: str
+    method: str  # "text_layer", "ocr" or "empty"
+
+class PdfExtractionResult(TypedDict):
+    """Result of extract_pdf"""
+    text: str
+    pages: List[PdfPageText]
+    method: str  # "text_layer", "ocr", "mixed", "pypdf" or "none"
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize extracted text by removing excessive whitespace,
@@ -63,41 +88,18 @@ def extract_text_from_pdf_with_layout(pdf_content: bytes) -> str:
         The extracted text as a string, preserving layout
     """
     try:
-        # Create a temporary file to work with
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-            temp_file.write(pdf_content)
-            temp_path = temp_file.name
-        
-        # Open the PDF with PyMuPDF
-        full_text = ""
+        # Open the PDF straight from memory with PyMuPDF
+        doc = fitz.open(stream=pdf_content, filetype="pdf")
         try:
-            # For testing purposes, we bypass file existence check when using patch
-            # But keep the check for real usage
-            if os.path.basename(temp_path).startswith('mock_') and not os.path.exists(temp_path):
-                # Just log in real code, but we need to continue for testing
-                logger.error(f"Temporary file not found: {temp_path}")
-                # For the tests, we'll just pretend the file exists
-                pass
-                
-            doc = fitz.open(temp_path)
-            
             # Extract text from each page with layout preservation
+            page_texts = []
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
-                # Get text with layout preservation (blocks parameter)
-                page_text = page.get_text("text")
-                full_text += page_text + "\n\n"
-                
-            doc.close()
+                page_texts.append(page.get_text("text") + "\n\n")
         finally:
-            # Clean up the temporary file
-            try:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except Exception as e:
-                logger.warning(f"Could not delete temporary file {temp_path}: {e}")
+            doc.close()
         
-        return full_text
+        return "".join(page_texts)
     
     except Exception as e:
         logger.error(f"Error extracting text with layout awareness: {e}")
@@ -105,8 +107,7 @@ def extract_text_from_pdf_with_layout(pdf_content: bytes) -> str:
 
 def extract_text_from_pdf(pdf_content: bytes) -> str:
     """
-    Extract text from a PDF file. Tries layout-aware extraction first,
-    then falls back to PyPDF, and finally attempts OCR if needed.
+    Extract text from a PDF file in a single pass (see extract_pdf).
     
     Args:
         pdf_content: The binary content of the PDF file
@@ -114,50 +115,205 @@ def extract_text_from_pdf(pdf_content: bytes) -> str:
     Returns:
         The extracted text as a string
     """
-    # Try PyMuPDF first for layout-aware extraction
-    layout_text = extract_text_from_pdf_with_layout(pdf_content)
-    if layout_text.strip():
-        logger.info("Successfully extracted PDF text using layout-aware method")
-        return layout_text
+    return extract_pdf(pdf_content)["text"]
+
+def extract_pdf(pdf_content: bytes) -> PdfExtractionResult:
+    """
+    Extract text from a PDF, opening it once.
+    
+    Every page is classified while the document is open: pages with a text layer
+    keep that text and only the remaining (image-only) pages are sent to OCR, so
+    PDFs where a few pages are scans are handled in one parse. PyPDF is only used
+    if PyMuPDF cannot open the file.
+    
+    Args:
+        pdf_content: The binary content of the PDF file
         
-    # Fall back to pypdf if layout extraction fails
+    Returns:
+        A PdfExtractionResult with the joined text, per-page results and the method used
+    """
     try:
-        # Create a PDF reader object
-        pdf_file = io.BytesIO(pdf_content)
-        pdf = PdfReader(pdf_file)
-        
-        # Extract text from each page
-        text = ""
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            text += page_text + "\n" if page_text else "\n"
-        
-        # If we got meaningful text, return it
-        if text.strip():
-            logger.info("Successfully extracted PDF text using PyPDF")
-            return text
-            
-        # If text extraction yielded no results, the PDF might be scanned
-        # Try OCR if available
-        if OCR_AVAILABLE:
-            return extract_text_with_ocr(pdf_content)
+        doc = fitz.open(stream=pdf_content, filetype="pdf")
+    except Exception as e:
+        logger.warning(f"PyMuPDF could not open the PDF ({e}); falling back to PyPDF")
+        return _extract_pdf_with_pypdf(pdf_content)
+    
+    try:
+        page_count = len(doc)
+        layer_texts, ocr_jobs = _plan_pages(doc, skip_text_pages=True)
+    finally:
+        doc.close()
+    
+    if ocr_jobs and not OCR_AVAILABLE:
+        logger.warning(f"{len(ocr_jobs)} PDF pages appear to be scanned, but OCR is not available")
+    ocr_texts = _ocr_pages(pdf_content, ocr_jobs) if ocr_jobs and OCR_AVAILABLE else {}
+    
+    pages: List[PdfPageText] = []
+    for page_number in range(page_count):
+        if page_number in ocr_texts:
+            text, method = ocr_texts[page_number], "ocr"
         else:
-            logger.warning("PDF appears to be scanned, but OCR is not available")
-            return ""
-            
+            text = layer_texts.get(page_number, "")
+            method = "text_layer" if text.strip() else "empty"
+        pages.append({"page_number": page_number, "text": text, "method": method})
+    
+    methods = {page["method"] for page in pages} - {"empty"}
+    if len(methods) > 1:
+        method = "mixed"
+    elif methods:
+        method = methods.pop()
+    else:
+        method = "none"
+    
+    logger.info(f"Extracted PDF text from {page_count} pages in one pass (method: {method}, {len(ocr_texts)} pages OCRed)")
+    return {
+        "text": "".join(page["text"] + "\n\n" for page in pages),
+        "pages": pages,
+        "method": method
+    }
+
+def _extract_pdf_with_pypdf(pdf_content: bytes) -> PdfExtractionResult:
+    """Extracts the text layer with PyPDF, for files PyMuPDF cannot open."""
+    try:
+        pdf = PdfReader(io.BytesIO(pdf_content))
+        pages: List[PdfPageText] = []
+        for page_number, page in enumerate(pdf.pages):
+            page_text = page.extract_text() or ""
+            pages.append({
+                "page_number": page_number,
+                "text": page_text,
+                "method": "text_layer" if page_text.strip() else "empty"
+            })
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
-        # Try OCR as a last resort if available
-        if OCR_AVAILABLE:
-            return extract_text_with_ocr(pdf_content)
-        return ""
+        return {"text": "", "pages": [], "method": "none"}
+    
+    text = "".join(page["text"] + "\n" for page in pages)
+    if text.strip():
+        logger.info("Successfully extracted PDF text using PyPDF")
+    return {"text": text, "pages": pages, "method": "pypdf" if text.strip() else "none"}
+
+def choose_ocr_dpi(width_pt: float, height_pt: float) -> int:
+    """
+    Picks the render resolution for OCRing a page of the given size.
+    
+    Regular pages (A4/Letter) are rendered at OCR_MAX_DPI; larger pages get a lower
+    DPI so the image stays under OCR_MAX_PIXELS, but never below OCR_MIN_DPI.
+    
+    Args:
+        width_pt: Page width in points (1/72 inch)
+        height_pt: Page height in points
+        
+    Returns:
+        The DPI to render the page at
+    """
+    area_sq_inches = max(width_pt, 1.0) * max(height_pt, 1.0) / (72 * 72)
+    dpi = int(math.sqrt(settings.OCR_MAX_PIXELS / area_sq_inches))
+    return max(settings.OCR_MIN_DPI, min(settings.OCR_MAX_DPI, dpi))
 
-def extract_text_with_ocr(file_content: bytes) -> str:
+def _ocr_page_batch(file_content: bytes, jobs: List[tuple]) -> List[tuple]:
+    """
+    Renders and OCRs a batch of pages. Runs inside an OCR worker process.
+    
+    Pages are rendered straight to grayscale pixel buffers and handed to Tesseract
+    without encoding them as image files.
+    
+    Args:
+        file_content: The binary content of the document
+        jobs: (page number, dpi) pairs to OCR
+        
+    Returns:
+        (page number, text) pairs
+    """
+    results = []
+    doc = fitz.open(stream=file_content)
+    try:
+        for page_num, dpi in jobs:
+            pix = doc.load_page(page_num).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            results.append((page_num, pytesseract.image_to_string(img)))
+    finally:
+        doc.close()
+    return results
+
+def _ocr_batch_in_process(file_content: bytes, jobs: List[tuple]) -> Dict[int, str]:
+    """
+    OCRs a batch of pages in the calling thread.
+    
+    If OCR fails (e.g. no tesseract binary), the failure is logged and the pages are
+    left out, so they count as empty and the rest of the document is kept.
+    """
+    try:
+        return dict(_ocr_page_batch(file_content, jobs))
+    except Exception as e:
+        logger.error(f"OCR failed for pages {[page_num for page_num, _ in jobs]}: {e}")
+        return {}
+
+def _ocr_pages(file_content: bytes, jobs: List[tuple]) -> Dict[int, str]:
+    """
+    OCRs pages in parallel on the OCR process pool.
+    
+    Pages are dealt round-robin into one batch per worker, so each worker opens the
+    document once. A single page is OCRed in the calling thread, and so is any batch
+    the pool fails to process. Pages whose OCR fails are missing from the result.
+    
+    Returns:
+        The OCR text by page number
+    """
+    if not jobs:
+        return {}
+    if len(jobs) == 1:
+        return _ocr_batch_in_process(file_content, jobs)
+    
+    batch_count = min(len(jobs), ocr_worker_count())
+    batches = [jobs[i::batch_count] for i in range(batch_count)]
+    try:
+        executor = get_ocr_executor()
+        futures = [executor.submit(_ocr_page_batch, file_content, batch) for batch in batches]
+    except Exception as e:
+        logger.warning(f"OCR process pool unavailable ({e}); OCRing {len(jobs)} pages in-process")
+        return _ocr_batch_in_process(file_content, jobs)
+    
+    texts = {}
+    for future, batch in zip(futures, batches):
+        try:
+            texts.update(future.result())
+        except Exception as e:
+            logger.warning(f"OCR worker failed ({e}); OCRing {len(batch)} pages in-process")
+            texts.update(_ocr_batch_in_process(file_content, batch))
+    return texts
+
+def _plan_pages(doc, skip_text_pages: bool) -> Tuple[Dict[int, str], List[tuple]]:
+    """
+    Reads the text layer of every page and decides which pages need OCR.
+    
+    A page needs OCR when its text layer has fewer than MIN_TEXT_LAYER_CHARS
+    characters (or always, if skip_text_pages is False).
+    
+    Returns:
+        (text layer by page number, (page number, dpi) OCR jobs)
+    """
+    layer_texts = {}
+    ocr_jobs = []
+    for page_num in range(len(doc)):
+        page = doc.load_page(page_num)
+        if skip_text_pages:
+            layer_texts[page_num] = page.get_text("text")
+            if len(layer_texts[page_num].strip()) >= MIN_TEXT_LAYER_CHARS:
+                continue
+        ocr_jobs.append((page_num, choose_ocr_dpi(page.rect.width, page.rect.height)))
+    return layer_texts, ocr_jobs
+
+def extract_text_with_ocr(file_content: bytes, skip_text_pages: bool = True) -> str:
     """
     Extract text from an image or scanned document using OCR.
     
+    Pages that already have a text layer keep that text; the remaining pages are
+    rendered at a DPI suited to their size and OCRed in parallel.
+    
     Args:
         file_content: The binary content of the file
+        skip_text_pages: Use the text layer instead of OCR where a page has one
         
     Returns:
         The extracted text as a string
@@ -167,42 +323,18 @@ def extract_text_with_ocr(file_content: bytes) -> str:
         return ""
         
     try:
-        # Create a temporary file to work with
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-            temp_file.write(file_content)
-            temp_path = temp_file.name
-            
-        full_text = ""
+        # Open the PDF (or image) from memory and decide per page whether it needs OCR
+        doc = fitz.open(stream=file_content)
         try:
-            # Open the PDF with PyMuPDF for rendering
-            doc = fitz.open(temp_path)
-            
-            for page_num in range(len(doc)):
-                # Convert PDF page to image
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
-                
-                # Save image to temporary file
-                img_path = f"{temp_path}_page{page_num}.png"
-                pix.save(img_path)
-                
-                # Process with OCR
-                try:
-                    img = Image.open(img_path)
-                    page_text = pytesseract.image_to_string(img)
-                    full_text += page_text + "\n\n"
-                finally:
-                    # Clean up image file
-                    if os.path.exists(img_path):
-                        os.unlink(img_path)
-                        
-            doc.close()
+            layer_texts, ocr_jobs = _plan_pages(doc, skip_text_pages)
         finally:
-            # Clean up the temporary PDF file
-            os.unlink(temp_path)
-            
-        logger.info("Successfully extracted text using OCR")
-        return full_text
+            doc.close()
+        
+        page_texts = {page_num: text for page_num, text in layer_texts.items() if len(text.strip()) >= MIN_TEXT_LAYER_CHARS}
+        page_texts.update(_ocr_pages(file_content, ocr_jobs))
+        
+        logger.info(f"Successfully extracted text using OCR ({len(ocr_jobs)} of {len(page_texts)} pages OCRed)")
+        return "".join(page_texts[page_num] + "\n\n" for page_num in sorted(page_texts))
         
     except Exception as e:
         logger.error(f"Error performing OCR: {e}")
@@ -428,4 +560,52 @@ def extract_text_from_file(file_content: bytes, filename: str) -> Optional[str]:
             logger.warning(f"Text extraction yielded empty result for {filename}")
         return cleaned_text
     
-    return None 
\ No newline at end of file
+    return None
+
+async def read_upload_file(upload, max_bytes: Optional[int] = None) -> bytes:
+    """
+    Reads an uploaded file in chunks, rejecting it once it exceeds the per-file size cap.
+    
+    By the time an endpoint runs, Starlette has already received the whole request and
+    spooled the file to a temporary file, so this check does not bound what the server
+    receives; UploadSizeLimitMiddleware caps the request body before that. Here the
+    spooled file is copied into a single buffer, with a per-file limit that can differ
+    from the request limit (e.g. zip archives in a bulk upload).
+    
+    Args:
+        upload: A FastAPI/Starlette UploadFile
+        max_bytes: Maximum accepted size (defaults to settings.MAX_UPLOAD_BYTES)
+        
+    Returns:
+        The file content
+        
+    Raises:
+        FileTooLargeError: If the file is larger than max_bytes
+    """
+    limit = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    declared_size = getattr(upload, "size", None)
+    if declared_size is not None and declared_size > limit:
+        raise FileTooLargeError(f"File is larger than the {limit} byte upload limit")
+    
+    content = bytearray()
+    while True:
+        chunk = await upload.read(UPLOAD_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(content) + len(chunk) > limit:
+            raise FileTooLargeError(f"File is larger than the {limit} byte upload limit")
+        content += chunk
+    return bytes(content)
+
+async def extract_text_from_file_async(file_content: bytes, filename: str) -> Optional[str]:
+    """
+    Runs extract_text_from_file on the parse executor so parsing and OCR never block the event loop.
+    
+    Args:
+        file_content: The binary content of the file
+        filename: The name of the file (with extension)
+        
+    Returns:
+        The extracted text as a string, or None if the file type is not supported
+    """
+    return await run_in_parse_executor(extract_text_from_file, file_content, filename)
@@ -0,0 +1,354 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted
+from google.generativeai.types import generation_types
+
+from recruitx_app.core.config import settings
+from recruitx_app.utils.embedding_providers import HashingEmbeddingFunction
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_MODES = ("live", "record", "replay", "synthetic")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CASSETTE_PATH = os.path.join(PROJECT_ROOT, ".llm_cassettes", "cassette.jsonl")
+
+
+class CassetteMissError(KeyError):
+    """Raised in replay mode for a request that is not in the cassette."""
+
+
+def _canonical(value: Any) -> Any:
+    """Converts a request value (prompt parts, tools, configs) to JSON-serializable data with a stable form."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if hasattr(type(value), "to_dict"):  # proto-plus messages
+        return _canonical(type(value).to_dict(value))
+    if hasattr(value, "tobytes") and hasattr(value, "mode"):  # PIL images
+        return {"image_sha256": hashlib.sha256(value.tobytes()).hexdigest(), "size": list(value.size)}
+    return repr(value)
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """Hashes a canonical request, so identical calls map to the same cassette entry."""
+    payload = json.dumps({"kind": kind, "request": request}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    Recorded LLM responses in a JSON Lines file, one {"key", "kind", "request", "response"} per line.
+
+    Entries are appended as they are recorded, so several processes can record into the
+    same file; on load, the last entry recorded for a key wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                            entries[entry["key"]] = entry
+                        except (ValueError, KeyError):
+                            logger.warning(f"Skipping malformed cassette entry at {self.path}:{line_number}.")
+            self._entries = entries
+            logger.info(f"Loaded {len(entries)} recorded LLM responses from {self.path}.")
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the recorded response for a request key, or None."""
+        with self._lock:
+            entry = self._load().get(key)
+        return entry["response"] if entry else None
+
+    def put(self, key: str, kind: str, request: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Records a response and appends it to the cassette file."""
+        entry = {"key": key, "kind": kind, "request": request, "response": response}
+        line = json.dumps(entry, sort_keys=True)
+        with self._lock:
+            self._load()[key] = entry
+            parent_dir = os.path.dirname(self.path)
+            if parent_dir and not os.path.exists(parent_dir):
+                os.makedirs(parent_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+# "key": <placeholder>, "key": "text", "key": [ ... in the JSON templates of the prompts
+_TEMPLATE_FIELD = re.compile(r'"(\w+)"\s*:\s*(<[^>]*>|"[^"]*"|\[|\{|-?\d+(?:\.\d+)?|true|false)')
+_QUOTED_EXAMPLE = re.compile(r"'(\w+)'")
+
+
+def synthetic_value(schema: Dict[str, Any], name: str, rng: random.Random) -> Any:
+    """Generates a value matching an OpenAPI-style schema, as used in Gemini function declarations."""
+    if schema.get("enum"):
+        return rng.choice(schema["enum"])
+    schema_type = str(schema.get("type", "string")).lower()
+    if schema_type == "object":
+        properties = schema.get("properties") or {}
+        required = set(schema.get("required") or [])
+        return {
+            key: synthetic_value(value, key, rng)
+            for key, value in properties.items()
+            if key in required or rng.random() < 0.8
+        }
+    if schema_type == "array":
+        items = schema.get("items") or {"type": "string"}
+        return [synthetic_value(items, name, rng) for _ in range(rng.randint(1, 3))]
+    if schema_type == "integer":
+        return rng.randint(0, 10)
+    if schema_type == "number":
+        return round(rng.uniform(0, 100), 1)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    # Descriptions like "The category (e.g., 'skill', 'experience')" name the expected values
+    examples = _QUOTED_EXAMPLE.findall(schema.get("description") or "")
+    if len(examples) >= 2:
+        return rng.choice(examples)
+    return f"Synthetic {name.replace('_', ' ')} {rng.randint(1, 999)}"
+
+
+def synthetic_json_from_template(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    """Fills the JSON template at the end of a prompt ("key": <integer score 0-100>, ...) with values."""
+    result: Dict[str, Any] = {}
+    for key, placeholder in _TEMPLATE_FIELD.findall(prompt):
+        lowered = placeholder.lower()
+        if placeholder == "[":
+            result[key] = []
+        elif placeholder == "{":
+            result[key] = {}
+        elif placeholder in ("true", "false"):
+            result[key] = rng.random() < 0.5
+        elif placeholder[0] in "-0123456789" or "integer" in lowered or "score" in lowered or "number" in lowered:
+            result[key] = rng.randint(0, 100)
+        else:
+            result[key] = f"Synthetic {key.replace('_', ' ')} {rng.randint(1, 999)}"
+    return result or {"result": f"Synthetic response {rng.randint(1, 999)}"}
+
+
+class LLMTransport:
+    """
+    Serves the Gemini calls of every agent and of the embedding function.
+
+    Modes (LLM_TRANSPORT):
+    - live: calls the API (the default).
+    - record: calls the API and appends every request and response, including
+      function-call payloads, to the cassette.
+    - replay: answers from the cassette without any network access.
+    - synthetic: generates responses; function calls get arguments valid against the
+      declared schema, JSON prompts get their template filled in, embeddings are
+      feature-hashing vectors.
+
+    Replay and synthetic calls block for the configured latency and fail with a 429
+    (ResourceExhausted) at the configured rate, so the key pool, retries and
+    concurrency limits can be load tested without Google in the loop.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        cassette_path: Optional[str] = None,
+        latency_seconds: Optional[float] = None,
+        embedding_latency_seconds: Optional[float] = None,
+        latency_jitter_seconds: Optional[float] = None,
+        rate_limit_rate: Optional[float] = None,
+        replay_miss_synthetic: Optional[bool] = None,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.mode = mode or settings.LLM_TRANSPORT
+        if self.mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown LLM transport '{self.mode}'; expected one of {', '.join(TRANSPORT_MODES)}")
+        self.cassette = CassetteStore(cassette_path or settings.LLM_CASSETTE_PATH or DEFAULT_CASSETTE_PATH)
+        self.latency_seconds = latency_seconds if latency_seconds is not None else settings.LLM_SIMULATED_LATENCY_MS / 1000
+        if embedding_latency_seconds is None and settings.LLM_SIMULATED_EMBEDDING_LATENCY_MS is not None:
+            embedding_latency_seconds = settings.LLM_SIMULATED_EMBEDDING_LATENCY_MS / 1000
+        self.embedding_latency_seconds = (embedding_latency_seconds if embedding_latency_seconds is not None
+                                          else self.latency_seconds)
+        self.latency_jitter_seconds = (latency_jitter_seconds if latency_jitter_seconds is not None
+                                       else settings.LLM_SIMULATED_LATENCY_JITTER_MS / 1000)
+        self.rate_limit_rate = rate_limit_rate if rate_limit_rate is not None else settings.LLM_SIMULATED_RATE_LIMIT_RATE
+        self.replay_miss_synthetic = (replay_miss_synthetic if replay_miss_synthetic is not None
+                                      else settings.LLM_REPLAY_MISS_SYNTHETIC)
+        self._sleep = sleep
+        self._rng = random.Random(seed if seed is not None else settings.LLM_SIMULATION_SEED)
+        self._rng_lock = threading.Lock()
+        self._synthetic_embeddings: Optional[HashingEmbeddingFunction] = None
+        self._supported_kwargs: Dict[Any, set] = {}
+
+    # --- Simulation ---
+
+    def _simulate_service(self, latency_seconds: float) -> None:
+        """Blocks for the injected latency, then fails with a 429 at the injected rate."""
+        with self._rng_lock:
+            delay = latency_seconds + self._rng.uniform(0, self.latency_jitter_seconds)
+            rate_limited = self._rng.random() < self.rate_limit_rate
+        if delay > 0:
+            self._sleep(delay)
+        if rate_limited:
+            raise ResourceExhausted(f"Simulated rate limit (LLM_TRANSPORT={self.mode})")
+
+    # --- generate_content ---
+
+    @staticmethod
+    def _generate_request(model: Any, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        generation_config = dict(getattr(model, "_generation_config", None) or {})
+        generation_config.update(_canonical(kwargs.get("generation_config")) or {})
+        return {
+            "model": getattr(model, "model_name", None),
+            "contents": _canonical(args[0] if args else kwargs.get("contents")),
+            "generation_config": _canonical(generation_config),
+            "tools": _canonical(kwargs.get("tools")),
+            "tool_config": _canonical(kwargs.get("tool_config"))
+        }
+
+    def _live_kwargs(self, method: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Drops arguments the installed SDK does not accept (e.g. tool_config before google-generativeai 0.5)."""
+        func = getattr(method, "__func__", method)
+        supported = self._supported_kwargs.get(func)
+        if supported is None:
+            parameters = inspect.signature(method).parameters
+            if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+                return kwargs
+            supported = set(parameters)
+            self._supported_kwargs[func] = supported
+        unsupported = [key for key in kwargs if key not in supported]
+        if unsupported:
+            logger.debug(f"Installed google-generativeai does not accept {unsupported}; calling without them.")
+            return {key: value for key, value in kwargs.items() if key in supported}
+        return kwargs
+
+    def call_model(self, model: Any, method_name: str, *args, **kwargs) -> Any:
+        """
+        Runs `model.<method_name>(*args, **kwargs)` through the transport (blocking).
+
+        Only generate_content is recorded, replayed or synthesized; other methods always go live.
+        """
+        method = getattr(model, method_name)
+        if method_name != "generate_content" or self.mode == "live":
+            return method(*args, **self._live_kwargs(method, kwargs))
+
+        request = self._generate_request(model, args, kwargs)
+        key = request_key("generate_content", request)
+
+        if self.mode == "record":
+            response = method(*args, **self._live_kwargs(method, kwargs))
+            result = getattr(response, "_result", None)
+            if result is not None:
+                self.cassette.put(key, "generate_content", request, type(result).to_dict(result))
+            return response
+
+        response_data = self.cassette.get(key) if self.mode == "replay" else None
+        if response_data is None:
+            if self.mode == "replay" and not self.replay_miss_synthetic:
+                raise CassetteMissError(f"No recorded response for {request['model']} request {key[:12]}")
+            response_data = self._synthetic_response(request, key)
+        self._simulate_service(self.latency_seconds)
+        return generation_types.GenerateContentResponse.from_response(glm.GenerateContentResponse(response_data))
+
+    @staticmethod
+    def _function_declarations(tools: Any) -> List[Dict[str, Any]]:
+        declarations = []
+        for tool in tools or []:
+            if isinstance(tool, dict):
+                declarations.extend(d for d in tool.get("function_declarations") or [] if isinstance(d, dict))
+        return declarations
+
+    def _synthetic_response(self, request: Dict[str, Any], key: str) -> Dict[str, Any]:
+        """Builds a GenerateContentResponse (as a dict) for a request; the same request always gets the same response."""
+        rng = random.Random(key)
+        declarations = self._function_declarations(request.get("tools"))
+        function_calling = ((request.get("tool_config") or {}).get("function_calling_config") or {})
+        if declarations and str(function_calling.get("mode", "auto")).lower() != "none":
+            allowed = function_calling.get("allowed_function_names") or []
+            declaration = next((d for d in declarations if d.get("name") in allowed), declarations[0])
+            parameters = declaration.get("parameters") or {"type": "object", "properties": {}}
+            part = {"function_call": {"name": declaration["name"], "args": synthetic_value(parameters, declaration["name"], rng)}}
+        else:
+            contents = request.get("contents")
+            prompt = contents if isinstance(contents, str) else json.dumps(contents)
+            generation_config = request.get("generation_config") or {}
+            if generation_config.get("response_mime_type") == "application/json" or "JSON" in prompt:
+                part = {"text": json.dumps(synthetic_json_from_template(prompt, rng))}
+            else:
+                part = {"text": f"Synthetic response {rng.randint(1, 999)} for {request.get('model')}."}
+        return {"candidates": [{"content": {"parts": [part], "role": "model"}, "finish_reason": "STOP", "index": 0}]}
+
+    # --- embed_content ---
+
+    def _get_synthetic_embeddings(self) -> HashingEmbeddingFunction:
+        if self._synthetic_embeddings is None:
+            self._synthetic_embeddings = HashingEmbeddingFunction(dimension=settings.HASHING_EMBEDDING_DIMENSION)
+        return self._synthetic_embeddings
+
+    def embed_content(self, model: str, content: List[str], task_type: Optional[str] = None,
+                      title: Optional[str] = None, client: Any = None) -> Dict[str, List[List[float]]]:
+        """
+        Embeds a batch of texts through the transport (blocking); the same contract as genai.embed_content.
+
+        Recording is per text, so replay does not depend on how texts were batched.
+        """
+        if self.mode == "live":
+            return genai.embed_content(model=model, content=content, task_type=task_type, title=title, client=client)
+
+        texts = list(content)
+        keys = [request_key("embed_content", {"model": model, "task_type": task_type, "title": title, "text": text})
+                for text in texts]
+
+        if self.mode == "record":
+            result = genai.embed_content(model=model, content=texts, task_type=task_type, title=title, client=client)
+            for key, text, embedding in zip(keys, texts, result["embedding"]):
+                self.cassette.put(key, "embed_content", {"model": model, "task_type": task_type, "text": text},
+                                  {"values": list(embedding)})
+            return result
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        if self.mode == "replay":
+            for i, key in enumerate(keys):
+                recorded = self.cassette.get(key)
+                if recorded is not None:
+                    embeddings[i] = recorded["values"]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            if self.mode == "replay" and not self.replay_miss_synthetic:
+                raise CassetteMissError(f"No recorded embeddings for {len(missing)} of {len(texts)} texts")
+            synthetic = self._get_synthetic_embeddings()([texts[i] for i in missing])
+            for i, embedding in zip(missing, synthetic):
+                embeddings[i] = embedding
+        self._simulate_service(self.embedding_latency_seconds)
+        return {"embedding": embeddings}
+
+
+# Instantiate the transport for easy import
+llm_transport = LLMTransport()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Stage:
+    def __init__(self, name: str, func: Callable[..., Awaitable[Any]], depends_on: Tuple[str, ...], optional: bool):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on
+        self.optional = optional
+
+
+class StagePipeline:
+    """
+    A small dependency graph of async stages.
+
+    Every stage starts as soon as the stages it depends on have finished, so independent
+    branches run concurrently. A stage is called with its dependencies' results as keyword
+    arguments (named after the dependency). Failures of required stages cancel the run
+    and are re-raised; an optional stage that fails yields None instead.
+
+    Example:
+        pipeline = StagePipeline()
+        pipeline.add_stage("facets", load_facets)
+        pipeline.add_stage("evidence", retrieve, depends_on=["facets"])
+        results, timings = await pipeline.run()
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, _Stage] = {}
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        optional: bool = False
+    ) -> "StagePipeline":
+        """
+        Adds a stage. Dependencies must already be registered, which keeps the graph acyclic.
+
+        Args:
+            name: Unique stage name, also the keyword its result is passed under
+            func: Coroutine function called with the dependency results
+            depends_on: Names of the stages whose results this stage needs
+            optional: If True a failure is logged and the stage result is None
+
+        Returns:
+            The pipeline, for chaining.
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already registered.")
+        depends_on = tuple(depends_on)
+        missing = [dep for dep in depends_on if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self._stages[name] = _Stage(name, func, depends_on, optional)
+        return self
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Runs every stage.
+
+        Returns:
+            A tuple of (results by stage name, seconds spent in each stage plus "total").
+        """
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        pipeline_start = time.perf_counter()
+
+        async def run_stage(stage: _Stage) -> Any:
+            inputs = {dep: await tasks[dep] for dep in stage.depends_on}
+            start = time.perf_counter()
+            try:
+                result = await stage.func(**inputs)
+            except Exception as e:
+                if not stage.optional:
+                    raise
+                logger.warning(f"Optional pipeline stage '{stage.name}' failed: {e}")
+                result = None
+            finally:
+                timings[stage.name] = round(time.perf_counter() - start, 4)
+            results[stage.name] = result
+            return result
+
+        # Stages are registered after their dependencies, so every awaited task already exists
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        timings["total"] = round(time.perf_counter() - pipeline_start, 4)
+        return results, timings
@@ -1,8 +1,14 @@
+import copy
 import time
 import random
 import logging
+import google.generativeai as genai
 from google.api_core.exceptions import ResourceExhausted, InternalServerError, ServiceUnavailable
 
+from recruitx_app.utils.api_key_pool import api_key_pool, estimate_tokens, mask_key
+from recruitx_app.utils.concurrency import run_in_llm_executor
+from recruitx_app.utils.llm_transport import llm_transport
+
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 5
@@ -11,6 +17,11 @@ MAX_BACKOFF = 60     # seconds
 
 async def call_gemini_with_backoff(api_call_func, *args, **kwargs):
     """Calls a Gemini API function with exponential backoff for rate limiting and server errors."""
+    # Synchronous GenerativeModel methods are scheduled on the API key pool
+    model = getattr(api_call_func, "__self__", None)
+    if isinstance(model, genai.GenerativeModel) and not asyncio.iscoroutinefunction(api_call_func):
+        return await _call_model_with_key_pool(model, api_call_func.__name__, *args, **kwargs)
+
     retries = 0
     backoff_time = INITIAL_BACKOFF
     
@@ -19,13 +30,10 @@ async def call_gemini_with_backoff(api_call_func, *args, **kwargs):
             # If api_call_func is already a coroutine
             if asyncio.iscoroutinefunction(api_call_func):
                 return await api_call_func(*args, **kwargs)
-            # If it's a regular function, run it in an executor (or call directly if synchronous)
+            # Synchronous SDK calls (e.g. model.generate_content) block, so run them on the
+            # bounded LLM executor to keep the event loop free
             else:
-                 # Assuming direct call for synchronous functions like model.generate_content
-                 # Adjust if using truly async library calls
-                 # Note: genai library's generate_content might not be a true async coroutine 
-                 # even if called from an async function. We'll call it directly.
-                 return api_call_func(*args, **kwargs)
+                 return await run_in_llm_executor(api_call_func, *args, **kwargs)
                  
         except ResourceExhausted as e:
             retries += 1
@@ -58,5 +66,59 @@ async def call_gemini_with_backoff(api_call_func, *args, **kwargs):
     # This point should ideally not be reached if MAX_RETRIES is > 0
     raise Exception(f"Failed after {MAX_RETRIES} retries.")
 
+async def _call_model_with_key_pool(model, method_name, *args, **kwargs):
+    """
+    Runs `model.<method_name>` on the key with the most headroom.
+
+    Each attempt uses a copy of the model bound to a client for the scheduled key, so
+    concurrent calls never share or reconfigure a key. A 429 puts that key in cooldown
+    and the call is retried right away on another key; the pool only makes it wait when
+    every key is exhausted. Server errors keep the exponential backoff.
+    """
+    contents = args[0] if args else kwargs.get("contents")
+    estimated_tokens = estimate_tokens(contents)
+    max_rate_limit_retries = max(MAX_RETRIES, len(api_key_pool.keys))
+    rate_limit_retries = 0
+    server_retries = 0
+    backoff_time = INITIAL_BACKOFF
+
+    while True:
+        key = await api_key_pool.acquire(estimated_tokens)
+        actual_tokens = None
+        try:
+            bound_model = copy.copy(model)
+            bound_model._client = api_key_pool.get_client(key)
+            # The transport goes live, or serves recorded/synthetic responses (LLM_TRANSPORT)
+            response = await run_in_llm_executor(llm_transport.call_model, bound_model, method_name, *args, **kwargs)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                actual_tokens = getattr(usage, "prompt_token_count", None)
+            return response
+
+        except ResourceExhausted as e:
+            api_key_pool.report_rate_limited(key)
+            rate_limit_retries += 1
+            if rate_limit_retries >= max_rate_limit_retries:
+                logger.error(f"API rate limit exceeded after {rate_limit_retries} attempts across keys: {e}")
+                raise e
+            logger.warning(f"Rate limit exceeded on key {mask_key(key)}. Rerouting to another key... (Attempt {rate_limit_retries}/{max_rate_limit_retries})")
+
+        except (InternalServerError, ServiceUnavailable) as e:
+            server_retries += 1
+            if server_retries >= MAX_RETRIES:
+                logger.error(f"Server error encountered after {MAX_RETRIES} retries: {e}")
+                raise e
+            wait_time = backoff_time + random.uniform(0, 1)
+            logger.warning(f"Server error ({type(e).__name__}). Retrying in {wait_time:.2f} seconds... (Attempt {server_retries}/{MAX_RETRIES})")
+            await asyncio.sleep(wait_time)
+            backoff_time = min(backoff_time * 2, MAX_BACKOFF)
+
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during API call: {e}")
+            raise e
+
+        finally:
+            api_key_pool.release(key, estimated_tokens, actual_tokens)
+
 # We need asyncio for await asyncio.sleep
 import asyncio 
\ No newline at end of file
@@ -1,108 +1,185 @@
 import re
-from typing import List, Optional
+from bisect import bisect_left
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 import numpy as np # Import numpy
 
+# Separators tried in order, most significant first: paragraphs, lines, sentences, spaces
+SEPARATORS = ["\n\n", "\n", ". ", "? ", "! ", " "]
 
-def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 100) -> List[str]:
+# What counts as one token when chunk sizes are measured in tokens: a word or a punctuation mark
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+LENGTH_UNITS = ("chars", "tokens")
+
+
+class _CharMeasure:
+    """Measures spans of the text in characters."""
+
+    def length(self, start: int, end: int) -> int:
+        return end - start
+
+    def advance(self, start: int, count: int, limit: int) -> int:
+        """Returns the offset `count` units after start, capped at limit."""
+        return min(start + count, limit)
+
+    def back(self, end: int, count: int, floor: int) -> int:
+        """Returns the offset `count` units before end, not below floor."""
+        return max(floor, end - count)
+
+
+class _TokenMeasure:
+    """Measures spans of the text in tokens, counting the tokens that start inside a span."""
+
+    def __init__(self, text: str):
+        self.token_starts = [match.start() for match in TOKEN_PATTERN.finditer(text)]
+
+    def length(self, start: int, end: int) -> int:
+        return bisect_left(self.token_starts, end) - bisect_left(self.token_starts, start)
+
+    def advance(self, start: int, count: int, limit: int) -> int:
+        index = bisect_left(self.token_starts, start) + count
+        if index < len(self.token_starts) and self.token_starts[index] < limit:
+            return self.token_starts[index]
+        return limit
+
+    def back(self, end: int, count: int, floor: int) -> int:
+        index = bisect_left(self.token_starts, end) - count
+        if index < 0:
+            return floor
+        return max(floor, self.token_starts[index])
+
+
+def _skip_whitespace(text: str, start: int, end: int) -> int:
+    while start < end and text[start].isspace():
+        start += 1
+    return start
+
+
+def _content_end(text: str, start: int, end: int) -> int:
+    """Returns the end of the span without its trailing whitespace."""
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
+
+
+def _iter_pieces(text: str, start: int, end: int, level: int, chunk_size: int, piece_size: int, measure) -> Iterator[Tuple[int, int]]:
+    """
+    Yields consecutive (start, end) pieces covering [start, end) that are each at most chunk_size.
+
+    A span that is too large is cut after every occurrence of the separator of this level and
+    only the parts that are still too large go on to the next level. Text without any separator
+    is cut into pieces of piece_size, leaving room for the overlap when the pieces are merged.
+    """
+    content_start = _skip_whitespace(text, start, end)
+    if measure.length(content_start, _content_end(text, content_start, end)) <= chunk_size:
+        yield start, end
+        return
+
+    if level == len(SEPARATORS):
+        position = start
+        while position < end:
+            cut = measure.advance(position, piece_size, end)
+            if cut <= position:
+                cut = end
+            yield position, cut
+            position = cut
+        return
+
+    separator = SEPARATORS[level]
+    position = start
+    while position < end:
+        index = text.find(separator, position, end)
+        cut = end if index == -1 else index + len(separator)
+        yield from _iter_pieces(text, position, cut, level + 1, chunk_size, piece_size, measure)
+        position = cut
+
+
+def iter_text_spans(
+    text: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    length_unit: str = "chars"
+) -> Iterator[Tuple[int, int, str]]:
     """
     Splits text into chunks of a target size with overlap, prioritizing meaningful separators.
 
+    Works in a single pass over offsets into the original text, so the time is linear in the
+    length of the text and chunks are only copied out when they are yielded. Chunks have no
+    leading or trailing whitespace and text[start:end] is exactly the chunk.
+
     Args:
         text: The input text to split.
-        chunk_size: The target maximum size of each chunk (in characters).
-        chunk_overlap: The number of characters to overlap between chunks.
+        chunk_size: The target maximum size of each chunk.
+        chunk_overlap: How much of the end of a chunk is repeated at the start of the next one.
+            The overlap starts at a word boundary where there is one and is capped at
+            half the chunk size.
+        length_unit: "chars" to measure sizes in characters, "tokens" to measure them in
+            words and punctuation marks (see TOKEN_PATTERN).
 
-    Returns:
-        A list of text chunks.
+    Yields:
+        (start, end, chunk text) for every chunk, in order.
     """
+    if length_unit not in LENGTH_UNITS:
+        raise ValueError(f"length_unit must be one of {LENGTH_UNITS}, got '{length_unit}'")
+    if chunk_size <= 0 or chunk_overlap < 0:
+        raise ValueError("chunk_size must be positive and chunk_overlap must not be negative")
     if not text:
-        return []
-
-    # 1. Define separators (order matters - try more significant ones first)
-    separators = ["\n\n", "\n", ". ", "? ", "! ", " "] # Paragraphs, lines, sentences, spaces
-
-    # 2. Initial split using the most significant separator
-    final_chunks = []
-    current_chunks = [text]
-
-    for sep in separators:
-        next_level_chunks = []
-        for chunk in current_chunks:
-            if len(chunk) <= chunk_size:
-                next_level_chunks.append(chunk)
-                continue
-
-            # Split the chunk by the current separator
-            if sep == " ": # Handle space splitting carefully
-                 # Simple split by space if it's the last resort
-                 sub_chunks = chunk.split(sep)
-            else:
-                 # Use regex to keep the separator at the end of the chunk (if possible)
-                 # This helps maintain sentence structure better than simple split
-                 try:
-                     # Use lookbehind assertion to split *after* the separator
-                     sub_chunks = re.split(f'(?<={re.escape(sep)})', chunk)
-                 except re.error: # Handle potential regex errors (e.g., lookbehind limits)
-                      sub_chunks = chunk.split(sep)
-            
-            # Filter out empty strings that might result from splitting
-            sub_chunks = [sub for sub in sub_chunks if sub]
-            next_level_chunks.extend(sub_chunks)
-        
-        current_chunks = next_level_chunks
-        # Check if all chunks are now small enough after this separator
-        if all(len(c) <= chunk_size for c in current_chunks):
-            break # No need for finer-grained splitting
-    
-    # At this point, current_chunks contains pieces split by separators, 
-    # but some might still be larger than chunk_size if separators were sparse.
-
-    # 3. Merge small chunks and handle overlap / oversized chunks
-    merged_chunks = []
-    current_merged_chunk = ""
-    
-    for i, chunk in enumerate(current_chunks):
-        # If a single chunk is already too large, split it forcefully
-        if len(chunk) > chunk_size:
-            # If we have something accumulated, store it first
-            if current_merged_chunk:
-                 merged_chunks.append(current_merged_chunk.strip())
-                 current_merged_chunk = ""
-            
-            # Force split the large chunk
-            for j in range(0, len(chunk), chunk_size - chunk_overlap):
-                sub_chunk = chunk[j : j + chunk_size]
-                merged_chunks.append(sub_chunk.strip())
-            continue # Move to the next original chunk
-
-        # Check if adding the next chunk exceeds the size limit
-        if len(current_merged_chunk) + len(chunk) <= chunk_size:
-            current_merged_chunk += chunk
-        else:
-            # Current merged chunk is full, store it
-            if current_merged_chunk:
-                merged_chunks.append(current_merged_chunk.strip())
-            
-            # Start the new chunk, considering overlap
-            # Find the overlapping part from the *end* of the previous merged chunk
-            overlap_start_index = max(0, len(current_merged_chunk) - chunk_overlap)
-            overlap_text = current_merged_chunk[overlap_start_index:]
-            
-            # Start new chunk with overlap (if any) and the current small chunk
-            current_merged_chunk = overlap_text.strip() + chunk 
-            # If the new chunk itself is now too large after adding overlap (unlikely but possible)
-            # handle it by just starting with the current small chunk
-            if len(current_merged_chunk) > chunk_size:
-                current_merged_chunk = chunk # Fallback
+        return
+    chunk_overlap = min(chunk_overlap, chunk_size // 2)
+
+    measure = _TokenMeasure(text) if length_unit == "tokens" else _CharMeasure()
+    text_end = len(text)
+    window_start: Optional[int] = None  # First non-whitespace offset of the chunk being built
+    window_end = 0  # End of the last non-whitespace of the chunk being built
+
+    for piece_start, piece_end in _iter_pieces(text, 0, text_end, 0, chunk_size, chunk_size - chunk_overlap, measure):
+        piece_content_end = _content_end(text, piece_start, piece_end)
+        if piece_content_end <= piece_start:
+            continue # Whitespace only
+        if window_start is None:
+            window_start = _skip_whitespace(text, piece_start, piece_end)
+            window_end = piece_content_end
+            continue
+        if measure.length(window_start, piece_content_end) <= chunk_size:
+            window_end = piece_content_end
+            continue
+
+        yield window_start, window_end, text[window_start:window_end]
 
-    # Add the last accumulated chunk
-    if current_merged_chunk:
-        merged_chunks.append(current_merged_chunk.strip())
+        # Start the next chunk with the end of this one, unless that leaves no room for the piece
+        next_start = _skip_whitespace(text, piece_start, piece_end)
+        if chunk_overlap:
+            overlap_start = measure.back(window_end, chunk_overlap, window_start)
+            if overlap_start > window_start and not text[overlap_start - 1].isspace():
+                # Do not start in the middle of a word if the overlap contains a word boundary
+                for index in range(overlap_start, window_end):
+                    if text[index].isspace():
+                        overlap_start = index
+                        break
+            overlap_start = _skip_whitespace(text, overlap_start, window_end)
+            if overlap_start < window_end and measure.length(overlap_start, piece_content_end) <= chunk_size:
+                next_start = overlap_start
+        window_start = next_start
+        window_end = piece_content_end
 
-    # Final filter for any empty strings that might have crept in
-    final_chunks = [chunk for chunk in merged_chunks if chunk]
+    if window_start is not None:
+        yield window_start, window_end, text[window_start:window_end]
 
-    return final_chunks 
+
+def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 100, length_unit: str = "chars") -> List[str]:
+    """
+    Splits text into chunks of a target size with overlap, prioritizing meaningful separators.
+
+    Args:
+        text: The input text to split.
+        chunk_size: The target maximum size of each chunk.
+        chunk_overlap: How much of the end of a chunk is repeated at the start of the next one.
+        length_unit: "chars" or "tokens" (see iter_text_spans).
+
+    Returns:
+        A list of text chunks.
+    """
+    return [chunk for _, _, chunk in iter_text_spans(text, chunk_size, chunk_overlap, length_unit)]
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> Optional[float]:
@@ -128,4 +205,93 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> Optional[float]:
         return float(np.clip(similarity, -1.0, 1.0))
     except Exception as e:
         # logger.error(f"Error calculating cosine similarity: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+
+VectorBatch = Union[np.ndarray, Sequence[Sequence[float]]]
+
+
+def normalize_rows(vectors: VectorBatch) -> np.ndarray:
+    """
+    Converts a batch of vectors to a float32 matrix of unit-length rows.
+
+    Args:
+        vectors: A (n, d) array or a list of n equally long vectors
+
+    Returns:
+        A new (n, d) float32 array; all-zero rows stay zero.
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a batch of vectors, got an array of shape {matrix.shape}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def cosine_similarity_matrix(queries: VectorBatch, candidates: VectorBatch, normalized: bool = False) -> np.ndarray:
+    """
+    Calculates the cosine similarity of every query vector to every candidate vector with one matrix product.
+
+    Args:
+        queries: q query vectors, as a (q, d) array or a list of vectors
+        candidates: c candidate vectors, as a (c, d) array or a list of vectors
+        normalized: Whether both inputs are already float32 unit-length rows (see normalize_rows),
+            which skips the conversion and normalization
+
+    Returns:
+        A (q, c) float32 array of similarities in [-1, 1]; zero vectors have similarity 0.
+
+    Raises:
+        ValueError: If the two batches have different dimensions.
+    """
+    if not normalized:
+        queries = normalize_rows(queries)
+        candidates = normalize_rows(candidates)
+    if queries.shape[1] != candidates.shape[1]:
+        raise ValueError(f"Dimension mismatch: queries are {queries.shape[1]}-dim, candidates {candidates.shape[1]}-dim")
+    similarities = queries @ candidates.T
+    # Rounding can put identical vectors slightly outside [-1, 1]
+    np.clip(similarities, -1.0, 1.0, out=similarities)
+    return similarities
+
+
+def top_k_similar(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Selects the k most similar candidates of every query from a similarity matrix.
+
+    Args:
+        similarities: A (q, c) matrix from cosine_similarity_matrix, or a single (c,) row
+        k: Number of candidates to keep per query (fewer if there are fewer candidates)
+
+    Returns:
+        (indices, scores), both shaped (q, k) (or (k,) for a single row), most similar first.
+    """
+    scores = np.asarray(similarities)
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        empty_shape = scores.shape[:-1] + (0,)
+        return np.empty(empty_shape, dtype=np.intp), np.empty(empty_shape, dtype=scores.dtype)
+    # Partial selection first, so only k entries per row are sorted
+    indices = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    top_scores = np.take_along_axis(scores, indices, axis=-1)
+    order = np.argsort(-top_scores, axis=-1, kind="stable")
+    return np.take_along_axis(indices, order, axis=-1), np.take_along_axis(top_scores, order, axis=-1)
+
+
+def indices_above_threshold(similarities: np.ndarray, threshold: float) -> Union[List[int], List[List[int]]]:
+    """
+    Lists, in their original order, the candidates whose similarity is at least the threshold.
+
+    Args:
+        similarities: A (q, c) matrix from cosine_similarity_matrix, or a single (c,) row
+        threshold: Minimum similarity to keep a candidate
+
+    Returns:
+        A list of candidate indices for a single row, or one such list per query.
+    """
+    mask = np.asarray(similarities) >= threshold
+    if mask.ndim == 1:
+        return np.flatnonzero(mask).tolist()
+    return [np.flatnonzero(row).tolist() for row in mask]
@@ -0,0 +1,369 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from recruitx_app.utils.concurrency import run_in_cache_executor
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are purged from the shared store every this many writes
+_PRUNE_EVERY_WRITES = 200
+
+
+class SQLiteCacheStore:
+    """
+    SQLite-backed key/value store shared by every worker process pointed at the same file.
+
+    Values are stored as JSON text together with their expiry time (wall clock) and the
+    time until which they may still be served stale. Pass ":memory:" for a process-local
+    store. Failures are logged and treated as misses so the cache never breaks a request.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connect()
+
+    def _connect(self):
+        """Opens the SQLite file and creates the cache table if needed."""
+        try:
+            if self.db_path != ":memory:":
+                parent_dir = os.path.dirname(self.db_path)
+                if parent_dir and not os.path.exists(parent_dir):
+                    os.makedirs(parent_dir)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            if self.db_path != ":memory:":
+                # WAL lets several uvicorn workers read while one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "stale_until REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn = conn
+            logger.info(f"Shared cache store ready at: {self.db_path}")
+        except Exception as e:
+            logger.error(f"Failed to open shared cache store at {self.db_path}: {e}", exc_info=True)
+            self._conn = None
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[str, float, float]]:
+        """
+        Returns (encoded value, expires_at, stale_until) for a key, or None if absent.
+        """
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, stale_until FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"Shared cache lookup failed: {e}", exc_info=True)
+            return None
+        return tuple(row) if row else None
+
+    def set(self, namespace: str, key: str, encoded: str, expires_at: float, stale_until: float) -> None:
+        """Stores an encoded value, purging rows past their stale window now and then."""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, stale_until) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, encoded, expires_at, stale_until)
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY_WRITES == 0:
+                    self._conn.execute("DELETE FROM cache_entries WHERE stale_until <= ?", (time.time(),))
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist cache entry {namespace}/{key}: {e}", exc_info=True)
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Removes one entry."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+
+    def clear(self, namespace: str) -> None:
+        """Removes every entry of a namespace."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+
+class TieredCache:
+    """
+    Two-tier cache for JSON-serialisable values with stale-while-revalidate.
+
+    The memory tier is an LRU bounded both by entry count and by the encoded size of
+    its values. Misses fall through to an optional shared SQLite tier, so workers
+    reuse each other's results and entries survive restarts. An entry is fresh for
+    `ttl_seconds`; for a further `stale_ttl_seconds` it is still served while
+    `get_or_fetch` refreshes it in the background. Values are stored encoded, so
+    every read returns an independent copy.
+
+    `lookup`/`get`/`set` touch the shared tier synchronously and suit sync callers;
+    async code uses `alookup`/`aset` (and `get_or_fetch`), which run the SQLite I/O
+    on the cache executor so a slow disk never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        stale_ttl_seconds: float = 0.0,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        shared_store: Optional[SQLiteCacheStore] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared_store = shared_store
+        self._clock = clock
+        # key -> (encoded value, expires_at, stale_until)
+        self._memory: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._counters = {
+            "memory_hits": 0,
+            "shared_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _remember(self, key: str, entry: Tuple[str, float, float]) -> None:
+        """Puts an entry in the memory tier and evicts until both bounds hold."""
+        size = len(entry[0])
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[0])
+            if size > self.max_bytes:
+                # Too large for the memory tier; the shared tier still keeps it
+                return
+            self._memory[key] = entry
+            self._memory_bytes += size
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted[0])
+                self._counters["evictions"] += 1
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry[0])
+
+    def _memory_entry(self, key: str, now: float) -> Tuple[Optional[Tuple[str, float, float]], Optional[Tuple[Any, bool]]]:
+        """Returns (memory entry, result); the result is set only for a fresh memory hit."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None and now < entry[1]:
+            self._count("memory_hits")
+            return entry, (json.loads(entry[0]), False)
+        return entry, None
+
+    def _resolve(
+        self,
+        key: str,
+        now: float,
+        entry: Optional[Tuple[str, float, float]],
+        shared_entry: Optional[Tuple[str, float, float]]
+    ) -> Optional[Tuple[Any, bool]]:
+        """Combines the memory entry with the shared tier's copy into a lookup result."""
+        if shared_entry is not None and (entry is None or shared_entry[1] > entry[1]):
+            entry = shared_entry
+            if now < entry[2]:
+                self._remember(key, entry)
+            if now < entry[1]:
+                self._count("shared_hits")
+                return json.loads(entry[0]), False
+
+        if entry is not None and now < entry[2]:
+            self._count("stale_hits")
+            return json.loads(entry[0]), True
+
+        if entry is not None:
+            self._forget(key)
+            self._count("expirations")
+        self._count("misses")
+        return None
+
+    def lookup(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        Looks a key up in the memory tier, then the shared tier.
+
+        Returns:
+            (value, is_stale) for a fresh or stale entry, or None on a miss.
+        """
+        now = self._clock()
+        entry, result = self._memory_entry(key, now)
+        if result is not None:
+            return result
+        # Memory tier missed or only holds a stale copy; another worker may have refreshed it
+        shared_entry = self.shared_store.get(self.namespace, key) if self.shared_store is not None else None
+        return self._resolve(key, now, entry, shared_entry)
+
+    async def alookup(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Like lookup, with the shared-tier read on the cache executor."""
+        now = self._clock()
+        entry, result = self._memory_entry(key, now)
+        if result is not None:
+            return result
+        shared_entry = None
+        if self.shared_store is not None:
+            shared_entry = await run_in_cache_executor(self.shared_store.get, self.namespace, key)
+        return self._resolve(key, now, entry, shared_entry)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Returns a fresh value for key, or default (stale entries count as absent)."""
+        result = self.lookup(key)
+        if result is None or result[1]:
+            return default
+        return result[0]
+
+    def _encode(self, key: str, value: Any, ttl_seconds: Optional[float]) -> Tuple[str, float, float]:
+        """Encodes a value, puts it in the memory tier and returns the entry for the shared tier."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = self._clock()
+        encoded = json.dumps(value, default=str)
+        entry = (encoded, now + ttl, now + ttl + self.stale_ttl_seconds)
+        self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Stores a JSON-serialisable value in both tiers."""
+        entry = self._encode(key, value, ttl_seconds)
+        if self.shared_store is not None:
+            self.shared_store.set(self.namespace, key, *entry)
+
+    async def aset(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Like set, with the shared-tier write on the cache executor."""
+        entry = self._encode(key, value, ttl_seconds)
+        if self.shared_store is not None:
+            await run_in_cache_executor(self.shared_store.set, self.namespace, key, *entry)
+
+    def delete(self, key: str) -> None:
+        """Removes a key from both tiers."""
+        self._forget(key)
+        if self.shared_store is not None:
+            self.shared_store.delete(self.namespace, key)
+
+    def clear(self) -> None:
+        """Removes every entry of this cache from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.shared_store is not None:
+            self.shared_store.clear(self.namespace)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Returns the cached value for key, fetching and storing it on a miss.
+
+        A stale value is returned immediately and refreshed in the background
+        (at most one refresh per key at a time).
+
+        Args:
+            key: Cache key
+            fetch: Coroutine function producing the value
+            cacheable: Decides whether a fetched value is stored (defaults to always)
+
+        Returns:
+            The cached or freshly fetched value.
+        """
+        cached = await self.alookup(key)
+        if cached is not None:
+            value, is_stale = cached
+            if is_stale:
+                self._refresh_in_background(key, fetch, cacheable)
+            return value
+
+        value = await fetch()
+        if cacheable is None or cacheable(value):
+            await self.aset(key, value)
+        return value
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                if cacheable is None or cacheable(value):
+                    await self.aset(key, value)
+                self._count("refreshes")
+            except Exception as e:
+                self._count("refresh_errors")
+                logger.warning(f"Background refresh of {self.namespace}/{key} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.ensure_future(refresh())
+
+    async def wait_for_refreshes(self) -> None:
+        """Waits for the background refreshes that are currently running."""
+        if self._refreshing:
+            await asyncio.gather(*list(self._refreshing.values()), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the memory tier's size."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["entries"] = len(self._memory)
+            stats["bytes"] = self._memory_bytes
+        lookups = stats["memory_hits"] + stats["shared_hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["max_bytes"] = self.max_bytes
+        stats["shared_tier"] = self.shared_store is not None
+        stats["refreshing"] = len(self._refreshing)
+        return stats
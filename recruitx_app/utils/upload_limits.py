@@ -0,0 +1,77 @@
+import logging
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from recruitx_app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def max_request_bytes(path: str) -> int:
+    """Returns the largest multipart request body accepted on a path."""
+    if path.rstrip("/").endswith("/candidates/bulk-upload"):
+        return settings.BULK_INGEST_MAX_REQUEST_BYTES
+    return settings.MAX_UPLOAD_BYTES + settings.UPLOAD_FORM_OVERHEAD_BYTES
+
+
+def _declared_length(scope: Scope) -> Optional[int]:
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _is_multipart(scope: Scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"content-type":
+            return value.lower().startswith(b"multipart/form-data")
+    return False
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Caps the body of multipart (file upload) requests before the form is parsed.
+
+    Starlette spools every uploaded file to a temporary file before the endpoint
+    runs, so a size check in the endpoint only happens after the whole body was
+    received. This middleware rejects a request with 413 as soon as its
+    Content-Length is over the limit, without reading the body, and counts the
+    bytes of bodies sent without one (chunked), stopping at the limit.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_request_bytes(scope["path"])
+        detail = f"Request body is larger than the {limit} byte upload limit"
+        declared = _declared_length(scope)
+        if declared is not None and declared > limit:
+            logger.warning(f"Rejected {scope['path']} upload of {declared} bytes before reading it (limit {limit}).")
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing and turned into a 413 response
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
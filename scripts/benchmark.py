@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+End-to-end performance benchmarks for the scoring pipeline.
+
+Everything runs in a temporary directory (SQLite database, vector store) against the
+synthetic LLM transport, so Gemini calls and embeddings take a fixed, configurable
+latency and never leave the machine. The per-key quotas of the API key pool are lifted,
+so the numbers measure the pipeline rather than the rate limiter.
+
+Benchmarks:
+- parser:    text extraction throughput (MB/s) per file format, and split_text
+- similarity: facet x chunk cosine similarities, one matrix product against the per-pair loop
+- ingestion: bulk CV ingestion throughput (CVs/s), with analysis and indexing
+- retrieval: candidate-filtered vector queries per second
+- single:    ScoringService.generate_score latency (cold, p50, p95)
+- batch:     POST /scores/batch throughput for each batch size
+
+Results are written as JSON. With --baseline, each metric is compared against a
+previous results file and the exit status is 1 if any metric is worse by more than
+--threshold (a fraction, 0.2 = 20%).
+
+Usage:
+    python scripts/benchmark.py --output benchmark_results.json
+    python scripts/benchmark.py --batch-sizes 10 100 --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Adjust path to import from the app
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from benchmark_split_text import make_document
+
+SUITES = ("parser", "similarity", "ingestion", "retrieval", "single", "batch")
+
+SKILLS = [
+    "Python", "Django", "FastAPI", "PostgreSQL", "MongoDB", "Redis", "Docker", "Kubernetes",
+    "AWS", "GCP", "Terraform", "React", "TypeScript", "Java", "Spring", "Go", "Kafka",
+    "Spark", "Airflow", "Machine Learning", "SQL", "CI/CD", "Linux", "GraphQL"
+]
+
+BENCHMARK_JD = """
+Job Title: Senior Python Developer
+
+Responsibilities:
+- Design, build and maintain efficient, reusable, and reliable Python code
+- Implement data storage solutions using PostgreSQL, MongoDB, and Redis
+- Develop and integrate RESTful APIs
+- Perform code reviews and mentor junior developers
+
+Requirements:
+- 5+ years of experience in Python development
+- Proficient with Python web frameworks (Django or FastAPI)
+- Experience with Docker, Kubernetes, and CI/CD pipelines
+- Bachelor's degree in Computer Science or related field
+"""
+
+
+def configure_environment(args: argparse.Namespace, workdir: str) -> None:
+    """Points the app at the temporary directory and the synthetic transport; must run before importing it."""
+    os.environ.update({
+        "LLM_TRANSPORT": "synthetic",
+        "LLM_SIMULATED_LATENCY_MS": str(args.llm_latency_ms),
+        "LLM_SIMULATED_EMBEDDING_LATENCY_MS": str(args.embedding_latency_ms),
+        "LLM_SIMULATED_LATENCY_JITTER_MS": "0",
+        "LLM_SIMULATED_RATE_LIMIT_RATE": "0",
+        "LLM_SIMULATION_SEED": str(args.seed),
+        # Gemini embeddings, served by the transport with the embedding latency
+        "EMBEDDING_PROVIDER": "gemini",
+        "GEMINI_RPM_PER_KEY": "1000000000",
+        "GEMINI_TPM_PER_KEY": "1000000000000",
+        "VECTOR_STORE_PATH": os.path.join(workdir, "vector_store"),
+        "EMBEDDING_CACHE_PATH": ":memory:",
+        "EXTERNAL_API_CACHE_PATH": ":memory:",
+    })
+    # Never send a real key anywhere
+    for i in range(1, 11):
+        os.environ[f"GEMINI_API_KEY_{i}"] = f"benchmark-key-{i}"
+    os.environ.setdefault("GEMINI_EMBEDDING_MODEL", "models/embedding-001")
+    # The SQLite database URL is relative to the working directory
+    os.chdir(workdir)
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    return {"value": round(value, 6), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def make_cv(index: int, rng: random.Random) -> str:
+    """Generates a CV with a random skill set and a few roles."""
+    skills = rng.sample(SKILLS, rng.randint(4, 10))
+    lines = [
+        f"CANDIDATE {index}",
+        f"candidate{index}@example.com | (555) 000-{index:04d}",
+        "",
+        "SUMMARY",
+        f"Software engineer with {rng.randint(1, 15)} years of experience building {rng.choice(skills)} systems.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "WORK EXPERIENCE",
+    ]
+    for role in range(rng.randint(2, 4)):
+        lines.append(f"Engineer {role} | Company {rng.randint(1, 500)} | {2010 + role * 3} - {2013 + role * 3}")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"- Built and operated {rng.choice(skills)} services used by {rng.randint(2, 900)} teams, "
+                         f"working with {rng.choice(skills)} and {rng.choice(skills)}.")
+        lines.append("")
+    lines += ["EDUCATION", "Bachelor of Science in Computer Science"]
+    return "\n".join(lines)
+
+
+# --- Parser ---
+
+def make_parser_inputs(size_bytes: int) -> Dict[str, bytes]:
+    """Encodes the same generated text as each supported format."""
+    text = make_document(size_bytes)
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    inputs = {"txt": text.encode("utf-8")}
+
+    try:
+        import docx
+        document = docx.Document()
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        inputs["docx"] = buffer.getvalue()
+    except ImportError:
+        print("python-docx is not installed; skipping the DOCX parser benchmark.")
+
+    try:
+        import fitz
+        pdf = fitz.open()
+        page_chars = 3000
+        for start in range(0, len(text), page_chars):
+            page = pdf.new_page()
+            page.insert_textbox(fitz.Rect(36, 36, 576, 806), text[start:start + page_chars], fontsize=8)
+        inputs["pdf"] = pdf.tobytes()
+        pdf.close()
+    except ImportError:
+        print("PyMuPDF is not installed; skipping the PDF parser benchmark.")
+
+    inputs["html"] = ("<html><body>" + "".join(f"<p>{p}</p>" for p in paragraphs) + "</body></html>").encode("utf-8")
+    return inputs
+
+
+def bench_parser(args: argparse.Namespace, metrics: Dict[str, Any]) -> None:
+    from recruitx_app.utils.file_parser import extract_text_from_file
+    from recruitx_app.utils.text_utils import split_text
+
+    size_bytes = int(args.parser_mb * 1_000_000)
+    for extension, content in make_parser_inputs(size_bytes).items():
+        best = None
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            text = extract_text_from_file(content, f"benchmark.{extension}")
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if not text:
+            print(f"The {extension} parser returned no text; skipping it.")
+            continue
+        metrics[f"parser_{extension}_mb_per_s"] = metric(len(content) / 1_000_000 / best, "MB/s", True)
+
+    text = make_document(size_bytes)
+    best = None
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        split_text(text, chunk_size=1000, chunk_overlap=100)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    metrics["split_text_mb_per_s"] = metric(size_bytes / 1_000_000 / best, "MB/s", True)
+
+
+def bench_similarity(args: argparse.Namespace, metrics: Dict[str, Any]) -> None:
+    """Times the similarities of evidence validation (20 facets x 300 chunks, 768 dims) both ways."""
+    import numpy as np
+    from recruitx_app.utils.text_utils import cosine_similarity, cosine_similarity_matrix
+
+    rng = np.random.default_rng(args.seed)
+    facets = rng.normal(size=(20, 768)).tolist()
+    chunks = rng.normal(size=(300, 768)).tolist()
+
+    def best_of(func) -> float:
+        best = None
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    pairwise = best_of(lambda: [[cosine_similarity(f, c) for c in chunks] for f in facets])
+    matrix = best_of(lambda: cosine_similarity_matrix(facets, chunks))
+    metrics["similarity_pairwise_ms"] = metric(pairwise * 1000, "ms", False)
+    metrics["similarity_matrix_ms"] = metric(matrix * 1000, "ms", False)
+    metrics["similarity_matrix_speedup"] = metric(pairwise / matrix, "x", True)
+
+
+# --- Ingestion ---
+
+async def bench_ingestion(args: argparse.Namespace, metrics: Dict[str, Any], candidate_count: int) -> None:
+    """Ingests the candidate pool used by the scoring benchmarks."""
+    from recruitx_app.services.bulk_ingestion_service import IngestionFile, bulk_ingestion_service
+
+    rng = random.Random(args.seed)
+    uploads = [(f"cv_{i}.txt", make_cv(i, rng).encode("utf-8")) for i in range(candidate_count)]
+
+    start = time.perf_counter()
+    batch = bulk_ingestion_service.start_batch(uploads, analyze=True)
+    while not batch.is_finished:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    counts = batch.counts()
+    failed = len(batch.files) - counts.get(IngestionFile.STATUS_COMPLETED, 0)
+    if failed:
+        print(f"Ingestion: {failed} of {len(batch.files)} CVs did not complete: {counts}")
+    metrics["ingestion_cvs_per_s"] = metric(len(uploads) / elapsed, "CVs/s", True)
+
+
+# --- Retrieval ---
+
+async def bench_retrieval(args: argparse.Namespace, metrics: Dict[str, Any], candidate_ids: List[int]) -> None:
+    from recruitx_app.services.agentic_rag_service import candidate_chunks_filter
+    from recruitx_app.services.vector_db_service import vector_db_service
+
+    query_embeddings = await vector_db_service.generate_embeddings(
+        [f"{skill} experience" for skill in SKILLS]
+    )
+    rng = random.Random(args.seed)
+    queries = [(rng.choice(query_embeddings), rng.choice(candidate_ids)) for _ in range(args.retrieval_queries)]
+    semaphore = asyncio.Semaphore(args.retrieval_concurrency)
+
+    async def query(embedding, candidate_id):
+        async with semaphore:
+            return await vector_db_service.query_collection(
+                query_embeddings=[embedding],
+                n_results=3,
+                where=candidate_chunks_filter(candidate_id)
+            )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(query(embedding, candidate_id) for embedding, candidate_id in queries))
+    elapsed = time.perf_counter() - start
+
+    if any(result is None for result in results):
+        print("Retrieval: some queries failed.")
+    metrics["retrieval_qps"] = metric(len(queries) / elapsed, "queries/s", True)
+
+
+# --- Scoring ---
+
+async def bench_single_score(args: argparse.Namespace, metrics: Dict[str, Any], job_id: int, candidate_ids: List[int]) -> None:
+    from recruitx_app.core.database import SessionLocal
+    from recruitx_app.services.scoring_service import ScoringService
+
+    scoring_service = ScoringService()
+    latencies = []
+    db = SessionLocal()
+    try:
+        for candidate_id in candidate_ids[:args.single_runs + 1]:
+            start = time.perf_counter()
+            score = await scoring_service.generate_score(db, job_id=job_id, candidate_id=candidate_id)
+            latencies.append(time.perf_counter() - start)
+            if score is None:
+                print(f"Single score: scoring candidate {candidate_id} failed.")
+    finally:
+        db.close()
+
+    # The first run decomposes the JD; later runs reuse the cached facets
+    metrics["single_score_cold_s"] = metric(latencies[0], "s", False)
+    warm = latencies[1:] or latencies
+    metrics["single_score_p50_s"] = metric(statistics.median(warm), "s", False)
+    metrics["single_score_p95_s"] = metric(percentile(warm, 0.95), "s", False)
+
+
+async def bench_batch(args: argparse.Namespace, metrics: Dict[str, Any], job_id: int, candidate_ids: List[int]) -> None:
+    import httpx
+    from recruitx_app.core.config import settings
+    from recruitx_app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for size in args.batch_sizes:
+            batch_ids = candidate_ids[:size]
+            start = time.perf_counter()
+            response = await client.post(
+                f"{settings.API_V1_STR}/scores/batch",
+                json={"job_id": job_id, "candidate_ids": batch_ids}
+            )
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                print(f"Batch of {size}: HTTP {response.status_code}: {response.text[:200]}")
+                continue
+            successful = response.json().get("successful", 0)
+            if successful != len(batch_ids):
+                print(f"Batch of {size}: {successful}/{len(batch_ids)} candidates scored.")
+            metrics[f"batch_{size}_candidates_per_s"] = metric(len(batch_ids) / elapsed, "candidates/s", True)
+
+
+# --- Runner ---
+
+def create_job() -> int:
+    from recruitx_app.core.database import SessionLocal
+    from recruitx_app.models.job import Job
+
+    db = SessionLocal()
+    try:
+        job = Job(title="Senior Python Developer", description_raw=BENCHMARK_JD)
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def candidate_ids_in_db() -> List[int]:
+    from recruitx_app.core.database import SessionLocal
+    from recruitx_app.models.candidate import Candidate
+
+    db = SessionLocal()
+    try:
+        return [candidate_id for (candidate_id,) in db.query(Candidate.id).order_by(Candidate.id)]
+    finally:
+        db.close()
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    from recruitx_app.core.database import Base, engine
+    from recruitx_app.main import app  # noqa: F401 - registers every model on Base
+    from recruitx_app.utils.concurrency import shutdown_executors
+
+    Base.metadata.create_all(bind=engine)
+    metrics: Dict[str, Any] = {}
+    suites = set(args.suites)
+    try:
+        if "parser" in suites:
+            print("Running the parser benchmarks...")
+            bench_parser(args, metrics)
+
+        if "similarity" in suites:
+            print("Running the similarity benchmark...")
+            bench_similarity(args, metrics)
+
+        if suites & {"ingestion", "retrieval", "single", "batch"}:
+            pool_size = max(max(args.batch_sizes), args.single_runs + 1)
+            print(f"Ingesting {pool_size} CVs...")
+            await bench_ingestion(args, metrics, pool_size)
+            if "ingestion" not in suites:
+                metrics.pop("ingestion_cvs_per_s")
+            candidate_ids = candidate_ids_in_db()
+            job_id = create_job()
+
+            if "retrieval" in suites:
+                print("Running the retrieval benchmark...")
+                await bench_retrieval(args, metrics, candidate_ids)
+            if "single" in suites:
+                print("Running the single-score benchmark...")
+                await bench_single_score(args, metrics, job_id, candidate_ids)
+            if "batch" in suites:
+                print(f"Running the batch benchmarks ({', '.join(map(str, args.batch_sizes))} candidates)...")
+                await bench_batch(args, metrics, job_id, candidate_ids)
+    finally:
+        shutdown_executors()
+    return metrics
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Prints each metric next to its baseline value.
+
+    Returns:
+        The names of the metrics that are worse than the baseline by more than the threshold.
+    """
+    regressions = []
+    print(f"\n{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if not previous or not previous["value"]:
+            print(f"{name:<36} {'-':>12} {current['value']:>12.4g} {'new':>8}")
+            continue
+        change = current["value"] / previous["value"] - 1
+        regressed = -change > threshold if current["higher_is_better"] else change > threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<36} {previous['value']:>12.4g} {current['value']:>12.4g} {change:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline against a fake LLM backend")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 1000], help="Candidates per POST /scores/batch")
+    parser.add_argument("--single-runs", type=int, default=10, help="Warm generate_score runs")
+    parser.add_argument("--parser-mb", type=float, default=2.0, help="Document size for the parser benchmarks")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per parser format and similarity variant; the fastest is reported")
+    parser.add_argument("--retrieval-queries", type=int, default=500)
+    parser.add_argument("--retrieval-concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=int, default=50, help="Latency of every generate_content call")
+    parser.add_argument("--embedding-latency-ms", type=int, default=20, help="Latency of every embedding call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    with tempfile.TemporaryDirectory(prefix="recruitx-benchmark-") as workdir:
+        configure_environment(args, workdir)
+        logging.disable(logging.WARNING)
+        metrics = asyncio.run(run_benchmarks(args))
+        os.chdir(project_root)
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "threshold")},
+        "metrics": metrics
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {len(metrics)} metrics to {output}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("Warning: the baseline was recorded with a different configuration.")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regression beyond {args.threshold:.0%}.")
+    else:
+        for name, value in metrics.items():
+            print(f"{name:<36} {value['value']:>12.4g} {value['unit']}")
+
+
+if __name__ == "__main__":
+    main()
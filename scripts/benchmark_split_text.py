@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for utils.text_utils.split_text on large, CV-like inputs.
+
+Splits generated documents of increasing size and prints the time per run and the
+throughput. Linear scaling shows up as a roughly constant MB/s column.
+
+Usage:
+    python scripts/benchmark_split_text.py --sizes 1 2 4 8 --unit chars
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Adjust path to import from the app
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from recruitx_app.utils.text_utils import iter_text_spans
+
+WORDS = [
+    "python", "developer", "experience", "managed", "team", "engineers", "designed",
+    "distributed", "systems", "research", "published", "papers", "machine", "learning",
+    "with", "the", "and", "of", "for", "in"
+]
+
+
+def make_document(size_bytes: int, seed: int = 0) -> str:
+    """Generates text with sentences, line breaks and paragraphs, like a long CV or portfolio."""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))).capitalize() + ". "
+        roll = rng.random()
+        if roll < 0.05:
+            sentence += "\n\n"
+        elif roll < 0.15:
+            sentence += "\n"
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)
+
+
+def benchmark(sizes_mb, unit: str, chunk_size: int, chunk_overlap: int, repeats: int) -> None:
+    print(f"{'size (MB)':>10} {'chunks':>8} {'seconds':>9} {'MB/s':>8}")
+    for size_mb in sizes_mb:
+        text = make_document(int(size_mb * 1_000_000))
+        best = None
+        chunks = 0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            chunks = sum(1 for _ in iter_text_spans(text, chunk_size, chunk_overlap, unit))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{size_mb:>10} {chunks:>8} {best:>9.3f} {size_mb / best:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the text splitter")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8], help="Document sizes in MB")
+    parser.add_argument("--unit", choices=["chars", "tokens"], default="chars", help="Chunk size unit")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per size; the fastest is reported")
+    args = parser.parse_args()
+    benchmark(args.sizes, args.unit, args.chunk_size, args.chunk_overlap, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
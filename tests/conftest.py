@@ -11,11 +11,17 @@ from unittest.mock import MagicMock
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
+# Keep the embedding cache process-local so test runs never read or write the on-disk store
+os.environ.setdefault("EMBEDDING_CACHE_PATH", ":memory:")
+# Same for the external API response cache
+os.environ.setdefault("EXTERNAL_API_CACHE_PATH", ":memory:")
+
 from recruitx_app.main import app
 from recruitx_app.core.config import settings
 from recruitx_app.core.database import Base, get_db
 from recruitx_app.agents.jd_analysis_agent import JDAnalysisAgent
 from recruitx_app.agents.cv_analysis_agent import CVAnalysisAgent
+from recruitx_app.agents.base_agent import gemini_model_registry
 
 # Use in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -63,6 +69,14 @@ Senior Python Developer | FinanceTech Inc. | Jan 2021 - Present
 """
 
 
+# Models cached by one test must not leak into tests that patch GenerativeModel
+@pytest.fixture(autouse=True)
+def clear_gemini_model_registry():
+    gemini_model_registry.clear()
+    yield
+    gemini_model_registry.clear()
+
+
 # Set up the database once for all tests
 @pytest.fixture(scope="session")
 def db_engine():
@@ -190,16 +190,21 @@ class TestScoringPipeline:
         scoring_service.jd_analysis_agent.decompose_job_description = AsyncMock(return_value=MOCK_JOB_FACETS)
         
         # Configure agentic_rag_service responses
-        with patch('recruitx_app.services.scoring_service.agentic_rag_service') as mock_rag:
+        with patch('recruitx_app.services.scoring_service.agentic_rag_service') as mock_rag, \
+             patch('recruitx_app.services.scoring_service.vector_db_service') as mock_vector_db:
             # Mock iterative_retrieve_and_validate
             mock_rag.iterative_retrieve_and_validate = AsyncMock(return_value={0: "Mock evidence"})
             
-            # Mock enrich_evidence_with_external_data
-            mock_rag.enrich_evidence_with_external_data = AsyncMock(return_value={
+            # Mock the job-level external data fetch and its mapping onto the evidence
+            mock_rag.fetch_job_external_data = AsyncMock(return_value={"salary_benchmark": {"data": "sample"}})
+            mock_rag.map_external_data_to_facets = MagicMock(return_value={
                 "external_data": {"salary_benchmark": {"data": "sample"}},
                 "facet_external_data": {"1": {"data": "sample"}}
             })
             
+            # Mock the JD/CV similarity embeddings
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+            
             # Mock synthesize_score
             scoring_service.orchestration_agent.synthesize_score = AsyncMock(return_value=MOCK_SCORE_SYNTHESIS_RESULT)
             
@@ -255,6 +260,8 @@ class TestScoringPipeline:
             mock_score.explanation = "The candidate is an excellent match for the position"
             mock_score.details = MOCK_SCORE_DETAILS
             
+            mock_db.query.return_value.filter.return_value.first.side_effect = [job, candidate]
+            
             with patch('recruitx_app.services.scoring_service.Score', return_value=mock_score):
                 score = await scoring_service.generate_score(mock_db, job_id=job.id, candidate_id=candidate.id)
             
@@ -266,5 +273,7 @@ class TestScoringPipeline:
             # Verify the integration flow
             scoring_service.jd_analysis_agent.decompose_job_description.assert_called_once()
             mock_rag.iterative_retrieve_and_validate.assert_called_once()
-            mock_rag.enrich_evidence_with_external_data.assert_called_once()
+            mock_rag.fetch_job_external_data.assert_called_once()
+            mock_rag.map_external_data_to_facets.assert_called_once()
+            mock_vector_db.generate_embeddings.assert_called_once()
             scoring_service.orchestration_agent.synthesize_score.assert_called_once() 
\ No newline at end of file
@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from recruitx_app.agents.base_agent import BaseAgent, GeminiModelRegistry, DEFAULT_SAFETY_SETTINGS
+from recruitx_app.agents.cv_analysis_agent import CVAnalysisAgent
+from recruitx_app.agents.jd_analysis_agent import JDAnalysisAgent
+from recruitx_app.agents.simple_scoring_agent import OrchestrationAgent
+
+
+class TestGeminiModelRegistry:
+
+    def test_same_configuration_reuses_model(self):
+        """Test that a model is built once per configuration and then reused."""
+        registry = GeminiModelRegistry()
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls:
+            first = registry.get_model("models/test", {"temperature": 0.1, "top_k": 40}, DEFAULT_SAFETY_SETTINGS)
+            # Dict key order does not create a new entry
+            second = registry.get_model("models/test", {"top_k": 40, "temperature": 0.1}, DEFAULT_SAFETY_SETTINGS)
+
+        assert first is second
+        mock_model_cls.assert_called_once()
+        assert "tools" not in mock_model_cls.call_args.kwargs
+
+    def test_different_configurations_get_different_models(self):
+        """Test that model name, generation config and tools are all part of the key."""
+        registry = GeminiModelRegistry()
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls:
+            base = registry.get_model("models/test", {"temperature": 0.1})
+            other_config = registry.get_model("models/test", {"temperature": 0.2})
+            other_name = registry.get_model("models/other", {"temperature": 0.1})
+            with_tools = registry.get_model("models/test", {"temperature": 0.1}, tools=[{"function_declarations": []}])
+
+        assert len({id(base), id(other_config), id(other_name), id(with_tools)}) == 4
+        assert mock_model_cls.call_count == 4
+        assert mock_model_cls.call_args.kwargs["tools"] == [{"function_declarations": []}]
+
+    def test_clear(self):
+        """Test that clearing the registry forces models to be rebuilt."""
+        registry = GeminiModelRegistry()
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls:
+            registry.get_model("models/test")
+            registry.clear()
+            registry.get_model("models/test")
+
+        assert mock_model_cls.call_count == 2
+
+
+class TestBaseAgent:
+
+    def test_agents_share_cached_models(self):
+        """Test that repeated calls and separate agent instances reuse one model."""
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls, \
+             patch('google.generativeai.configure') as mock_configure:
+            first_agent = JDAnalysisAgent()
+            second_agent = JDAnalysisAgent()
+            models = [first_agent._get_gemini_model("decomposition"), second_agent._get_gemini_model(), first_agent._get_gemini_model()]
+
+        assert models[0] is models[1] is models[2]
+        mock_model_cls.assert_called_once()
+        mock_configure.assert_not_called()
+
+    def test_subclass_generation_config(self):
+        """Test that each agent builds its model with its own generation config."""
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls:
+            OrchestrationAgent()._get_gemini_model()
+            CVAnalysisAgent()._get_gemini_model()
+
+        configs = [call.kwargs["generation_config"] for call in mock_model_cls.call_args_list]
+        assert configs[0]["response_mime_type"] == "application/json"
+        assert "response_mime_type" not in configs[1]
+
+    def test_generation_config_override(self):
+        """Test that a per-call generation config override selects a separate model."""
+        agent = BaseAgent(model_name="models/test")
+        with patch('google.generativeai.GenerativeModel', side_effect=lambda *a, **kw: MagicMock()) as mock_model_cls:
+            default_model = agent._get_gemini_model()
+            override_model = agent._get_gemini_model(generation_config={"temperature": 0.9})
+
+        assert default_model is not override_model
+        assert mock_model_cls.call_args.kwargs["generation_config"] == {"temperature": 0.9}
@@ -48,14 +48,14 @@ class TestIntegratedAgent:
     @pytest.mark.asyncio
     async def test_get_gemini_model_success(self, integrated_agent):
         """Test successful creation of a Gemini model."""
-        with patch('recruitx_app.agents.integrated_agent.genai') as mock_genai:
+        with patch('google.generativeai.GenerativeModel') as mock_generative_model:
             mock_model = MagicMock()
-            mock_genai.GenerativeModel.return_value = mock_model
+            mock_generative_model.return_value = mock_model
             
             result = integrated_agent._get_gemini_model()
             
             assert result == mock_model
-            mock_genai.GenerativeModel.assert_called_once()
+            mock_generative_model.assert_called_once()
             
     def test_get_gemini_model_error_with_recovery(self, integrated_agent):
         """Test error recovery when creating a Gemini model."""
@@ -73,7 +73,8 @@ class TestIntegratedAgent:
             # Verify the result - we expect recovery and returning the mock model
             assert result == mock_model
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
             
     def test_get_gemini_model_error_without_recovery(self, integrated_agent):
         """Test handling of persistent errors when creating a Gemini model."""
@@ -93,7 +94,8 @@ class TestIntegratedAgent:
             # Verify that the second exception was raised
             assert "Second API Error" in str(exc_info.value)
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_comprehensive_job_candidate_analysis_success(self, integrated_agent):
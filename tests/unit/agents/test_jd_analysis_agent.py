@@ -858,11 +858,11 @@ class TestJDAnalysisAgent:
                 mock_part.function_call = MagicMock()
                 mock_part.function_call.name = "analyze_job_description"
                 
-                # Create invalid function args (missing required fields that will fail Pydantic validation)
+                # Create invalid function args (wrong types that will fail Pydantic validation;
+                # job_id is added by the agent)
                 invalid_args = {
-                    # Missing job_id
-                    "required_skills": ["Python", "FastAPI"],
-                    # Missing responsibilities and market_insights which are required
+                    "required_skills": "Python, FastAPI",  # Should be a list
+                    "responsibilities": None,
                     "reasoning": "Analysis based on JD"
                 }
                 mock_part.function_call.args = json.dumps(invalid_args)
@@ -10,6 +10,7 @@ from unittest.mock import patch, MagicMock, AsyncMock, Mock, PropertyMock
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.insert(0, project_root)
 
+from recruitx_app.agents.base_agent import BaseAgent
 from recruitx_app.agents.multimodal_agent import MultimodalAgent
 
 class TestMultimodalAgent:
@@ -26,7 +27,7 @@ class TestMultimodalAgent:
         assert multimodal_agent is not None
         assert multimodal_agent.model_name is not None
         assert multimodal_agent.safety_settings is not None
-        assert hasattr(multimodal_agent, '_api_key_index')
+        assert isinstance(multimodal_agent, BaseAgent)
         
     def test_get_gemini_model_success(self, multimodal_agent):
         """Test successful creation of a Gemini multimodal model."""
@@ -58,7 +59,8 @@ class TestMultimodalAgent:
             # Verify the result
             assert result == mock_model
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
             
     def test_get_gemini_model_error_without_recovery(self, multimodal_agent):
         """Test handling of persistent errors when creating a Gemini model."""
@@ -78,7 +80,8 @@ class TestMultimodalAgent:
             # Verify that the second exception was raised
             assert "Second API Error" in str(exc_info.value)
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_analyze_document_with_images_success(self, multimodal_agent):
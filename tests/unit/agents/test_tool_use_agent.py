@@ -10,6 +10,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..
 sys.path.insert(0, project_root)
 
 from recruitx_app.agents.tool_use_agent import ToolUseAgent
+from recruitx_app.utils.llm_transport import LLMTransport
 
 class TestToolUseAgent:
     """Test class for the ToolUseAgent."""
@@ -76,7 +77,8 @@ class TestToolUseAgent:
             # Verify the result
             assert result == mock_model
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
             
     def test_get_gemini_model_error_without_recovery(self, tool_use_agent):
         """Test handling of persistent errors when creating a Gemini model."""
@@ -96,7 +98,8 @@ class TestToolUseAgent:
             # Verify that the second exception was raised
             assert "Second API Error" in str(exc_info.value)
             assert mock_generative_model.call_count == 2
-            mock_configure.assert_called_once()
+            # Models come from the shared registry; the global client is never reconfigured
+            mock_configure.assert_not_called()
     
     def test_fetch_job_requirements(self, tool_use_agent):
         """Test the fetch_job_requirements tool."""
@@ -435,4 +438,25 @@ class TestToolUseAgent:
             # Verify the result has steps
             assert "steps" in result
             assert len(result["steps"]) == 2
-            assert "analysis" in result 
\ No newline at end of file
+            assert "analysis" in result 
+
+    @pytest.mark.asyncio
+    async def test_analyze_job_candidate_match_synthetic_transport(self, tmp_path):
+        """Test the full tool-use flow against synthetic SDK responses (proto function-call args, not JSON strings)."""
+        transport = LLMTransport(mode="synthetic", cassette_path=str(tmp_path / "cassette.jsonl"), seed=3,
+                                 latency_seconds=0, latency_jitter_seconds=0, rate_limit_rate=0)
+        agent = ToolUseAgent()
+        with patch('recruitx_app.utils.retry_utils.llm_transport', transport), \
+             patch.object(agent, 'execute_tool', wraps=agent.execute_tool) as mock_execute_tool:
+            result = await agent.analyze_job_candidate_match(job_id=123, candidate_id=456)
+
+        assert "error" not in result
+        tool_name, args = mock_execute_tool.await_args.args
+        assert tool_name == "fetch_job_requirements"
+        assert isinstance(args["job_id"], (int, float))
+        assert len(result["steps"]) == 1
+        step = result["steps"][0]
+        # The synthetic transport calls the first declared tool with schema-valid arguments
+        assert step["action"] == "Called fetch_job_requirements"
+        assert "required_skills" in step["result"]
+        assert isinstance(result["analysis"], dict)
@@ -0,0 +1,119 @@
+import time
+from unittest.mock import patch, AsyncMock
+
+from sqlalchemy.orm import sessionmaker
+
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.job import Job
+from recruitx_app.models.score import Score
+from recruitx_app.models.scoring_job import ScoringJob
+from recruitx_app.services.scoring_queue_service import scoring_queue_service
+
+
+SHORTLIST = {
+    "job_id": 1,
+    "pool_size": 3,
+    "candidates": [
+        {"candidate_id": 7, "score": 0.9, "embedding_similarity": 0.95, "skill_overlap": 0.8, "matched_skills": ["python"]},
+        {"candidate_id": 3, "score": 0.5, "embedding_similarity": 0.6, "skill_overlap": 0.25, "matched_skills": []}
+    ]
+}
+
+
+def test_shortlist_endpoint(client):
+    """Test that the shortlist endpoint returns the ranked candidates."""
+    with patch("recruitx_app.api.v1.endpoints.scores.shortlist_service.shortlist",
+               new=AsyncMock(return_value=SHORTLIST)) as mock_shortlist:
+        response = client.get("/api/v1/scores/job/1/shortlist?top_k=2")
+    assert response.status_code == 200
+    assert [c["candidate_id"] for c in response.json()["candidates"]] == [7, 3]
+    assert mock_shortlist.await_args.kwargs["top_k"] == 2
+
+
+def test_shortlist_endpoint_unknown_job(client):
+    with patch("recruitx_app.api.v1.endpoints.scores.shortlist_service.shortlist", new=AsyncMock(return_value=None)):
+        response = client.get("/api/v1/scores/job/99/shortlist")
+    assert response.status_code == 404
+
+
+def test_batch_scoring_scores_only_the_shortlist(client):
+    """Test that shortlist_top_k passes only the shortlisted candidates on to LLM scoring."""
+    with patch("recruitx_app.api.v1.endpoints.scores.shortlist_service.shortlist",
+               new=AsyncMock(return_value=SHORTLIST)) as mock_shortlist, \
+         patch("recruitx_app.api.v1.endpoints.scores.bulk_scoring_service.score_candidates",
+               new=AsyncMock(return_value={7: {"status": "success"}, 3: {"status": "success"}})) as mock_score:
+        response = client.post("/api/v1/scores/batch", json={"job_id": 1, "shortlist_top_k": 2})
+
+    assert response.status_code == 200
+    assert mock_shortlist.await_args.kwargs["candidate_ids"] is None
+    assert mock_score.await_args.kwargs["candidate_ids"] == [7, 3]
+    assert response.json()["successful"] == 2
+
+
+def test_batch_scoring_uses_request_database(client, db_session):
+    """Test that bulk scoring opens its sessions on the database of the request's session."""
+    with patch("recruitx_app.api.v1.endpoints.scores.bulk_scoring_service.score_candidates",
+               new=AsyncMock(return_value={1: {"status": "success"}})) as mock_score:
+        response = client.post("/api/v1/scores/batch", json={"job_id": 1, "candidate_ids": [1]})
+
+    assert response.status_code == 200
+    session = mock_score.await_args.kwargs["session_factory"]()
+    try:
+        assert session.get_bind() is db_session.get_bind()
+    finally:
+        session.close()
+
+
+def test_batch_scoring_preparation_failure_is_server_error(client):
+    """Test that a job that exists but cannot be prepared gives a 500, not a 404."""
+    with patch("recruitx_app.api.v1.endpoints.scores.bulk_scoring_service.score_candidates",
+               new=AsyncMock(side_effect=RuntimeError("embedding service down"))):
+        response = client.post("/api/v1/scores/batch", json={"job_id": 1, "candidate_ids": [1]})
+
+    assert response.status_code == 500
+    assert "embedding service down" in response.json()["detail"]
+
+
+def test_batch_scoring_validates_shortlist_top_k(client):
+    """Test that shortlist_top_k has the same bounds as the shortlist endpoint's top_k."""
+    for top_k in (0, 10001):
+        response = client.post("/api/v1/scores/batch", json={"job_id": 1, "shortlist_top_k": top_k})
+        assert response.status_code == 422
+
+
+def test_batch_scoring_requires_candidates_or_shortlist(client):
+    response = client.post("/api/v1/scores/batch", json={"job_id": 1})
+    assert response.status_code == 400
+
+
+def test_generate_score_is_processed_by_running_workers(client, db_session):
+    """Test that a job queued by the (threadpool) endpoint wakes the workers on the event loop."""
+    db_session.add(Job(id=501, title="Backend Engineer", description_raw="Python backend role"))
+    db_session.add(Candidate(id=501, name="Ada", resume_raw="Python for 6 years"))
+    db_session.commit()
+
+    async def generate_score(db, job_id, candidate_id):
+        score = Score(job_id=job_id, candidate_id=candidate_id, overall_score=80.0, explanation="ok")
+        db.add(score)
+        db.commit()
+        db.refresh(score)
+        return score
+
+    request_sessions = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    with patch.object(scoring_queue_service, "session_factory", request_sessions), \
+         patch.object(scoring_queue_service.scoring_service, "generate_score", new=AsyncMock(side_effect=generate_score)):
+        response = client.post("/api/v1/scores/generate", json={"job_id": 501, "candidate_id": 501})
+        assert response.status_code == 202
+        scoring_job_id = response.json()["scoring_job_id"]
+
+        # Poll the database directly: another HTTP request would wake the loop and hide a missed wakeup
+        deadline = time.monotonic() + 5
+        status = None
+        while time.monotonic() < deadline:
+            db_session.expire_all()
+            status = db_session.get(ScoringJob, scoring_job_id).status
+            if status == ScoringJob.STATUS_COMPLETED:
+                break
+            time.sleep(0.05)
+
+    assert status == ScoringJob.STATUS_COMPLETED
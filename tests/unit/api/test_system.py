@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+from recruitx_app.main import app
+
+client = TestClient(app)
+
+def test_cache_stats():
+    """Test the cache stats endpoint reports the external API cache counters."""
+    response = client.get("/api/v1/system/cache/stats")
+    assert response.status_code == 200
+    stats = response.json()["external_api"]
+    for counter in ("memory_hits", "shared_hits", "stale_hits", "misses", "evictions", "hit_ratio", "entries", "bytes"):
+        assert counter in stats
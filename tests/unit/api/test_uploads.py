@@ -0,0 +1,78 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from recruitx_app.core.config import settings
+
+
+def test_candidate_upload_parses_file(client):
+    """Test that an uploaded CV is parsed and passed on to the candidate service."""
+    created = {"id": 1, "name": "Jane Doe", "email": "jane@example.com", "resume_raw": "parsed", "created_at": datetime.now()}
+    with patch("recruitx_app.api.v1.endpoints.candidates.candidate_service.create_candidate", return_value=created) as mock_create:
+        response = client.post(
+            "/api/v1/candidates/upload",
+            data={"name": "Jane Doe", "email": "jane@example.com"},
+            files={"file": ("cv.txt", b"Python developer with 5 years of experience.", "text/plain")}
+        )
+    assert response.status_code == 201
+    assert "Python developer" in mock_create.call_args.kwargs["candidate_data"].resume_raw
+
+
+def test_candidate_upload_rejects_large_file(client):
+    """Test that uploads over the size limit are rejected with 413."""
+    with patch.object(settings, "MAX_UPLOAD_BYTES", 10):
+        response = client.post(
+            "/api/v1/candidates/upload",
+            data={"name": "Jane Doe"},
+            files={"file": ("cv.txt", b"x" * 100, "text/plain")}
+        )
+    assert response.status_code == 413
+
+
+def test_candidate_upload_rejected_before_endpoint_runs(client):
+    """Test that a request declaring more than the upload limit never reaches the endpoint."""
+    with patch.object(settings, "MAX_UPLOAD_BYTES", 10), patch.object(settings, "UPLOAD_FORM_OVERHEAD_BYTES", 100), \
+         patch("recruitx_app.api.v1.endpoints.candidates.read_upload_file") as mock_read:
+        response = client.post(
+            "/api/v1/candidates/upload",
+            data={"name": "Jane Doe"},
+            files={"file": ("cv.txt", b"x" * 1000, "text/plain")}
+        )
+    assert response.status_code == 413
+    mock_read.assert_not_called()
+
+
+def test_job_upload_rejects_large_file(client):
+    """Test that job description uploads over the size limit are rejected with 413."""
+    with patch.object(settings, "MAX_UPLOAD_BYTES", 10):
+        response = client.post(
+            "/api/v1/jobs/upload",
+            data={"title": "Engineer"},
+            files={"file": ("jd.txt", b"x" * 100, "text/plain")}
+        )
+    assert response.status_code == 413
+
+
+def test_bulk_upload_starts_batch(client, db_session):
+    """Test that a multi-file upload is handed to the bulk ingestion service."""
+    with patch("recruitx_app.api.v1.endpoints.candidates.bulk_ingestion_service.start_batch") as mock_start:
+        mock_start.return_value.to_dict.return_value = {
+            "batch_id": "abc", "analyze": False, "total_files": 2, "finished_files": 0,
+            "counts": {"QUEUED": 2}, "is_finished": False, "created_at": datetime.now(), "files": []
+        }
+        response = client.post(
+            "/api/v1/candidates/bulk-upload",
+            data={"analyze": "false"},
+            files=[("files", ("a.txt", b"CV one", "text/plain")), ("files", ("b.txt", b"CV two", "text/plain"))]
+        )
+    assert response.status_code == 202
+    assert response.json()["batch_id"] == "abc"
+    assert mock_start.call_args.args[0] == [("a.txt", b"CV one"), ("b.txt", b"CV two")]
+    assert mock_start.call_args.kwargs["analyze"] is False
+    # The batch opens its sessions on the request's database
+    assert mock_start.call_args.kwargs["session_factory"].kw["bind"] is db_session.get_bind()
+
+
+def test_bulk_upload_progress_not_found(client):
+    """Test that polling an unknown batch returns 404."""
+    response = client.get("/api/v1/candidates/bulk-upload/unknown")
+    assert response.status_code == 404
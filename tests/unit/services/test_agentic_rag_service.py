@@ -8,7 +8,9 @@ from typing import Dict, List, Any, Optional
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.insert(0, project_root)
 
-from recruitx_app.services.agentic_rag_service import AgenticRAGService
+import chromadb
+
+from recruitx_app.services.agentic_rag_service import AgenticRAGService, candidate_chunks_filter
 from recruitx_app.schemas.job import JobRequirementFacet
 
 class TestAgenticRAGService:
@@ -67,8 +69,7 @@ class TestAgenticRAGService:
             
             # Verify the 'where' filter was correctly constructed
             expected_where_filter = {
-                "doc_type": "candidate",
-                "candidate_id": candidate_id
+                "$and": [{"doc_type": "candidate"}, {"candidate_id": candidate_id}]
             }
             
             first_call_args = mock_vector_db.query_collection.call_args_list[0][1]
@@ -141,6 +142,161 @@ class TestAgenticRAGService:
             assert result[0] is None  # Should be None on error
             mock_vector_db.query_collection.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_retrieve_evidence_for_facets_uses_query_embeddings(self, agentic_rag_service):
+        """Test that facet queries are embedded once and the vectors travel with the results."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", context="Backend", is_required=True),
+            JobRequirementFacet(facet_type="skill", detail="Docker", is_required=False)
+        ]
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=[[1.0, 0.0], [0.0, 1.0]])
+            mock_vector_db.query_collection = AsyncMock(side_effect=lambda **kwargs: {
+                'ids': [['id1']],
+                'documents': [['chunk']],
+                'metadatas': [[{}]],
+                'distances': [[0.1]],
+                'embeddings': [[[1.0, 0.0]]]
+            })
+
+            result = await agentic_rag_service.retrieve_evidence_for_facets(candidate_id=1, facets=facets)
+
+            mock_vector_db.generate_embeddings.assert_called_once_with(["Python Backend", "Docker"])
+            first_call_args = mock_vector_db.query_collection.call_args_list[0][1]
+            assert first_call_args['query_embeddings'] == [[1.0, 0.0]]
+            assert first_call_args['include_embeddings'] is True
+            assert result[0]['query_embeddings'] == [[1.0, 0.0]]
+            assert result[1]['query_embeddings'] == [[0.0, 1.0]]
+
+    @pytest.mark.asyncio
+    async def test_validate_evidence_relevance_reuses_stored_embeddings(self, agentic_rag_service):
+        """Test that validation uses the embeddings returned by the query instead of re-embedding."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", is_required=True)
+        ]
+        retrieved_evidence = {
+            0: {
+                'ids': [['id1', 'id2']],
+                'documents': [['Python backend work', 'Unrelated hobby']],
+                'metadatas': [[{'source': 'resume'}, {'source': 'resume'}]],
+                'distances': [[0.1, 0.9]],
+                'embeddings': [[[1.0, 0.0], [0.0, 1.0]]],
+                'query_embeddings': [[1.0, 0.0]]
+            }
+        }
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock()
+
+            result = await agentic_rag_service.validate_evidence_relevance(
+                facets=facets,
+                retrieved_evidence=retrieved_evidence,
+                relevance_threshold=0.5
+            )
+
+            mock_vector_db.generate_embeddings.assert_not_called()
+            assert result[0]['ids'] == [['id1']]
+            assert result[0]['documents'] == [['Python backend work']]
+            assert 'embeddings' not in result[0]
+
+    @pytest.mark.asyncio
+    async def test_validate_evidence_relevance_embeds_only_missing_chunks(self, agentic_rag_service):
+        """Test that only facets without stored chunk embeddings are sent for embedding."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", is_required=True),
+            JobRequirementFacet(facet_type="skill", detail="Go", is_required=True)
+        ]
+        retrieved_evidence = {
+            0: {
+                'ids': [['id1']],
+                'documents': [['Python work']],
+                'metadatas': [[{}]],
+                'distances': [[0.1]],
+                'embeddings': [[[1.0, 0.0]]],
+                'query_embeddings': [[1.0, 0.0]]
+            },
+            1: {
+                'ids': [['id2']],
+                'documents': [['Go services']],
+                'metadatas': [[{}]],
+                'distances': [[0.1]]
+            }
+        }
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=[[0.0, 1.0], [0.0, 1.0]])
+
+            result = await agentic_rag_service.validate_evidence_relevance(
+                facets=facets,
+                retrieved_evidence=retrieved_evidence
+            )
+
+            mock_vector_db.generate_embeddings.assert_called_once_with(["Go", "Go services"])
+            assert result[0]['ids'] == [['id1']]
+            assert result[1]['ids'] == [['id2']]
+
+    @pytest.mark.asyncio
+    async def test_retrieve_evidence_for_facets_batched(self, agentic_rag_service):
+        """Test that batched mode issues a single multi-query and keeps the per-facet result shape."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", is_required=True),
+            JobRequirementFacet(facet_type="skill", detail="Kubernetes", is_required=False),
+            JobRequirementFacet(facet_type="skill", detail="SQL", is_required=False)
+        ]
+        batched_result = {
+            'ids': [['id1', 'id2'], [], ['id3']],
+            'documents': [['Python work', 'Django app'], [], ['Postgres tuning']],
+            'metadatas': [[{}, {}], [], [{}]],
+            'distances': [[0.1, 0.2], [], [0.3]],
+            'embeddings': [[[1.0, 0.0], [0.9, 0.1]], [], [[0.0, 1.0]]]
+        }
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=[[1.0, 0.0], [0.5, 0.5], [0.0, 1.0]])
+            mock_vector_db.query_collection = AsyncMock(return_value=batched_result)
+
+            result = await agentic_rag_service.retrieve_evidence_for_facets(
+                candidate_id=7,
+                facets=facets,
+                batch_queries=True
+            )
+
+            mock_vector_db.generate_embeddings.assert_called_once()
+            mock_vector_db.query_collection.assert_called_once()
+            call_args = mock_vector_db.query_collection.call_args[1]
+            assert call_args['query_embeddings'] == [[1.0, 0.0], [0.5, 0.5], [0.0, 1.0]]
+            assert call_args['where'] == {"$and": [{"doc_type": "candidate"}, {"candidate_id": 7}]}
+
+            assert result[0]['ids'] == [['id1', 'id2']]
+            assert result[0]['embeddings'] == [[[1.0, 0.0], [0.9, 0.1]]]
+            assert result[0]['query_embeddings'] == [[1.0, 0.0]]
+            assert result[1] is None
+            assert result[2]['documents'] == [['Postgres tuning']]
+
+    @pytest.mark.asyncio
+    async def test_retrieve_evidence_for_facets_batched_query_failure(self, agentic_rag_service):
+        """Test that a failed batched query yields None for every facet."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", is_required=True),
+            JobRequirementFacet(facet_type="skill", detail="SQL", is_required=False)
+        ]
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=None)
+            mock_vector_db.query_collection = AsyncMock(return_value=None)
+
+            result = await agentic_rag_service.retrieve_evidence_for_facets(
+                candidate_id=1,
+                facets=facets,
+                batch_queries=True
+            )
+
+            assert result == {0: None, 1: None}
+            call_args = mock_vector_db.query_collection.call_args[1]
+            assert call_args['query_texts'] == ["Python", "SQL"]
+            assert 'query_embeddings' not in call_args
+
     @pytest.mark.asyncio
     async def test_validate_evidence_relevance_successful(self, agentic_rag_service):
         """Test successful validation of evidence relevance."""
@@ -177,37 +333,19 @@ class TestAgenticRAGService:
             }
         }
         
-        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db, \
-             patch('recruitx_app.services.agentic_rag_service.cosine_similarity') as mock_cosine_similarity:
-            # Mock vector_db to return embeddings
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db:
+            # Mock vector_db to return embeddings; only the first chunk of each facet
+            # points the same way as its facet (similarity 1.0), the rest are < 0.5
             mock_vector_db.generate_embeddings = AsyncMock(return_value=[
-                [0.1, 0.2, 0.3],  # Facet 1 embedding
-                [0.4, 0.5, 0.6],  # Facet 2 embedding
-                [0.1, 0.2, 0.3],  # Chunk 1 embedding
-                [0.4, 0.5, 0.6],  # Chunk 2 embedding
-                [0.7, 0.8, 0.9],  # Chunk 3 embedding
-                [0.1, 0.2, 0.3],  # Chunk 4 embedding
-                [0.4, 0.5, 0.6]   # Chunk 5 embedding
+                [1.0, 0.0, 0.0],  # Facet 1 embedding
+                [0.0, 1.0, 0.0],  # Facet 2 embedding
+                [1.0, 0.0, 0.0],  # Chunk 1 embedding
+                [0.3, 0.0, 1.0],  # Chunk 2 embedding
+                [0.0, 1.0, 0.0],  # Chunk 3 embedding
+                [0.0, 2.0, 0.1],  # Chunk 4 embedding
+                [1.0, 0.4, 0.0]   # Chunk 5 embedding
             ])
             
-            # Mock cosine_similarity to return good similarity for the first chunk of each facet
-            # and poor similarity for the rest
-            def mock_similarity(vec1, vec2):
-                # Return high similarity for the first chunk of each facet, low for the rest
-                if vec1 == [0.1, 0.2, 0.3] and vec2 == [0.1, 0.2, 0.3]:
-                    return 0.99  # High similarity for Facet 1, Chunk 1
-                elif vec1 == [0.1, 0.2, 0.3] and vec2 == [0.4, 0.5, 0.6]:
-                    return 0.3   # Low similarity for Facet 1, Chunk 2
-                elif vec1 == [0.1, 0.2, 0.3] and vec2 == [0.7, 0.8, 0.9]:
-                    return 0.2   # Low similarity for Facet 1, Chunk 3
-                elif vec1 == [0.4, 0.5, 0.6] and vec2 == [0.1, 0.2, 0.3]:
-                    return 0.8   # High similarity for Facet 2, Chunk 4
-                elif vec1 == [0.4, 0.5, 0.6] and vec2 == [0.4, 0.5, 0.6]:
-                    return 0.4   # Low similarity for Facet 2, Chunk 5
-                return 0.0
-            
-            mock_cosine_similarity.side_effect = mock_similarity
-            
             # Call the method
             result = await agentic_rag_service.validate_evidence_relevance(
                 facets=facets,
@@ -394,6 +532,48 @@ class TestAgenticRAGService:
             assert mock_vector_db.generate_embeddings.call_count == 2
             mock_vector_db.query_collection.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_iterative_retrieve_and_validate_refinement_reuses_embeddings(self, agentic_rag_service):
+        """Test that refinement compares stored chunk embeddings to the facet's original query embedding."""
+        facets = [
+            JobRequirementFacet(facet_type="skill", detail="Python", is_required=True)
+        ]
+        # Initial retrieval found only irrelevant chunks, but carried the query embedding
+        initial_evidence = {
+            0: {
+                'ids': [['id0']],
+                'documents': [['Unrelated']],
+                'metadatas': [[{}]],
+                'distances': [[0.9]],
+                'embeddings': [[[0.0, 1.0]]],
+                'query_embeddings': [[1.0, 0.0]]
+            }
+        }
+
+        with patch('recruitx_app.services.agentic_rag_service.vector_db_service') as mock_vector_db, \
+             patch.object(AgenticRAGService, 'retrieve_evidence_for_facets', new_callable=AsyncMock) as mock_retrieve, \
+             patch.object(AgenticRAGService, 'validate_evidence_relevance', new_callable=AsyncMock) as mock_validate:
+            mock_retrieve.return_value = initial_evidence
+            mock_validate.return_value = {0: None}
+            mock_vector_db.generate_embeddings = AsyncMock()
+            mock_vector_db.query_collection = AsyncMock(return_value={
+                'ids': [['id1', 'id2']],
+                'documents': [['Python developer', 'Gardening']],
+                'metadatas': [[{}, {}]],
+                'distances': [[0.1, 0.8]],
+                'embeddings': [[[0.9, 0.1], [0.0, 1.0]]]
+            })
+
+            result = await agentic_rag_service.iterative_retrieve_and_validate(
+                candidate_id=1,
+                facets=facets,
+                max_attempts_per_facet=2
+            )
+
+            mock_vector_db.generate_embeddings.assert_not_called()
+            assert mock_vector_db.query_collection.call_args[1]['include_embeddings'] is True
+            assert result[0]['ids'] == [['id1']]
+
     @pytest.mark.asyncio
     async def test_get_external_data_for_job_market_fit(self, agentic_rag_service):
         """Test retrieving external market data for job fit."""
@@ -1111,11 +1291,30 @@ class TestAgenticRAGService:
                 skills=["Python"]
             )
             
-            # Verify the result captures the exception
+            # The failing source is left out; the other lookups still return their data
+            assert result["salary_benchmark"] is None
+            assert result["market_insights"] is not None
+            assert result["skill_trends"] is not None
+            assert result["error"] is None
+            
+    @pytest.mark.asyncio
+    async def test_get_external_data_all_sources_fail(self, agentic_rag_service):
+        """Test that an error is reported when every external source raises."""
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service') as mock_tool:
+            mock_tool.get_salary_benchmark = AsyncMock(side_effect=Exception("Unexpected API failure"))
+            mock_tool.get_job_market_insights = AsyncMock(side_effect=Exception("Unexpected API failure"))
+            mock_tool.get_skill_demand_trends = AsyncMock(side_effect=Exception("Unexpected API failure"))
+            
+            result = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Software Engineer",
+                location="San Francisco",
+                skills=["Python"]
+            )
+            
             assert result["salary_benchmark"] is None
             assert result["market_insights"] is None
             assert result["skill_trends"] is None
-            assert "Unexpected API failure" in result["error"]
+            assert result["error"] == "Failed to retrieve any external data"
             
     @pytest.mark.asyncio
     async def test_get_external_data_with_too_many_skills(self, agentic_rag_service):
@@ -1214,7 +1413,8 @@ class TestAgenticRAGService:
             mock_query.assert_called_once_with(
                 query_texts=[refined_query],
                 n_results=3,
-                where={"doc_type": "candidate", "candidate_id": 1}
+                where={"$and": [{"doc_type": "candidate"}, {"candidate_id": 1}]},
+                include_embeddings=True
             )
             
             # Final result should still contain the initial evidence for the second facet
@@ -1353,4 +1553,159 @@ class TestAgenticRAGService:
             
             # Verify the outcome
             assert 0 in result and result[0] is not None  # Evidence is kept as-is
-            mock_refine.assert_not_called()  # Refinement should not be attempted for optional facets 
\ No newline at end of file
+            mock_refine.assert_not_called()  # Refinement should not be attempted for optional facets 
+
+    @staticmethod
+    def _external_tool_mock(delays=None, failures=()):
+        """Builds an external_tool_service mock whose lookups take `delays[name]` seconds."""
+        import asyncio
+        delays = delays or {}
+        state = {"in_flight": 0, "peak": 0, "calls": 0}
+
+        def lookup(name, data):
+            async def call(**kwargs):
+                state["calls"] += 1
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                try:
+                    await asyncio.sleep(delays.get(name, 0.02))
+                finally:
+                    state["in_flight"] -= 1
+                if name in failures:
+                    return {"success": False, "error": f"{name} unavailable"}
+                return {"success": True, "data": data}
+            return AsyncMock(side_effect=call)
+
+        tool = MagicMock()
+        tool.get_salary_benchmark = lookup("salary", {"salary_data": {"median": 100000}})
+        tool.get_job_market_insights = lookup("market", {"market_data": {"demand_growth_rate": 0.1}})
+        tool.get_skill_demand_trends = lookup("skills", {"skill_trends": []})
+        return tool, state
+
+    @pytest.mark.asyncio
+    async def test_external_lookups_run_concurrently(self, agentic_rag_service):
+        """Test that the three external lookups overlap instead of running one after another."""
+        tool, state = self._external_tool_mock()
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service', tool):
+            result = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location="Remote", skills=["Python"], experience_years=3
+            )
+
+        assert state["peak"] == 3
+        assert result["error"] is None
+        assert result["salary_benchmark"] and result["market_insights"] and result["skill_trends"]
+
+    @pytest.mark.asyncio
+    async def test_slow_external_source_returns_partial_results(self, agentic_rag_service):
+        """Test that a source exceeding its timeout is dropped and the rest are returned uncached."""
+        tool, state = self._external_tool_mock(delays={"market": 1.0})
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service', tool), \
+             patch('recruitx_app.services.agentic_rag_service.settings') as mock_settings:
+            mock_settings.EXTERNAL_DATA_TIMEOUT_SECONDS = 0.1
+            result = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=["Python"]
+            )
+            assert result["market_insights"] is None
+            assert result["salary_benchmark"] is not None
+            assert result["error"] is None
+
+            # Partial results are not cached, so the next call tries every source again
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=["Python"]
+            )
+        assert state["calls"] == 6
+
+    @pytest.mark.asyncio
+    async def test_external_data_cached_per_job_profile(self, agentic_rag_service):
+        """Test that complete results are reused for the same title, location, experience and skills."""
+        tool, state = self._external_tool_mock()
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service', tool):
+            first = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location="Remote", skills=["Python", "SQL"], experience_years=3
+            )
+            second = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="engineer", location="Remote", skills=["Python", "SQL"], experience_years=3
+            )
+            assert state["calls"] == 3
+            assert second == first
+
+            # Callers get copies, so mutating a result does not corrupt the cache
+            second["salary_benchmark"]["salary_data"]["median"] = 0
+            third = await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location="Remote", skills=["Python", "SQL"], experience_years=3
+            )
+            assert third["salary_benchmark"]["salary_data"]["median"] == 100000
+
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location="Remote", skills=["Python", "SQL"], experience_years=5
+            )
+        assert state["calls"] == 6
+
+    @pytest.mark.asyncio
+    async def test_external_data_cache_key_follows_skills_sent(self, agentic_rag_service):
+        """Test that results are cached per skills list as sent, in order and truncated to the top 10."""
+        tool, state = self._external_tool_mock()
+        skills = [f"Skill {i}" for i in range(20)]
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service', tool):
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=skills
+            )
+            # Too many skills for the trends lookup, so only the top 10 are sent and the rest do not matter
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=skills[:10] + ["Other"] * 10
+            )
+            assert state["calls"] == 2
+
+            # A different order changes the top skills sent
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=list(reversed(skills))
+            )
+            assert state["calls"] == 4
+
+            # Same top 10, but the trends lookup gets the full list
+            await agentic_rag_service.get_external_data_for_job_market_fit(
+                job_title="Engineer", location=None, skills=skills[:12]
+            )
+        assert state["calls"] == 7
+        assert tool.get_salary_benchmark.call_args.kwargs["skills"] == skills[:10]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_external_requests_share_lookups(self, agentic_rag_service):
+        """Test that concurrent requests for the same job profile trigger one set of lookups."""
+        import asyncio
+        tool, state = self._external_tool_mock()
+        with patch('recruitx_app.services.agentic_rag_service.external_tool_service', tool):
+            results = await asyncio.gather(*(
+                agentic_rag_service.get_external_data_for_job_market_fit(
+                    job_title="Engineer", location="Remote", skills=["Python"]
+                )
+                for _ in range(5)
+            ))
+
+        assert state["calls"] == 3
+        assert all(result == results[0] for result in results)
+
+
+def test_candidate_chunks_filter_against_chroma():
+    """Test the filter on a real (in-memory) ChromaDB collection, which rejects implicit multi-key filters."""
+    client = chromadb.EphemeralClient()
+    collection = client.get_or_create_collection("test_candidate_chunks_filter")
+    collection.add(
+        ids=["cand_7_a", "cand_7_b", "cand_8_a", "job_7_a"],
+        embeddings=[[1.0, 0.0], [0.9, 0.1], [1.0, 0.0], [1.0, 0.0]],
+        documents=["Python at Acme", "Django at Initech", "Python at Globex", "Python developer wanted"],
+        metadatas=[
+            {"doc_type": "candidate", "candidate_id": 7},
+            {"doc_type": "candidate", "candidate_id": 7},
+            {"doc_type": "candidate", "candidate_id": 8},
+            {"doc_type": "job", "candidate_id": 7}
+        ]
+    )
+    try:
+        results = collection.query(query_embeddings=[[1.0, 0.0]], n_results=3, where=candidate_chunks_filter(7))
+        assert sorted(results["ids"][0]) == ["cand_7_a", "cand_7_b"]
+
+        with pytest.raises(ValueError):
+            collection.query(query_embeddings=[[1.0, 0.0]], n_results=3, where={"doc_type": "candidate", "candidate_id": 7})
+    finally:
+        client.delete_collection("test_candidate_chunks_filter")
@@ -0,0 +1,182 @@
+import asyncio
+import io
+import zipfile
+import pytest
+from unittest.mock import patch, AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import Base
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.schemas.candidate import CandidateAnalysis
+from recruitx_app.services.bulk_ingestion_service import (
+    BulkIngestionService, IngestionFile, candidate_name_from_filename, _DONE
+)
+from recruitx_app.services.candidate_service import CandidateService
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database shared by every session the service opens."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def candidate_service():
+    service = CandidateService()
+    service.get_or_run_analysis = AsyncMock(
+        side_effect=lambda db, candidate_id, text: CandidateAnalysis(candidate_id=candidate_id, skills=["Python"])
+    )
+    return service
+
+
+@pytest.fixture
+def ingestion_service(candidate_service, session_factory):
+    return BulkIngestionService(
+        candidate_service=candidate_service,
+        session_factory=session_factory,
+        parse_workers=2,
+        analysis_workers=2,
+        db_batch_size=10,
+        index_batch_size=10,
+        queue_size=2
+    )
+
+
+@pytest.fixture
+def mock_vector_db():
+    with patch('recruitx_app.services.bulk_ingestion_service.vector_db_service') as vector_db:
+        vector_db.add_document_chunks = AsyncMock(return_value=True)
+        yield vector_db
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+async def run(service, uploads, analyze=True, session_factory=None):
+    batch = service.start_batch(uploads, analyze=analyze, session_factory=session_factory)
+    await asyncio.wait_for(service._tasks[batch.batch_id], timeout=10)
+    return batch
+
+
+@pytest.mark.asyncio
+class TestBulkIngestionService:
+
+    async def test_files_and_archives_are_ingested(self, ingestion_service, session_factory, mock_vector_db):
+        """Test that every CV, including zip members, is stored, analyzed and indexed."""
+        uploads = [
+            ("ada_lovelace.txt", b"Ada Lovelace. Python and mathematics."),
+            ("cvs.zip", make_zip({
+                "grace-hopper.txt": b"Grace Hopper. COBOL compilers.",
+                "nested/linus.txt": b"Linus. C kernels.",
+                "__MACOSX/._linus.txt": b"resource fork"
+            }))
+        ]
+        batch = await run(ingestion_service, uploads)
+
+        assert [f.filename for f in batch.files] == ["ada_lovelace.txt", "cvs.zip/grace-hopper.txt", "cvs.zip/nested/linus.txt"]
+        assert batch.counts() == {IngestionFile.STATUS_COMPLETED: 3}
+        assert batch.is_finished
+
+        db = session_factory()
+        candidates = {c.id: c for c in db.query(Candidate).all()}
+        db.close()
+        assert sorted(c.name for c in candidates.values()) == ["Ada Lovelace", "Grace Hopper", "Linus"]
+        assert all(candidates[f.candidate_id].analysis["skills"] == ["Python"] for f in batch.files)
+        assert all(c.content_hash for c in candidates.values())
+
+        indexed_ids = [i for call in mock_vector_db.add_document_chunks.call_args_list for i in call.kwargs["ids"]]
+        assert len(indexed_ids) == 3
+        assert all(any(i.startswith(f"cand_{f.candidate_id}_") for i in indexed_ids) for f in batch.files)
+
+    async def test_batch_uses_the_given_session_factory(self, ingestion_service, session_factory, mock_vector_db):
+        """Test that a per-batch session_factory is used instead of the service's."""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        request_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        batch = await run(ingestion_service, [("ada.txt", b"Ada. Python.")], session_factory=request_session_factory)
+        assert batch.counts() == {IngestionFile.STATUS_COMPLETED: 1}
+
+        db = request_session_factory()
+        assert [c.analysis["skills"] for c in db.query(Candidate).all()] == [["Python"]]
+        db.close()
+        db = session_factory()
+        assert db.query(Candidate).count() == 0
+        db.close()
+
+    async def test_failures_are_reported_per_file(self, ingestion_service, candidate_service, mock_vector_db):
+        """Test that a file failing in one stage does not affect the rest of the batch."""
+        async def analyze(db, candidate_id, text):
+            return None if "broken analysis" in text else CandidateAnalysis(candidate_id=candidate_id)
+        candidate_service.get_or_run_analysis.side_effect = analyze
+
+        batch = await run(ingestion_service, [
+            ("good.txt", b"A fine CV."),
+            ("image.xyz", b"unsupported format"),
+            ("bad.txt", b"A CV with broken analysis."),
+            ("broken.zip", b"not a zip")
+        ])
+
+        statuses = {f.filename: (f.status, f.error) for f in batch.files}
+        assert statuses["good.txt"] == (IngestionFile.STATUS_COMPLETED, None)
+        assert statuses["image.xyz"] == (IngestionFile.STATUS_FAILED, "Could not extract text from the file")
+        assert statuses["bad.txt"] == (IngestionFile.STATUS_FAILED, "CV analysis failed")
+        assert statuses["broken.zip"][0] == IngestionFile.STATUS_FAILED
+        # The candidate is stored even though its analysis failed
+        assert next(f for f in batch.files if f.filename == "bad.txt").candidate_id is not None
+
+    async def test_store_only_batch_skips_analysis(self, ingestion_service, candidate_service, mock_vector_db):
+        """Test that analyze=False stores the candidates without analyzing or indexing them."""
+        batch = await run(ingestion_service, [("a.txt", b"CV one"), ("b.txt", b"CV two")], analyze=False)
+
+        assert batch.counts() == {IngestionFile.STATUS_COMPLETED: 2}
+        assert all(f.candidate_id for f in batch.files)
+        candidate_service.get_or_run_analysis.assert_not_awaited()
+        mock_vector_db.add_document_chunks.assert_not_awaited()
+
+    async def test_indexing_failure_marks_files_failed(self, ingestion_service, mock_vector_db):
+        """Test that a failed ChromaDB add is reported on the files of that index batch."""
+        mock_vector_db.add_document_chunks.return_value = False
+        batch = await run(ingestion_service, [("a.txt", b"CV one")])
+
+        assert batch.files[0].status == IngestionFile.STATUS_FAILED
+        assert "indexing" in batch.files[0].error
+
+    async def test_next_items_batches_queued_items(self):
+        """Test that a stage takes every already-queued item, up to the batch size, in one go."""
+        queue = asyncio.Queue()
+        for item in [1, 2, 3, _DONE]:
+            queue.put_nowait(item)
+
+        assert await BulkIngestionService._next_items(queue, 2) == ([1, 2], False)
+        assert await BulkIngestionService._next_items(queue, 2) == ([3], True)
+
+    async def test_batch_size_limits(self, ingestion_service):
+        """Test the file count limit and the per-member size limit of archives."""
+        with patch.object(settings, "BULK_INGEST_MAX_FILES", 1):
+            with pytest.raises(ValueError):
+                ingestion_service.start_batch([("a.txt", b"a"), ("b.txt", b"b")])
+
+        with patch.object(settings, "MAX_UPLOAD_BYTES", 10):
+            sources = ingestion_service._expand_uploads([("cvs.zip", make_zip({"big.txt": b"x" * 100}))])
+        assert sources[0][0].status == IngestionFile.STATUS_FAILED
+
+
+def test_candidate_name_from_filename():
+    assert candidate_name_from_filename("cvs.zip/nested/jane_doe-cv.pdf") == "Jane Doe Cv"
+    assert candidate_name_from_filename("___.pdf") == "Unknown Candidate"
@@ -0,0 +1,178 @@
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from recruitx_app.core.database import Base
+from recruitx_app.models.job import Job
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.score import Score
+from recruitx_app.schemas.job import JobRequirementFacet
+from recruitx_app.services.bulk_scoring_service import BulkScoringService
+from recruitx_app.services.scoring_service import ScoringService
+
+FACETS = [
+    JobRequirementFacet(facet_type="skill", detail="Python", is_required=True),
+    JobRequirementFacet(facet_type="experience", detail="5+ years", is_required=False)
+]
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database shared by every session the service opens."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    db.add(Job(id=1, title="Backend Engineer", company="Acme", location="Remote", description_raw="Python backend role"))
+    db.add_all([
+        Candidate(id=1, name="Ada", resume_raw="Python for 6 years"),
+        Candidate(id=2, name="Grace", resume_raw="COBOL and Python"),
+        Candidate(id=3, name="Linus", resume_raw="C kernels")
+    ])
+    db.commit()
+    db.close()
+
+    yield factory
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def bulk_service(session_factory):
+    scoring_service = ScoringService()
+    scoring_service.jd_analysis_agent = MagicMock()
+    scoring_service.jd_analysis_agent.decompose_job_description = AsyncMock(return_value=FACETS)
+    scoring_service.orchestration_agent = MagicMock()
+    scoring_service.orchestration_agent.synthesize_score = AsyncMock(
+        side_effect=lambda **kwargs: {"overall_score": 70.0 + kwargs["candidate_id"], "explanation": "ok"}
+    )
+    return BulkScoringService(scoring_service=scoring_service, session_factory=session_factory)
+
+
+@pytest.fixture
+def mock_rag():
+    with patch('recruitx_app.services.bulk_scoring_service.agentic_rag_service') as rag, \
+         patch('recruitx_app.services.bulk_scoring_service.vector_db_service') as vector_db:
+        rag.embed_facet_queries = AsyncMock(return_value={"Python": [1.0, 0.0], "5+ years": [0.0, 1.0]})
+        rag.fetch_job_external_data = AsyncMock(return_value={
+            "salary_benchmark": None, "market_insights": None, "skill_trends": None,
+            "error": "Failed to retrieve any external data"
+        })
+        rag.iterative_retrieve_and_validate = AsyncMock(return_value={0: {"documents": [["Python"]]}, 1: None})
+        rag.map_external_data_to_facets = MagicMock(side_effect=lambda facets, evidence, data: {
+            "external_data": data, "facet_external_data": {}
+        })
+        vector_db.generate_embeddings = AsyncMock(return_value=[[0.5, 0.5]])
+        yield rag
+
+
+class TestBulkScoringService:
+
+    @pytest.mark.asyncio
+    async def test_job_artifacts_computed_once(self, bulk_service, mock_rag, session_factory):
+        """Test that JD-side work runs once and is shared by every candidate."""
+        results = await bulk_service.score_candidates(job_id=1, candidate_ids=[1, 2, 3])
+
+        assert [r["status"] for r in results.values()] == ["success"] * 3
+        bulk_service.scoring_service.jd_analysis_agent.decompose_job_description.assert_called_once()
+        mock_rag.embed_facet_queries.assert_called_once()
+        mock_rag.fetch_job_external_data.assert_called_once()
+        assert mock_rag.iterative_retrieve_and_validate.call_count == 3
+        assert mock_rag.map_external_data_to_facets.call_count == 3
+
+        for call in mock_rag.iterative_retrieve_and_validate.call_args_list:
+            assert call.kwargs["query_embeddings"] == {"Python": [1.0, 0.0], "5+ years": [0.0, 1.0]}
+        for call in bulk_service.scoring_service.orchestration_agent.synthesize_score.call_args_list:
+            assert call.kwargs["jd_embedding"] == [0.5, 0.5]
+
+        db = session_factory()
+        scores = db.query(Score).order_by(Score.candidate_id).all()
+        assert [s.overall_score for s in scores] == [71.0, 72.0, 73.0]
+        assert results[2]["score_id"] == scores[1].id
+        # Decomposed facets are persisted on the job for later runs
+        assert db.get(Job, 1).requirement_facets[0]["detail"] == "Python"
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_candidate_reported(self, bulk_service, mock_rag, session_factory):
+        """Test that unknown candidates are reported without affecting the others."""
+        results = await bulk_service.score_candidates(job_id=1, candidate_ids=[1, 99, 1])
+
+        assert list(results.keys()) == [1, 99]
+        assert results[1]["status"] == "success"
+        assert results[99]["status"] == "error"
+
+        db = session_factory()
+        assert db.query(Score).count() == 1
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_returns_none(self, bulk_service, mock_rag):
+        """Test that a missing job aborts before any candidate work."""
+        result = await bulk_service.score_candidates(job_id=42, candidate_ids=[1])
+
+        assert result is None
+        mock_rag.iterative_retrieve_and_validate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_preparation_error_is_raised(self, bulk_service, mock_rag):
+        """Test that a failure while preparing the job is not reported as a missing job."""
+        bulk_service.prepare_job_context = AsyncMock(side_effect=RuntimeError("embedding service down"))
+
+        with pytest.raises(RuntimeError, match="embedding service down"):
+            await bulk_service.score_candidates(job_id=1, candidate_ids=[1])
+        mock_rag.iterative_retrieve_and_validate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_session_factory_override(self, bulk_service, mock_rag, session_factory):
+        """Test that every session of a batch comes from the factory passed by the caller."""
+        opened = []
+
+        def request_sessions():
+            opened.append(True)
+            return session_factory()
+
+        bulk_service.session_factory = MagicMock(side_effect=AssertionError("default factory used"))
+        results = await bulk_service.score_candidates(job_id=1, candidate_ids=[1, 2], session_factory=request_sessions)
+
+        assert [r["status"] for r in results.values()] == ["success"] * 2
+        # Job preparation, one session per candidate, and the final save
+        assert len(opened) == 4
+
+    @pytest.mark.asyncio
+    async def test_decomposition_failure_scores(self, bulk_service, mock_rag, session_factory):
+        """Test that a failed decomposition records failure scores without retrieval."""
+        bulk_service.scoring_service.jd_analysis_agent.decompose_job_description.return_value = None
+
+        results = await bulk_service.score_candidates(job_id=1, candidate_ids=[1, 2])
+
+        assert all(r["status"] == "success" and r["overall_score"] == 0.0 for r in results.values())
+        mock_rag.iterative_retrieve_and_validate.assert_not_called()
+        mock_rag.embed_facet_queries.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, bulk_service, mock_rag):
+        """Test that no more than max_concurrency candidates are processed at once."""
+        import asyncio
+        in_flight = 0
+        peak = 0
+
+        async def slow_retrieve(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {0: None, 1: None}
+
+        mock_rag.iterative_retrieve_and_validate.side_effect = slow_retrieve
+
+        await bulk_service.score_candidates(job_id=1, candidate_ids=[1, 2, 3], max_concurrency=2)
+
+        assert peak == 2
@@ -22,6 +22,13 @@ class TestCandidateService:
         mock_session = MagicMock()
         return mock_session
     
+    @pytest.fixture(autouse=True)
+    def mock_document_cache(self):
+        """Start every test with an empty analysis cache."""
+        with patch('recruitx_app.services.candidate_service.document_cache_service') as mock_cache:
+            mock_cache.get_analysis.return_value = None
+            yield mock_cache
+    
     @pytest.fixture
     def candidate_service(self):
         """Create a CandidateService instance for testing."""
@@ -140,12 +147,15 @@ class TestCandidateService:
         }
         
         # Call the method
-        result = candidate_service.create_candidate(mock_db_session, candidate_data)
+        with patch('recruitx_app.services.candidate_service.shortlist_service') as mock_shortlist:
+            result = candidate_service.create_candidate(mock_db_session, candidate_data)
         
         # Verify the DB operations were called correctly
         mock_db_session.add.assert_called_once()
         mock_db_session.commit.assert_called_once()
         mock_db_session.refresh.assert_called_once()
+        # The new candidate must not wait for the shortlist index TTL
+        mock_shortlist.invalidate.assert_called_once()
         
         # Verify the candidate object was created with the right data
         added_candidate = mock_db_session.add.call_args[0][0]
@@ -165,14 +175,14 @@ class TestCandidateService:
         candidate_service.cv_agent.analyze_cv = AsyncMock(return_value=sample_candidate_analysis)
         
         # Mock the vector_db_service
-        with patch('recruitx_app.services.candidate_service.vector_db_service.add_document_chunks', 
+        with patch('recruitx_app.services.candidate_service.vector_db_service.sync_document_chunks', 
                    new_callable=AsyncMock) as mock_add_chunks, \
-             patch('recruitx_app.services.candidate_service.split_text') as mock_split_text:
+             patch('recruitx_app.services.candidate_service.iter_text_spans') as mock_split_text:
             
-            # Configure mock split_text to return some chunks
-            mock_split_text.return_value = ["Chunk 1", "Chunk 2"]
+            # Configure the mock splitter to return some chunks
+            mock_split_text.return_value = [(0, 7, "Chunk 1"), (8, 15, "Chunk 2")]
             
-            # Configure mock add_document_chunks to indicate success
+            # Configure mock sync_document_chunks to indicate success
             mock_add_chunks.return_value = True
             
             # Call the method
@@ -194,14 +204,11 @@ class TestCandidateService:
             # Verify chunking and indexing
             mock_split_text.assert_called_once_with(sample_candidate.resume_raw)
             mock_add_chunks.assert_called_once()
-            # Verify parameters to add_document_chunks
+            # Verify parameters to sync_document_chunks
             call_args = mock_add_chunks.call_args[1]
-            assert "documents" in call_args
-            assert "metadatas" in call_args
-            assert "ids" in call_args
-            assert len(call_args["documents"]) == 2
-            assert len(call_args["metadatas"]) == 2
-            assert len(call_args["ids"]) == 2
+            assert call_args["doc_id"] == "cand_1"
+            assert call_args["documents"] == ["Chunk 1", "Chunk 2"]
+            assert [(m["start_offset"], m["end_offset"]) for m in call_args["metadatas"]] == [(0, 7), (8, 15)]
     
     @pytest.mark.asyncio
     async def test_analyze_cv_candidate_not_found(self, candidate_service, mock_db_session):
@@ -288,14 +295,14 @@ class TestCandidateService:
         candidate_service.cv_agent.analyze_cv = AsyncMock(return_value=sample_candidate_analysis)
         
         # Mock the vector_db_service to fail
-        with patch('recruitx_app.services.candidate_service.vector_db_service.add_document_chunks', 
+        with patch('recruitx_app.services.candidate_service.vector_db_service.sync_document_chunks', 
                    new_callable=AsyncMock) as mock_add_chunks, \
-             patch('recruitx_app.services.candidate_service.split_text') as mock_split_text:
+             patch('recruitx_app.services.candidate_service.iter_text_spans') as mock_split_text:
             
-            # Configure mock split_text to return some chunks
-            mock_split_text.return_value = ["Chunk 1", "Chunk 2"]
+            # Configure the mock splitter to return some chunks
+            mock_split_text.return_value = [(0, 7, "Chunk 1"), (8, 15, "Chunk 2")]
             
-            # Configure mock add_document_chunks to indicate failure
+            # Configure mock sync_document_chunks to indicate failure
             mock_add_chunks.return_value = False
             
             # Call the method
@@ -313,12 +320,49 @@ class TestCandidateService:
         # Mock the CV agent
         candidate_service.cv_agent.analyze_cv = AsyncMock(return_value=sample_candidate_analysis)
         
-        # Mock split_text to return empty list
-        with patch('recruitx_app.services.candidate_service.split_text') as mock_split_text:
+        # Mock the splitter to return no chunks
+        with patch('recruitx_app.services.candidate_service.iter_text_spans') as mock_split_text:
             mock_split_text.return_value = []
             
             # Call the method
             result = await candidate_service.analyze_cv(mock_db_session, candidate_id=1)
             
             # Verify result is still the analysis despite chunking failure
-            assert result == sample_candidate_analysis 
\ No newline at end of file
+            assert result == sample_candidate_analysis
+    
+    @pytest.mark.asyncio
+    async def test_analyze_cv_stores_analysis_in_cache(self, candidate_service, mock_db_session, sample_candidate,
+                                                       sample_candidate_analysis, mock_document_cache):
+        """Test that a fresh analysis is stored under the CV text for later duplicates."""
+        mock_db_session.query.return_value.filter.return_value.first.return_value = sample_candidate
+        candidate_service.cv_agent.analyze_cv = AsyncMock(return_value=sample_candidate_analysis)
+        
+        with patch('recruitx_app.services.candidate_service.vector_db_service.sync_document_chunks',
+                   new_callable=AsyncMock, return_value=True):
+            await candidate_service.analyze_cv(mock_db_session, candidate_id=1)
+        
+        mock_document_cache.store_analysis.assert_called_once()
+        args = mock_document_cache.store_analysis.call_args[0]
+        assert args[1] == sample_candidate.resume_raw
+        assert args[4]["skills"] == sample_candidate_analysis.skills
+    
+    @pytest.mark.asyncio
+    async def test_analyze_cv_reuses_cached_analysis(self, candidate_service, mock_db_session, sample_candidate,
+                                                     sample_candidate_analysis, mock_document_cache):
+        """Test that a CV analysed before is not sent to the LLM again."""
+        sample_candidate.id = 7
+        mock_db_session.query.return_value.filter.return_value.first.return_value = sample_candidate
+        mock_document_cache.get_analysis.return_value = sample_candidate_analysis.model_dump(mode='json')
+        candidate_service.cv_agent.analyze_cv = AsyncMock()
+        
+        with patch('recruitx_app.services.candidate_service.vector_db_service.sync_document_chunks',
+                   new_callable=AsyncMock, return_value=True) as mock_add_chunks:
+            result = await candidate_service.analyze_cv(mock_db_session, candidate_id=7)
+        
+        candidate_service.cv_agent.analyze_cv.assert_not_called()
+        mock_document_cache.store_analysis.assert_not_called()
+        assert result.candidate_id == 7
+        assert result.skills == sample_candidate_analysis.skills
+        assert sample_candidate.analysis["candidate_id"] == 7
+        # The duplicate is still indexed under its own document id
+        assert all(metadata["candidate_id"] == 7 for metadata in mock_add_chunks.call_args[1]["metadatas"])
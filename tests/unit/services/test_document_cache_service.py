@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.document_cache import AnalysisCacheEntry, ExtractedDocument
+from recruitx_app.services.candidate_service import CandidateService
+from recruitx_app.schemas.candidate import CandidateAnalysis
+from recruitx_app.services.document_cache_service import DocumentCacheService, compute_file_hash
+
+
+@pytest.fixture
+def cache_service():
+    return DocumentCacheService()
+
+
+@pytest.mark.asyncio
+class TestDocumentCacheService:
+
+    async def test_duplicate_upload_is_parsed_once(self, cache_service, db_session):
+        """Test that the second upload of the same bytes reuses the extracted text."""
+        file_content = b"%PDF-1.4 same cv bytes"
+        with patch('recruitx_app.services.document_cache_service.extract_text_from_file_async',
+                   new_callable=AsyncMock, return_value="Extracted CV text") as mock_extract:
+            first = await cache_service.extract_text(db_session, file_content, "cv.pdf")
+            second = await cache_service.extract_text(db_session, file_content, "cv-copy.pdf")
+
+        mock_extract.assert_awaited_once()
+        assert first == ("Extracted CV text", compute_file_hash(file_content), False)
+        assert second == ("Extracted CV text", compute_file_hash(file_content), True)
+        cached = db_session.query(ExtractedDocument).filter(
+            ExtractedDocument.content_hash == compute_file_hash(file_content)
+        ).one()
+        assert cached.filename == "cv.pdf"
+        assert cached.hit_count == 1
+
+    async def test_different_content_is_parsed_separately(self, cache_service, db_session):
+        """Test that files with different bytes are not confused."""
+        with patch('recruitx_app.services.document_cache_service.extract_text_from_file_async',
+                   new_callable=AsyncMock, side_effect=["Text A", "Text B"]):
+            text_a, hash_a, _ = await cache_service.extract_text(db_session, b"file a", "a.txt")
+            text_b, hash_b, _ = await cache_service.extract_text(db_session, b"file b", "b.txt")
+
+        assert (text_a, text_b) == ("Text A", "Text B")
+        assert hash_a != hash_b
+
+    async def test_failed_extraction_is_not_cached(self, cache_service, db_session):
+        """Test that unparseable files are retried on the next upload."""
+        with patch('recruitx_app.services.document_cache_service.extract_text_from_file_async',
+                   new_callable=AsyncMock, return_value=None) as mock_extract:
+            await cache_service.extract_text(db_session, b"broken", "broken.pdf")
+            await cache_service.extract_text(db_session, b"broken", "broken.pdf")
+
+        assert mock_extract.await_count == 2
+        assert db_session.query(ExtractedDocument).filter(
+            ExtractedDocument.content_hash == compute_file_hash(b"broken")
+        ).count() == 0
+
+    async def test_analysis_keyed_by_text_and_model(self, cache_service, db_session):
+        """Test that analyses are only reused for the same text and model."""
+        cache_service.store_analysis(db_session, "CV text", AnalysisCacheEntry.TYPE_CV, "model-a", {"skills": ["Python"]})
+        # Storing the same key again is a no-op
+        cache_service.store_analysis(db_session, "CV text", AnalysisCacheEntry.TYPE_CV, "model-a", {"skills": ["Go"]})
+
+        assert cache_service.get_analysis(db_session, "CV text", AnalysisCacheEntry.TYPE_CV, "model-a") == {"skills": ["Python"]}
+        assert cache_service.get_analysis(db_session, "CV text", AnalysisCacheEntry.TYPE_CV, "model-b") is None
+        assert cache_service.get_analysis(db_session, "Other CV", AnalysisCacheEntry.TYPE_CV, "model-a") is None
+
+    async def test_duplicate_cv_skips_llm_analysis(self, db_session):
+        """Test that analysing a second candidate with the same CV text reuses the first analysis."""
+        sample_candidate_analysis = CandidateAnalysis(candidate_id=0, skills=["Python", "SQL"])
+        with patch('recruitx_app.services.candidate_service.CVAnalysisAgent') as mock_agent_class:
+            service = CandidateService()
+        service.cv_agent.model_name = "models/test"
+        service.cv_agent.analyze_cv = AsyncMock(return_value=sample_candidate_analysis)
+        first = Candidate(name="A", email="a@example.com", resume_raw="Identical CV text")
+        second = Candidate(name="B", email="b@example.com", resume_raw="Identical CV text")
+        db_session.add_all([first, second])
+        db_session.commit()
+
+        with patch('recruitx_app.services.candidate_service.vector_db_service.add_document_chunks',
+                   new_callable=AsyncMock, return_value=True):
+            await service.analyze_cv(db_session, first.id)
+            result = await service.analyze_cv(db_session, second.id)
+
+        service.cv_agent.analyze_cv.assert_awaited_once()
+        assert result.candidate_id == second.id
+        assert second.analysis["skills"] == sample_candidate_analysis.skills
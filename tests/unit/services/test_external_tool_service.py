@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 import os
 import sys
 import asyncio
@@ -102,8 +103,7 @@ class TestExternalToolService:
     async def test_cache_functionality(self, external_tool_service):
         """Test that caching works correctly."""
         # Clear the cache first
-        external_tool_service._cache = {}
-        external_tool_service._cache_timestamps = {}
+        external_tool_service._cache.clear()
         
         with patch('aiohttp.ClientSession.request') as mock_request:
             # Configure the mock response
@@ -394,4 +394,137 @@ class TestExternalToolService:
         assert len(result["skill_trends"]) == 3
         assert "industry_insights" in result
         assert "reference_period" in result
-        assert "metadata" in result 
\ No newline at end of file
+        assert "metadata" in result 
+
+def _json_response(payload, status=200, delay=0.0):
+    """Builds an aiohttp-style response context manager returning `payload`."""
+    async def text():
+        if delay:
+            await asyncio.sleep(delay)
+        return json.dumps(payload)
+
+    mock_response = AsyncMock()
+    mock_response.status = status
+    mock_response.text = AsyncMock(side_effect=text)
+    mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_response.__aexit__ = AsyncMock(return_value=None)
+    return mock_response
+
+
+@pytest.mark.asyncio
+class TestExternalToolServiceSession:
+
+    @pytest_asyncio.fixture
+    async def service(self):
+        service = ExternalToolService()
+        yield service
+        await service.close()
+
+    async def test_session_reused_across_requests(self, service):
+        """Test that requests share one long-lived session instead of opening one each."""
+        with patch('aiohttp.ClientSession.request', side_effect=lambda **kwargs: _json_response({"ok": True})):
+            await service._make_api_request("https://api.example.com/a", use_cache=False)
+            session = service._session
+            await service._make_api_request("https://api.example.com/b", use_cache=False)
+
+        assert session is not None
+        assert service._session is session
+        assert not session.closed
+        assert session.connector.limit_per_host == service.limit_per_host
+
+    async def test_start_and_close(self, service):
+        """Test that the lifespan hooks open and close the shared session."""
+        await service.start()
+        session = service._session
+        assert session is not None and not session.closed
+
+        await service.close()
+
+        assert session.closed
+        assert service._session is None
+
+    async def test_identical_in_flight_gets_are_merged(self, service):
+        """Test that concurrent identical GETs send a single request and all get the response."""
+        with patch('aiohttp.ClientSession.request',
+                   side_effect=lambda **kwargs: _json_response({"median": 100}, delay=0.05)) as mock_request:
+            results = await asyncio.gather(*[
+                service._make_api_request(
+                    "https://api.example.com/salary",
+                    params={"title": "Engineer"},
+                    use_cache=False
+                )
+                for _ in range(5)
+            ])
+
+        assert mock_request.call_count == 1
+        assert all(result == {"success": True, "data": {"median": 100}, "error": None} for result in results)
+        # Callers get independent copies
+        results[0]["data"]["median"] = 0
+        assert results[1]["data"]["median"] == 100
+        assert service._in_flight == {}
+
+    async def test_different_requests_are_not_merged(self, service):
+        """Test that GETs with different parameters are sent separately."""
+        with patch('aiohttp.ClientSession.request',
+                   side_effect=lambda **kwargs: _json_response({"ok": True}, delay=0.01)) as mock_request:
+            await asyncio.gather(
+                service._make_api_request("https://api.example.com/salary", params={"title": "A"}, use_cache=False),
+                service._make_api_request("https://api.example.com/salary", params={"title": "B"}, use_cache=False)
+            )
+
+        assert mock_request.call_count == 2
+
+    async def test_per_host_concurrency_is_bounded(self, service):
+        """Test that no more than max_concurrent_per_host requests run against one host."""
+        service.max_concurrent_per_host = 2
+        active = 0
+        peak = 0
+
+        async def text():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return "{}"
+
+        def request(**kwargs):
+            mock_response = _json_response({})
+            mock_response.text = AsyncMock(side_effect=text)
+            return mock_response
+
+        with patch('aiohttp.ClientSession.request', side_effect=request) as mock_request:
+            await asyncio.gather(*[
+                service._make_api_request("https://api.example.com/skills", params={"i": i}, use_cache=False)
+                for i in range(6)
+            ])
+
+        assert mock_request.call_count == 6
+        assert peak == 2
+
+    async def test_expired_response_served_while_refreshing(self, service):
+        """Test that an expired response is returned immediately and refreshed in the background."""
+        service._cache.clear()
+        service._cache.ttl_seconds = 0  # Refreshed entries expire immediately too
+        service._cache.set("salary", {"success": True, "data": {"median": 1}, "error": None}, ttl_seconds=-1)
+        
+        with patch('aiohttp.ClientSession.request',
+                   side_effect=lambda **kwargs: _json_response({"median": 2})) as mock_request:
+            result = await service._make_api_request("https://api.example.com/salary", cache_key="salary")
+            assert result["data"] == {"median": 1}
+            await service._cache.wait_for_refreshes()
+        
+        mock_request.assert_called_once()
+        assert service._cache.lookup("salary")[0]["data"] == {"median": 2}
+    
+    async def test_simulated_data_is_cached(self, service):
+        """Test that repeated simulated lookups reuse the first simulation."""
+        service._cache.clear()
+        service.salary_api_key = None
+        with patch.object(service, '_simulate_salary_data', return_value={"median": 3}) as mock_simulate:
+            first = await service.get_salary_benchmark("Engineer", location="Berlin")
+            second = await service.get_salary_benchmark("Engineer", location="Berlin")
+            await service.get_salary_benchmark("Engineer", location="Paris")
+        
+        assert first == second == {"success": True, "data": {"median": 3}, "error": None}
+        assert mock_simulate.call_count == 2
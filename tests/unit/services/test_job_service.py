@@ -160,13 +160,13 @@ class TestJobService:
         
         # Mock the vector DB service
         mock_vector_db = AsyncMock()
-        mock_vector_db.add_document_chunks.return_value = True
+        mock_vector_db.sync_document_chunks.return_value = True
         monkeypatch.setattr("recruitx_app.services.job_service.vector_db_service", mock_vector_db)
         
         # Mock the text splitter
         def mock_split_text(text, **kwargs):
-            return ["Chunk 1", "Chunk 2"]
-        monkeypatch.setattr("recruitx_app.services.job_service.split_text", mock_split_text)
+            return iter([(0, 7, "Chunk 1"), (8, 15, "Chunk 2")])
+        monkeypatch.setattr("recruitx_app.services.job_service.iter_text_spans", mock_split_text)
         
         # Execute
         result = await job_service.analyze_job(mock_db_session, job_id=1)
@@ -178,7 +178,7 @@ class TestJobService:
             job_description=sample_job["description_raw"]
         )
         mock_db_session.commit.assert_called_once()
-        mock_vector_db.add_document_chunks.assert_called_once()
+        mock_vector_db.sync_document_chunks.assert_called_once()
         # Compare with the model_dump of analysis_result instead of sample_job_analysis
         assert result == analysis_result.model_dump()
     
@@ -265,13 +265,13 @@ class TestJobService:
         
         # Mock the vector DB service to return False (indexing failed)
         mock_vector_db = AsyncMock()
-        mock_vector_db.add_document_chunks.return_value = False
+        mock_vector_db.sync_document_chunks.return_value = False
         monkeypatch.setattr("recruitx_app.services.job_service.vector_db_service", mock_vector_db)
         
         # Mock the text splitter
         def mock_split_text(text, **kwargs):
-            return ["Chunk 1", "Chunk 2"]
-        monkeypatch.setattr("recruitx_app.services.job_service.split_text", mock_split_text)
+            return iter([(0, 7, "Chunk 1"), (8, 15, "Chunk 2")])
+        monkeypatch.setattr("recruitx_app.services.job_service.iter_text_spans", mock_split_text)
         
         # Execute
         result = await job_service.analyze_job(mock_db_session, job_id=1)
@@ -280,7 +280,7 @@ class TestJobService:
         mock_db_session.query.assert_called_once()
         job_service.jd_analysis_agent.analyze_job_description.assert_called_once()
         mock_db_session.commit.assert_called_once()
-        mock_vector_db.add_document_chunks.assert_called_once()
+        mock_vector_db.sync_document_chunks.assert_called_once()
         # The function should still return the analysis even if indexing fails
         assert result == analysis_result.model_dump()
     
@@ -296,8 +296,8 @@ class TestJobService:
         
         # Mock the text splitter to return empty list (chunking failed)
         def mock_split_text(text, **kwargs):
-            return []
-        monkeypatch.setattr("recruitx_app.services.job_service.split_text", mock_split_text)
+            return iter([])
+        monkeypatch.setattr("recruitx_app.services.job_service.iter_text_spans", mock_split_text)
         
         # Execute
         result = await job_service.analyze_job(mock_db_session, job_id=1)
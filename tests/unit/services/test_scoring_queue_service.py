@@ -0,0 +1,218 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from recruitx_app.core.database import Base
+from recruitx_app.models.job import Job
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.score import Score
+from recruitx_app.models.scoring_job import ScoringJob
+from recruitx_app.services.scoring_queue_service import ScoringQueueService
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database shared by every session the queue opens."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    db.add(Job(id=1, title="Backend Engineer", description_raw="Python backend role"))
+    db.add(Candidate(id=1, name="Ada", resume_raw="Python for 6 years"))
+    db.commit()
+    db.close()
+
+    yield factory
+    Base.metadata.drop_all(bind=engine)
+
+
+def make_score_generator(failures: int = 0):
+    """Returns a generate_score mock that fails `failures` times before saving a score."""
+    calls = {"count": 0}
+
+    async def generate_score(db, job_id, candidate_id):
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            return None
+        score = Score(job_id=job_id, candidate_id=candidate_id, overall_score=80.0, explanation="ok")
+        db.add(score)
+        db.commit()
+        db.refresh(score)
+        return score
+
+    return AsyncMock(side_effect=generate_score)
+
+
+@pytest.fixture
+def queue_factory(session_factory):
+    def build(failures: int = 0, max_attempts: int = 3):
+        scoring_service = MagicMock()
+        scoring_service.generate_score = make_score_generator(failures)
+        return ScoringQueueService(
+            scoring_service=scoring_service,
+            session_factory=session_factory,
+            num_workers=2,
+            max_attempts=max_attempts,
+            retry_delay=0
+        )
+    return build
+
+
+class TestScoringQueueService:
+
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_pending_and_workers_complete(self, queue_factory, session_factory):
+        """Test that enqueue returns immediately and workers drain the queue."""
+        queue = queue_factory()
+        await queue.start()
+        try:
+            db = session_factory()
+            scoring_job = queue.enqueue(db, job_id=1, candidate_id=1)
+            assert scoring_job.status == ScoringJob.STATUS_PENDING
+            scoring_job_id = scoring_job.id
+            db.close()
+
+            await queue.join()
+
+            db = session_factory()
+            stored = queue.get_scoring_job(db, scoring_job_id)
+            assert stored.status == ScoringJob.STATUS_COMPLETED
+            assert stored.attempts == 1
+            assert stored.score_id is not None
+            assert stored.completed_at is not None
+            db.close()
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_is_retried(self, queue_factory, session_factory):
+        """Test that a failed attempt is re-queued and succeeds on retry."""
+        queue = queue_factory(failures=1)
+        await queue.start()
+        try:
+            db = session_factory()
+            scoring_job_id = queue.enqueue(db, job_id=1, candidate_id=1).id
+            db.close()
+
+            await queue.join()
+
+            db = session_factory()
+            stored = queue.get_scoring_job(db, scoring_job_id)
+            assert stored.status == ScoringJob.STATUS_COMPLETED
+            assert stored.attempts == 2
+            assert stored.error is None
+            db.close()
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_job_fails_after_max_attempts(self, queue_factory, session_factory):
+        """Test that a job is marked FAILED once its attempts are exhausted."""
+        queue = queue_factory(failures=5, max_attempts=2)
+        await queue.start()
+        try:
+            db = session_factory()
+            scoring_job_id = queue.enqueue(db, job_id=1, candidate_id=1).id
+            db.close()
+
+            await queue.join()
+
+            db = session_factory()
+            stored = queue.get_scoring_job(db, scoring_job_id)
+            assert stored.status == ScoringJob.STATUS_FAILED
+            assert stored.attempts == 2
+            assert stored.error
+            assert queue.scoring_service.generate_score.call_count == 2
+            db.close()
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_unfinished_jobs_recovered_on_start(self, queue_factory, session_factory):
+        """Test that PENDING jobs and RUNNING jobs past their lease are processed when the queue starts."""
+        now = datetime.now(timezone.utc)
+        db = session_factory()
+        db.add_all([
+            ScoringJob(job_id=1, candidate_id=1, status=ScoringJob.STATUS_PENDING, attempts=0, max_attempts=3),
+            ScoringJob(job_id=1, candidate_id=1, status=ScoringJob.STATUS_RUNNING, attempts=1, max_attempts=3,
+                       started_at=now - timedelta(hours=2)),
+            ScoringJob(job_id=1, candidate_id=1, status=ScoringJob.STATUS_COMPLETED, attempts=1, max_attempts=3),
+            # Still within its lease: owned by another live process
+            ScoringJob(job_id=1, candidate_id=1, status=ScoringJob.STATUS_RUNNING, attempts=1, max_attempts=3,
+                       started_at=now - timedelta(seconds=10))
+        ])
+        db.commit()
+        db.close()
+
+        queue = queue_factory()
+        await queue.start()
+        try:
+            await queue.join()
+            assert queue.scoring_service.generate_score.call_count == 2
+
+            db = session_factory()
+            jobs = db.query(ScoringJob).order_by(ScoringJob.id).all()
+            assert [j.status for j in jobs] == [ScoringJob.STATUS_COMPLETED] * 3 + [ScoringJob.STATUS_RUNNING]
+            assert jobs[3].attempts == 1
+            db.close()
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_job_claimed_by_one_worker_only(self, queue_factory, session_factory):
+        """Test that a job delivered to two queues (e.g. two processes) is scored once."""
+        first, second = queue_factory(), queue_factory()
+        db = session_factory()
+        scoring_job_id = first.enqueue(db, job_id=1, candidate_id=1).id
+        db.close()
+
+        await asyncio.gather(first._process(scoring_job_id), second._process(scoring_job_id))
+
+        calls = first.scoring_service.generate_score.call_count + second.scoring_service.generate_score.call_count
+        assert calls == 1
+        db = session_factory()
+        stored = first.get_scoring_job(db, scoring_job_id)
+        assert stored.status == ScoringJob.STATUS_COMPLETED
+        assert stored.attempts == 1
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_candidate_fails_without_retry(self, queue_factory, session_factory):
+        """Test that a job for a candidate that does not exist fails on the first attempt."""
+        queue = queue_factory()
+        await queue.start()
+        try:
+            db = session_factory()
+            scoring_job_id = queue.enqueue(db, job_id=1, candidate_id=999).id
+            db.close()
+
+            await queue.join()
+
+            db = session_factory()
+            stored = queue.get_scoring_job(db, scoring_job_id)
+            assert stored.status == ScoringJob.STATUS_FAILED
+            assert stored.attempts == 1
+            assert "Candidate 999" in stored.error
+            queue.scoring_service.generate_score.assert_not_called()
+            db.close()
+        finally:
+            await queue.stop()
+
+    def test_enqueue_without_running_workers_persists(self, queue_factory, session_factory):
+        """Test that enqueueing before start still records the job for later pickup."""
+        queue = queue_factory()
+        db = session_factory()
+        scoring_job = queue.enqueue(db, job_id=1, candidate_id=1)
+
+        assert scoring_job.id is not None
+        assert db.query(ScoringJob).count() == 1
+        db.close()
@@ -91,6 +91,13 @@ MOCK_CV_ANALYSIS = CandidateAnalysis(
 )
 
 class TestScoringService:
+    @pytest.fixture(autouse=True)
+    def mock_vector_db(self):
+        """Keep the JD/CV similarity stage away from the embedding API."""
+        with patch('recruitx_app.services.scoring_service.vector_db_service') as mock_vector_db:
+            mock_vector_db.generate_embeddings = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+            yield mock_vector_db
+
     @pytest.fixture
     def mock_db_session(self):
         """Create a mock database session."""
@@ -160,7 +167,8 @@ class TestScoringService:
         with patch('recruitx_app.services.scoring_service.agentic_rag_service') as mock_rag:
             # Configure mock responses
             mock_rag.iterative_retrieve_and_validate = AsyncMock(return_value={0: "Mock evidence"})
-            mock_rag.enrich_evidence_with_external_data = AsyncMock(return_value={
+            mock_rag.fetch_job_external_data = AsyncMock(return_value={"salary_benchmark": {"data": "sample"}})
+            mock_rag.map_external_data_to_facets = MagicMock(return_value={
                 "external_data": {"salary_benchmark": {"data": "sample"}},
                 "facet_external_data": {"1": {"data": "sample"}}
             })
@@ -183,7 +191,8 @@ class TestScoringService:
             
             # Verify agentic_rag_service calls
             mock_rag.iterative_retrieve_and_validate.assert_called_once()
-            mock_rag.enrich_evidence_with_external_data.assert_called_once()
+            mock_rag.fetch_job_external_data.assert_called_once()
+            mock_rag.map_external_data_to_facets.assert_called_once()
             
             # Verify orchestration agent was called with correct arguments
             scoring_service.orchestration_agent.synthesize_score.assert_called_once()
@@ -191,6 +200,9 @@ class TestScoringService:
             assert call_args["job_description"] == "Test job description"
             assert call_args["candidate_resume"] == "Test CV content"
             assert call_args["candidate_id"] == 1
+            # JD/CV embeddings are computed by their own pipeline stage
+            assert call_args["jd_embedding"] == [0.1, 0.2]
+            assert call_args["cv_embedding"] == [0.3, 0.4]
             
             # Verify database operations
             mock_db_session.add.assert_called_once()
@@ -203,6 +215,52 @@ class TestScoringService:
             assert result.candidate_id == 1
             assert result.overall_score == 85.5
             assert "The candidate is a good match for this job." in result.explanation
+            assert set(result.details["timings"]) == {
+                "facets", "similarity_embeddings", "evidence", "external_data",
+                "enrichment", "synthesis", "total"
+            }
+
+    @pytest.mark.asyncio
+    async def test_generate_score_runs_independent_stages_concurrently(self, scoring_service, mock_db_session, mock_vector_db):
+        """Test that evidence retrieval, external data and embeddings overlap instead of running in sequence."""
+        mock_job = MagicMock(spec=Job)
+        mock_job.id = 1
+        mock_job.title = "Software Engineer"
+        mock_job.location = None
+        mock_job.description_raw = "Test job description"
+        mock_candidate = MagicMock(spec=Candidate)
+        mock_candidate.id = 1
+        mock_candidate.resume_raw = "Test CV content"
+        mock_db_session.query.return_value.filter.return_value.first.side_effect = [mock_job, mock_candidate]
+
+        in_flight = 0
+        peak = 0
+
+        def slow(result):
+            async def stage(*args, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.05)
+                in_flight -= 1
+                return result
+            return stage
+
+        mock_vector_db.generate_embeddings = AsyncMock(side_effect=slow([[0.1], [0.2]]))
+        with patch('recruitx_app.services.scoring_service.agentic_rag_service') as mock_rag, \
+             patch('asyncio.sleep', wraps=asyncio.sleep) as mock_sleep:
+            mock_rag.iterative_retrieve_and_validate = AsyncMock(side_effect=slow({0: None}))
+            mock_rag.fetch_job_external_data = AsyncMock(side_effect=slow({"error": "unavailable"}))
+            mock_rag.map_external_data_to_facets = MagicMock(return_value={"external_data": {"error": "unavailable"}})
+
+            result = await scoring_service.generate_score(db=mock_db_session, job_id=1, candidate_id=1)
+
+        assert result is not None
+        assert peak == 3
+        # Only the simulated stage latencies sleep; there is no fixed delay before synthesis
+        assert all(call.args == (0.05,) for call in mock_sleep.call_args_list)
+        timings = result.details["timings"]
+        assert timings["total"] < timings["evidence"] + timings["external_data"] + timings["similarity_embeddings"]
     
     @pytest.mark.asyncio
     async def test_error_during_job_analysis(self, scoring_service, mock_db_session):
@@ -281,4 +339,63 @@ class TestScoringService:
         
         # Verify no score was persisted
         mock_db_session.add.assert_not_called()
-        mock_db_session.commit.assert_not_called() 
\ No newline at end of file
+        mock_db_session.commit.assert_not_called() 
+    @pytest.mark.asyncio
+    async def test_get_job_facets_uses_in_process_cache(self, scoring_service):
+        """Test that repeated lookups for the same JD reuse the decomposed facets."""
+        from recruitx_app.schemas.job import JobRequirementFacet
+        facets = [JobRequirementFacet(facet_type="skill", detail="Python", is_required=True)]
+        scoring_service.jd_analysis_agent.decompose_job_description = AsyncMock(return_value=facets)
+        
+        job = MagicMock(spec=Job)
+        job.id = 1
+        job.description_raw = "Test job description"
+        job.requirement_facets = None
+        job.requirement_facets_hash = None
+        
+        first = await scoring_service.get_job_facets(job)
+        second = await scoring_service.get_job_facets(job)
+        
+        assert first == facets
+        assert second == facets
+        scoring_service.jd_analysis_agent.decompose_job_description.assert_called_once()
+        # Facets are persisted on the job row together with the hash of the JD text
+        assert job.requirement_facets == [f.model_dump() for f in facets]
+        assert job.requirement_facets_hash is not None
+    
+    @pytest.mark.asyncio
+    async def test_get_job_facets_uses_stored_facets(self, scoring_service):
+        """Test that facets persisted on the job are reused when the JD text is unchanged."""
+        from recruitx_app.utils.cache_utils import compute_content_hash
+        job = MagicMock(spec=Job)
+        job.id = 2
+        job.description_raw = "Stored job description"
+        job.requirement_facets = [{"facet_type": "skill", "detail": "SQL", "is_required": False, "context": None}]
+        job.requirement_facets_hash = compute_content_hash("Stored job description")
+        
+        facets = await scoring_service.get_job_facets(job)
+        
+        assert len(facets) == 1
+        assert facets[0].detail == "SQL"
+        scoring_service.jd_analysis_agent.decompose_job_description.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_job_facets_invalidated_when_jd_changes(self, scoring_service):
+        """Test that stored facets are ignored once the JD text no longer matches the stored hash."""
+        from recruitx_app.schemas.job import JobRequirementFacet
+        new_facets = [JobRequirementFacet(facet_type="skill", detail="Rust", is_required=True)]
+        scoring_service.jd_analysis_agent.decompose_job_description = AsyncMock(return_value=new_facets)
+        
+        job = MagicMock(spec=Job)
+        job.id = 3
+        job.description_raw = "Edited job description"
+        job.requirement_facets = [{"facet_type": "skill", "detail": "SQL", "is_required": False, "context": None}]
+        job.requirement_facets_hash = "stale-hash"
+        
+        facets = await scoring_service.get_job_facets(job)
+        
+        assert facets == new_facets
+        scoring_service.jd_analysis_agent.decompose_job_description.assert_called_once_with(
+            job_id=3,
+            job_description="Edited job description"
+        )
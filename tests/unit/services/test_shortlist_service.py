@@ -0,0 +1,204 @@
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from recruitx_app.core.config import settings
+from recruitx_app.core.database import Base
+from recruitx_app.models.candidate import Candidate
+from recruitx_app.models.job import Job
+from recruitx_app.services.shortlist_service import ShortlistService, normalize_skill
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database shared by every session the service opens."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def pool(session_factory):
+    """Three candidates and one job; candidate 3 was never indexed."""
+    db = session_factory()
+    db.add_all([
+        Candidate(id=1, name="Ada", resume_raw="cv", analysis={"skills": ["Python", "SQL"]}),
+        Candidate(id=2, name="Grace", resume_raw="cv", analysis={"skills": ["COBOL"]}),
+        Candidate(id=3, name="Linus", resume_raw="cv", analysis={"skills": ["python", " Machine  Learning"]}),
+        Job(id=1, title="Data Engineer", description_raw="jd", analysis={"required_skills": ["Python", "Machine Learning"]})
+    ])
+    db.commit()
+    yield db
+    db.close()
+
+
+# Stored chunk embeddings: candidate 1 points along x, candidate 2 along y, the job along x
+CHUNKS = {
+    "candidate": {
+        "ids": ["cand_1_a", "cand_1_b", "cand_2_a"],
+        "embeddings": [[1.0, 0.0], [1.0, 0.2], [0.0, 1.0]],
+        "metadatas": [{"candidate_id": 1}, {"candidate_id": 1}, {"candidate_id": 2}]
+    },
+    "job": {"ids": ["job_1_a"], "embeddings": [[2.0, 0.0]], "metadatas": [{"job_id": 1}]}
+}
+
+
+def fake_get_embeddings(pages):
+    async def get_embeddings(where=None, limit=None, offset=None):
+        if where == {"doc_type": "candidate"}:
+            data = pages["candidate"]
+            offset = offset or 0
+            end = offset + limit if limit else None
+            return {key: values[offset:end] for key, values in data.items()}
+        return pages["job"]
+    return get_embeddings
+
+
+@pytest.fixture
+def mock_vector_db():
+    with patch('recruitx_app.services.shortlist_service.vector_db_service') as vector_db:
+        vector_db.get_embeddings = AsyncMock(side_effect=fake_get_embeddings(CHUNKS))
+        vector_db.generate_embeddings = AsyncMock(return_value=[[0.0, 1.0]])
+        yield vector_db
+
+
+@pytest.mark.asyncio
+class TestShortlistService:
+
+    async def test_candidates_are_ranked_by_embedding_and_skills(self, session_factory, pool, mock_vector_db):
+        """Test the combined score, its components and the ranking order."""
+        service = ShortlistService(session_factory=session_factory)
+        result = await service.shortlist(pool, job_id=1, top_k=10)
+
+        assert result["pool_size"] == 3
+        ranked = {entry["candidate_id"]: entry for entry in result["candidates"]}
+        assert [entry["candidate_id"] for entry in result["candidates"]] == [1, 3, 2]
+
+        assert ranked[1]["embedding_similarity"] == pytest.approx(0.995, abs=1e-3)
+        assert ranked[1]["skill_overlap"] == 0.5
+        assert ranked[1]["matched_skills"] == ["python"]
+        assert ranked[1]["score"] == pytest.approx(0.7 * 0.995 + 0.3 * 0.5, abs=1e-3)
+
+        # Never indexed: ranked by skills alone
+        assert ranked[3]["embedding_similarity"] == 0.0
+        assert ranked[3]["skill_overlap"] == 1.0
+        assert sorted(ranked[3]["matched_skills"]) == ["machine learning", "python"]
+        assert ranked[2]["score"] == 0.0
+
+        mock_vector_db.generate_embeddings.assert_not_awaited()
+
+    async def test_top_k_and_candidate_subset(self, session_factory, pool, mock_vector_db):
+        """Test that top_k truncates the ranking and candidate_ids restricts the pool."""
+        service = ShortlistService(session_factory=session_factory)
+
+        top = await service.shortlist(pool, job_id=1, top_k=1)
+        assert [entry["candidate_id"] for entry in top["candidates"]] == [1]
+
+        subset = await service.shortlist(pool, job_id=1, top_k=5, candidate_ids=[2, 3])
+        assert subset["pool_size"] == 2
+        assert [entry["candidate_id"] for entry in subset["candidates"]] == [3, 2]
+
+    async def test_requested_candidates_missing_from_index_are_kept(self, session_factory, pool, mock_vector_db):
+        """Test that explicitly requested candidates the cached index does not know rank with score 0."""
+        service = ShortlistService(session_factory=session_factory)
+        await service.get_index()
+        pool.add(Candidate(id=4, name="Barbara", resume_raw="cv", analysis={"skills": ["Python"]}))
+        pool.commit()
+
+        result = await service.shortlist(pool, job_id=1, top_k=5, candidate_ids=[4, 2, 3])
+        assert result["pool_size"] == 3
+        assert [entry["candidate_id"] for entry in result["candidates"]] == [3, 2, 4]
+        assert result["candidates"][2] == {"candidate_id": 4, "score": 0.0, "embedding_similarity": 0.0,
+                                           "skill_overlap": 0.0, "matched_skills": []}
+
+        top = await service.shortlist(pool, job_id=1, top_k=1, candidate_ids=[4, 2])
+        assert [entry["candidate_id"] for entry in top["candidates"]] == [2]
+
+    async def test_embeddings_are_read_page_by_page(self, session_factory, pool, mock_vector_db):
+        """Test that chunks of one candidate split over several pages are still averaged together."""
+        service = ShortlistService(session_factory=session_factory)
+        with patch.object(settings, "SHORTLIST_PAGE_SIZE", 1):
+            index = await service.get_index()
+
+        assert mock_vector_db.get_embeddings.await_count == 4
+        expected = np.array([2.0, 0.2]) / np.linalg.norm([2.0, 0.2])
+        np.testing.assert_allclose(index.embeddings[0], expected, rtol=1e-5)
+        np.testing.assert_array_equal(index.embeddings[2], [0.0, 0.0])
+
+    async def test_unindexed_job_is_embedded_once(self, session_factory, pool, mock_vector_db):
+        """Test that a job without stored chunks falls back to embedding its description."""
+        mock_vector_db.get_embeddings.side_effect = fake_get_embeddings(
+            {**CHUNKS, "job": {"ids": [], "embeddings": [], "metadatas": []}}
+        )
+        service = ShortlistService(session_factory=session_factory)
+        result = await service.shortlist(pool, job_id=1)
+
+        mock_vector_db.generate_embeddings.assert_awaited_once_with(["jd"])
+        ranked = {entry["candidate_id"]: entry for entry in result["candidates"]}
+        assert ranked[2]["embedding_similarity"] == pytest.approx(1.0)
+
+    async def test_job_without_required_skills_uses_embeddings_only(self, session_factory, pool, mock_vector_db):
+        """Test that the skill weight is dropped when the job lists no required skills."""
+        pool.query(Job).filter(Job.id == 1).update({"analysis": None})
+        pool.commit()
+        service = ShortlistService(session_factory=session_factory)
+        result = await service.shortlist(pool, job_id=1)
+
+        best = result["candidates"][0]
+        assert best["candidate_id"] == 1
+        assert best["score"] == best["embedding_similarity"]
+
+    async def test_missing_job_returns_none(self, session_factory, pool, mock_vector_db):
+        service = ShortlistService(session_factory=session_factory)
+        assert await service.shortlist(pool, job_id=42) is None
+
+    async def test_index_is_cached_until_ttl_or_invalidate(self, session_factory, pool, mock_vector_db):
+        """Test that the candidate matrix is reused within the TTL and rebuilt in the background after it."""
+        now = [1000.0]
+        service = ShortlistService(session_factory=session_factory, clock=lambda: now[0])
+
+        first = await service.get_index()
+        assert await service.get_index() is first
+
+        # Outdated indexes keep being served until the rebuild is done
+        now[0] += settings.SHORTLIST_INDEX_TTL_SECONDS
+        assert await service.get_index() is first
+        await service.wait_for_refresh()
+        second = await service.get_index()
+        assert second is not first
+
+        service.invalidate()
+        assert await service.get_index() is second
+        await service.wait_for_refresh()
+        assert await service.get_index() is not second
+
+    async def test_invalidate_during_build_is_not_lost(self, session_factory, pool, mock_vector_db):
+        """Test that an invalidate() while the index is being built triggers another rebuild."""
+        service = ShortlistService(session_factory=session_factory)
+        load_embeddings = fake_get_embeddings(CHUNKS)
+
+        async def invalidate_then_load(*args, **kwargs):
+            service.invalidate()
+            return await load_embeddings(*args, **kwargs)
+
+        mock_vector_db.get_embeddings.side_effect = invalidate_then_load
+        first = await service.get_index()
+
+        mock_vector_db.get_embeddings.side_effect = load_embeddings
+        assert await service.get_index() is first
+        await service.wait_for_refresh()
+        second = await service.get_index()
+        assert second is not first
+        assert await service.get_index() is second
+
+
+def test_normalize_skill():
+    assert normalize_skill("  Machine \n Learning ") == "machine learning"
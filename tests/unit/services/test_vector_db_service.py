@@ -2,8 +2,10 @@ import pytest
 import os
 import sys
 import asyncio
+import threading
 from unittest.mock import patch, MagicMock, AsyncMock, call
-from recruitx_app.services.vector_db_service import VectorDBService, PERSIST_DIRECTORY
+from recruitx_app.core.config import settings
+from recruitx_app.services.vector_db_service import VectorDBService, PERSIST_DIRECTORY, content_chunk_ids
 from chromadb.api.models.Collection import Collection
 from chromadb.api.types import GetResult, QueryResult
 from chromadb.errors import ChromaError
@@ -45,6 +47,7 @@ class TestVectorDBService:
         """Create a mock ChromaDB client."""
         mock_client = MagicMock()
         mock_collection = MagicMock()
+        mock_collection.metadata = None  # A collection that has not recorded its embedding model yet
         
         # Set up the client to return our mock collection
         mock_client.get_or_create_collection.return_value = mock_collection
@@ -64,6 +67,7 @@ class TestVectorDBService:
             service = VectorDBService()
             service._client = mock_chromadb
             service._collection = mock_chromadb.get_or_create_collection()
+            service._embedding_cache.clear()
             return service
     
     @patch('recruitx_app.services.vector_db_service.chromadb.PersistentClient')
@@ -165,20 +169,19 @@ class TestVectorDBService:
         
         # Direct patch of the module functions used in the method
         with patch('recruitx_app.services.vector_db_service.settings') as mock_settings, \
-             patch('recruitx_app.services.vector_db_service.embedding_functions.GoogleGenerativeAiEmbeddingFunction', return_value=MagicMock()) as mock_embedding:
+             patch('recruitx_app.services.vector_db_service.PooledEmbeddingFunction', return_value=MagicMock()) as mock_embedding:
             
             # Configure the mock settings
-            mock_settings.get_next_api_key.return_value = "test-api-key"
+            mock_settings.EMBEDDING_PROVIDER = "gemini"
             mock_settings.GEMINI_EMBEDDING_MODEL = "test-embedding-model"
             
             # Call the method
             result = vector_db_service._get_embedding_function()
             
-            # Verify the embedding function was created
+            # Verify the embedding function was created; keys come from the pool per batch
             assert result is not None
-            mock_settings.get_next_api_key.assert_called_once()
+            mock_settings.get_next_api_key.assert_not_called()
             mock_embedding.assert_called_once_with(
-                api_key="test-api-key",
                 model_name=mock_settings.GEMINI_EMBEDDING_MODEL
             )
     
@@ -189,11 +192,12 @@ class TestVectorDBService:
         
         # Direct patch of the module functions used in the method
         with patch('recruitx_app.services.vector_db_service.settings') as mock_settings, \
-             patch('recruitx_app.services.vector_db_service.embedding_functions.GoogleGenerativeAiEmbeddingFunction', 
+             patch('recruitx_app.services.vector_db_service.PooledEmbeddingFunction', 
                   side_effect=Exception("Test embedding error")):
             
             # Configure the mock settings
             mock_settings.get_next_api_key.return_value = "test-api-key"
+            mock_settings.EMBEDDING_PROVIDER = "gemini"
             mock_settings.GEMINI_EMBEDDING_MODEL = "test-embedding-model"
             
             # Call the method
@@ -218,6 +222,43 @@ class TestVectorDBService:
             # Verify the result
             assert result == [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
     
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_cache_io_off_event_loop(self, vector_db_service):
+        """Test that the embedding cache's SQLite tier is read and written on the cache executor."""
+        embedding_function = MagicMock(return_value=[[0.1, 0.2, 0.3]])
+        threads = []
+        cache = vector_db_service._embedding_cache
+        get_many, set_many = cache.get_many, cache.set_many
+
+        def recording(method, name):
+            def call(*args):
+                threads.append((name, threading.current_thread().name))
+                return method(*args)
+            return call
+
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=embedding_function), \
+             patch.object(cache, 'get_many', side_effect=recording(get_many, "get_many")), \
+             patch.object(cache, 'set_many', side_effect=recording(set_many, "set_many")):
+            await vector_db_service.generate_embeddings(["Off-loop text"])
+
+        assert [name for name, _ in threads] == ["get_many", "set_many"]
+        assert all(thread.startswith("cache") for _, thread in threads)
+    
+    @pytest.mark.asyncio
+    async def test_synthetic_embeddings_not_served_to_live_runs(self, vector_db_service):
+        """Test that vectors cached while the LLM transport is synthetic are a miss for live mode."""
+        embedding_function = MagicMock(side_effect=[[[0.9, 0.9, 0.9]], [[0.1, 0.2, 0.3]]])
+
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=embedding_function), \
+             patch.object(settings, 'EMBEDDING_PROVIDER', 'gemini'):
+            with patch.object(settings, 'LLM_TRANSPORT', 'synthetic'):
+                assert await vector_db_service.generate_embeddings(["Shared text"]) == [pytest.approx([0.9, 0.9, 0.9])]
+            with patch.object(settings, 'LLM_TRANSPORT', 'live'):
+                live = await vector_db_service.generate_embeddings(["Shared text"])
+
+        assert embedding_function.call_count == 2
+        assert live == [pytest.approx([0.1, 0.2, 0.3])]
+    
     @pytest.mark.asyncio
     async def test_generate_embeddings_no_function(self, vector_db_service):
         """Test generating embeddings when embedding function is None."""
@@ -241,11 +282,45 @@ class TestVectorDBService:
             # Verify the result
             assert result is None
     
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_uses_cache(self, vector_db_service):
+        """Test that cached embeddings are reused and only misses are sent to the API."""
+        embedding_function = MagicMock()
+        embedding_function.side_effect = [
+            [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]],
+            [[0.7, 0.8, 0.9]]
+        ]
+        
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=embedding_function):
+            await vector_db_service.generate_embeddings(["Cached text A", "Cached text B"])
+            result = await vector_db_service.generate_embeddings(["Cached text B", "New text C", "Cached text A"])
+            
+            # The second call only embeds the single miss, in one batch
+            assert embedding_function.call_count == 2
+            embedding_function.assert_called_with(["New text C"])
+            assert len(result) == 3
+            assert result[0] == pytest.approx([0.4, 0.5, 0.6])
+            assert result[1] == [0.7, 0.8, 0.9]
+            assert result[2] == pytest.approx([0.1, 0.2, 0.3])
+    
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_deduplicates_misses(self, vector_db_service):
+        """Test that repeated texts in one request are embedded only once."""
+        embedding_function = MagicMock(return_value=[[0.1, 0.2]])
+        
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=embedding_function):
+            result = await vector_db_service.generate_embeddings(["Same text", "Same text"])
+            
+            embedding_function.assert_called_once_with(["Same text"])
+            assert result == [[0.1, 0.2], [0.1, 0.2]]
+    
     @pytest.mark.asyncio
     async def test_add_document_chunks(self, vector_db_service):
         """Test adding document chunks to the vector database."""
+        mock_embeddings = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
         # Mock the get_collection method
-        with patch.object(vector_db_service, 'get_collection') as mock_get_collection:
+        with patch.object(vector_db_service, 'get_collection') as mock_get_collection, \
+             patch.object(vector_db_service, 'generate_embeddings', AsyncMock(return_value=mock_embeddings)) as mock_generate:
             mock_get_collection.return_value = vector_db_service._collection
             
             # Call the method
@@ -255,16 +330,136 @@ class TestVectorDBService:
                 ids=["doc1", "doc2"]
             )
             
+            # Verify embeddings were generated through the cache-aware path
+            mock_generate.assert_called_once_with(TEST_DOCUMENTS)
+            
             # Verify that the collection's add method was called
             vector_db_service._collection.add.assert_called_once()
             call_args = vector_db_service._collection.add.call_args[1]
             assert call_args["documents"] == TEST_DOCUMENTS
+            assert call_args["embeddings"] == mock_embeddings
             assert call_args["metadatas"] == TEST_METADATA
             assert call_args["ids"] == ["doc1", "doc2"]
             
             # Verify the result
             assert result is True
     
+    def test_get_collection_records_embedding_model(self, vector_db_service, mock_chromadb):
+        """Test that a new collection is stamped with the configured provider and model."""
+        vector_db_service._collection = None
+        collection = mock_chromadb.get_or_create_collection.return_value
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=MagicMock()), \
+             patch.object(settings, 'EMBEDDING_PROVIDER', 'hashing'):
+            collection.count.return_value = 0
+            assert vector_db_service.get_collection() is collection
+
+        collection.modify.assert_called_once_with(metadata={
+            "embedding_provider": "hashing",
+            "embedding_model": f"hashing/{settings.HASHING_EMBEDDING_DIMENSION}"
+        })
+
+    def test_get_collection_rejects_other_embedding_model(self, vector_db_service, mock_chromadb):
+        """Test that a collection holding another model's vectors is not used."""
+        collection = mock_chromadb.get_or_create_collection.return_value
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=MagicMock()), \
+             patch.object(settings, 'EMBEDDING_PROVIDER', 'local'):
+            collection.metadata = {"embedding_provider": "gemini", "embedding_model": "models/embedding-001"}
+            vector_db_service._collection = None
+            assert vector_db_service.get_collection() is None
+
+            # Collections from before the model was recorded hold Gemini vectors
+            collection.metadata = None
+            collection.count.return_value = 10
+            assert vector_db_service.get_collection() is None
+        collection.modify.assert_not_called()
+        vector_db_service._collection = collection
+
+    @pytest.mark.asyncio
+    async def test_add_document_chunks_checks_dimension(self, vector_db_service):
+        """Test that the first add records the vector dimension and later adds must match it."""
+        collection = vector_db_service._collection
+        with patch.object(vector_db_service, 'get_collection', return_value=collection), \
+             patch.object(vector_db_service, 'generate_embeddings', AsyncMock(return_value=[[0.1, 0.2, 0.3]])):
+            assert await vector_db_service.add_document_chunks(["a"], [{}], ["a"]) is True
+            collection.modify.assert_called_once_with(metadata={"embedding_dimension": 3})
+
+            collection.metadata = {"embedding_dimension": 768}
+            assert await vector_db_service.add_document_chunks(["b"], [{}], ["b"]) is False
+            assert collection.add.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_local_batches(self, vector_db_service):
+        """Test that local providers embed length-sorted batches and keep the input order."""
+        embedding_function = MagicMock(side_effect=lambda texts: [[float(len(text))] for text in texts])
+        texts = ["aa", "a", "aaaa", "aaa"]
+        with patch.object(vector_db_service, '_get_embedding_function', return_value=embedding_function), \
+             patch.object(settings, 'EMBEDDING_PROVIDER', 'hashing'), \
+             patch.object(settings, 'LOCAL_EMBEDDING_BATCH_SIZE', 2):
+            result = await vector_db_service.generate_embeddings(texts)
+
+        assert result == [[2.0], [1.0], [4.0], [3.0]]
+        assert sorted(call.args[0] for call in embedding_function.call_args_list) == [["aa", "a"], ["aaaa", "aaa"]]
+
+    def test_content_chunk_ids(self):
+        """Test that chunk IDs follow the content, not the position, and repeats stay unique."""
+        ids = content_chunk_ids("job_1", ["alpha", "beta", "alpha"])
+        assert ids[0].startswith("job_1_") and len(ids[0]) == len("job_1_") + 16
+        assert ids[2] == f"{ids[0]}_1"
+        assert content_chunk_ids("job_1", ["beta"]) == [ids[1]]
+
+    @pytest.mark.asyncio
+    async def test_sync_document_chunks_only_touches_changes(self, vector_db_service):
+        """Test that a re-index embeds only new chunks and deletes orphaned ones."""
+        kept_id, dropped_id = content_chunk_ids("job_1", ["kept chunk", "dropped chunk"])
+        collection = vector_db_service._collection
+        collection.get.return_value = {
+            "ids": [kept_id, dropped_id, "job_1_chunk_7"],
+            "metadatas": [{"doc_id": "job_1", "chunk_index": 0}, {"doc_id": "job_1", "chunk_index": 1},
+                          {"doc_id": "job_1", "chunk_index": 7}]
+        }
+
+        with patch.object(vector_db_service, 'add_document_chunks', AsyncMock(return_value=True)) as mock_add:
+            result = await vector_db_service.sync_document_chunks(
+                doc_id="job_1",
+                documents=["new chunk", "kept chunk"],
+                metadatas=[{"doc_id": "job_1", "chunk_index": 0}, {"doc_id": "job_1", "chunk_index": 1}]
+            )
+
+        assert result is True
+        collection.get.assert_called_once_with(where={"doc_id": "job_1"}, include=["metadatas"])
+        mock_add.assert_awaited_once()
+        assert mock_add.call_args.kwargs["documents"] == ["new chunk"]
+        # The kept chunk moved, so only its metadata is updated
+        collection.update.assert_called_once_with(ids=[kept_id], metadatas=[{"doc_id": "job_1", "chunk_index": 1}])
+        collection.delete.assert_called_once_with(ids=[dropped_id, "job_1_chunk_7"])
+
+    @pytest.mark.asyncio
+    async def test_sync_document_chunks_unchanged_document(self, vector_db_service):
+        """Test that re-indexing an unchanged document embeds and writes nothing."""
+        documents = ["one", "two"]
+        metadatas = [{"doc_id": "cand_1", "chunk_index": i} for i in range(2)]
+        collection = vector_db_service._collection
+        collection.get.return_value = {"ids": content_chunk_ids("cand_1", documents), "metadatas": metadatas}
+
+        with patch.object(vector_db_service, 'add_document_chunks', AsyncMock()) as mock_add:
+            assert await vector_db_service.sync_document_chunks("cand_1", documents, metadatas) is True
+
+        mock_add.assert_not_awaited()
+        collection.update.assert_not_called()
+        collection.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sync_document_chunks_keeps_orphans_if_add_fails(self, vector_db_service):
+        """Test that existing chunks are not deleted when the new ones could not be added."""
+        collection = vector_db_service._collection
+        collection.get.return_value = {"ids": ["cand_1_old"], "metadatas": [{"doc_id": "cand_1"}]}
+
+        with patch.object(vector_db_service, 'add_document_chunks', AsyncMock(return_value=False)):
+            result = await vector_db_service.sync_document_chunks("cand_1", ["new"], [{"doc_id": "cand_1"}])
+
+        assert result is False
+        collection.delete.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_add_document_chunks_no_collection(self, vector_db_service):
         """Test adding document chunks when collection is None."""
@@ -304,7 +499,8 @@ class TestVectorDBService:
         mock_collection = MagicMock()
         mock_collection.add.side_effect = Exception("Test add error")
         
-        with patch.object(vector_db_service, 'get_collection', return_value=mock_collection):
+        with patch.object(vector_db_service, 'get_collection', return_value=mock_collection), \
+             patch.object(vector_db_service, 'generate_embeddings', AsyncMock(return_value=None)):
             # Call the method
             result = await vector_db_service.add_document_chunks(
                 documents=TEST_DOCUMENTS,
@@ -401,6 +597,26 @@ class TestVectorDBService:
             assert len(result['ids'][0]) == 0
             assert len(result['documents'][0]) == 0
 
+    @pytest.mark.asyncio
+    async def test_query_collection_with_query_embeddings(self, vector_db_service):
+        """Test querying with precomputed embeddings and returning stored chunk embeddings."""
+        mock_collection = MagicMock()
+        mock_collection.query.return_value = MOCK_QUERY_RESULTS
+
+        with patch.object(vector_db_service, 'get_collection', return_value=mock_collection):
+            result = await vector_db_service.query_collection(
+                query_texts=["Python developer"],
+                query_embeddings=[[0.1, 0.2, 0.3]],
+                n_results=2,
+                include_embeddings=True
+            )
+
+            call_args = mock_collection.query.call_args[1]
+            assert call_args["query_embeddings"] == [[0.1, 0.2, 0.3]]
+            assert "query_texts" not in call_args
+            assert "embeddings" in call_args["include"]
+            assert result == MOCK_QUERY_RESULTS
+
     def test_singleton_pattern(self):
         """Test that the VectorDBService follows the singleton pattern."""
         # Create two instances of the service
@@ -425,11 +641,11 @@ class TestVectorDBService:
     def test_get_embedding_function_logs_error(self, mock_logger_error, vector_db_service):
         """Test error logging during embedding function initialization failure."""
         vector_db_service._embedding_function = None # Ensure it's reset
-        with patch('recruitx_app.services.vector_db_service.embedding_functions.GoogleGenerativeAiEmbeddingFunction', side_effect=Exception("Embedding Init Error!")):
+        with patch('recruitx_app.services.vector_db_service.PooledEmbeddingFunction', side_effect=Exception("Embedding Init Error!")):
             result = vector_db_service._get_embedding_function()
             assert result is None
             mock_logger_error.assert_called_once()
-            assert "Failed to initialize Google Generative AI embedding function" in mock_logger_error.call_args[0][0]
+            assert "Failed to initialize embedding function for provider 'gemini'" in mock_logger_error.call_args[0][0]
 
     @patch('recruitx_app.services.vector_db_service.logger.error')
     def test_get_collection_logs_error_no_client(self, mock_logger_error, vector_db_service):
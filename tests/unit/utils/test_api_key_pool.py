@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from google.api_core.exceptions import ResourceExhausted
+import google.generativeai as genai
+
+from recruitx_app.utils.api_key_pool import ApiKeyPool, PooledEmbeddingFunction, estimate_tokens
+from recruitx_app.utils.retry_utils import call_gemini_with_backoff
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def pool(clock):
+    return ApiKeyPool(["key-a", "key-b", "key-c"], rpm_limit=2, tpm_limit=1000, cooldown_seconds=30, clock=clock)
+
+
+class TestApiKeyPool:
+
+    def test_routes_to_key_with_most_headroom(self, pool):
+        """Test that consecutive acquisitions spread over the keys instead of draining one."""
+        keys = [pool.acquire_blocking() for _ in range(3)]
+        assert sorted(keys) == ["key-a", "key-b", "key-c"]
+
+    def test_token_budget_steers_large_requests(self, pool):
+        """Test that a key with little TPM headroom is skipped for a large request."""
+        pool._states["key-a"].prompt_tokens = 100
+        pool._states["key-b"].prompt_tokens = 500
+
+        assert pool.acquire_blocking(estimated_tokens=600) == "key-c"
+
+    def test_rate_limited_key_cools_down(self, pool, clock):
+        """Test that a key reported with a 429 is avoided until its cooldown ends."""
+        pool.report_rate_limited("key-a")
+
+        acquired = {pool.acquire_blocking() for _ in range(4)}
+        assert "key-a" not in acquired
+
+        clock.now += 31
+        assert pool.best_key() == "key-a"
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill_when_exhausted(self, clock):
+        """Test that acquire sleeps only until the earliest key refills."""
+        pool = ApiKeyPool(["only"], rpm_limit=60, tpm_limit=1000, cooldown_seconds=30, clock=clock)
+        pool._states["only"].request_tokens = 0.0
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        with patch('recruitx_app.utils.api_key_pool.asyncio.sleep', side_effect=fake_sleep):
+            key = await pool.acquire()
+
+        assert key == "only"
+        assert sleeps == [pytest.approx(1.0)]  # 60 RPM refills one request per second
+
+    def test_release_tracks_in_flight_and_actual_tokens(self, pool):
+        """Test that release frees the slot and corrects the token estimate."""
+        key = pool.acquire_blocking(estimated_tokens=100)
+        assert pool._states[key].in_flight == 1
+
+        pool.release(key, estimated_tokens=100, actual_tokens=300)
+
+        assert pool._states[key].in_flight == 0
+        assert pool._states[key].prompt_tokens == pytest.approx(700)
+
+    def test_clients_are_bound_per_key_and_cached(self, pool):
+        """Test that each key gets its own client, reused across calls."""
+        with patch('recruitx_app.utils.api_key_pool.glm.GenerativeServiceClient') as mock_client_cls:
+            mock_client_cls.side_effect = lambda client_options: MagicMock(options=client_options)
+            client_a = pool.get_client("key-a")
+            assert pool.get_client("key-a") is client_a
+            client_b = pool.get_client("key-b")
+
+        assert client_a.options == {"api_key": "key-a"}
+        assert client_b.options == {"api_key": "key-b"}
+        assert mock_client_cls.call_count == 2
+
+    def test_snapshot_masks_keys(self, pool):
+        """Test that the monitoring snapshot does not expose full keys."""
+        snapshot = pool.snapshot()
+        assert [entry["key"] for entry in snapshot] == ["...ey-a", "...ey-b", "...ey-c"]
+        assert all(entry["headroom"] == 1.0 for entry in snapshot)
+
+    def test_estimate_tokens(self):
+        """Test the prompt size estimate for text and media parts."""
+        assert estimate_tokens("a" * 40) == 11
+        assert estimate_tokens(["a" * 40, {"mime_type": "image/png", "data": b""}]) == 11 + 258
+        assert estimate_tokens(None) == 0
+
+
+class TestPooledEmbeddingFunction:
+
+    def test_batch_embedded_with_key_bound_client(self, pool):
+        """Test that a batch is sent in one call with the scheduled key's client."""
+        with patch.object(pool, 'get_client', side_effect=lambda key: f"client-{key}"), \
+             patch('recruitx_app.utils.api_key_pool.genai.embed_content',
+                   return_value={"embedding": [[0.1], [0.2]]}) as mock_embed:
+            embedding_function = PooledEmbeddingFunction(model_name="models/embedding-001", pool=pool)
+            result = embedding_function(["one", "two"])
+
+        assert result == [[0.1], [0.2]]
+        mock_embed.assert_called_once()
+        assert mock_embed.call_args.kwargs["content"] == ["one", "two"]
+        assert mock_embed.call_args.kwargs["client"].startswith("client-key-")
+
+    def test_rate_limited_batch_moves_to_another_key(self, pool):
+        """Test that a 429 cools the key down and retries the batch on a different key."""
+        used_clients = []
+
+        def embed(**kwargs):
+            used_clients.append(kwargs["client"])
+            if len(used_clients) == 1:
+                raise ResourceExhausted("quota")
+            return {"embedding": [[0.3]]}
+
+        with patch.object(pool, 'get_client', side_effect=lambda key: key), \
+             patch('recruitx_app.utils.api_key_pool.genai.embed_content', side_effect=embed):
+            result = PooledEmbeddingFunction(model_name="models/embedding-001", pool=pool)(["text"])
+
+        assert result == [[0.3]]
+        assert used_clients[0] != used_clients[1]
+        assert pool._states[used_clients[0]].rate_limited_count == 1
+
+
+@pytest.mark.asyncio
+class TestKeyPooledModelCalls:
+
+    async def test_model_call_rerouted_after_rate_limit(self, pool):
+        """Test that a GenerativeModel call hitting a 429 is retried immediately on another key."""
+        model = genai.GenerativeModel("models/test-model")
+        clients = {key: MagicMock(name=key) for key in pool.keys}
+        first_key = {}
+
+        for key, client in clients.items():
+            def make(key=key):
+                def generate_content(request, **kwargs):
+                    if not first_key:
+                        first_key["key"] = key
+                        raise ResourceExhausted("quota")
+                    return MagicMock()
+                return generate_content
+            client.generate_content.side_effect = make()
+
+        with patch('recruitx_app.utils.retry_utils.api_key_pool', pool), \
+             patch.object(pool, 'get_client', side_effect=lambda key: clients[key]), \
+             patch('recruitx_app.utils.retry_utils.asyncio.sleep') as mock_sleep, \
+             patch('google.generativeai.generative_models.generation_types.GenerateContentResponse.from_response',
+                   return_value="response"):
+            result = await call_gemini_with_backoff(model.generate_content, "Hello")
+
+        assert result == "response"
+        mock_sleep.assert_not_called()
+        assert pool._states[first_key["key"]].rate_limited_count == 1
+        # The original model is never bound to a key
+        assert model._client is None
+        assert all(state.in_flight == 0 for state in pool._states.values())
@@ -0,0 +1,83 @@
+import os
+import sys
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from recruitx_app.utils.cache_utils import LRUCache, TTLCache, compute_content_hash
+
+
+class TestLRUCache:
+    """Test class for the in-process LRU cache."""
+    
+    def test_get_and_set(self):
+        """Test basic storage and retrieval."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.set("c", 3)
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+    
+    def test_pop_and_clear(self):
+        """Test explicit removal of entries."""
+        cache = LRUCache(maxsize=4)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert "a" not in cache
+        cache.clear()
+        assert len(cache) == 0
+    
+    def test_invalid_maxsize(self):
+        """Test that a non-positive maxsize is rejected."""
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestTTLCache:
+    """Test class for the expiring LRU cache."""
+
+    def test_entries_expire(self):
+        """Test that entries are served until their TTL and dropped afterwards."""
+        now = [100.0]
+        cache = TTLCache(maxsize=4, ttl_seconds=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2, ttl_seconds=30)
+
+        now[0] += 9
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert "a" not in cache
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_pop_returns_value(self):
+        """Test that pop unwraps the stored value."""
+        cache = TTLCache(maxsize=4, ttl_seconds=10)
+        cache.set("a", {"x": 1})
+        assert cache.pop("a") == {"x": 1}
+        assert cache.pop("a", "gone") == "gone"
+
+
+def test_compute_content_hash():
+    """Test that the content hash is a stable sha256 hex digest."""
+    digest = compute_content_hash("hello")
+    assert digest == compute_content_hash("hello")
+    assert digest != compute_content_hash("hello!")
+    assert len(digest) == 64
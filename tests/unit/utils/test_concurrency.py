@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from recruitx_app.utils import concurrency
+from recruitx_app.utils.concurrency import (
+    get_llm_executor,
+    run_in_chroma_executor,
+    run_in_llm_executor,
+    run_in_parse_executor,
+    shutdown_executors,
+)
+
+
+class TestConcurrency:
+
+    @pytest.mark.asyncio
+    async def test_blocking_calls_run_in_parallel(self):
+        """Test that blocking calls run on the pool concurrently instead of serially."""
+        start = time.perf_counter()
+        await asyncio.gather(*(run_in_llm_executor(time.sleep, 0.1) for _ in range(4)))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Test that the event loop keeps running while a blocking call is in flight."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await asyncio.gather(run_in_chroma_executor(time.sleep, 0.1), ticker())
+
+        assert ticks == 5
+
+    @pytest.mark.asyncio
+    async def test_executors_are_separate(self):
+        """Test that LLM, ChromaDB and parsing work run on their own named thread pools."""
+        llm_thread = await run_in_llm_executor(lambda: threading.current_thread().name)
+        chroma_thread = await run_in_chroma_executor(lambda: threading.current_thread().name)
+        parse_thread = await run_in_parse_executor(lambda: threading.current_thread().name)
+
+        assert llm_thread.startswith("llm")
+        assert chroma_thread.startswith("chroma")
+        assert parse_thread.startswith("parse")
+
+    @pytest.mark.asyncio
+    async def test_kwargs_are_forwarded(self):
+        """Test that positional and keyword arguments reach the wrapped function."""
+        result = await run_in_llm_executor(lambda a, b=0: a + b, 2, b=3)
+
+        assert result == 5
+
+    def test_shutdown_recreates_lazily(self):
+        """Test that executors are recreated on demand after shutdown."""
+        first = get_llm_executor()
+        shutdown_executors()
+
+        assert concurrency._llm_executor is None
+        assert get_llm_executor() is not first
@@ -0,0 +1,49 @@
+import os
+import sys
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from recruitx_app.utils.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """Test class for the content-addressed embedding cache."""
+    
+    def test_round_trip(self):
+        """Test that stored embeddings are returned for the same model and text."""
+        cache = EmbeddingCache(db_path=":memory:")
+        cache.set_many("model-a", ["hello", "world"], [[0.1, 0.2], [0.3, 0.4]])
+        
+        result = cache.get_many("model-a", ["world", "unknown", "hello"])
+        
+        assert result[0] == pytest.approx([0.3, 0.4])
+        assert result[1] is None
+        assert result[2] == pytest.approx([0.1, 0.2])
+    
+    def test_keyed_by_model_name(self):
+        """Test that embeddings from one model are never served for another."""
+        cache = EmbeddingCache(db_path=":memory:")
+        cache.set_many("model-a", ["hello"], [[0.1, 0.2]])
+        
+        assert cache.get_many("model-b", ["hello"]) == [None]
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that the SQLite tier serves embeddings to a fresh cache instance."""
+        db_path = str(tmp_path / "embeddings.sqlite3")
+        EmbeddingCache(db_path=db_path).set_many("model-a", ["hello"], [[0.5, 0.25]])
+        
+        fresh_cache = EmbeddingCache(db_path=db_path)
+        
+        assert fresh_cache.get_many("model-a", ["hello"]) == [[0.5, 0.25]]
+    
+    def test_memory_only(self):
+        """Test that the cache works without a disk tier."""
+        cache = EmbeddingCache(db_path=None)
+        cache.set_many("model-a", ["hello"], [[1.0]])
+        
+        assert cache.get_many("model-a", ["hello"]) == [[1.0]]
+        cache.clear()
+        assert cache.get_many("model-a", ["hello"]) == [None]
@@ -0,0 +1,68 @@
+import os
+import sys
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from recruitx_app.core.config import settings
+from recruitx_app.utils.embedding_providers import (
+    HashingEmbeddingFunction, LocalEmbeddingFunction, embedding_model_id, length_sorted_batches
+)
+
+
+class TestEmbeddingProviders:
+    """Test class for the local embedding backends."""
+
+    def test_hashing_embeddings(self):
+        """Test that hashing embeddings are deterministic, normalized and lexically similar."""
+        embed = HashingEmbeddingFunction(dimension=64)
+        vectors = np.array(embed(["Python developer", "python developer", "Senior accountant"]))
+
+        assert vectors.shape == (3, 64)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+        assert vectors[0] @ vectors[2] < 0.5
+        # A fresh instance produces the same vectors: nothing is fitted
+        assert HashingEmbeddingFunction(dimension=64)(["Python developer"])[0] == vectors[0].tolist()
+        assert embed([]) == []
+
+    def test_local_embeddings_load_model_once(self):
+        """Test that the sentence-transformers model is loaded lazily, once, and asked for normalized vectors."""
+        model = MagicMock()
+        model.encode.return_value = np.array([[0.6, 0.8]])
+        model_class = MagicMock(return_value=model)
+        with patch.dict(sys.modules, {"sentence_transformers": MagicMock(SentenceTransformer=model_class)}):
+            embed = LocalEmbeddingFunction(model_name="/models/minilm", device="cpu", batch_size=8)
+            model_class.assert_not_called()
+
+            assert embed(["text"]) == [pytest.approx([0.6, 0.8])]
+            embed(["more text"])
+
+        model_class.assert_called_once_with("/models/minilm", device="cpu")
+        assert model.encode.call_args.kwargs["normalize_embeddings"] is True
+        assert model.encode.call_args.kwargs["batch_size"] == 8
+
+    def test_length_sorted_batches(self):
+        """Test that batches group texts of similar length and cover every position once."""
+        texts = ["a", "aaaa", "aa", "aaaaa", "aaa"]
+        assert length_sorted_batches(texts, 2) == [[3, 1], [4, 2], [0]]
+        assert length_sorted_batches([], 2) == []
+
+    def test_embedding_model_id(self):
+        with patch.object(settings, "LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2"), \
+             patch.object(settings, "HASHING_EMBEDDING_DIMENSION", 256):
+            assert embedding_model_id("gemini") == settings.GEMINI_EMBEDDING_MODEL
+            assert embedding_model_id("local") == "local/all-MiniLM-L6-v2"
+            assert embedding_model_id("hashing") == "hashing/256"
+        for mode in ("live", "record"):
+            with patch.object(settings, "LLM_TRANSPORT", mode):
+                assert embedding_model_id("gemini") == settings.GEMINI_EMBEDDING_MODEL
+        for mode in ("replay", "synthetic"):
+            with patch.object(settings, "LLM_TRANSPORT", mode):
+                assert embedding_model_id("gemini") == f"{mode}/{settings.GEMINI_EMBEDDING_MODEL}"
+        with pytest.raises(ValueError):
+            embedding_model_id("openai")
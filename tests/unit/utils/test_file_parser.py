@@ -12,8 +12,25 @@ from recruitx_app.utils.file_parser import (
     extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt, 
     extract_text_from_file, clean_text, extract_text_from_pdf_with_layout,
     extract_text_with_ocr, extract_text_from_rtf, extract_text_from_csv,
-    extract_text_from_html
+    extract_text_from_html, extract_text_from_file_async, read_upload_file,
+    FileTooLargeError, choose_ocr_dpi, extract_pdf, _ocr_pages
 )
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+
+
+def make_pdf(page_texts):
+    """Builds an in-memory PDF; a None entry becomes an image-only (scanned) page."""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        if text is None:
+            page.insert_image(fitz.Rect(72, 72, 272, 272), pixmap=fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 20, 20), 0))
+        else:
+            page.insert_text((72, 72), text)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
 
 
 class TestFileParser:
@@ -74,32 +91,79 @@ class TestFileParser:
         assert "Latin-1 encoded text" in extract_text_from_txt(latin1_text)
         assert "UTF-16 encoded text" in extract_text_from_txt(utf16_text)
     
-    @patch('recruitx_app.utils.file_parser.extract_text_from_pdf_with_layout')
     @patch('recruitx_app.utils.file_parser.PdfReader')
-    def test_extract_text_from_pdf_with_layout_first(self, mock_pdf_reader, mock_layout_extract):
-        """Test that layout-aware extraction is attempted first."""
-        # Setup layout extract to return text
-        mock_layout_extract.return_value = "Layout-aware extracted text"
+    def test_extract_text_from_pdf_uses_text_layer(self, mock_pdf_reader):
+        """Test that a PDF with a text layer is read once with PyMuPDF and never OCRed."""
+        pdf_bytes = make_pdf(["Layout-aware extracted text on page one", "Second page text layer content"])
         
-        # Extract text - should use layout-aware method and not fall back to PdfReader
-        result = extract_text_from_pdf(b'mock_pdf_content')
+        with patch('recruitx_app.utils.file_parser.fitz.open', wraps=fitz.open) as mock_open, \
+             patch('recruitx_app.utils.file_parser._ocr_pages') as mock_ocr:
+            result = extract_pdf(pdf_bytes)
         
-        # Verify layout-aware extraction was called
-        mock_layout_extract.assert_called_once_with(b'mock_pdf_content')
-        
-        # Verify PdfReader was not called (no fallback needed)
+        mock_open.assert_called_once()
+        mock_ocr.assert_not_called()
         mock_pdf_reader.assert_not_called()
+        assert result["method"] == "text_layer"
+        assert [page["method"] for page in result["pages"]] == ["text_layer", "text_layer"]
+        assert "Layout-aware extracted text" in extract_text_from_pdf(pdf_bytes)
+    
+    def test_extract_pdf_mixed_document(self):
+        """Test that only the image-only pages of a mixed PDF are OCRed, in a single parse."""
+        pdf_bytes = make_pdf(["Typed cover letter with a text layer", None, "Typed references page with text"])
+        
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True), \
+             patch('recruitx_app.utils.file_parser.fitz.open', wraps=fitz.open) as mock_open, \
+             patch('recruitx_app.utils.file_parser._ocr_pages', return_value={1: "Scanned diploma"}) as mock_ocr:
+            result = extract_pdf(pdf_bytes)
+        
+        mock_open.assert_called_once()
+        assert [job[0] for job in mock_ocr.call_args[0][1]] == [1]
+        assert result["method"] == "mixed"
+        assert [page["method"] for page in result["pages"]] == ["text_layer", "ocr", "text_layer"]
+        assert result["pages"][1]["text"] == "Scanned diploma"
+        assert result["text"].index("cover letter") < result["text"].index("Scanned diploma") < result["text"].index("references")
+    
+    def test_extract_pdf_keeps_text_pages_when_ocr_fails(self):
+        """Test that an OCR failure (e.g. no tesseract binary) leaves the scanned page empty and keeps the rest."""
+        pdf_bytes = make_pdf(["Typed cover letter with a text layer", None])
+        
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True), \
+             patch('recruitx_app.utils.file_parser._ocr_page_batch', side_effect=EnvironmentError("tesseract is not installed")):
+            result = extract_pdf(pdf_bytes)
+            text = extract_text_from_file(pdf_bytes, "cv.pdf")
+            ocr_text = extract_text_with_ocr(pdf_bytes)
+        
+        assert [page["method"] for page in result["pages"]] == ["text_layer", "empty"]
+        assert result["method"] == "text_layer"
+        assert "cover letter" in text
+        assert "cover letter" in ocr_text
+    
+    def test_ocr_pages_survives_failing_workers(self):
+        """Test that batches failing in the pool are retried in-process, and dropped if that fails too."""
+        jobs = [(0, 300), (1, 300)]
+        failing_pool = MagicMock()
+        failing_pool.submit.return_value.result.side_effect = RuntimeError("worker died")
+        
+        with patch('recruitx_app.utils.file_parser.get_ocr_executor', return_value=failing_pool), \
+             patch('recruitx_app.utils.file_parser.ocr_worker_count', return_value=2), \
+             patch('recruitx_app.utils.file_parser._ocr_page_batch',
+                   side_effect=[[(0, "Page one")], EnvironmentError("tesseract is not installed")]):
+            assert _ocr_pages(b"%PDF", jobs) == {0: "Page one"}
+    
+    def test_extract_pdf_scanned_without_ocr(self):
+        """Test that image-only pages are reported empty when OCR is unavailable."""
+        pdf_bytes = make_pdf([None])
         
-        # Verify the result
-        assert result == "Layout-aware extracted text"
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', False):
+            result = extract_pdf(pdf_bytes)
+        
+        assert result["method"] == "none"
+        assert result["pages"][0]["method"] == "empty"
+        assert result["text"].strip() == ""
     
-    @patch('recruitx_app.utils.file_parser.extract_text_from_pdf_with_layout')
     @patch('recruitx_app.utils.file_parser.PdfReader')
-    def test_extract_text_from_pdf_fallback(self, mock_pdf_reader, mock_layout_extract):
-        """Test PDF extraction fallback when layout-aware extraction fails."""
-        # Setup layout extract to return empty text (failure)
-        mock_layout_extract.return_value = ""
-        
+    def test_extract_text_from_pdf_fallback(self, mock_pdf_reader):
+        """Test that PyPDF is used when PyMuPDF cannot open the file."""
         # Create mock PDF pages with text
         mock_page1 = MagicMock()
         mock_page1.extract_text.return_value = "Page 1 content"
@@ -112,18 +176,16 @@ class TestFileParser:
         mock_pdf_instance.pages = [mock_page1, mock_page2]
         mock_pdf_reader.return_value = mock_pdf_instance
         
-        # Extract text - should fall back to PdfReader
-        result = extract_text_from_pdf(b'mock_pdf_content')
-        
-        # Verify layout-aware extraction was called first
-        mock_layout_extract.assert_called_once_with(b'mock_pdf_content')
+        with patch('recruitx_app.utils.file_parser.fitz.open', side_effect=RuntimeError("cannot open")):
+            result = extract_pdf(b'mock_pdf_content')
         
         # Verify PdfReader was called as fallback
         mock_pdf_reader.assert_called_once()
         
         # Verify the result
-        assert "Page 1 content" in result
-        assert "Page 2 content" in result
+        assert result["method"] == "pypdf"
+        assert "Page 1 content" in result["text"]
+        assert "Page 2 content" in result["text"]
     
     @patch('recruitx_app.utils.file_parser.fitz')
     def test_extract_text_from_pdf_with_layout(self, mock_fitz):
@@ -140,98 +202,93 @@ class TestFileParser:
         mock_doc.load_page.side_effect = [mock_page1, mock_page2]
         mock_doc.__len__.return_value = 2
         
-        # Test with mocked temporary file
-        with patch('recruitx_app.utils.file_parser.tempfile.NamedTemporaryFile') as mock_temp:
-            # Set up the mock temporary file
-            mock_temp_instance = MagicMock()
-            mock_temp_instance.name = "/tmp/mock_temp_file.pdf"
-            mock_temp.return_value.__enter__.return_value = mock_temp_instance
-            
-            # Call the function
-            result = extract_text_from_pdf_with_layout(b'mock_pdf_content')
-            
-            # Verify temp file was created and written to
-            mock_temp_instance.write.assert_called_once_with(b'mock_pdf_content')
-            
-            # Verify document was opened
-            mock_fitz.open.assert_called_once_with("/tmp/mock_temp_file.pdf")
-            
-            # Verify pages were loaded and text was extracted
-            assert mock_doc.load_page.call_count == 2
-            assert mock_page1.get_text.call_count == 1
-            assert mock_page2.get_text.call_count == 1
-            
-            # Verify document was closed
-            assert mock_doc.close.call_count == 1
-            
-            # Verify the result
-            assert "Page 1 with layout" in result
-            assert "Page 2 with layout" in result
-    
-    @patch('recruitx_app.utils.file_parser.pytesseract')
-    @patch('recruitx_app.utils.file_parser.Image')
-    @patch('recruitx_app.utils.file_parser.fitz')
-    @patch('recruitx_app.utils.file_parser.os.path.exists')
-    @patch('recruitx_app.utils.file_parser.os.unlink')
-    def test_extract_text_with_ocr(self, mock_unlink, mock_exists, mock_fitz, mock_image, mock_pytesseract):
-        """Test OCR text extraction from scanned documents."""
-        # Mock exists for temp file cleanup
-        mock_exists.return_value = True
-        
-        # Configure mock document and pages
-        mock_doc = MagicMock()
-        mock_page1 = MagicMock()
-        mock_pixmap1 = MagicMock()
-        mock_page2 = MagicMock()
-        mock_pixmap2 = MagicMock()
+        # Call the function
+        result = extract_text_from_pdf_with_layout(b'mock_pdf_content')
         
-        # Set up the mock chain
-        mock_fitz.open.return_value = mock_doc
-        mock_doc.load_page.side_effect = [mock_page1, mock_page2]
-        mock_page1.get_pixmap.return_value = mock_pixmap1
-        mock_page2.get_pixmap.return_value = mock_pixmap2
-        mock_doc.__len__.return_value = 2
+        # Verify document was opened from memory, without a temporary file
+        mock_fitz.open.assert_called_once_with(stream=b'mock_pdf_content', filetype="pdf")
         
-        # Mock OCR results
-        mock_pytesseract.image_to_string.side_effect = ["OCR text page 1", "OCR text page 2"]
+        # Verify pages were loaded and text was extracted
+        assert mock_doc.load_page.call_count == 2
+        assert mock_page1.get_text.call_count == 1
+        assert mock_page2.get_text.call_count == 1
         
-        # Mock image opening
-        mock_image.open.side_effect = [MagicMock(), MagicMock()]
+        # Verify document was closed
+        assert mock_doc.close.call_count == 1
         
-        # Test with mocked temporary file
-        with patch('recruitx_app.utils.file_parser.tempfile.NamedTemporaryFile') as mock_temp:
-            # Set up the mock temporary file
-            mock_temp_instance = MagicMock()
-            mock_temp_instance.name = "/tmp/mock_temp_file.pdf"
-            mock_temp.return_value.__enter__.return_value = mock_temp_instance
-            
-            # Set OCR_AVAILABLE to True during test
-            with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True):
-                # Call the function
-                result = extract_text_with_ocr(b'mock_pdf_content')
-                
-                # Verify temp file was created and written to
-                mock_temp_instance.write.assert_called_once_with(b'mock_pdf_content')
-                
-                # Verify document was opened and processed
-                mock_fitz.open.assert_called_once_with("/tmp/mock_temp_file.pdf")
-                assert mock_doc.load_page.call_count == 2
-                
-                # Verify pixmaps were created and saved
-                assert mock_page1.get_pixmap.call_count == 1
-                assert mock_page2.get_pixmap.call_count == 1
-                assert mock_pixmap1.save.call_count == 1
-                assert mock_pixmap2.save.call_count == 1
-                
-                # Verify OCR was performed
-                assert mock_pytesseract.image_to_string.call_count == 2
-                
-                # Verify temp files were cleaned up
-                assert mock_unlink.call_count >= 1
-                
-                # Verify the result
-                assert "OCR text page 1" in result
-                assert "OCR text page 2" in result
+        # Verify the result
+        assert "Page 1 with layout" in result
+        assert "Page 2 with layout" in result
+    
+    @patch('recruitx_app.utils.file_parser.pytesseract')
+    def test_extract_text_with_ocr(self, mock_pytesseract):
+        """Test that only pages without a text layer are OCRed, in parallel, in page order."""
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "This page already has a text layer")
+        doc.new_page()
+        doc.new_page()
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        
+        ocred_sizes = []
+        def image_to_string(img):
+            ocred_sizes.append(img.size)
+            return f"OCR text {len(ocred_sizes)}"
+        mock_pytesseract.image_to_string.side_effect = image_to_string
+        
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True), \
+             patch('recruitx_app.utils.file_parser.ocr_worker_count', return_value=2), \
+             patch('recruitx_app.utils.file_parser.get_ocr_executor', return_value=ThreadPoolExecutor(2)) as mock_pool:
+            result = extract_text_with_ocr(pdf_bytes)
+        
+        # Two image-only pages, dealt into one batch per worker
+        mock_pool.assert_called_once()
+        assert len(ocred_sizes) == 2
+        assert result.index("This page already has a text layer") < result.index("OCR text")
+        assert "OCR text 1" in result and "OCR text 2" in result
+    
+    @patch('recruitx_app.utils.file_parser.pytesseract')
+    def test_extract_text_with_ocr_renders_in_memory(self, mock_pytesseract):
+        """Test that pages are rendered to grayscale buffers at the chosen DPI without image files."""
+        doc = fitz.open()
+        doc.new_page(width=612, height=792)
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        mock_pytesseract.image_to_string.return_value = "Scanned text"
+        
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True), \
+             patch('recruitx_app.utils.file_parser.get_ocr_executor') as mock_pool:
+            result = extract_text_with_ocr(pdf_bytes)
+        
+        # A single page is OCRed in the calling thread
+        mock_pool.assert_not_called()
+        img = mock_pytesseract.image_to_string.call_args[0][0]
+        assert img.mode == "L"
+        assert img.size == (2550, 3300)  # Letter at 300 DPI
+        assert "Scanned text" in result
+    
+    @patch('recruitx_app.utils.file_parser.pytesseract')
+    def test_extract_text_with_ocr_without_pool(self, mock_pytesseract):
+        """Test that OCR falls back to the calling thread if the process pool fails."""
+        doc = fitz.open()
+        doc.new_page()
+        doc.new_page()
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        mock_pytesseract.image_to_string.side_effect = ["Page one", "Page two"]
+        
+        with patch('recruitx_app.utils.file_parser.OCR_AVAILABLE', True), \
+             patch('recruitx_app.utils.file_parser.get_ocr_executor', side_effect=RuntimeError("no pool")):
+            result = extract_text_with_ocr(pdf_bytes)
+        
+        assert result.index("Page one") < result.index("Page two")
+    
+    def test_choose_ocr_dpi(self):
+        """Test that the OCR DPI shrinks for large pages within the configured bounds."""
+        assert choose_ocr_dpi(612, 792) == 300  # Letter
+        assert choose_ocr_dpi(200, 300) == 300  # Small pages are capped at the max DPI
+        assert 150 < choose_ocr_dpi(1191, 1684) < 300  # A2
+        assert choose_ocr_dpi(2384, 3370) == 150  # A0 is clamped to the min DPI
     
     def test_ocr_not_available(self):
         """Test handling when OCR is not available."""
@@ -242,8 +299,8 @@ class TestFileParser:
     @patch('recruitx_app.utils.file_parser.PdfReader')
     def test_extract_text_from_pdf_with_error(self, mock_pdf_reader):
         """Test error handling when extracting text from a PDF file."""
-        # Mock layout extraction to fail
-        with patch('recruitx_app.utils.file_parser.extract_text_from_pdf_with_layout', return_value=""):
+        # PyMuPDF cannot open the file
+        with patch('recruitx_app.utils.file_parser.fitz.open', side_effect=RuntimeError("cannot open")):
             # Make the PdfReader raise an exception
             mock_pdf_reader.side_effect = Exception("PDF extraction error")
             
@@ -445,4 +502,69 @@ class TestFileParser:
                 
                 mock_txt.assert_called_once_with(b'content')
                 mock_clean.assert_called_once_with("Text   with   extra  spaces")
-                assert result == "Text with extra spaces" 
\ No newline at end of file
+                assert result == "Text with extra spaces"
+    
+    def test_extract_text_from_real_pdf(self):
+        """Test layout extraction on a real in-memory PDF."""
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Hello from PyMuPDF")
+        pdf_bytes = doc.tobytes()
+        doc.close()
+        
+        assert "Hello from PyMuPDF" in extract_text_from_pdf_with_layout(pdf_bytes)
+
+
+class FakeUpload:
+    """Minimal stand-in for an UploadFile that records how it was read."""
+    
+    def __init__(self, content: bytes, size=None):
+        self._buffer = io.BytesIO(content)
+        self.size = size
+        self.reads = 0
+    
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+@pytest.mark.asyncio
+class TestUploadHandling:
+    """Test class for streaming upload reads and off-loop parsing."""
+    
+    async def test_read_upload_file_in_chunks(self):
+        """Test that uploads are read in bounded chunks and reassembled."""
+        content = b"x" * (3 * 1024 * 1024 + 10)
+        upload = FakeUpload(content)
+        
+        result = await read_upload_file(upload, max_bytes=10 * 1024 * 1024)
+        
+        assert result == content
+        assert upload.reads == 5  # Four chunks plus the final empty read
+    
+    async def test_read_upload_file_rejects_oversized_stream(self):
+        """Test that reading stops as soon as the size cap is exceeded."""
+        upload = FakeUpload(b"x" * (5 * 1024 * 1024))
+        
+        with pytest.raises(FileTooLargeError):
+            await read_upload_file(upload, max_bytes=2 * 1024 * 1024)
+        assert upload.reads == 3
+    
+    async def test_read_upload_file_rejects_declared_size(self):
+        """Test that an upload whose declared size is too large is rejected without reading."""
+        upload = FakeUpload(b"small", size=100)
+        
+        with pytest.raises(FileTooLargeError):
+            await read_upload_file(upload, max_bytes=10)
+        assert upload.reads == 0
+    
+    async def test_extract_text_from_file_async_runs_off_loop(self):
+        """Test that parsing runs on the parse executor thread."""
+        import threading
+        
+        def fake_extract(content, filename):
+            return threading.current_thread().name
+        
+        with patch('recruitx_app.utils.file_parser.extract_text_from_file', side_effect=fake_extract):
+            thread_name = await extract_text_from_file_async(b"content", "cv.txt")
+        
+        assert thread_name.startswith("parse")
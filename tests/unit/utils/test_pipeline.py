@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+
+from recruitx_app.utils.pipeline import StagePipeline
+
+
+@pytest.mark.asyncio
+class TestStagePipeline:
+
+    async def test_dependencies_receive_results(self):
+        """Test that stages get their dependencies' results as keyword arguments."""
+        async def numbers():
+            return [1, 2, 3]
+
+        async def sum_numbers(numbers):
+            return sum(numbers)
+
+        async def report(numbers, sum_numbers):
+            return f"{len(numbers)} numbers, total {sum_numbers}"
+
+        pipeline = StagePipeline()
+        pipeline.add_stage("numbers", numbers).add_stage("sum_numbers", sum_numbers, depends_on=["numbers"])
+        pipeline.add_stage("report", report, depends_on=["numbers", "sum_numbers"])
+        results, timings = await pipeline.run()
+
+        assert results == {"numbers": [1, 2, 3], "sum_numbers": 6, "report": "3 numbers, total 6"}
+        assert set(timings) == {"numbers", "sum_numbers", "report", "total"}
+
+    async def test_independent_stages_run_concurrently(self):
+        """Test that stages without dependencies between them overlap."""
+        running = set()
+        overlaps = []
+
+        def stage(name):
+            async def run(**kwargs):
+                running.add(name)
+                await asyncio.sleep(0.02)
+                overlaps.append(set(running))
+                running.discard(name)
+                return name
+            return run
+
+        pipeline = StagePipeline()
+        pipeline.add_stage("root", stage("root"))
+        pipeline.add_stage("left", stage("left"), depends_on=["root"])
+        pipeline.add_stage("right", stage("right"), depends_on=["root"])
+        pipeline.add_stage("join", stage("join"), depends_on=["left", "right"])
+        await pipeline.run()
+
+        assert {"left", "right"} in overlaps
+        assert {"root"} == overlaps[0]
+        assert overlaps[-1] == {"join"}
+
+    async def test_optional_stage_failure_yields_none(self):
+        """Test that a failing optional stage does not abort the pipeline."""
+        async def flaky():
+            raise RuntimeError("external service down")
+
+        async def consumer(flaky):
+            return flaky is None
+
+        pipeline = StagePipeline()
+        pipeline.add_stage("flaky", flaky, optional=True)
+        pipeline.add_stage("consumer", consumer, depends_on=["flaky"])
+        results, _ = await pipeline.run()
+
+        assert results == {"flaky": None, "consumer": True}
+
+    async def test_required_stage_failure_cancels_run(self):
+        """Test that a failing required stage raises and cancels the stages still running."""
+        cancelled = asyncio.Event()
+
+        async def failing():
+            raise ValueError("boom")
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        pipeline = StagePipeline()
+        pipeline.add_stage("failing", failing)
+        pipeline.add_stage("slow", slow)
+
+        with pytest.raises(ValueError, match="boom"):
+            await pipeline.run()
+        assert cancelled.is_set()
+
+    async def test_unknown_dependency_rejected(self):
+        """Test that stages must be registered after their dependencies."""
+        async def stage(**kwargs):
+            return None
+
+        pipeline = StagePipeline()
+        with pytest.raises(ValueError, match="unknown stages"):
+            pipeline.add_stage("child", stage, depends_on=["parent"])
+        pipeline.add_stage("parent", stage)
+        with pytest.raises(ValueError, match="already registered"):
+            pipeline.add_stage("parent", stage)
@@ -44,6 +44,20 @@ class TestRetryUtils:
         # Verify the mock was called exactly once with the right arguments
         mock_sync_func.assert_called_once_with("sync_arg")
     
+    async def test_sync_call_runs_off_event_loop(self):
+        """Test that synchronous SDK calls are executed on the LLM executor thread pool."""
+        import threading
+        thread_names = []
+
+        def blocking_call():
+            thread_names.append(threading.current_thread().name)
+            return "done"
+
+        result = await call_gemini_with_backoff(blocking_call)
+
+        assert result == "done"
+        assert thread_names[0].startswith("llm")
+
     @patch('asyncio.sleep')
     async def test_rate_limit_with_recovery(self, mock_sleep):
         """Test recovery after rate limit errors."""
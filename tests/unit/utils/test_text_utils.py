@@ -8,7 +8,10 @@ from typing import List
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.insert(0, project_root)
 
-from recruitx_app.utils.text_utils import split_text, cosine_similarity
+from recruitx_app.utils.text_utils import (
+    split_text, iter_text_spans, cosine_similarity, normalize_rows, cosine_similarity_matrix,
+    top_k_similar, indices_above_threshold
+)
 
 
 class TestTextUtils:
@@ -118,6 +121,47 @@ class TestTextUtils:
         
         assert found_overlap
     
+    def test_iter_text_spans_offsets(self):
+        """Test that every span points at its exact position in the source text."""
+        text = "  Intro line.\n\nSecond paragraph with words. Another sentence here!\nLast line.  "
+        spans = list(iter_text_spans(text, chunk_size=30, chunk_overlap=8))
+
+        assert len(spans) > 1
+        for start, end, chunk in spans:
+            assert text[start:end] == chunk
+            assert chunk == chunk.strip() and len(chunk) <= 30
+        assert [s for s, _, _ in spans] == sorted(s for s, _, _ in spans)
+        assert spans[0][0] == 2 and spans[-1][1] == len(text) - 2
+
+    def test_iter_text_spans_is_lazy(self):
+        """Test that spans are produced as a generator."""
+        spans = iter_text_spans("word " * 1000, chunk_size=50, chunk_overlap=0)
+        assert next(spans) == (0, 49, ("word " * 10).strip())
+
+    def test_split_text_in_tokens(self):
+        """Test that chunk sizes can be measured in tokens (words and punctuation)."""
+        text = "one two three, four five six. seven eight nine ten."
+        result = split_text(text, chunk_size=5, chunk_overlap=1, length_unit="tokens")
+
+        assert result == ["one two three, four", "four five six.", "seven eight nine ten."]
+
+    def test_split_text_whitespace_only(self):
+        """Test that whitespace-only text yields no chunks."""
+        assert split_text(" \n\n \t ") == []
+
+    def test_split_text_invalid_arguments(self):
+        """Test that an unknown length unit or a non-positive chunk size is rejected."""
+        with pytest.raises(ValueError):
+            split_text("text", length_unit="bytes")
+        with pytest.raises(ValueError):
+            split_text("text", chunk_size=0)
+
+    def test_split_text_overlap_capped(self):
+        """Test that an overlap as large as the chunk still makes progress."""
+        result = split_text("a" * 100, chunk_size=20, chunk_overlap=20)
+        assert all(len(chunk) <= 20 for chunk in result)
+        assert len(result) < 20
+
     def test_cosine_similarity_identical(self):
         """Test cosine similarity of identical vectors."""
         vec = [1.0, 2.0, 3.0, 4.0]
@@ -177,4 +221,65 @@ class TestTextUtils:
         result = cosine_similarity(vec1, vec2)
         
         # Result should be exactly 1.0 after clipping
-        assert result == 1.0 
\ No newline at end of file
+        assert result == 1.0
+
+
+class TestSimilarityMatrix:
+    """Tests for the batched similarity API."""
+
+    def test_matrix_matches_pairwise(self):
+        """Test that every entry equals the per-pair cosine similarity."""
+        rng = np.random.default_rng(0)
+        queries = rng.normal(size=(4, 16)).tolist()
+        candidates = rng.normal(size=(7, 16)).tolist()
+        result = cosine_similarity_matrix(queries, candidates)
+
+        assert result.shape == (4, 7)
+        assert result.dtype == np.float32
+        expected = [[cosine_similarity(q, c) for c in candidates] for q in queries]
+        np.testing.assert_allclose(result, expected, atol=1e-5)
+
+    def test_zero_vectors_and_clipping(self):
+        """Test that zero vectors have similarity 0 and identical vectors exactly 1."""
+        result = cosine_similarity_matrix([[1.0, 1e-10], [0.0, 0.0]], [[1.0, 1e-10], [-3.0, 0.0]])
+        np.testing.assert_array_equal(result, [[1.0, -1.0], [0.0, 0.0]])
+
+    def test_prenormalized_input(self):
+        """Test that normalized=True gives the same result on normalize_rows output."""
+        queries = normalize_rows([[3.0, 4.0]])
+        candidates = normalize_rows([[4.0, 3.0], [0.0, 0.0]])
+        np.testing.assert_allclose(queries, [[0.6, 0.8]])
+        np.testing.assert_allclose(
+            cosine_similarity_matrix(queries, candidates, normalized=True),
+            cosine_similarity_matrix([[3.0, 4.0]], [[4.0, 3.0], [0.0, 0.0]])
+        )
+
+    def test_dimension_mismatch(self):
+        with pytest.raises(ValueError):
+            cosine_similarity_matrix([[1.0, 2.0, 3.0]], [[1.0, 2.0]])
+
+    def test_top_k_similar(self):
+        """Test top-k selection per row and for a single row."""
+        similarities = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.3, 0.1]], dtype=np.float32)
+        indices, scores = top_k_similar(similarities, 2)
+        np.testing.assert_array_equal(indices, [[1, 3], [0, 2]])
+        np.testing.assert_allclose(scores, [[0.9, 0.7], [0.8, 0.3]])
+
+        indices, scores = top_k_similar(similarities[0], 10)
+        np.testing.assert_array_equal(indices, [1, 3, 2, 0])
+        assert top_k_similar(similarities, 0)[0].shape == (2, 0)
+
+    def test_indices_above_threshold(self):
+        similarities = np.array([[0.1, 0.9, 0.5], [0.2, 0.3, 0.4]])
+        assert indices_above_threshold(similarities, 0.5) == [[1, 2], []]
+        assert indices_above_threshold(similarities[0], 0.5) == [1, 2]
+
+    def test_matrix_matches_pairwise_at_embedding_size(self):
+        """Test the evidence-validation shape (facets x chunks, 768-dim) against the per-pair loop."""
+        rng = np.random.default_rng(0)
+        facets = rng.normal(size=(20, 768)).tolist()
+        chunks = rng.normal(size=(300, 768)).tolist()
+
+        expected = [[cosine_similarity(f, c) for c in chunks] for f in facets]
+        np.testing.assert_allclose(cosine_similarity_matrix(facets, chunks), expected, atol=1e-5)
+
@@ -0,0 +1,170 @@
+import os
+import sys
+import asyncio
+import threading
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from recruitx_app.utils.tiered_cache import SQLiteCacheStore, TieredCache
+
+
+class RecordingStore(SQLiteCacheStore):
+    """SQLite store that records the thread each read and write ran on."""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.threads = []
+
+    def get(self, namespace, key):
+        self.threads.append(("get", threading.current_thread().name))
+        return super().get(namespace, key)
+
+    def set(self, namespace, key, encoded, expires_at, stale_until):
+        self.threads.append(("set", threading.current_thread().name))
+        super().set(namespace, key, encoded, expires_at, stale_until)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTieredCache:
+    """Test class for the two-tier cache with stale-while-revalidate."""
+    
+    def test_round_trip_returns_copies(self, clock):
+        """Test that values are returned as independent copies."""
+        cache = TieredCache("test", ttl_seconds=60, clock=clock)
+        cache.set("key", {"items": [1, 2]})
+        
+        first = cache.get("key")
+        first["items"].append(3)
+        
+        assert cache.get("key") == {"items": [1, 2]}
+        assert cache.stats()["memory_hits"] == 2
+    
+    def test_bounded_by_entries(self, clock):
+        """Test that the memory tier evicts the least recently used entry."""
+        cache = TieredCache("test", ttl_seconds=60, max_entries=2, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+    
+    def test_bounded_by_bytes(self, clock):
+        """Test that the memory tier stays under its byte budget."""
+        cache = TieredCache("test", ttl_seconds=60, max_bytes=100, clock=clock)
+        for i in range(5):
+            cache.set(f"key{i}", "x" * 40)
+        
+        stats = cache.stats()
+        assert stats["bytes"] <= 100
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 3
+    
+    def test_expired_entries_are_stale_then_gone(self, clock):
+        """Test the fresh, stale and expired phases of an entry."""
+        cache = TieredCache("test", ttl_seconds=60, stale_ttl_seconds=30, clock=clock)
+        cache.set("key", "value")
+        
+        assert cache.lookup("key") == ("value", False)
+        clock.now += 70
+        assert cache.lookup("key") == ("value", True)
+        assert cache.get("key") is None  # get only returns fresh values
+        clock.now += 30
+        assert cache.lookup("key") is None
+        assert cache.stats()["expirations"] == 1
+    
+    def test_shared_tier_serves_other_instances(self, clock, tmp_path):
+        """Test that an entry written by one worker is read by another through SQLite."""
+        db_path = str(tmp_path / "cache.sqlite3")
+        TieredCache("test", ttl_seconds=60, shared_store=SQLiteCacheStore(db_path), clock=clock).set("key", {"a": 1})
+        
+        other_worker = TieredCache("test", ttl_seconds=60, shared_store=SQLiteCacheStore(db_path), clock=clock)
+        
+        assert other_worker.get("key") == {"a": 1}
+        assert other_worker.stats()["shared_hits"] == 1
+        # Promoted to the memory tier
+        assert other_worker.get("key") == {"a": 1}
+        assert other_worker.stats()["memory_hits"] == 1
+    
+    def test_namespaces_are_isolated(self, clock):
+        """Test that caches sharing a store do not see each other's keys."""
+        store = SQLiteCacheStore(":memory:")
+        TieredCache("one", ttl_seconds=60, shared_store=store, clock=clock).set("key", 1)
+        
+        assert TieredCache("two", ttl_seconds=60, shared_store=store, clock=clock).get("key") is None
+    
+    @pytest.mark.asyncio
+    async def test_get_or_fetch_caches_only_cacheable_values(self, clock):
+        """Test that a miss fetches and only stores values accepted by cacheable."""
+        cache = TieredCache("test", ttl_seconds=60, clock=clock)
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            return {"success": len(calls) > 1}
+        
+        cacheable = lambda result: result["success"]
+        assert await cache.get_or_fetch("key", fetch, cacheable) == {"success": False}
+        assert await cache.get_or_fetch("key", fetch, cacheable) == {"success": True}
+        assert await cache.get_or_fetch("key", fetch, cacheable) == {"success": True}
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, clock):
+        """Test that a stale entry is returned at once and refreshed once in the background."""
+        cache = TieredCache("test", ttl_seconds=60, stale_ttl_seconds=600, clock=clock)
+        cache.set("key", "old")
+        clock.now += 61
+        release = asyncio.Event()
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return "new"
+        
+        assert await cache.get_or_fetch("key", fetch) == "old"
+        assert await cache.get_or_fetch("key", fetch) == "old"
+        release.set()
+        await cache.wait_for_refreshes()
+        
+        assert len(calls) == 1
+        assert await cache.get_or_fetch("key", fetch) == "new"
+        stats = cache.stats()
+        assert stats["stale_hits"] == 2
+        assert stats["refreshes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_or_fetch_keeps_shared_io_off_the_event_loop(self, clock):
+        """Test that the shared tier is read and written on the cache executor, not the loop thread."""
+        store = RecordingStore(":memory:")
+        cache = TieredCache("test", ttl_seconds=60, shared_store=store, clock=clock)
+        
+        async def fetch():
+            return {"a": 1}
+        
+        assert await cache.get_or_fetch("key", fetch) == {"a": 1}
+        assert [op for op, _ in store.threads] == ["get", "set"]
+        assert all(name.startswith("cache") for _, name in store.threads)
+        
+        other_worker = TieredCache("test", ttl_seconds=60, shared_store=store, clock=clock)
+        assert await other_worker.alookup("key") == ({"a": 1}, False)
+        assert other_worker.stats()["shared_hits"] == 1
+        assert store.threads[-1][1].startswith("cache")
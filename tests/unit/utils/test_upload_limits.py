@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from recruitx_app.core.config import settings
+from recruitx_app.utils.upload_limits import UploadSizeLimitMiddleware, max_request_bytes
+
+
+@pytest.fixture
+def upload_client():
+    """A minimal app with the middleware and one upload endpoint that records its calls."""
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware)
+    calls = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    with patch.object(settings, "MAX_UPLOAD_BYTES", 1000), patch.object(settings, "UPLOAD_FORM_OVERHEAD_BYTES", 500):
+        yield TestClient(app), calls
+
+
+def multipart_body(size: int) -> bytes:
+    return (b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.txt\"\r\n"
+            b"Content-Type: text/plain\r\n\r\n" + b"x" * size + b"\r\n--boundary--\r\n")
+
+
+MULTIPART_HEADERS = {"content-type": "multipart/form-data; boundary=boundary"}
+
+
+class TestUploadSizeLimitMiddleware:
+
+    def test_upload_within_limit_passes(self, upload_client):
+        client, calls = upload_client
+        response = client.post("/upload", files={"file": ("cv.txt", b"x" * 900, "text/plain")})
+        assert response.status_code == 200
+        assert response.json() == {"size": 900}
+        assert calls == ["cv.txt"]
+
+    def test_declared_length_over_limit_is_rejected_unread(self, upload_client):
+        """Test that a Content-Length over the limit gets a 413 without running the endpoint."""
+        client, calls = upload_client
+        response = client.post("/upload", files={"file": ("cv.txt", b"x" * 5000, "text/plain")})
+        assert response.status_code == 413
+        assert "1500 byte" in response.json()["detail"]
+        assert calls == []
+
+    def test_chunked_body_is_cut_off_at_limit(self, upload_client):
+        """Test that a body without Content-Length is rejected once it passes the limit."""
+        client, calls = upload_client
+        body = multipart_body(5000)
+
+        def chunks():
+            for start in range(0, len(body), 256):
+                yield body[start:start + 256]
+
+        response = client.post("/upload", content=chunks(), headers=MULTIPART_HEADERS)
+        assert response.status_code == 413
+        assert calls == []
+
+    def test_non_multipart_requests_are_not_limited(self, upload_client):
+        client, _ = upload_client
+        response = client.post("/echo", json={"text": "x" * 5000})
+        assert response.status_code == 200
+
+
+def test_bulk_upload_has_its_own_limit():
+    assert max_request_bytes("/api/v1/candidates/bulk-upload") == settings.BULK_INGEST_MAX_REQUEST_BYTES
+    assert max_request_bytes("/api/v1/candidates/upload") == settings.MAX_UPLOAD_BYTES + settings.UPLOAD_FORM_OVERHEAD_BYTES